@@ -5,6 +5,9 @@ import { google } from 'googleapis';
 import { Stream } from 'stream';
 import fetch from 'node-fetch'; // Using built-in or node-fetch if available in env
 import { Buffer } from 'buffer';
+import { DfsResponseCache, DfsCacheFamily } from './services/dfsResponseCache';
+import { dfsAgent, sendWrapped } from './services/dfsUpstream';
+import { DfsCoalescer } from './services/dfsCoalescer';
 
 const app = express();
 const PORT = process.env.PORT || 8080;
@@ -36,7 +39,8 @@ if (SERVICE_ACCOUNT_JSON) {
 app.use(cors({
   origin: true,
   methods: ['GET', 'POST', 'OPTIONS'],
-  allowedHeaders: ['Content-Type', 'X-API-Key', 'X-Filename', 'Authorization']
+  allowedHeaders: ['Content-Type', 'X-API-Key', 'X-Filename', 'Authorization'],
+  exposedHeaders: ['X-DFS-Cache', 'X-DFS-Coalesced']
 }));
 app.use(express.json({ limit: '50mb' })); // Increased limit for large payloads
 
@@ -77,7 +81,8 @@ app.get('/dfs/ping', async (req, res) => {
     const response = await fetch(postUrl, {
       method: 'POST',
       headers: { 'Authorization': `Basic ${auth}`, 'Content-Type': 'application/json' },
-      body: JSON.stringify(postBody)
+      body: JSON.stringify(postBody),
+      agent: dfsAgent
     });
 
     const data: any = await response.json();
@@ -126,7 +131,9 @@ const ALLOWED_DFS_PATHS = [
 
 app.post('/dfs/proxy', async (req, res) => {
     // Support both schemas: Client sends { path, ... }, Legacy might send { endpoint, ... }
-    let { path, endpoint, payload, creds } = req.body;
+    let { path, endpoint, payload, creds, method } = req.body;
+    // task_get endpoints are GET-only upstream; everything else is POST
+    const upstreamMethod = method === 'GET' ? 'GET' : 'POST';
     
     // Normalize to 'path' (no leading slash, no v3)
     if (!path && endpoint) {
@@ -163,34 +170,107 @@ app.post('/dfs/proxy', async (req, res) => {
         });
     }
     
+    // 3. Response cache (live endpoints only, opt-in via DFS_CACHE_ENABLED)
+    const cacheKey = DfsResponseCache.isCacheable(path, upstreamMethod)
+        ? DfsResponseCache.keyFor(path, payload, creds)
+        : null;
+    if (cacheKey) {
+        const cached = await DfsResponseCache.get(cacheKey);
+        if (cached) {
+            console.log(`[DFS_PROXY] <- CACHE_HIT (${Date.now() - start}ms)`);
+            res.setHeader('X-DFS-Cache', 'HIT');
+            try {
+                await sendWrapped(req, res, 200, cached);
+            } catch (e: any) {
+                console.error(`[DFS_PROXY] CACHE_SEND_ERROR: ${e.message}`);
+            }
+            return;
+        }
+    } else {
+        DfsResponseCache.noteBypass();
+    }
+
     try {
+        // 4. Coalescing: concurrent search_volume calls share one upstream request
+        if (DfsCoalescer.canCoalesce(path, upstreamMethod, payload)) {
+            const merged = await DfsCoalescer.submit(path, payload, creds);
+            res.setHeader('X-DFS-Cache', cacheKey ? 'MISS' : 'BYPASS');
+            res.setHeader('X-DFS-Coalesced', String(merged.coalesced));
+            await sendWrapped(req, res, merged.proxyStatus, merged.body);
+
+            console.log(`[DFS_PROXY] <- ${merged.proxyStatus} coalesced=${merged.coalesced} (${Date.now() - start}ms)`);
+            if (cacheKey && merged.proxyStatus === 200) DfsResponseCache.put(cacheKey, path, merged.body);
+            return;
+        }
+
         const auth = Buffer.from(`${creds.login}:${creds.password}`).toString('base64');
         const response = await fetch(url, {
-            method: 'POST',
+            method: upstreamMethod,
             headers: {
                 'Authorization': `Basic ${auth}`,
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify(payload)
+            body: upstreamMethod === 'POST' ? JSON.stringify(payload) : undefined,
+            agent: dfsAgent
         });
 
-        // We forward the raw status and body from DFS
-        const data = await response.json();
-        
-        console.log(`[DFS_PROXY] <- ${response.status} (${Date.now() - start}ms)`);
-        
+        // Non-JSON (gateway HTML etc.) cannot be embedded in the wrapper
+        const contentType = response.headers.get('content-type') || '';
+        if (!contentType.includes('json') || !response.body) {
+            const text = await response.text();
+            throw new Error(`Upstream returned ${response.status} ${contentType || 'no content-type'}: ${text.slice(0, 200)}`);
+        }
+
+        // Stream the DFS body straight into the wrapper; the cache gets a copy of the bytes
+        const captured: Buffer[] | undefined = cacheKey && response.ok ? [] : undefined;
+        res.setHeader('X-DFS-Cache', cacheKey ? 'MISS' : 'BYPASS');
+
         // Return 200 even if DFS failed logic, client handles the DFS error structure
-        res.status(200).json({
-            proxyStatus: response.status,
-            data: data
-        });
+        await sendWrapped(req, res, response.status, response.body, captured);
+
+        console.log(`[DFS_PROXY] <- ${response.status} (${Date.now() - start}ms)`);
+
+        if (cacheKey && captured) {
+            // Written after the reply; put() skips DFS-level errors
+            DfsResponseCache.put(cacheKey, path, Buffer.concat(captured).toString('utf8'));
+        }
 
     } catch (e: any) {
         console.error(`[DFS_PROXY] ERROR: ${e.message}`);
+        // Mid-stream failure: the status line is gone, so cut the connection
+        if (res.headersSent) {
+            res.destroy(e);
+            return;
+        }
         res.status(500).json({ error: "Proxy Request Failed", details: e.message });
     }
 });
 
+// --- DFS CACHE ADMIN ---
+
+app.get('/dfs/cache/stats', async (req, res) => {
+    res.json(await DfsResponseCache.getStats());
+});
+
+app.get('/dfs/cache/entries', async (req, res) => {
+    const limit = Math.min(1000, Number(req.query.limit) || 100);
+    res.json(await DfsResponseCache.listEntries(limit));
+});
+
+app.post('/dfs/cache/purge', async (req, res) => {
+    const { family, pathPrefix } = req.body || {};
+    const families: DfsCacheFamily[] = ['search_volume', 'keywords_for_keywords', 'amazon'];
+    if (family && !families.includes(family)) {
+        return res.status(400).json({ error: `Unknown family. Use one of: ${families.join(', ')}` });
+    }
+    const removed = await DfsResponseCache.purge({ family, pathPrefix });
+    res.json({ ok: true, removed });
+});
+
+app.get('/dfs/coalesce/stats', (req, res) => {
+    res.json(DfsCoalescer.getStats());
+});
+
 // --- GOOGLE DRIVE ROUTES ---
 
 app.get('/snapshots', async (req, res) => {
@@ -0,0 +1,87 @@
+
+import assert from 'assert';
+import { DfsCoalescer } from './dfsCoalescer';
+
+/**
+ * UNIT TEST: DfsCoalescer.sliceFor
+ * A merged search_volume/live envelope is narrowed to one caller's keywords:
+ * rows matched ignoring case and spacing, rows DFS respelled beyond that
+ * shared with every caller, task data and result_count rewritten, cost split
+ * by the caller's share, and error envelopes passed through.
+ */
+
+function mergedEnvelope() {
+    return {
+        status_code: 20000,
+        cost: 0.075,
+        tasks: [{
+            id: 'task-1',
+            status_code: 20000,
+            cost: 0.075,
+            result_count: 3,
+            data: { location_code: 2356, language_code: 'en', keywords: ['razor', 'Beard Oil', 'trimmer'] },
+            result: [
+                { keyword: 'razor', search_volume: 1000 },
+                { keyword: 'beard oil', search_volume: 500 },
+                { keyword: 'trimmer', search_volume: 800 }
+            ]
+        }]
+    };
+}
+
+const MERGED_KEYWORDS = ['razor', 'Beard Oil', 'trimmer'];
+
+export function runDfsCoalescerTests() {
+    console.group("Testing DfsCoalescer.sliceFor");
+
+    // 1. Only the caller's rows, matched regardless of case and padding
+    const merged = mergedEnvelope();
+    const mine = DfsCoalescer.sliceFor(merged, ['Razor', ' BEARD OIL'], MERGED_KEYWORDS);
+    assert.deepStrictEqual(mine.tasks[0].result.map((r: any) => r.keyword), ['razor', 'beard oil']);
+    assert.strictEqual(mine.tasks[0].result_count, 2);
+    assert.deepStrictEqual(mine.tasks[0].data.keywords, ['Razor', ' BEARD OIL'], "Task data should echo the caller's own keywords");
+    assert.strictEqual(mine.tasks[0].data.location_code, 2356);
+
+    // 2. Cost is split by keyword share; the slices add back up to the merged cost
+    const theirs = DfsCoalescer.sliceFor(merged, ['trimmer'], MERGED_KEYWORDS);
+    assert.strictEqual(mine.cost, 0.05);
+    assert.strictEqual(theirs.tasks[0].cost, 0.025);
+    assert.strictEqual(Math.round((mine.cost + theirs.cost) * 1e6) / 1e6, merged.cost);
+
+    // 3. The merged envelope is not mutated by slicing
+    assert.deepStrictEqual(merged, mergedEnvelope());
+
+    // 4. Inner whitespace is ignored; a row DFS respelled goes to every caller
+    const respelled = {
+        status_code: 20000,
+        cost: 0.05,
+        tasks: [{
+            status_code: 20000,
+            cost: 0.05,
+            result_count: 2,
+            data: { keywords: ['razor   blade', "men's razor"] },
+            result: [
+                { keyword: 'razor blade', search_volume: 900 },
+                { keyword: 'mens razor', search_volume: 300 }
+            ]
+        }]
+    };
+    const spaced = DfsCoalescer.sliceFor(respelled, ['razor   blade'], ['razor   blade', "men's razor"]);
+    assert.deepStrictEqual(spaced.tasks[0].result.map((r: any) => r.keyword), ['razor blade', 'mens razor']);
+    const other = DfsCoalescer.sliceFor(respelled, ["men's razor"], ['razor   blade', "men's razor"]);
+    assert.deepStrictEqual(other.tasks[0].result.map((r: any) => r.keyword), ['mens razor'], "An unmatched row should reach every caller, a matched one only its owner");
+
+    // 5. Error envelopes (no result array) keep their shape and codes
+    const failed = {
+        status_code: 20000,
+        tasks: [{ status_code: 40202, status_message: 'Rate limit', result_count: 0, data: { keywords: ['razor', 'trimmer'] }, result: null }]
+    };
+    const sliced = DfsCoalescer.sliceFor(failed, ['razor'], ['razor', 'trimmer']);
+    assert.strictEqual(sliced.tasks[0].status_code, 40202);
+    assert.strictEqual(sliced.tasks[0].result, null);
+    assert.strictEqual(sliced.tasks[0].result_count, 0);
+    assert.deepStrictEqual(sliced.tasks[0].data.keywords, ['razor']);
+
+    console.log("All DfsCoalescer Tests Passed.");
+    console.groupEnd();
+}
@@ -0,0 +1,228 @@
+import { createHash } from 'crypto';
+import fetch from 'node-fetch';
+import { Buffer } from 'buffer';
+import { dfsAgent } from './dfsUpstream';
+
+/**
+ * DFS COALESCER
+ * Holds concurrent google_ads search_volume/live requests for a short window
+ * and sends them upstream as one call. Requests are grouped by login and by
+ * every payload field except `keywords`; keyword lists are merged (deduped
+ * ignoring case and spacing) up to the DFS 700 limit, and the result rows are split
+ * back out so each caller gets the envelope it would have got on its own.
+ * A failed merged call is re-sent per request only for task-level input
+ * errors; throttling, outages and account errors go to every caller as-is.
+ * Off unless DFS_COALESCE_WINDOW_MS is set.
+ */
+
+export interface DfsCreds {
+    login: string;
+    password: string;
+}
+
+export interface CoalescedResult {
+    proxyStatus: number;
+    body: string;               // Raw JSON for the caller's own keywords
+    coalesced: number;          // Requests that shared the upstream call
+}
+
+interface Waiter {
+    keywords: string[];
+    resolve: (r: CoalescedResult) => void;
+    reject: (e: Error) => void;
+}
+
+interface Group {
+    key: string;
+    path: string;
+    base: Record<string, any>;  // payload[0] minus keywords
+    creds: DfsCreds;
+    keywords: Map<string, string>;  // normalised -> first spelling seen
+    waiters: Waiter[];
+    timer: ReturnType<typeof setTimeout> | null;
+}
+
+const COALESCE_PATH = 'keywords_data/google_ads/search_volume/live';
+const MAX_KEYWORDS = 700;
+const WINDOW_MS = Math.max(0, Number(process.env.DFS_COALESCE_WINDOW_MS) || 0);
+
+const groups = new Map<string, Group>();
+const stats = { requests: 0, upstreamCalls: 0, fallbacks: 0, keywordsIn: 0, keywordsSent: 0 };
+
+// Case and spacing only, like normalizeKeywordString; stripping punctuation here would merge non-Latin keywords
+const norm = (k: string) => String(k).trim().toLowerCase().replace(/\s+/g, ' ');
+
+async function callUpstream(path: string, payload: any, creds: DfsCreds): Promise<{ status: number; data: any }> {
+    stats.upstreamCalls++;
+    const auth = Buffer.from(`${creds.login}:${creds.password}`).toString('base64');
+    const response = await fetch(`https://api.dataforseo.com/v3/${path}`, {
+        method: 'POST',
+        headers: {
+            'Authorization': `Basic ${auth}`,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(payload),
+        agent: dfsAgent
+    });
+    return { status: response.status, data: await response.json() };
+}
+
+function succeeded(status: number, data: any): boolean {
+    const task = data?.tasks?.[0];
+    return status === 200 && data?.status_code === 20000 && task?.status_code === 20000;
+}
+
+/**
+ * Failures that say nothing about any one caller's keywords: throttling, upstream
+ * outages, and account-level codes (401xx auth, 402xx balance/rate limits such
+ * as 40202). Re-sending each request alone would only repeat them N times.
+ */
+function sharedFailure(status: number, data: any): boolean {
+    if (status === 401 || status === 402 || status >= 429) return true;
+    const codes = [data?.status_code, data?.tasks?.[0]?.status_code].filter((c): c is number => typeof c === 'number');
+    return codes.some(c => (c >= 40100 && c < 40300) || c >= 50000);
+}
+
+/**
+ * The merged envelope narrowed to one caller's keywords, cost split by share.
+ * A row matching none of the merged keywords (DFS rewrote the spelling) goes
+ * to every caller, whose own normalisation can still match it.
+ */
+function sliceFor(data: any, keywords: string[], merged: string[]): any {
+    const wanted = new Set(keywords.map(norm));
+    const sent = new Set(merged.map(norm));
+    const task = data.tasks[0];
+    const share = sent.size > 0 ? wanted.size / sent.size : 0;
+    const rows = Array.isArray(task.result)
+        ? task.result.filter((r: any) => { const k = norm(r?.keyword); return wanted.has(k) || !sent.has(k); })
+        : task.result;
+    const cost = (n: any) => typeof n === 'number' ? Math.round(n * share * 1e6) / 1e6 : n;
+
+    return {
+        ...data,
+        cost: cost(data.cost),
+        tasks: [{
+            ...task,
+            cost: cost(task.cost),
+            result_count: Array.isArray(rows) ? rows.length : task.result_count,
+            data: task.data ? { ...task.data, keywords } : task.data,
+            result: rows
+        }]
+    };
+}
+
+async function runSolo(group: Group, waiter: Waiter) {
+    try {
+        const { status, data } = await callUpstream(group.path, [{ ...group.base, keywords: waiter.keywords }], group.creds);
+        waiter.resolve({ proxyStatus: status, body: JSON.stringify(data), coalesced: 1 });
+    } catch (e: any) {
+        waiter.reject(e);
+    }
+}
+
+async function flush(group: Group) {
+    if (groups.get(group.key) === group) groups.delete(group.key);
+    if (group.timer) clearTimeout(group.timer);
+    group.timer = null;
+
+    const keywords = Array.from(group.keywords.values());
+    stats.keywordsSent += keywords.length;
+    console.log(`[DFS_COALESCE][FLUSH] requests=${group.waiters.length} keywords=${keywords.length}`);
+
+    if (group.waiters.length === 1) return runSolo(group, group.waiters[0]);
+
+    let result: { status: number; data: any };
+    try {
+        result = await callUpstream(group.path, [{ ...group.base, keywords }], group.creds);
+    } catch (e: any) {
+        group.waiters.forEach(w => w.reject(e));
+        return;
+    }
+
+    if (!succeeded(result.status, result.data) && sharedFailure(result.status, result.data)) {
+        console.warn(`[DFS_COALESCE][SHARED_FAIL] status=${result.status} dfs=${result.data?.tasks?.[0]?.status_code ?? result.data?.status_code} requests=${group.waiters.length}`);
+        const hasTask = Array.isArray(result.data?.tasks) && result.data.tasks.length > 0;
+        group.waiters.forEach(w => w.resolve({
+            proxyStatus: result.status,
+            body: JSON.stringify(hasTask ? sliceFor(result.data, w.keywords, keywords) : result.data),
+            coalesced: group.waiters.length
+        }));
+        return;
+    }
+
+    if (!succeeded(result.status, result.data)) {
+        // Task-level input errors: one caller's bad input must not fail everyone else's keywords
+        stats.fallbacks++;
+        console.warn(`[DFS_COALESCE][FALLBACK] status=${result.status} dfs=${result.data?.tasks?.[0]?.status_code ?? result.data?.status_code} requests=${group.waiters.length}`);
+        await Promise.all(group.waiters.map(w => runSolo(group, w)));
+        return;
+    }
+
+    group.waiters.forEach(w => w.resolve({
+        proxyStatus: result.status,
+        body: JSON.stringify(sliceFor(result.data, w.keywords, keywords)),
+        coalesced: group.waiters.length
+    }));
+}
+
+export const DfsCoalescer = {
+
+    enabled: WINDOW_MS > 0,
+
+    /** Single-task search_volume/live payloads within the keyword limit. */
+    canCoalesce(path: string, method: 'GET' | 'POST', payload: any): boolean {
+        if (WINDOW_MS <= 0 || method !== 'POST' || path.replace(/\/$/, '') !== COALESCE_PATH) return false;
+        if (!Array.isArray(payload) || payload.length !== 1) return false;
+        const keywords = payload[0]?.keywords;
+        return Array.isArray(keywords) && keywords.length > 0 && keywords.length <= MAX_KEYWORDS &&
+            keywords.every((k: any) => typeof k === 'string');
+    },
+
+    submit(path: string, payload: any[], creds: DfsCreds): Promise<CoalescedResult> {
+        const { keywords, ...base } = payload[0];
+        const key = createHash('sha256')
+            .update(`${path}\n${JSON.stringify(Object.entries(base).sort())}\n${creds.login}\n${creds.password}`)
+            .digest('hex');
+
+        stats.requests++;
+        stats.keywordsIn += keywords.length;
+
+        return new Promise<CoalescedResult>((resolve, reject) => {
+            const waiter: Waiter = { keywords, resolve, reject };
+
+            let group = groups.get(key);
+            if (group) {
+                const added = new Set(keywords.map(norm).filter((k: string) => !group!.keywords.has(k))).size;
+                if (group.keywords.size + added > MAX_KEYWORDS) {
+                    flush(group);
+                    group = undefined;
+                }
+            }
+            if (!group) {
+                const created: Group = { key, path, base, creds, keywords: new Map(), waiters: [], timer: null };
+                created.timer = setTimeout(() => flush(created), WINDOW_MS);
+                groups.set(key, created);
+                group = created;
+            }
+
+            group.waiters.push(waiter);
+            keywords.forEach((k: string) => {
+                const n = norm(k);
+                if (!group!.keywords.has(n)) group!.keywords.set(n, k);
+            });
+            if (group.keywords.size >= MAX_KEYWORDS) flush(group);
+        });
+    },
+
+    sliceFor,
+
+    getStats() {
+        return {
+            enabled: WINDOW_MS > 0,
+            windowMs: WINDOW_MS,
+            pendingGroups: groups.size,
+            ...stats,
+            requestsPerUpstreamCall: stats.upstreamCalls > 0 ? stats.requests / stats.upstreamCalls : 0
+        };
+    }
+};
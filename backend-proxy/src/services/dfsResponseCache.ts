@@ -0,0 +1,286 @@
+import { createHash } from 'crypto';
+import { promises as fs } from 'fs';
+import os from 'os';
+import nodePath from 'path';
+import type { DfsCreds } from './dfsCoalescer';
+
+/**
+ * DFS RESPONSE CACHE
+ * Disk-backed cache for /dfs/proxy live calls, keyed by
+ * sha256(path, canonical payload, sha256(login:password)). Entries live as one
+ * JSON file each under DFS_CACHE_DIR; an index file keeps LRU order, sizes and
+ * expiry so startup never has to read the bodies. Only successful live responses are
+ * stored: task_post/task_get and anything DFS flagged as an error go upstream.
+ * The lookup happens before DataForSEO sees the credentials, so the password
+ * is part of the key: a known login with a wrong or revoked password misses.
+ */
+
+export type DfsCacheFamily = 'search_volume' | 'keywords_for_keywords' | 'amazon';
+export type DfsCacheStatus = 'HIT' | 'MISS' | 'BYPASS';
+
+interface CacheEntryMeta {
+    key: string;
+    path: string;
+    family: DfsCacheFamily;
+    bytes: number;
+    storedAt: number;
+    expiresAt: number;
+    lastAccess: number;
+    hits: number;
+}
+
+const readNum = (name: string, fallback: number): number => {
+    const n = Number(process.env[name]);
+    return Number.isFinite(n) && n > 0 ? n : fallback;
+};
+
+const HOUR_S = 3600;
+
+const ENABLED = process.env.DFS_CACHE_ENABLED === 'true';
+const CACHE_DIR = process.env.DFS_CACHE_DIR || nodePath.join(os.tmpdir(), 'dfs-cache');
+const MAX_BYTES = readNum('DFS_CACHE_MAX_MB', 512) * 1024 * 1024;
+const INDEX_FILE = 'index.json';
+const INDEX_FLUSH_MS = 2000;
+
+// Search volumes are monthly aggregates; keyword ideas drift faster; Amazon fastest
+const TTL_MS: Record<DfsCacheFamily, number> = {
+    search_volume: readNum('DFS_CACHE_TTL_SEARCH_VOLUME_S', 7 * 24 * HOUR_S) * 1000,
+    keywords_for_keywords: readNum('DFS_CACHE_TTL_KEYWORDS_S', 3 * 24 * HOUR_S) * 1000,
+    amazon: readNum('DFS_CACHE_TTL_AMAZON_S', 24 * HOUR_S) * 1000
+};
+
+// Map insertion order is the LRU order: oldest first
+const index = new Map<string, CacheEntryMeta>();
+let totalBytes = 0;
+let ready: Promise<void> | null = null;
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+
+const stats = { hits: 0, misses: 0, bypass: 0, writes: 0, evictions: 0, errors: 0 };
+
+function stableStringify(value: any): string {
+    if (value === null || typeof value !== 'object') return JSON.stringify(value) ?? 'null';
+    if (Array.isArray(value)) return `[${value.map(stableStringify).join(',')}]`;
+    const keys = Object.keys(value).filter(k => value[k] !== undefined).sort();
+    return `{${keys.map(k => `${JSON.stringify(k)}:${stableStringify(value[k])}`).join(',')}}`;
+}
+
+function familyFor(path: string): DfsCacheFamily {
+    if (path.includes('amazon')) return 'amazon';
+    if (path.includes('search_volume')) return 'search_volume';
+    return 'keywords_for_keywords';
+}
+
+function fileFor(key: string): string {
+    return nodePath.join(CACHE_DIR, `${key}.json`);
+}
+
+/** DFS reports failures inside a 200, per request and per task. */
+function isCacheableBody(data: any): boolean {
+    if (!data || data.status_code !== 20000) return false;
+    const tasks = Array.isArray(data.tasks) ? data.tasks : [];
+    return tasks.length > 0 && tasks.every((t: any) => t?.status_code === 20000);
+}
+
+function scheduleIndexFlush() {
+    if (flushTimer) return;
+    flushTimer = setTimeout(() => {
+        flushTimer = null;
+        const tmp = nodePath.join(CACHE_DIR, `${INDEX_FILE}.tmp`);
+        fs.writeFile(tmp, JSON.stringify(Array.from(index.values())))
+            .then(() => fs.rename(tmp, nodePath.join(CACHE_DIR, INDEX_FILE)))
+            .catch(e => console.warn(`[DFS_CACHE][INDEX_FLUSH_FAIL] ${e.message}`));
+    }, INDEX_FLUSH_MS);
+}
+
+function touch(meta: CacheEntryMeta) {
+    index.delete(meta.key);
+    meta.lastAccess = Date.now();
+    index.set(meta.key, meta);
+    scheduleIndexFlush();
+}
+
+async function removeEntry(key: string) {
+    const meta = index.get(key);
+    if (!meta) return;
+    index.delete(key);
+    totalBytes -= meta.bytes;
+    await fs.unlink(fileFor(key)).catch(() => {});
+    scheduleIndexFlush();
+}
+
+async function evictToFit() {
+    for (const key of index.keys()) {
+        if (totalBytes <= MAX_BYTES) break;
+        await removeEntry(key);
+        stats.evictions++;
+    }
+}
+
+async function load() {
+    await fs.mkdir(CACHE_DIR, { recursive: true });
+    let saved: CacheEntryMeta[] = [];
+    try {
+        saved = JSON.parse(await fs.readFile(nodePath.join(CACHE_DIR, INDEX_FILE), 'utf8'));
+    } catch (e) {
+        // First start or unreadable index: the sweep below clears the orphans
+    }
+
+    const now = Date.now();
+    saved
+        .filter(m => m && m.key && m.expiresAt > now)
+        .sort((a, b) => a.lastAccess - b.lastAccess)
+        .forEach(m => {
+            index.set(m.key, m);
+            totalBytes += m.bytes;
+        });
+
+    // Drop body files the index no longer knows about (expired or never indexed)
+    const files = await fs.readdir(CACHE_DIR);
+    await Promise.all(files
+        .filter(f => f.endsWith('.json') && f !== INDEX_FILE && !index.has(f.slice(0, -5)))
+        .map(f => fs.unlink(nodePath.join(CACHE_DIR, f)).catch(() => {})));
+
+    await evictToFit();
+    console.log(`[DFS_CACHE][LOAD] dir=${CACHE_DIR} entries=${index.size} bytes=${totalBytes} max_bytes=${MAX_BYTES}`);
+}
+
+function ensureReady(): Promise<void> {
+    if (!ready) {
+        ready = load().catch(e => {
+            console.error(`[DFS_CACHE][LOAD_FAIL] ${e.message}`);
+            stats.errors++;
+        });
+    }
+    return ready;
+}
+
+export const DfsResponseCache = {
+
+    enabled: ENABLED,
+
+    /** Only live POST calls are deterministic enough to replay. */
+    isCacheable(path: string, method: 'GET' | 'POST'): boolean {
+        return ENABLED && method === 'POST' && /\/live\/?$/.test(path);
+    },
+
+    keyFor(path: string, payload: any, creds: DfsCreds): string {
+        // Only a digest of the credentials goes into the key, never the plaintext
+        const account = createHash('sha256').update(`${creds.login}:${creds.password}`).digest('hex');
+        return createHash('sha256')
+            .update(`${path}\n${stableStringify(payload)}\n${account}`)
+            .digest('hex');
+    },
+
+    /** Returns the stored upstream body as raw JSON text, unparsed. */
+    async get(key: string): Promise<string | null> {
+        await ensureReady();
+        const meta = index.get(key);
+        if (!meta) {
+            stats.misses++;
+            return null;
+        }
+        if (meta.expiresAt <= Date.now()) {
+            await removeEntry(key);
+            stats.misses++;
+            return null;
+        }
+        try {
+            const body = await fs.readFile(fileFor(key), 'utf8');
+            meta.hits++;
+            touch(meta);
+            stats.hits++;
+            return body;
+        } catch (e) {
+            // Body went missing; treat as a miss and forget it
+            await removeEntry(key);
+            stats.misses++;
+            stats.errors++;
+            return null;
+        }
+    },
+
+    /** Stores the raw upstream body if DFS reported success; never throws. */
+    async put(key: string, path: string, body: string): Promise<void> {
+        try {
+            if (!isCacheableBody(JSON.parse(body))) return;
+            await ensureReady();
+            const bytes = Buffer.byteLength(body);
+            if (bytes > MAX_BYTES) return;
+
+            const tmp = `${fileFor(key)}.${process.pid}.tmp`;
+            await fs.writeFile(tmp, body);
+            await fs.rename(tmp, fileFor(key));
+
+            const previous = index.get(key);
+            if (previous) totalBytes -= previous.bytes;
+            const family = familyFor(path);
+            const now = Date.now();
+            index.delete(key);
+            index.set(key, { key, path, family, bytes, storedAt: now, expiresAt: now + TTL_MS[family], lastAccess: now, hits: 0 });
+            totalBytes += bytes;
+            stats.writes++;
+
+            await evictToFit();
+            scheduleIndexFlush();
+        } catch (e: any) {
+            stats.errors++;
+            console.warn(`[DFS_CACHE][WRITE_FAIL] path=${path} reason=${e.message}`);
+        }
+    },
+
+    noteBypass() {
+        stats.bypass++;
+    },
+
+    async getStats() {
+        await ensureReady();
+        const byFamily: Record<DfsCacheFamily, { entries: number; bytes: number }> = {
+            search_volume: { entries: 0, bytes: 0 },
+            keywords_for_keywords: { entries: 0, bytes: 0 },
+            amazon: { entries: 0, bytes: 0 }
+        };
+        index.forEach(m => {
+            byFamily[m.family].entries++;
+            byFamily[m.family].bytes += m.bytes;
+        });
+        const lookups = stats.hits + stats.misses;
+        return {
+            enabled: ENABLED,
+            dir: CACHE_DIR,
+            entries: index.size,
+            bytes: totalBytes,
+            maxBytes: MAX_BYTES,
+            ttlMs: TTL_MS,
+            hitRate: lookups > 0 ? stats.hits / lookups : 0,
+            ...stats,
+            byFamily
+        };
+    },
+
+    /** Most recently used first. */
+    async listEntries(limit = 100) {
+        await ensureReady();
+        return Array.from(index.values()).reverse().slice(0, limit).map(m => ({
+            key: m.key,
+            path: m.path,
+            family: m.family,
+            bytes: m.bytes,
+            hits: m.hits,
+            storedAt: new Date(m.storedAt).toISOString(),
+            expiresAt: new Date(m.expiresAt).toISOString(),
+            lastAccess: new Date(m.lastAccess).toISOString()
+        }));
+    },
+
+    /** Purges everything, or only entries matching a family and/or path prefix. */
+    async purge(filter: { family?: DfsCacheFamily; pathPrefix?: string } = {}): Promise<number> {
+        await ensureReady();
+        const doomed = Array.from(index.values()).filter(m =>
+            (!filter.family || m.family === filter.family) &&
+            (!filter.pathPrefix || m.path.startsWith(filter.pathPrefix))
+        );
+        for (const m of doomed) await removeEntry(m.key);
+        console.log(`[DFS_CACHE][PURGE] removed=${doomed.length} family=${filter.family || '*'} prefix=${filter.pathPrefix || '*'}`);
+        return doomed.length;
+    }
+};
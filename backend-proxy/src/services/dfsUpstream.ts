@@ -0,0 +1,89 @@
+import https from 'https';
+import zlib from 'zlib';
+import { Readable, Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+import type { Request, Response } from 'express';
+
+/**
+ * DFS UPSTREAM
+ * Connection reuse and response passthrough for /dfs/proxy. A single
+ * keep-alive agent holds warm TLS sockets to api.dataforseo.com, and upstream
+ * bodies are streamed into the { proxyStatus, data } wrapper byte-for-byte
+ * instead of being parsed and re-serialised.
+ */
+
+const readNum = (name: string, fallback: number): number => {
+    const n = Number(process.env[name]);
+    return Number.isFinite(n) && n > 0 ? n : fallback;
+};
+
+export const dfsAgent = new https.Agent({
+    keepAlive: true,
+    keepAliveMsecs: 30000,
+    maxSockets: readNum('DFS_MAX_SOCKETS', 16),
+    maxFreeSockets: readNum('DFS_MAX_FREE_SOCKETS', 8),
+    // Drop idle sockets before DFS's load balancer does
+    timeout: 60000
+});
+
+type Encoding = 'br' | 'gzip';
+
+// off | gzip | br | auto (prefer br when the browser offers it)
+const COMPRESSION = (process.env.PROXY_COMPRESSION || 'auto').toLowerCase();
+
+function pickEncoding(req: Request): Encoding | null {
+    if (COMPRESSION === 'off') return null;
+    const accepted = String(req.header('Accept-Encoding') || '');
+    const offers = (enc: Encoding) => new RegExp(`\\b${enc}\\b`).test(accepted);
+    if ((COMPRESSION === 'auto' || COMPRESSION === 'br') && offers('br')) return 'br';
+    if ((COMPRESSION === 'auto' || COMPRESSION === 'gzip') && offers('gzip')) return 'gzip';
+    return null;
+}
+
+function encoderFor(encoding: Encoding): Transform {
+    // Low levels: the proxy is latency-bound, and JSON compresses well regardless
+    return encoding === 'br'
+        ? zlib.createBrotliCompress({ params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 4 } })
+        : zlib.createGzip({ level: 5 });
+}
+
+/**
+ * Writes `{"proxyStatus":<status>,"data":<body>}` with `body` streamed in
+ * as-is. The body must already be a JSON document. Chunks are copied into
+ * `capture` when given (for the response cache).
+ */
+export async function sendWrapped(
+    req: Request,
+    res: Response,
+    proxyStatus: number,
+    body: Readable | NodeJS.ReadableStream | string,
+    capture?: Buffer[]
+): Promise<void> {
+    const source = typeof body === 'string' ? Readable.from([Buffer.from(body)]) : body;
+
+    async function* wrapped() {
+        yield Buffer.from(`{"proxyStatus":${proxyStatus},"data":`);
+        let empty = true;
+        for await (const chunk of source as AsyncIterable<Buffer | string>) {
+            const buf = typeof chunk === 'string' ? Buffer.from(chunk) : chunk;
+            if (buf.length === 0) continue;
+            empty = false;
+            capture?.push(buf);
+            yield buf;
+        }
+        if (empty) yield Buffer.from('null');
+        yield Buffer.from('}');
+    }
+
+    res.status(200);
+    res.setHeader('Content-Type', 'application/json; charset=utf-8');
+    res.setHeader('Vary', 'Accept-Encoding');
+
+    const encoding = pickEncoding(req);
+    if (encoding) {
+        res.setHeader('Content-Encoding', encoding);
+        await pipeline(Readable.from(wrapped()), encoderFor(encoding), res);
+    } else {
+        await pipeline(Readable.from(wrapped()), res);
+    }
+}
@@ -4,25 +4,10 @@ import { LockedKeyword } from './types';
 
 // --- Shared Normalization Logic ---
 
-/**
- * STRICT NORMALIZATION V1
- * Rules:
- * 1. Lowercase
- * 2. Trim
- * 3. Remove diacritics (NFKD)
- * 4. Remove all non-alphanumeric chars (except space)
- * 5. Collapse multiple spaces to single space
- */
-export function normalizeKeywordString(raw: string): string {
-    if (!raw) return "";
-    return raw
-        .toLowerCase()
-        .trim()
-        .normalize("NFKD")
-        .replace(/[\u0300-\u036f]/g, "") // Remove diacritics
-        .replace(/[^a-z0-9\s]/g, "") // Remove punctuation/symbols
-        .replace(/\s+/g, " "); // Collapse spaces
-}
+// Delegates to the canonical implementation so both import paths share one
+// memoized intern table.
+import { normalizeKeywordString } from './src/driftHash';
+export { normalizeKeywordString };
 
 // --- v1 Registry Hash (Simple) ---
 
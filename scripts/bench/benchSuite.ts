@@ -0,0 +1,350 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { installNodeShims } from '../headless/nodeShims';
+import { measure, quietly, compareResults, DEFAULT_BENCH_OPTIONS } from './harness';
+import type { BenchOptions, BenchResult, BenchComparison } from './harness';
+import type { SnapshotKeywordRow, CategorySnapshotDoc, SweepResult } from '../../src/types';
+import type { SignalDTO } from '../../src/services/signalHarvesterClient';
+
+declare const process: any;
+
+/**
+ * HOT PATH BENCHMARKS
+ * Keyword normalisation and guards, bootstrap generation, demand metrics,
+ * corpus health, deep-dive planning and chunk encode/decode, over synthetic
+ * corpora built with getSeededRNG so every run (and every build) sees the same
+ * rows. Loaded by scripts/runBench.ts through Vite's SSR loader with
+ * `firebase/firestore` aliased to the in-memory local stand-in, so the chunk
+ * store cases never touch a real database.
+ */
+
+export interface BenchSuiteOptions {
+    sizes: number[];
+    filter?: string;
+    categoryId: string;
+    workspace: string;
+    out?: string;
+    compare?: string;
+    thresholdPct: number;
+    bench?: Partial<BenchOptions>;
+}
+
+export interface BenchReport {
+    suite: 'mci-hot-paths';
+    version: 1;
+    startedAt: string;
+    finishedAt: string;
+    env: { node: string; platform: string; arch: string; gcExposed: boolean; compactChunks: boolean };
+    options: Omit<BenchSuiteOptions, 'workspace' | 'out' | 'compare' | 'bench'> & { bench: BenchOptions };
+    results: BenchResult[];
+    comparison: BenchComparison[] | null;
+    regressions: number;
+    outputChanges: number;      // Cases whose output hash differs from the baseline; a failure like a regression
+}
+
+interface Corpus {
+    size: number;
+    rows: SnapshotKeywordRow[];
+    texts: string[];
+    snapshot: CategorySnapshotDoc;
+    signals: SignalDTO[];
+}
+
+interface BenchCase {
+    name: string;
+    perCorpus: boolean;
+    /** Returns the op to time; setup work done here is not measured. */
+    prepare: (corpus: Corpus | null) => Promise<() => any> | (() => any);
+}
+
+const CHUNK_SIZE = 400;
+const FIXED_ISO = '2026-01-01T00:00:00.000Z';
+const MODIFIERS = ['price', 'best', 'for men', 'online', 'review', 'buy', 'how to use', 'combo', 'kit', 'india', 'vs', 'for sensitive skin', 'under 500', 'amazon', '2024', 'for women'];
+const INTENTS = ['Decision', 'Consideration', 'Problem', 'Discovery'];
+
+export async function runBenchSuite(opts: BenchSuiteOptions): Promise<BenchReport> {
+    fs.mkdirSync(opts.workspace, { recursive: true });
+    installNodeShims(opts.workspace);
+
+    const { getSeededRNG } = await import('../../src/utils/deterministic');
+    const { CORE_CATEGORIES } = await import('../../src/constants');
+    const { normalizeKeywordString } = await import('../../src/driftHash');
+    const { KeywordCanonicalizer } = await import('../../src/utils/KeywordCanonicalizer');
+    const { CategoryKeywordGuard, HEAD_TERMS, BRAND_PACKS } = await import('../../src/services/categoryKeywordGuard');
+    const { BootstrapServiceV3 } = await import('../../src/services/bootstrapServiceV3');
+    const { generateForCategory } = await import('../../src/services/megaKeywordInjection');
+    const { MetricsCalculatorV3 } = await import('../../src/services/metricsCalculatorV3');
+    const { MetricsCalculatorV4 } = await import('../../src/services/metricsCalculatorV4');
+    const { CorpusHealthService } = await import('../../src/services/corpusHealthService');
+    const { DeepDiveChunkPlanner } = await import('../../src/services/deepDiveChunkPlanner');
+    const { ChunkCodec } = await import('../../src/services/chunkCodec');
+    const { FirestoreChunkStore } = await import('../../src/services/firestoreChunkStore');
+    const { FirestoreClient } = await import('../../src/services/firestoreClient');
+    const { MCI_ENABLE_COMPACT_CHUNKS } = await import('../../src/config/featureFlags');
+    const { doc } = await import('firebase/firestore');
+
+    const category = CORE_CATEGORIES.find(c => c.id === opts.categoryId);
+    if (!category) throw new Error(`Unknown category: ${opts.categoryId}`);
+    const db = FirestoreClient.getDbSafe();
+    if (!db) throw new Error('Local Firestore could not be initialised');
+
+    // --- Synthetic corpora ---
+
+    function buildCorpus(size: number): Corpus {
+        const rng = getSeededRNG(`bench:corpus:${opts.categoryId}:${size}`);
+        const pick = <T>(arr: T[]): T => arr[Math.floor(rng() * arr.length)];
+        const heads = HEAD_TERMS[opts.categoryId] || ['product'];
+        const brands = BRAND_PACKS[opts.categoryId] || [];
+        const otherHeads = Object.entries(HEAD_TERMS).filter(([id]) => id !== opts.categoryId).flatMap(([, h]) => h);
+        const anchors = category!.anchors.length > 0 ? category!.anchors : ['General'];
+
+        const rows: SnapshotKeywordRow[] = new Array(size);
+        for (let i = 0; i < size; i++) {
+            // ~15% off-category terms for the guard to reject
+            let text = rng() < 0.15 ? pick(otherHeads) : pick(heads);
+            if (brands.length > 0 && rng() < 0.5) text = `${pick(brands)} ${text}`;
+            const modifierCount = Math.floor(rng() * 3);
+            for (let m = 0; m < modifierCount; m++) text = rng() < 0.5 ? `${text} ${pick(MODIFIERS)}` : `${pick(MODIFIERS)} ${text}`;
+            // Messy input as it arrives from DFS and CSVs
+            if (rng() < 0.1) text = `  ${text.toUpperCase()}!! `;
+            else if (rng() < 0.05) text = text.replace(' ', '   ');
+
+            const v = rng();
+            const volume = v < 0.05 ? null : v < 0.25 ? 0 : Math.round(10 * Math.pow(10, rng() * 4));
+            const status = volume === null ? 'UNVERIFIED' : volume === 0 ? 'ZERO' : volume < 20 ? 'LOW' : 'VALID';
+            rows[i] = {
+                keyword_id: `kw_${i.toString(36)}`,
+                keyword_text: text,
+                volume,
+                amazonVolume: rng() < 0.4 ? Math.round(rng() * 5000) : undefined,
+                cpc: Math.round(rng() * 3000) / 100,
+                competition: Math.round(rng() * 100) / 100,
+                anchor_id: pick(anchors),
+                intent_bucket: pick(INTENTS),
+                status,
+                active: status !== 'UNVERIFIED' && rng() > 0.05,
+                language_code: 'en',
+                country_code: 'IN',
+                category_id: opts.categoryId,
+                created_at_iso: FIXED_ISO,
+                validated_at_iso: volume === null ? undefined : FIXED_ISO
+            };
+        }
+
+        const count = (s: string) => rows.filter(r => r.status === s).length;
+        const snapshot = {
+            snapshot_id: `bench_${opts.categoryId}_${size}`,
+            category_id: opts.categoryId,
+            country_code: 'IN',
+            language_code: 'en',
+            lifecycle: 'CERTIFIED_LITE',
+            created_at_iso: FIXED_ISO,
+            updated_at_iso: FIXED_ISO,
+            anchors: anchors.map((a, order) => ({ anchor_id: a, order, source: 'BENCH' })),
+            targets: { per_anchor: 40, validation_min_vol: 20 },
+            stats: {
+                anchors_total: anchors.length,
+                keywords_total: size,
+                valid_total: count('VALID'),
+                zero_total: count('ZERO'),
+                validated_total: size - count('UNVERIFIED'),
+                low_total: count('LOW'),
+                error_total: 0
+            },
+            integrity: { sha256: '', chunk_count: Math.ceil(size / CHUNK_SIZE), chunk_size: CHUNK_SIZE }
+        } as CategorySnapshotDoc;
+
+        const signals: SignalDTO[] = Array.from({ length: 200 }, (_, i) => ({
+            id: `sig_${i}`,
+            title: `${pick(heads)} ${pick(MODIFIERS)} discussion`,
+            snippet: `Users comparing ${pick(brands.length > 0 ? brands : heads)} options`,
+            url: `https://example.com/${i}`,
+            categoryId: opts.categoryId,
+            platform: pick(['reddit', 'youtube', 'instagram', 'amazon']),
+            source: 'bench',
+            signalType: pick(['review', 'question', 'complaint', 'trend']),
+            trustScore: Math.round(rng() * 100),
+            confidence: Math.round(rng() * 100) / 100,
+            firstSeenAt: FIXED_ISO,
+            lastSeenAt: FIXED_ISO
+        } as SignalDTO));
+
+        return { size, rows, texts: rows.map(r => r.keyword_text), snapshot, signals };
+    }
+
+    const chunksOf = <T>(arr: T[]) => {
+        const out: T[][] = [];
+        for (let i = 0; i < arr.length; i += CHUNK_SIZE) out.push(arr.slice(i, i + CHUNK_SIZE));
+        return out;
+    };
+
+    const trends = { fiveYearTrendPct: 12.5, trendStatus: 'Growing' as const };
+
+    // --- Cases ---
+
+    const cases: BenchCase[] = [
+        {
+            name: 'keyword.normalizeKeywordString',
+            perCorpus: true,
+            prepare: c => () => c!.texts.map(normalizeKeywordString)
+        },
+        {
+            // Memoised: after warmup this is the steady-state lookup path
+            name: 'keyword.canonicalKey',
+            perCorpus: true,
+            prepare: c => () => c!.texts.map(t => KeywordCanonicalizer.canonicalKey(t))
+        },
+        {
+            name: 'guard.isSpecific',
+            perCorpus: true,
+            prepare: c => () => {
+                let ok = 0;
+                for (const t of c!.texts) if (CategoryKeywordGuard.isSpecific(t, opts.categoryId).ok) ok++;
+                return ok;
+            }
+        },
+        {
+            name: 'bootstrap.generate',
+            perCorpus: false,
+            prepare: () => () => CORE_CATEGORIES.flatMap(cat => cat.anchors.map(a => BootstrapServiceV3.generate(cat.id, a).length))
+        },
+        {
+            name: 'bootstrap.generateForCategory',
+            perCorpus: false,
+            prepare: () => () => CORE_CATEGORIES.map(cat => generateForCategory(cat.id).length)
+        },
+        {
+            name: 'metrics.v3.calculate',
+            perCorpus: true,
+            prepare: c => () => MetricsCalculatorV3.calculate(opts.categoryId, c!.snapshot.snapshot_id, c!.rows, trends)
+        },
+        {
+            name: 'metrics.v4.calculate',
+            perCorpus: true,
+            prepare: async c => {
+                const v3 = await quietly(async () => MetricsCalculatorV3.calculate(opts.categoryId, c!.snapshot.snapshot_id, c!.rows, trends) as SweepResult);
+                return () => MetricsCalculatorV4.calculate(opts.categoryId, c!.rows, v3);
+            }
+        },
+        {
+            name: 'corpus.computeSnapshotHealth',
+            perCorpus: true,
+            prepare: c => () => CorpusHealthService.computeSnapshotHealth(c!.snapshot, c!.rows)
+        },
+        {
+            name: 'deepDive.plan',
+            perCorpus: true,
+            prepare: c => () => DeepDiveChunkPlanner.plan(c!.rows, c!.signals)
+        },
+        {
+            name: 'chunks.codec.encode',
+            perCorpus: true,
+            prepare: c => {
+                const chunks = chunksOf(c!.rows);
+                return async () => {
+                    const out: Uint8Array[] = [];
+                    for (const chunk of chunks) out.push(await ChunkCodec.encodeRows(chunk));
+                    return out;
+                };
+            }
+        },
+        {
+            name: 'chunks.codec.decode',
+            perCorpus: true,
+            prepare: async c => {
+                const payloads: Uint8Array[] = [];
+                for (const chunk of chunksOf(c!.rows)) payloads.push(await ChunkCodec.encodeRows(chunk));
+                return async () => {
+                    let n = 0;
+                    for (const p of payloads) n += (await ChunkCodec.decodeRows(p)).length;
+                    return n;
+                };
+            }
+        },
+        {
+            // Sanitise, hash, encode and batch-commit, against the in-memory store
+            name: 'chunks.store.write',
+            perCorpus: true,
+            prepare: c => {
+                const ref = doc(db, 'bench_snapshots', `${c!.snapshot.snapshot_id}_w`);
+                return async () => {
+                    const res = await FirestoreChunkStore.writeChunks(ref, c!.rows, CHUNK_SIZE, { incremental: false });
+                    if (!res.ok) throw new Error(res.error);
+                    return res.chunkHashes;
+                };
+            }
+        },
+        {
+            name: 'chunks.store.read',
+            perCorpus: true,
+            prepare: async c => {
+                const ref = doc(db, 'bench_snapshots', `${c!.snapshot.snapshot_id}_r`);
+                const written = await FirestoreChunkStore.writeChunks(ref, c!.rows, CHUNK_SIZE, { incremental: false });
+                if (!written.ok) throw new Error(written.error);
+                return async () => {
+                    const res = await FirestoreChunkStore.readChunks(ref);
+                    if (!res.ok) throw new Error(res.error);
+                    return res.rows.length;
+                };
+            }
+        }
+    ];
+
+    const benchOptions: BenchOptions = { ...DEFAULT_BENCH_OPTIONS, ...opts.bench };
+    const filter = opts.filter ? new RegExp(opts.filter) : null;
+    const selected = cases.filter(c => !filter || filter.test(c.name));
+    const startedAt = new Date().toISOString();
+    const results: BenchResult[] = [];
+
+    const run = async (c: BenchCase, corpus: Corpus | null) => {
+        const op = await c.prepare(corpus);
+        const r = await measure(c.name, corpus ? corpus.size : null, op, benchOptions);
+        results.push(r);
+        const heap = r.retainedBytes !== null ? `retained=${r.retainedBytes}` : `heap_delta=${r.heapDeltaBytes}`;
+        console.log(`[BENCH] ${r.name} size=${r.size ?? '-'} ops_s=${r.opsPerSec} p50_ms=${r.p50Ms} p99_ms=${r.p99Ms} ${heap} hash=${r.outputHash}`);
+    };
+
+    for (const c of selected.filter(c => !c.perCorpus)) await run(c, null);
+    for (const size of opts.sizes) {
+        // One corpus alive at a time keeps the heap numbers comparable across sizes
+        const corpus = buildCorpus(size);
+        for (const c of selected.filter(c => c.perCorpus)) await run(c, corpus);
+    }
+
+    let comparison: BenchComparison[] | null = null;
+    if (opts.compare) {
+        const baseline: BenchReport = JSON.parse(fs.readFileSync(opts.compare, 'utf8'));
+        comparison = compareResults(results, baseline.results, opts.thresholdPct);
+        comparison.forEach(d => {
+            if (d.regressed || d.outputChanged) {
+                console.warn(`[BENCH][DIFF] ${d.name} size=${d.size ?? '-'} ops_s_delta=${d.opsPerSecDeltaPct}% p50_delta=${d.p50DeltaPct}% p99_delta=${d.p99DeltaPct}% regressed=${d.regressed} output_changed=${d.outputChanged}`);
+            }
+        });
+    }
+
+    const { workspace, out, compare, bench, ...rest } = opts;
+    const report: BenchReport = {
+        suite: 'mci-hot-paths',
+        version: 1,
+        startedAt,
+        finishedAt: new Date().toISOString(),
+        env: {
+            node: process.version,
+            platform: process.platform,
+            arch: process.arch,
+            gcExposed: typeof (globalThis as any).gc === 'function',
+            compactChunks: MCI_ENABLE_COMPACT_CHUNKS
+        },
+        options: { ...rest, bench: benchOptions },
+        results,
+        comparison,
+        regressions: comparison ? comparison.filter(d => d.regressed).length : 0,
+        outputChanges: comparison ? comparison.filter(d => d.outputChanged).length : 0
+    };
+
+    const file = out || path.join(workspace, `bench-${startedAt.replace(/[:.]/g, '-')}.json`);
+    fs.mkdirSync(path.dirname(file), { recursive: true });
+    fs.writeFileSync(file, JSON.stringify(report, null, 2));
+    console.log(`[BENCH][DONE] cases=${results.length} regressions=${report.regressions} output_changes=${report.outputChanges} report=${file}`);
+    return report;
+}
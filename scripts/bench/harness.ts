@@ -0,0 +1,175 @@
+import * as crypto from 'crypto';
+
+declare const process: any;
+
+/**
+ * BENCH HARNESS
+ * Times a case by running its op repeatedly (after warmup) until both a
+ * minimum sample count and a minimum wall time are reached, recording each op
+ * separately. Heap is sampled around the timed loop: `heapDeltaBytes` is the
+ * growth across the loop, `retainedBytes` what survives a GC afterwards (only
+ * when node runs with --expose-gc). The first op's result is hashed so a
+ * behaviour change shows up next to the timing change.
+ */
+
+export interface BenchOptions {
+    minSamples: number;
+    maxSamples: number;
+    minTimeMs: number;
+    warmup: number;
+    warmupMs: number;
+}
+
+export interface BenchResult {
+    name: string;
+    size: number | null;        // Corpus rows, null for corpus-independent cases
+    samples: number;
+    opsPerSec: number;
+    rowsPerSec: number | null;
+    meanMs: number;
+    p50Ms: number;
+    p99Ms: number;
+    minMs: number;
+    maxMs: number;
+    heapDeltaBytes: number;
+    retainedBytes: number | null;
+    outputHash: string;
+}
+
+export const DEFAULT_BENCH_OPTIONS: BenchOptions = {
+    minSamples: 5,
+    maxSamples: 10000,
+    minTimeMs: 500,
+    warmup: 2,
+    warmupMs: 200
+};
+
+const gc: (() => void) | undefined = (globalThis as any).gc;
+
+function percentile(sorted: number[], p: number): number {
+    if (sorted.length === 0) return 0;
+    const idx = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+    return sorted[Math.max(0, idx)];
+}
+
+// Wall-clock stamps (computedAt, trend_5y.timestamp, *_iso) differ on every call
+const VOLATILE_KEY = /^(timestamp|ts)$|At$|_at$|_iso$/;
+
+function stableStringify(value: any): string {
+    if (value === null || typeof value !== 'object') return JSON.stringify(value) ?? 'null';
+    if (value instanceof Uint8Array) return `bytes:${crypto.createHash('sha256').update(value).digest('hex')}`;
+    if (value instanceof Map) return stableStringify(Array.from(value.entries()));
+    if (value instanceof Set) return stableStringify(Array.from(value.values()));
+    if (Array.isArray(value)) return `[${value.map(stableStringify).join(',')}]`;
+    const keys = Object.keys(value).filter(k => value[k] !== undefined && !VOLATILE_KEY.test(k)).sort();
+    return `{${keys.map(k => `${JSON.stringify(k)}:${stableStringify(value[k])}`).join(',')}}`;
+}
+
+export function hashOutput(value: any): string {
+    return crypto.createHash('sha256').update(stableStringify(value)).digest('hex').slice(0, 16);
+}
+
+const round = (n: number, digits = 4) => Math.round(n * 10 ** digits) / 10 ** digits;
+
+/** Services log per call; the timed loop measures the work, not the console. */
+export async function quietly<T>(fn: () => Promise<T>): Promise<T> {
+    const saved = { log: console.log, warn: console.warn, info: console.info, debug: console.debug };
+    const noop = () => {};
+    console.log = console.warn = console.info = console.debug = noop;
+    try {
+        return await fn();
+    } finally {
+        Object.assign(console, saved);
+    }
+}
+
+export async function measure(
+    name: string,
+    size: number | null,
+    op: () => any,
+    opts: BenchOptions = DEFAULT_BENCH_OPTIONS
+): Promise<BenchResult> {
+    return quietly(async () => {
+        const first = await op();
+        const outputHash = hashOutput(first);
+        // Until the JIT has settled: a count for slow ops, a time budget for fast ones
+        const warmupStart = Date.now();
+        for (let i = 1; i < opts.warmup || Date.now() - warmupStart < opts.warmupMs; i++) await op();
+
+        gc?.();
+        const heapBefore = process.memoryUsage().heapUsed;
+
+        const samples: number[] = [];
+        const started = process.hrtime.bigint();
+        let elapsedMs = 0;
+        while (samples.length < opts.maxSamples && (samples.length < opts.minSamples || elapsedMs < opts.minTimeMs)) {
+            const t0 = process.hrtime.bigint();
+            await op();
+            const t1 = process.hrtime.bigint();
+            samples.push(Number(t1 - t0) / 1e6);
+            elapsedMs = Number(t1 - started) / 1e6;
+        }
+
+        const heapAfter = process.memoryUsage().heapUsed;
+        let retainedBytes: number | null = null;
+        if (gc) {
+            gc();
+            retainedBytes = process.memoryUsage().heapUsed - heapBefore;
+        }
+
+        const totalMs = samples.reduce((s, v) => s + v, 0);
+        const sorted = [...samples].sort((a, b) => a - b);
+        const opsPerSec = totalMs > 0 ? samples.length / (totalMs / 1000) : 0;
+        return {
+            name,
+            size,
+            samples: samples.length,
+            opsPerSec: round(opsPerSec, 2),
+            rowsPerSec: size !== null ? Math.round(opsPerSec * size) : null,
+            meanMs: round(totalMs / samples.length),
+            p50Ms: round(percentile(sorted, 50)),
+            p99Ms: round(percentile(sorted, 99)),
+            minMs: round(sorted[0]),
+            maxMs: round(sorted[sorted.length - 1]),
+            heapDeltaBytes: heapAfter - heapBefore,
+            retainedBytes,
+            outputHash
+        };
+    });
+}
+
+export interface BenchComparison {
+    name: string;
+    size: number | null;
+    opsPerSecDeltaPct: number;
+    p50DeltaPct: number;
+    p99DeltaPct: number;
+    outputChanged: boolean;
+    regressed: boolean;
+}
+
+/**
+ * Matches results to a previous report by name and size. A case regresses when
+ * its median op got slower by more than thresholdPct; the median is far less
+ * sensitive to GC pauses than the mean behind ops/sec.
+ */
+export function compareResults(current: BenchResult[], baseline: BenchResult[], thresholdPct: number): BenchComparison[] {
+    const key = (r: BenchResult) => `${r.name}@${r.size}`;
+    const previous = new Map(baseline.map(r => [key(r), r]));
+    return current.flatMap(r => {
+        const b = previous.get(key(r));
+        if (!b) return [];
+        const opsDelta = b.opsPerSec > 0 ? ((r.opsPerSec - b.opsPerSec) / b.opsPerSec) * 100 : 0;
+        const p50Delta = b.p50Ms > 0 ? ((r.p50Ms - b.p50Ms) / b.p50Ms) * 100 : 0;
+        const p99Delta = b.p99Ms > 0 ? ((r.p99Ms - b.p99Ms) / b.p99Ms) * 100 : 0;
+        return [{
+            name: r.name,
+            size: r.size,
+            opsPerSecDeltaPct: round(opsDelta, 1),
+            p50DeltaPct: round(p50Delta, 1),
+            p99DeltaPct: round(p99Delta, 1),
+            outputChanged: r.outputHash !== b.outputHash,
+            regressed: p50Delta > thresholdPct
+        }];
+    });
+}
@@ -0,0 +1,244 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import * as crypto from 'crypto';
+
+/**
+ * FIXTURE FETCH
+ * Wraps globalThis.fetch so DataForSEO and Gemini traffic can be recorded to,
+ * and replayed from, a fixtures directory. Both the direct DFS API and the
+ * backend proxy (/dfs/proxy) map onto the same fixture, keyed by DFS path and
+ * payload, so recordings made through either transport replay through both.
+ * Gemini calls are keyed by model method and request body. Everything else
+ * (Firestore, emulator) goes to the real fetch.
+ *
+ *   live    - no interception
+ *   record  - call upstream, store every DFS/LLM response
+ *   replay  - serve from fixtures only; DFS misses can be synthesised
+ */
+
+export type FixtureMode = 'live' | 'record' | 'replay';
+
+export interface FixtureOptions {
+    dir: string;
+    mode: FixtureMode;
+    /** On a DFS replay miss, answer with deterministic synthetic volumes. */
+    synthesizeDfs?: boolean;
+}
+
+interface Fixture {
+    kind: 'dfs' | 'llm';
+    route: string;
+    status: number;
+    contentType: string;
+    body: string;
+}
+
+interface Classified {
+    kind: 'dfs' | 'llm';
+    route: string;              // DFS path or Gemini model:method
+    payload: any;
+    viaProxy: boolean;
+    method: string;
+}
+
+const stats = { recorded: 0, replayed: 0, synthesized: 0, missed: 0, passthrough: 0 };
+const misses: string[] = [];
+
+function stableStringify(value: any): string {
+    if (value === null || typeof value !== 'object') return JSON.stringify(value) ?? 'null';
+    if (Array.isArray(value)) return `[${value.map(stableStringify).join(',')}]`;
+    const keys = Object.keys(value).filter(k => value[k] !== undefined).sort();
+    return `{${keys.map(k => `${JSON.stringify(k)}:${stableStringify(value[k])}`).join(',')}}`;
+}
+
+const sha = (s: string) => crypto.createHash('sha256').update(s).digest('hex').slice(0, 32);
+
+const normalizeDfsPath = (p: string) => String(p || '').replace(/^\/+/, '').replace(/^v3\//, '');
+
+function parseBody(body: any): any {
+    if (typeof body !== 'string' || !body) return undefined;
+    try {
+        return JSON.parse(body);
+    } catch {
+        return body;
+    }
+}
+
+function classify(url: URL, init: RequestInit | undefined): Classified | null {
+    const method = (init?.method || 'GET').toUpperCase();
+    const body = parseBody(init?.body);
+
+    if (url.hostname === 'api.dataforseo.com') {
+        return { kind: 'dfs', route: normalizeDfsPath(url.pathname), payload: body, viaProxy: false, method };
+    }
+    if (url.pathname.endsWith('/dfs/proxy') && body && typeof body === 'object') {
+        // Creds are deliberately left out of the key
+        const route = normalizeDfsPath(body.path || body.endpoint);
+        return { kind: 'dfs', route, payload: body.payload, viaProxy: true, method: body.method === 'GET' ? 'GET' : 'POST' };
+    }
+    if (url.hostname === 'generativelanguage.googleapis.com') {
+        // e.g. /v1beta/models/gemini-2.5-flash:generateContent
+        const route = url.pathname.replace(/^\/v[^/]+\//, '');
+        return { kind: 'llm', route, payload: body, viaProxy: false, method };
+    }
+    return null;
+}
+
+const fixtureFile = (dir: string, c: Classified) =>
+    path.join(dir, c.kind, `${sha(`${c.method} ${c.route}\n${stableStringify(c.payload ?? null)}`)}.json`);
+
+function readFixture(file: string): Fixture | null {
+    try {
+        return JSON.parse(fs.readFileSync(file, 'utf8'));
+    } catch {
+        return null;
+    }
+}
+
+function writeFixture(file: string, fx: Fixture) {
+    fs.mkdirSync(path.dirname(file), { recursive: true });
+    fs.writeFileSync(file, JSON.stringify(fx, null, 1));
+}
+
+/** The proxy wraps DFS bodies; fixtures always hold the bare DFS body. */
+function respond(c: Classified, fx: Pick<Fixture, 'status' | 'contentType' | 'body'>): Response {
+    if (c.kind === 'dfs' && c.viaProxy) {
+        return new Response(`{"proxyStatus":${fx.status},"data":${fx.body}}`, {
+            status: 200,
+            headers: { 'Content-Type': 'application/json' }
+        });
+    }
+    return new Response(fx.body, { status: fx.status, headers: { 'Content-Type': fx.contentType } });
+}
+
+// --- Synthetic DFS ---
+
+/** Deterministic per keyword: about a quarter are zero, the rest log-spread to ~50k. */
+function syntheticVolume(keyword: string): number {
+    const h = crypto.createHash('md5').update(keyword.toLowerCase().trim()).digest();
+    if (h[0] < 64) return 0;
+    return Math.round(10 * Math.pow(5000, h.readUInt16BE(1) / 65535));
+}
+
+const volumeRow = (keyword: string) => ({
+    keyword,
+    search_volume: syntheticVolume(keyword),
+    competition: 'LOW',
+    competition_index: syntheticVolume(`${keyword}#c`) % 100,
+    cpc: Math.round(syntheticVolume(`${keyword}#cpc`) % 300) / 100
+});
+
+const syntheticTasks = new Map<string, string[]>();
+
+const envelope = (tasks: any[]) => JSON.stringify({
+    version: 'synthetic',
+    status_code: 20000,
+    status_message: 'Ok.',
+    cost: 0,
+    tasks_count: tasks.length,
+    tasks_error: 0,
+    tasks
+});
+
+const okTask = (data: any, result: any[] | null, id = `synth-${crypto.randomUUID()}`) => ({
+    id,
+    status_code: 20000,
+    status_message: 'Ok.',
+    cost: 0,
+    result_count: result ? result.length : 0,
+    data,
+    result
+});
+
+function synthesizeDfs(c: Classified): string {
+    const route = c.route;
+    const tasks: any[] = Array.isArray(c.payload) ? c.payload : [];
+
+    if (route.includes('/task_post')) {
+        return envelope(tasks.map(t => {
+            const id = `synth-${sha(stableStringify(t))}`;
+            syntheticTasks.set(id, t.keywords || []);
+            return { ...okTask(t, null, id), status_code: 20100, status_message: 'Task Created.' };
+        }));
+    }
+    if (route.includes('/task_get/')) {
+        const id = route.slice(route.lastIndexOf('/') + 1);
+        const keywords = syntheticTasks.get(id) || [];
+        return envelope([okTask({ keywords }, keywords.map(volumeRow), id)]);
+    }
+    if (route.includes('keywords_for_keywords') || route.includes('keyword_ideas') ||
+        route.includes('related_keywords') || route.includes('keyword_suggestions')) {
+        return envelope(tasks.map(t => {
+            const seeds: string[] = t.keys || t.keywords || (t.keyword ? [t.keyword] : []);
+            const ideas = seeds.flatMap(s => [s, `best ${s}`, `${s} price`, `${s} online`, `${s} for men`]);
+            return okTask(t, ideas.map(volumeRow));
+        }));
+    }
+    if (route.includes('amazon')) {
+        return envelope(tasks.map(t => okTask(t, [{
+            items: (t.keywords || []).map((k: string) => ({ keyword: k, search_volume: syntheticVolume(`${k}#amz`) }))
+        }])));
+    }
+    if (route.includes('search_volume')) {
+        return envelope(tasks.map(t => okTask(t, (t.keywords || []).map(volumeRow))));
+    }
+    return envelope(tasks.map(t => okTask(t, [])));
+}
+
+// --- Install ---
+
+export function installFixtureFetch(opts: FixtureOptions) {
+    const realFetch = globalThis.fetch;
+    if (opts.mode === 'live') return;
+
+    globalThis.fetch = (async (input: any, init?: RequestInit) => {
+        const url = new URL(typeof input === 'string' ? input : input.url ?? String(input));
+        const c = classify(url, init);
+        if (!c) {
+            stats.passthrough++;
+            return realFetch(input, init);
+        }
+
+        const file = fixtureFile(opts.dir, c);
+
+        if (opts.mode === 'record') {
+            const res = await realFetch(input, init);
+            const text = await res.text();
+            let status = res.status;
+            let body = text;
+            // Through the proxy: keep the bare DFS body so direct runs can replay it
+            if (c.kind === 'dfs' && c.viaProxy && res.ok) {
+                const wrapped = JSON.parse(text);
+                status = wrapped.proxyStatus ?? 200;
+                body = JSON.stringify(wrapped.data);
+            }
+            if (res.ok) {
+                writeFixture(file, { kind: c.kind, route: c.route, status, contentType: res.headers.get('content-type') || 'application/json', body });
+                stats.recorded++;
+            }
+            return new Response(text, { status: res.status, headers: res.headers });
+        }
+
+        const fx = readFixture(file);
+        if (fx) {
+            stats.replayed++;
+            return respond(c, fx);
+        }
+        if (c.kind === 'dfs' && opts.synthesizeDfs) {
+            stats.synthesized++;
+            return respond(c, { status: 200, contentType: 'application/json', body: synthesizeDfs(c) });
+        }
+
+        stats.missed++;
+        misses.push(`${c.kind} ${c.route} -> ${path.relative(opts.dir, file)}`);
+        const message = `FIXTURE_MISS: no recording for ${c.kind} ${c.route}. Re-run with --fixtures-mode record.`;
+        return new Response(JSON.stringify({ error: { code: 404, message, status: 'NOT_FOUND' } }), {
+            status: 404,
+            headers: { 'Content-Type': 'application/json' }
+        });
+    }) as typeof fetch;
+}
+
+export function getFixtureStats() {
+    return { ...stats, misses: misses.slice(0, 50) };
+}
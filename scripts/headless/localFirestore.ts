@@ -0,0 +1,555 @@
+import * as fs from 'fs';
+import * as path from 'path';
+
+/**
+ * LOCAL FIRESTORE STAND-IN
+ * File-backed implementation of the slice of the `firebase/firestore` modular
+ * API the services use. scripts/runPipeline.ts aliases `firebase/firestore`
+ * to this module for `--store local`, so a pipeline run needs neither the
+ * network nor the emulator. Semantics follow Firestore where the app relies
+ * on them (merge writes, dot-path updates, missing orderBy fields excluded,
+ * updateDoc on a missing doc fails); everything else is deliberately simple.
+ */
+
+declare const process: any;
+
+// --- Value types ---
+
+export class Timestamp {
+    constructor(public readonly seconds: number, public readonly nanoseconds: number) {}
+
+    static now() {
+        return Timestamp.fromMillis(Date.now());
+    }
+    static fromDate(d: Date) {
+        return Timestamp.fromMillis(d.getTime());
+    }
+    static fromMillis(ms: number) {
+        return new Timestamp(Math.floor(ms / 1000), (ms % 1000) * 1e6);
+    }
+    toMillis() {
+        return this.seconds * 1000 + Math.floor(this.nanoseconds / 1e6);
+    }
+    toDate() {
+        return new Date(this.toMillis());
+    }
+    isEqual(other: Timestamp) {
+        return other instanceof Timestamp && other.seconds === this.seconds && other.nanoseconds === this.nanoseconds;
+    }
+}
+
+export class Bytes {
+    private constructor(private readonly bytes: Uint8Array) {}
+
+    static fromUint8Array(arr: Uint8Array) {
+        return new Bytes(new Uint8Array(arr));
+    }
+    static fromBase64String(b64: string) {
+        return new Bytes(new Uint8Array(Buffer.from(b64, 'base64')));
+    }
+    toUint8Array() {
+        return new Uint8Array(this.bytes);
+    }
+    toBase64() {
+        return Buffer.from(this.bytes).toString('base64');
+    }
+    isEqual(other: Bytes) {
+        return other instanceof Bytes && other.toBase64() === this.toBase64();
+    }
+}
+
+const DOCUMENT_ID = '__name__';
+
+class FieldPath {
+    constructor(public readonly field: string) {}
+}
+
+export function documentId() {
+    return new FieldPath(DOCUMENT_ID);
+}
+
+// --- Storage ---
+
+type Data = Record<string, any>;
+
+class LocalFirestore {
+    readonly type = 'firestore';
+    readonly app = { name: '[DEFAULT]', options: { projectId: 'local-headless' } };
+    readonly docs = new Map<string, Data>();
+    readonly byParent = new Map<string, Set<string>>();
+    readonly listeners = new Set<() => void>();
+    private flushTimer: ReturnType<typeof setTimeout> | null = null;
+
+    constructor(readonly file: string | null) {
+        if (file && fs.existsSync(file)) {
+            const saved: Record<string, any> = JSON.parse(fs.readFileSync(file, 'utf8'));
+            Object.entries(saved).forEach(([p, d]) => this.put(p, revive(d)));
+        }
+    }
+
+    get(p: string): Data | undefined {
+        return this.docs.get(p);
+    }
+
+    put(p: string, data: Data) {
+        this.docs.set(p, data);
+        const parent = parentPath(p);
+        if (!this.byParent.has(parent)) this.byParent.set(parent, new Set());
+        this.byParent.get(parent)!.add(p);
+    }
+
+    remove(p: string) {
+        this.docs.delete(p);
+        this.byParent.get(parentPath(p))?.delete(p);
+    }
+
+    changed() {
+        this.listeners.forEach(l => l());
+        this.scheduleFlush();
+    }
+
+    private scheduleFlush() {
+        if (!this.file || this.flushTimer) return;
+        this.flushTimer = setTimeout(() => this.flush(), 500);
+    }
+
+    flush() {
+        if (this.flushTimer) clearTimeout(this.flushTimer);
+        this.flushTimer = null;
+        if (!this.file) return;
+        const out: Record<string, any> = {};
+        this.docs.forEach((d, p) => { out[p] = serialize(d); });
+        fs.mkdirSync(path.dirname(this.file), { recursive: true });
+        const tmp = `${this.file}.tmp`;
+        fs.writeFileSync(tmp, JSON.stringify(out));
+        fs.renameSync(tmp, this.file);
+    }
+}
+
+let instance: LocalFirestore | null = null;
+
+export function getFirestore(_app?: any): LocalFirestore {
+    if (!instance) instance = new LocalFirestore(process.env.MCI_LOCAL_FIRESTORE_FILE || null);
+    return instance;
+}
+
+/** Writes pending changes to disk now; the runner calls this before exiting. */
+export function flushLocalFirestore() {
+    instance?.flush();
+}
+
+export function getLocalFirestoreStats() {
+    return { documents: instance?.docs.size ?? 0, file: instance?.file ?? null };
+}
+
+/** There is nothing to connect to; accepted so emulator wiring is harmless here. */
+export function connectFirestoreEmulator(_db: LocalFirestore, _host: string, _port: number) {}
+
+function parentPath(p: string): string {
+    return p.slice(0, Math.max(0, p.lastIndexOf('/')));
+}
+
+// Bytes and Timestamps are immutable, so copies can share them
+function clone(value: any): any {
+    if (value === null || typeof value !== 'object') return value;
+    if (value instanceof Bytes || value instanceof Timestamp) return value;
+    if (value instanceof Uint8Array) return Bytes.fromUint8Array(value);
+    if (value instanceof Date) return Timestamp.fromDate(value);
+    if (Array.isArray(value)) return value.map(clone);
+    const out: Data = {};
+    for (const [k, v] of Object.entries(value)) {
+        if (v !== undefined) out[k] = clone(v);
+    }
+    return out;
+}
+
+function serialize(value: any): any {
+    if (value instanceof Bytes) return { __bytes: value.toBase64() };
+    if (value instanceof Timestamp) return { __ts: [value.seconds, value.nanoseconds] };
+    if (Array.isArray(value)) return value.map(serialize);
+    if (value && typeof value === 'object') {
+        const out: Data = {};
+        for (const [k, v] of Object.entries(value)) out[k] = serialize(v);
+        return out;
+    }
+    return value;
+}
+
+function revive(value: any): any {
+    if (Array.isArray(value)) return value.map(revive);
+    if (value && typeof value === 'object') {
+        if (typeof value.__bytes === 'string') return Bytes.fromBase64String(value.__bytes);
+        if (Array.isArray(value.__ts)) return new Timestamp(value.__ts[0], value.__ts[1]);
+        const out: Data = {};
+        for (const [k, v] of Object.entries(value)) out[k] = revive(v);
+        return out;
+    }
+    return value;
+}
+
+// --- References ---
+
+const segmentsOf = (parts: string[]) => parts.flatMap(p => String(p).split('/')).filter(Boolean);
+
+export class DocumentReference {
+    readonly type = 'document';
+    constructor(readonly firestore: LocalFirestore, readonly path: string) {}
+    get id() {
+        return this.path.slice(this.path.lastIndexOf('/') + 1);
+    }
+    get parent(): CollectionReference {
+        return new CollectionReference(this.firestore, parentPath(this.path));
+    }
+}
+
+export class Query {
+    constructor(
+        readonly firestore: LocalFirestore,
+        readonly source: { collectionPath?: string; groupId?: string },
+        readonly constraints: QueryConstraint[] = []
+    ) {}
+}
+
+export class CollectionReference extends Query {
+    readonly type = 'collection';
+    constructor(firestore: LocalFirestore, readonly path: string) {
+        super(firestore, { collectionPath: path });
+    }
+    get id() {
+        return this.path.slice(this.path.lastIndexOf('/') + 1);
+    }
+    get parent(): DocumentReference | null {
+        return this.path.includes('/') ? new DocumentReference(this.firestore, parentPath(this.path)) : null;
+    }
+}
+
+const autoId = () => Array.from({ length: 20 }, () =>
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'[Math.floor(Math.random() * 62)]
+).join('');
+
+export function doc(parent: any, ...pathSegments: string[]): DocumentReference {
+    if (parent instanceof CollectionReference && pathSegments.length === 0) {
+        return new DocumentReference(parent.firestore, `${parent.path}/${autoId()}`);
+    }
+    const base = parent instanceof LocalFirestore ? [] : [parent.path];
+    const db: LocalFirestore = parent instanceof LocalFirestore ? parent : parent.firestore;
+    const segs = segmentsOf([...base, ...pathSegments]);
+    if (segs.length % 2 !== 0) throw new Error(`Invalid document reference: ${segs.join('/')} has an odd number of segments`);
+    return new DocumentReference(db, segs.join('/'));
+}
+
+export function collection(parent: any, ...pathSegments: string[]): CollectionReference {
+    const base = parent instanceof LocalFirestore ? [] : [parent.path];
+    const db: LocalFirestore = parent instanceof LocalFirestore ? parent : parent.firestore;
+    const segs = segmentsOf([...base, ...pathSegments]);
+    if (segs.length % 2 !== 1) throw new Error(`Invalid collection reference: ${segs.join('/')} has an even number of segments`);
+    return new CollectionReference(db, segs.join('/'));
+}
+
+export function collectionGroup(db: LocalFirestore, groupId: string): Query {
+    return new Query(db, { groupId });
+}
+
+// --- Snapshots ---
+
+export class DocumentSnapshot {
+    constructor(readonly ref: DocumentReference, private readonly raw: Data | undefined) {}
+    get id() {
+        return this.ref.id;
+    }
+    exists(): boolean {
+        return this.raw !== undefined;
+    }
+    data(): any {
+        return this.raw === undefined ? undefined : clone(this.raw);
+    }
+    get(field: string | FieldPath): any {
+        return readField(this.raw, field instanceof FieldPath ? field.field : field, this.ref);
+    }
+}
+
+export class QueryDocumentSnapshot extends DocumentSnapshot {
+    data(): any {
+        return super.data()!;
+    }
+}
+
+export class QuerySnapshot {
+    constructor(readonly query: Query, readonly docs: QueryDocumentSnapshot[]) {}
+    get size() {
+        return this.docs.length;
+    }
+    get empty() {
+        return this.docs.length === 0;
+    }
+    forEach(cb: (d: QueryDocumentSnapshot) => void) {
+        this.docs.forEach(cb);
+    }
+}
+
+// --- Queries ---
+
+export type QueryConstraint =
+    | { kind: 'where'; field: string; op: string; value: any }
+    | { kind: 'orderBy'; field: string; dir: 'asc' | 'desc' }
+    | { kind: 'limit'; n: number }
+    | { kind: 'startAfter'; values: any[] };
+
+const fieldName = (f: string | FieldPath) => f instanceof FieldPath ? f.field : f;
+
+export function where(field: string | FieldPath, op: string, value: any): QueryConstraint {
+    return { kind: 'where', field: fieldName(field), op, value };
+}
+
+export function orderBy(field: string | FieldPath, dir: 'asc' | 'desc' = 'asc'): QueryConstraint {
+    return { kind: 'orderBy', field: fieldName(field), dir };
+}
+
+export function limit(n: number): QueryConstraint {
+    return { kind: 'limit', n };
+}
+
+export function startAfter(...values: any[]): QueryConstraint {
+    return { kind: 'startAfter', values };
+}
+
+export function query(base: Query, ...constraints: QueryConstraint[]): Query {
+    return new Query(base.firestore, base.source, [...base.constraints, ...constraints]);
+}
+
+function readField(data: Data | undefined, field: string, ref: DocumentReference): any {
+    if (field === DOCUMENT_ID) return ref.path;
+    let cur: any = data;
+    for (const part of field.split('.')) {
+        if (cur === null || typeof cur !== 'object') return undefined;
+        cur = cur[part];
+    }
+    return cur;
+}
+
+const TYPE_ORDER = (v: any) =>
+    v === null ? 0 : typeof v === 'boolean' ? 1 : typeof v === 'number' ? 2 :
+    v instanceof Timestamp ? 3 : typeof v === 'string' ? 4 : v instanceof Bytes ? 5 :
+    Array.isArray(v) ? 6 : 7;
+
+function compareValues(a: any, b: any): number {
+    const ta = TYPE_ORDER(a), tb = TYPE_ORDER(b);
+    if (ta !== tb) return ta - tb;
+    if (a instanceof Timestamp) return a.toMillis() - b.toMillis();
+    if (typeof a === 'number' || typeof a === 'boolean') return Number(a) - Number(b);
+    if (typeof a === 'string') return a < b ? -1 : a > b ? 1 : 0;
+    const ja = JSON.stringify(serialize(a)), jb = JSON.stringify(serialize(b));
+    return ja < jb ? -1 : ja > jb ? 1 : 0;
+}
+
+const equal = (a: any, b: any) => a !== undefined && compareValues(a, b) === 0;
+
+function matches(c: Extract<QueryConstraint, { kind: 'where' }>, snap: DocumentSnapshot): boolean {
+    let v = snap.get(c.field);
+    let target = c.value;
+    if (c.field === DOCUMENT_ID) {
+        // Ids may be given bare or as full paths
+        const asPath = (x: any) => x instanceof DocumentReference ? x.path : String(x);
+        v = snap.id;
+        target = Array.isArray(target)
+            ? target.map(t => asPath(t).split('/').pop())
+            : asPath(target).split('/').pop();
+    }
+    switch (c.op) {
+        case '==': return equal(v, target);
+        case '!=': return v !== undefined && !equal(v, target);
+        case '<': return v !== undefined && TYPE_ORDER(v) === TYPE_ORDER(target) && compareValues(v, target) < 0;
+        case '<=': return v !== undefined && TYPE_ORDER(v) === TYPE_ORDER(target) && compareValues(v, target) <= 0;
+        case '>': return v !== undefined && TYPE_ORDER(v) === TYPE_ORDER(target) && compareValues(v, target) > 0;
+        case '>=': return v !== undefined && TYPE_ORDER(v) === TYPE_ORDER(target) && compareValues(v, target) >= 0;
+        case 'in': return (target as any[]).some(t => equal(v, t));
+        case 'not-in': return v !== undefined && !(target as any[]).some(t => equal(v, t));
+        case 'array-contains': return Array.isArray(v) && v.some(x => equal(x, target));
+        case 'array-contains-any': return Array.isArray(v) && v.some(x => (target as any[]).some(t => equal(x, t)));
+        default: throw new Error(`Unsupported where operator: ${c.op}`);
+    }
+}
+
+function runQuery(q: Query): QueryDocumentSnapshot[] {
+    const db = q.firestore;
+    let paths: string[];
+    if (q.source.collectionPath !== undefined) {
+        paths = Array.from(db.byParent.get(q.source.collectionPath) || []);
+    } else {
+        const groupId = q.source.groupId!;
+        paths = Array.from(db.docs.keys()).filter(p => {
+            const parent = parentPath(p);
+            return parent.slice(parent.lastIndexOf('/') + 1) === groupId;
+        });
+    }
+
+    let snaps = paths.map(p => new QueryDocumentSnapshot(new DocumentReference(db, p), db.get(p)));
+
+    const wheres = q.constraints.filter((c): c is Extract<QueryConstraint, { kind: 'where' }> => c.kind === 'where');
+    const orders = q.constraints.filter((c): c is Extract<QueryConstraint, { kind: 'orderBy' }> => c.kind === 'orderBy');
+    const limits = q.constraints.filter((c): c is Extract<QueryConstraint, { kind: 'limit' }> => c.kind === 'limit');
+    const cursor = q.constraints.find((c): c is Extract<QueryConstraint, { kind: 'startAfter' }> => c.kind === 'startAfter');
+
+    snaps = snaps.filter(s => wheres.every(w => matches(w, s)));
+    // Firestore leaves out documents that lack an orderBy field
+    snaps = snaps.filter(s => orders.every(o => s.get(o.field) !== undefined));
+
+    const keyOf = (s: DocumentSnapshot) => [...orders.map(o => s.get(o.field)), s.ref.path];
+    const compareKeys = (a: any[], b: any[]) => {
+        for (let i = 0; i < orders.length; i++) {
+            const c = compareValues(a[i], b[i]);
+            if (c !== 0) return orders[i].dir === 'desc' ? -c : c;
+        }
+        return compareValues(a[orders.length], b[orders.length]);
+    };
+    snaps.sort((a, b) => compareKeys(keyOf(a), keyOf(b)));
+
+    if (cursor) {
+        const first = cursor.values[0];
+        if (first instanceof DocumentSnapshot) {
+            const k = keyOf(first);
+            snaps = snaps.filter(s => compareKeys(keyOf(s), k) > 0);
+        } else {
+            const vals = cursor.values;
+            snaps = snaps.filter(s => {
+                const k = keyOf(s);
+                for (let i = 0; i < vals.length && i < orders.length; i++) {
+                    const c = compareValues(k[i], vals[i]) * (orders[i].dir === 'desc' ? -1 : 1);
+                    if (c !== 0) return c > 0;
+                }
+                return false;
+            });
+        }
+    }
+
+    if (limits.length > 0) snaps = snaps.slice(0, limits[limits.length - 1].n);
+    return snaps;
+}
+
+// --- Reads ---
+
+export async function getDoc(ref: DocumentReference): Promise<DocumentSnapshot> {
+    return new DocumentSnapshot(ref, ref.firestore.get(ref.path));
+}
+
+export async function getDocs(q: Query): Promise<QuerySnapshot> {
+    return new QuerySnapshot(q, runQuery(q));
+}
+
+export function onSnapshot(target: DocumentReference | Query, onNext: (snap: any) => void, onError?: (e: any) => void): () => void {
+    const db = target.firestore;
+    const emit = () => {
+        try {
+            onNext(target instanceof DocumentReference
+                ? new DocumentSnapshot(target, db.get(target.path))
+                : new QuerySnapshot(target, runQuery(target)));
+        } catch (e) {
+            onError?.(e);
+        }
+    };
+    db.listeners.add(emit);
+    setTimeout(emit, 0);
+    return () => { db.listeners.delete(emit); };
+}
+
+// --- Writes ---
+
+function setPath(target: Data, field: string, value: any) {
+    const parts = field.split('.');
+    let cur = target;
+    for (const part of parts.slice(0, -1)) {
+        if (!cur[part] || typeof cur[part] !== 'object' || Array.isArray(cur[part])) cur[part] = {};
+        cur = cur[part];
+    }
+    cur[parts[parts.length - 1]] = value;
+}
+
+function deepMerge(target: Data, patch: Data): Data {
+    for (const [k, v] of Object.entries(patch)) {
+        const isPlain = v && typeof v === 'object' && !Array.isArray(v) && !(v instanceof Bytes) && !(v instanceof Timestamp);
+        if (isPlain && target[k] && typeof target[k] === 'object' && !Array.isArray(target[k])) {
+            deepMerge(target[k], v);
+        } else {
+            target[k] = v;
+        }
+    }
+    return target;
+}
+
+function applySet(ref: DocumentReference, data: Data, options?: { merge?: boolean }) {
+    const db = ref.firestore;
+    const next = clone(data);
+    const current = db.get(ref.path);
+    db.put(ref.path, options?.merge && current ? deepMerge(clone(current), next) : next);
+}
+
+function applyUpdate(ref: DocumentReference, fields: Data) {
+    const db = ref.firestore;
+    const current = db.get(ref.path);
+    if (!current) throw new Error(`NOT_FOUND: No document to update: ${ref.path}`);
+    const next = clone(current);
+    Object.entries(fields).forEach(([k, v]) => setPath(next, k, clone(v)));
+    db.put(ref.path, next);
+}
+
+const updateFields = (args: any[]): Data => {
+    if (args.length === 1) return args[0];
+    const out: Data = {};
+    for (let i = 0; i < args.length; i += 2) out[fieldName(args[i])] = args[i + 1];
+    return out;
+};
+
+export async function setDoc(ref: DocumentReference, data: Data, options?: { merge?: boolean }): Promise<void> {
+    applySet(ref, data, options);
+    ref.firestore.changed();
+}
+
+export async function updateDoc(ref: DocumentReference, ...args: any[]): Promise<void> {
+    applyUpdate(ref, updateFields(args));
+    ref.firestore.changed();
+}
+
+export async function deleteDoc(ref: DocumentReference): Promise<void> {
+    ref.firestore.remove(ref.path);
+    ref.firestore.changed();
+}
+
+export class WriteBatch {
+    private ops: Array<{ ref: DocumentReference; apply: () => void }> = [];
+    constructor(private readonly db: LocalFirestore) {}
+
+    set(ref: DocumentReference, data: Data, options?: { merge?: boolean }) {
+        const snapshot = clone(data);
+        this.ops.push({ ref, apply: () => applySet(ref, snapshot, options) });
+        return this;
+    }
+    update(ref: DocumentReference, ...args: any[]) {
+        const fields = clone(updateFields(args));
+        this.ops.push({ ref, apply: () => applyUpdate(ref, fields) });
+        return this;
+    }
+    delete(ref: DocumentReference) {
+        this.ops.push({ ref, apply: () => this.db.remove(ref.path) });
+        return this;
+    }
+    async commit(): Promise<void> {
+        const ops = this.ops;
+        this.ops = [];
+        if (ops.length > 500) throw new Error(`INVALID_ARGUMENT: batch of ${ops.length} writes exceeds 500`);
+
+        // All-or-nothing: stored docs are replaced, never mutated, so the old values can be put back
+        const previous = new Map<string, Data | undefined>();
+        ops.forEach(op => { if (!previous.has(op.ref.path)) previous.set(op.ref.path, this.db.get(op.ref.path)); });
+        try {
+            ops.forEach(op => op.apply());
+        } catch (e) {
+            previous.forEach((d, p) => d === undefined ? this.db.remove(p) : this.db.put(p, d));
+            throw e;
+        }
+        if (ops.length > 0) this.db.changed();
+    }
+}
+
+export function writeBatch(db: LocalFirestore): WriteBatch {
+    return new WriteBatch(db);
+}
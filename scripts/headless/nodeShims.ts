@@ -0,0 +1,92 @@
+import * as fs from 'fs';
+import * as path from 'path';
+
+/**
+ * NODE SHIMS
+ * The browser globals the pipeline services touch, for headless runs:
+ * a file-backed `localStorage` (so StorageAdapter and the corpus stores keep
+ * state across runs in the workspace) and a minimal `window` that accepts
+ * heartbeat events. IndexedDB is left undefined, so StorageAdapter picks its
+ * localStorage engine. Must be installed before any service module loads.
+ */
+
+class FileStorage {
+    private data = new Map<string, string>();
+    private timer: ReturnType<typeof setTimeout> | null = null;
+
+    constructor(private readonly file: string) {
+        try {
+            const saved = JSON.parse(fs.readFileSync(file, 'utf8'));
+            Object.entries(saved).forEach(([k, v]) => this.data.set(k, String(v)));
+        } catch {
+            // First run: start empty
+        }
+    }
+
+    get length() {
+        return this.data.size;
+    }
+
+    key(i: number): string | null {
+        return Array.from(this.data.keys())[i] ?? null;
+    }
+
+    getItem(key: string): string | null {
+        return this.data.has(key) ? this.data.get(key)! : null;
+    }
+
+    setItem(key: string, value: string) {
+        this.data.set(key, String(value));
+        this.scheduleFlush();
+    }
+
+    removeItem(key: string) {
+        if (this.data.delete(key)) this.scheduleFlush();
+    }
+
+    clear() {
+        this.data.clear();
+        this.scheduleFlush();
+    }
+
+    flush() {
+        if (this.timer) clearTimeout(this.timer);
+        this.timer = null;
+        fs.mkdirSync(path.dirname(this.file), { recursive: true });
+        const tmp = `${this.file}.tmp`;
+        fs.writeFileSync(tmp, JSON.stringify(Object.fromEntries(this.data)));
+        fs.renameSync(tmp, this.file);
+    }
+
+    private scheduleFlush() {
+        if (this.timer) return;
+        this.timer = setTimeout(() => this.flush(), 1000);
+        this.timer.unref?.();
+    }
+}
+
+let storage: FileStorage | null = null;
+
+export function installNodeShims(workspace: string) {
+    const g = globalThis as any;
+
+    if (typeof g.localStorage === 'undefined' || g.localStorage === null) {
+        storage = new FileStorage(path.join(workspace, 'localStorage.json'));
+        g.localStorage = storage;
+    }
+    if (typeof g.window === 'undefined') {
+        const target = new EventTarget();
+        g.window = {
+            location: { host: 'headless', hostname: 'headless', href: 'http://headless/', origin: 'http://headless', reload() {} },
+            localStorage: g.localStorage,
+            addEventListener: target.addEventListener.bind(target),
+            removeEventListener: target.removeEventListener.bind(target),
+            dispatchEvent: target.dispatchEvent.bind(target),
+            setTimeout, clearTimeout, setInterval, clearInterval
+        };
+    }
+}
+
+export function flushNodeShims() {
+    storage?.flush();
+}
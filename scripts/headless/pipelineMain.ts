@@ -0,0 +1,178 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { installNodeShims, flushNodeShims } from './nodeShims';
+import { installFixtureFetch, getFixtureStats } from './fixtureFetch';
+import type { FixtureMode } from './fixtureFetch';
+import { flushLocalFirestore, getLocalFirestoreStats } from './localFirestore';
+import type { LlmCallLayer } from '../../src/services/llmCallLayer';
+import type { LlmScheduler } from '../../src/services/llmScheduler';
+
+declare const process: any;
+
+/**
+ * HEADLESS PIPELINE
+ * Runs corpus -> demand -> deep dive for a set of categories without a
+ * browser. Loaded by scripts/runPipeline.ts through Vite's SSR loader, which
+ * has already swapped `firebase/firestore` for the chosen backend. The shims
+ * and fixture fetch are installed before any service module is imported, since
+ * several services capture env and globals at load time.
+ */
+
+export type HeadlessStage = 'corpus' | 'demand' | 'pipeline';
+
+export interface HeadlessOptions {
+    categories: string;             // "N" (first N core categories) or "id,id,..."
+    month?: string;
+    stages: HeadlessStage[];
+    mode: 'DRY_RUN' | 'FULL_RUN';
+    tier: 'LITE' | 'FULL';
+    store: 'local' | 'emulator' | 'live';
+    workspace: string;
+    fixtures: { dir: string; mode: FixtureMode; synthesizeDfs: boolean };
+}
+
+interface CategoryOutcome {
+    ok: boolean;
+    ms: number;
+    detail?: Record<string, any>;
+    error?: string;
+}
+
+export interface HeadlessReport {
+    startedAt: string;
+    finishedAt: string;
+    month: string;
+    store: HeadlessOptions['store'];
+    mode: HeadlessOptions['mode'];
+    categories: string[];
+    stages: Partial<Record<HeadlessStage, { ms: number; byCategory: Record<string, CategoryOutcome> }>>;
+    fixtures: ReturnType<typeof getFixtureStats>;
+    firestore: ReturnType<typeof getLocalFirestoreStats> | null;
+    llm: { cache: ReturnType<typeof LlmCallLayer.getStats>; scheduler: ReturnType<typeof LlmScheduler.getStats> } | null;
+    ok: boolean;
+}
+
+const errorText = (e: any) => String(e?.message || e);
+
+export async function runHeadless(opts: HeadlessOptions): Promise<HeadlessReport> {
+    fs.mkdirSync(opts.workspace, { recursive: true });
+    installNodeShims(opts.workspace);
+    installFixtureFetch(opts.fixtures);
+
+    // Replays never reach the real services, but the clients refuse to start without creds
+    if (opts.fixtures.mode === 'replay') {
+        process.env.DATAFORSEO_LOGIN = process.env.DATAFORSEO_LOGIN || 'fixture-replay';
+        process.env.DATAFORSEO_PASSWORD = process.env.DATAFORSEO_PASSWORD || 'fixture-replay';
+        process.env.API_KEY = process.env.API_KEY || 'fixture-replay';
+    }
+
+    const { CORE_CATEGORIES } = await import('../../src/constants');
+    const { DateUtils } = await import('../../src/utils/dateUtils');
+    const { FirestoreClient } = await import('../../src/services/firestoreClient');
+    const { BulkCorpusAutomationService } = await import('../../src/services/bulkCorpusAutomationService');
+    const { DemandRunner } = await import('../../src/services/demandRunner');
+    const { PipelineOrchestrator } = await import('../../src/services/pipelineOrchestrator');
+    const llmLayer = (await import('../../src/services/llmCallLayer')).LlmCallLayer;
+    const llmScheduler = (await import('../../src/services/llmScheduler')).LlmScheduler;
+
+    // Initialise the default app first so bare getFirestore() calls share it (and the emulator)
+    if (!FirestoreClient.getDbSafe()) throw new Error('Firestore could not be initialised');
+
+    const categoryIds = /^\d+$/.test(opts.categories)
+        ? CORE_CATEGORIES.slice(0, Number(opts.categories)).map(c => c.id)
+        : opts.categories.split(',').map(s => s.trim()).filter(Boolean);
+    const unknown = categoryIds.filter(id => !CORE_CATEGORIES.some(c => c.id === id));
+    if (unknown.length > 0) throw new Error(`Unknown categories: ${unknown.join(',')}`);
+
+    const month = opts.month || DateUtils.getCurrentMonthKey();
+    const report: HeadlessReport = {
+        startedAt: new Date().toISOString(),
+        finishedAt: '',
+        month,
+        store: opts.store,
+        mode: opts.mode,
+        categories: categoryIds,
+        stages: {},
+        fixtures: getFixtureStats(),
+        firestore: null,
+        llm: null,
+        ok: true
+    };
+
+    console.log(`[HEADLESS][START] categories=${categoryIds.join(',')} month=${month} stages=${opts.stages.join(',')} store=${opts.store} fixtures=${opts.fixtures.mode}`);
+
+    const runStage = async (stage: HeadlessStage, body: (byCategory: Record<string, CategoryOutcome>) => Promise<void>) => {
+        const byCategory: Record<string, CategoryOutcome> = {};
+        const t0 = Date.now();
+        await body(byCategory);
+        const ms = Date.now() - t0;
+        report.stages[stage] = { ms, byCategory };
+        const failed = Object.entries(byCategory).filter(([, o]) => !o.ok).map(([id]) => id);
+        if (failed.length > 0) report.ok = false;
+        console.log(`[HEADLESS][STAGE] stage=${stage} ms=${ms} ok=${categoryIds.length - failed.length} failed=${failed.join(',') || 'none'}`);
+    };
+
+    // Sequential per category for demand and pipeline, matching the console's run order
+    const perCategory = (fn: (id: string) => Promise<{ ok: boolean; detail?: Record<string, any>; error?: string }>) =>
+        async (byCategory: Record<string, CategoryOutcome>) => {
+            for (const id of categoryIds) {
+                const t0 = Date.now();
+                try {
+                    const r = await fn(id);
+                    byCategory[id] = { ...r, ms: Date.now() - t0 };
+                } catch (e: any) {
+                    byCategory[id] = { ok: false, ms: Date.now() - t0, error: errorText(e) };
+                }
+            }
+        };
+
+    if (opts.stages.includes('corpus')) {
+        await runStage('corpus', async byCategory => {
+            // The bulk service pipelines its own stages across categories, so it runs once
+            const t0 = Date.now();
+            const summary = await BulkCorpusAutomationService.runBulkCertifyLite(`HEADLESS-${Date.now()}`, { onlyCategoryIds: categoryIds });
+            const ms = Date.now() - t0;
+            categoryIds.forEach(id => {
+                const failure = summary.failed.find(f => f.id === id);
+                byCategory[id] = failure
+                    ? { ok: false, ms, error: `${failure.stage}: ${failure.reason}` }
+                    : { ok: true, ms, detail: { skipped: summary.skippedAlreadyCertified.includes(id), ...summary.metricsByCategory[id] } };
+            });
+        });
+    }
+
+    if (opts.stages.includes('demand')) {
+        await runStage('demand', perCategory(async id => {
+            const r = await DemandRunner.runDemand({ categoryId: id, month, force: true });
+            return { ok: r.ok, error: r.error, detail: { docId: r.docId, demand_index_mn: r.demand_index_mn, metricsVersion: r.metricsVersion, source: r.source } };
+        }));
+    }
+
+    if (opts.stages.includes('pipeline')) {
+        await runStage('pipeline', perCategory(async id => {
+            const r = await PipelineOrchestrator.runOrderedPipeline({ categoryId: id, month, tier: opts.tier, mode: opts.mode });
+            return {
+                ok: r.verdict !== 'NO_GO',
+                error: r.blockers.length > 0 ? r.blockers.join('; ') : undefined,
+                detail: { verdict: r.verdict, warnings: r.warnings, timingsMs: r.timingsMs, artifacts: r.artifacts }
+            };
+        }));
+    }
+
+    report.finishedAt = new Date().toISOString();
+    report.fixtures = getFixtureStats();
+    report.llm = { cache: llmLayer.getStats(), scheduler: llmScheduler.getStats() };
+    llmLayer.logStats();
+    if (opts.store === 'local') {
+        flushLocalFirestore();
+        report.firestore = getLocalFirestoreStats();
+    }
+    flushNodeShims();
+
+    const file = path.join(opts.workspace, `report-${report.startedAt.replace(/[:.]/g, '-')}.json`);
+    fs.writeFileSync(file, JSON.stringify(report, null, 2));
+    const fx = report.fixtures;
+    console.log(`[HEADLESS][FIXTURES] replayed=${fx.replayed} recorded=${fx.recorded} synthesized=${fx.synthesized} missed=${fx.missed}`);
+    console.log(`[HEADLESS][DONE] ok=${report.ok} report=${file}`);
+    return report;
+}
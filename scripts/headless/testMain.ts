@@ -0,0 +1,74 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { installNodeShims } from './nodeShims';
+
+declare const process: any;
+
+/**
+ * UNIT TEST SUITE
+ * Finds the colocated `*.test.ts` modules under the given roots, imports each
+ * one and awaits every exported `run...Tests` function. Loaded by
+ * scripts/runTests.ts through Vite's SSR loader, so test modules import the
+ * services exactly as the app does. Shims point at a throwaway directory:
+ * tests must never see, or leave behind, a real workspace's state.
+ */
+
+export interface TestSuiteOptions {
+    roots: string[];        // Absolute directories to search
+    filter?: string;        // Regex on the root-relative test file path
+}
+
+export interface TestSuiteReport {
+    files: number;
+    passed: string[];
+    failed: Array<{ name: string; error: string }>;
+}
+
+const TEST_FILE = /\.test\.tsx?$/;
+const TEST_EXPORT = /^run\w*Tests$/;
+
+function findTestFiles(dir: string): string[] {
+    if (!fs.existsSync(dir)) return [];
+    return fs.readdirSync(dir, { withFileTypes: true }).flatMap(entry => {
+        const full = path.join(dir, entry.name);
+        if (entry.isDirectory()) return entry.name === 'node_modules' ? [] : findTestFiles(full);
+        return TEST_FILE.test(entry.name) ? [full] : [];
+    });
+}
+
+export async function runTestSuite(root: string, opts: TestSuiteOptions): Promise<TestSuiteReport> {
+    installNodeShims(fs.mkdtempSync(path.join(os.tmpdir(), 'mci-tests-')));
+
+    const filter = opts.filter ? new RegExp(opts.filter) : null;
+    const files = opts.roots.flatMap(findTestFiles)
+        .map(f => '/' + path.relative(root, f).split(path.sep).join('/'))
+        .filter(f => !filter || filter.test(f))
+        .sort();
+
+    const report: TestSuiteReport = { files: files.length, passed: [], failed: [] };
+    for (const file of files) {
+        let mod: Record<string, any>;
+        try {
+            mod = await import(/* @vite-ignore */ file);
+        } catch (e: any) {
+            report.failed.push({ name: file, error: e?.stack || String(e) });
+            console.error(`[TEST][LOAD_FAIL] file=${file} reason=${e?.message || e}`);
+            continue;
+        }
+        for (const [name, fn] of Object.entries(mod)) {
+            if (!TEST_EXPORT.test(name) || typeof fn !== 'function') continue;
+            const id = `${file}#${name}`;
+            try {
+                await fn();
+                report.passed.push(id);
+            } catch (e: any) {
+                report.failed.push({ name: id, error: e?.stack || String(e) });
+                console.error(`[TEST][FAIL] ${id}\n${e?.stack || e}`);
+            }
+        }
+    }
+
+    console.log(`[TEST][DONE] files=${report.files} passed=${report.passed.length} failed=${report.failed.length}`);
+    return report;
+}
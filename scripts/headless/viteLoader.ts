@@ -0,0 +1,65 @@
+import * as path from 'path';
+import { fileURLToPath } from 'url';
+import { createServer } from 'vite';
+
+/**
+ * Shared bootstrap for the node entry scripts (runPipeline, runBench, runTests).
+ * The services are browser modules (import.meta.env, bundler resolution), so
+ * they are loaded through Vite's SSR module loader rather than plain Node.
+ */
+
+export type ViteAlias = { find: RegExp | string; replacement: string };
+
+export const ROOT = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '../..');
+
+/** `firebase/firestore` -> the in-memory / file-backed local stand-in. */
+export const LOCAL_FIRESTORE_ALIAS: ViteAlias = {
+    find: /^firebase\/firestore$/,
+    replacement: path.join(ROOT, 'scripts/headless/localFirestore.ts')
+};
+
+/** `--flag value` pairs; a flag followed by another flag (or nothing) is 'true'. */
+export function parseArgs(argv: string[]): Record<string, string> {
+    const out: Record<string, string> = {};
+    for (let i = 0; i < argv.length; i++) {
+        const arg = argv[i];
+        if (!arg.startsWith('--')) throw new Error(`Unexpected argument: ${arg}`);
+        const key = arg.slice(2);
+        const next = argv[i + 1];
+        if (next === undefined || next.startsWith('--')) {
+            out[key] = 'true';
+        } else {
+            out[key] = next;
+            i++;
+        }
+    }
+    return out;
+}
+
+/**
+ * Starts a middleware-only Vite server, SSR-loads `entry` (root-relative, e.g.
+ * '/scripts/bench/benchSuite.ts') and hands the module to `fn`. The server is
+ * closed however `fn` ends.
+ */
+export async function withSsrModule<T>(entry: string, alias: ViteAlias[], fn: (mod: any) => Promise<T>): Promise<T> {
+    const server = await createServer({
+        configFile: false,
+        root: ROOT,
+        logLevel: 'warn',
+        appType: 'custom',
+        server: { middlewareMode: true, hmr: false, watch: null },
+        optimizeDeps: { noDiscovery: true },
+        resolve: {
+            alias: [
+                ...alias,
+                { find: '@', replacement: path.join(ROOT, 'src') }
+            ]
+        }
+    });
+
+    try {
+        return await fn(await server.ssrLoadModule(entry));
+    } finally {
+        await server.close();
+    }
+}
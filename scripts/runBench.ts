@@ -0,0 +1,67 @@
+import * as path from 'path';
+import { parseArgs, withSsrModule, LOCAL_FIRESTORE_ALIAS } from './headless/viteLoader.ts';
+import type { BenchSuiteOptions, BenchReport } from './bench/benchSuite';
+
+/**
+ * Hot path benchmark runner.
+ *
+ *   npm run bench -- --sizes 1000,10000 --out bench/main.json
+ *   npm run bench -- --compare bench/main.json --threshold 15
+ *
+ * Loaded through Vite's SSR module loader like scripts/runPipeline.ts, with
+ * `firebase/firestore` always aliased to the in-memory local stand-in.
+ * Run under --expose-gc (the npm script does) for retained-heap numbers.
+ *
+ * Options:
+ *   --sizes list          Corpus sizes in rows (default 1000,10000,100000)
+ *   --filter regex        Only cases whose name matches
+ *   --category id         Category the corpora are built for (default shaving)
+ *   --min-time ms         Minimum timed wall time per case (default 500)
+ *   --min-samples n       Minimum timed ops per case (default 5)
+ *   --workspace dir       Shim state and default report location (default .bench)
+ *   --out file            Report path (default <workspace>/bench-<timestamp>.json)
+ *   --compare file        Previous report; exits 1 when a case regresses or its output hash changed
+ *   --threshold pct       Median op slowdown that counts as a regression (default 15)
+ */
+
+declare const process: any;
+
+function positive(name: string, value: string | undefined, fallback: number): number {
+    if (value === undefined) return fallback;
+    const n = Number(value);
+    if (!Number.isFinite(n) || n <= 0) throw new Error(`--${name} must be a positive number (got ${value})`);
+    return n;
+}
+
+function buildOptions(args: Record<string, string>): BenchSuiteOptions {
+    const sizes = (args.sizes || '1000,10000,100000').split(',').map(s => positive('sizes', s.trim(), 0));
+    return {
+        sizes,
+        filter: args.filter,
+        categoryId: args.category || 'shaving',
+        workspace: path.resolve(args.workspace || '.bench'),
+        out: args.out ? path.resolve(args.out) : undefined,
+        compare: args.compare ? path.resolve(args.compare) : undefined,
+        thresholdPct: positive('threshold', args.threshold, 15),
+        bench: {
+            minTimeMs: positive('min-time', args['min-time'], 500),
+            minSamples: positive('min-samples', args['min-samples'], 5)
+        }
+    };
+}
+
+async function main() {
+    const opts = buildOptions(parseArgs(process.argv.slice(2)));
+    // In-memory only: the chunk store cases must never write anywhere real
+    delete process.env.MCI_LOCAL_FIRESTORE_FILE;
+    delete process.env.FIRESTORE_EMULATOR_HOST;
+
+    const report: BenchReport = await withSsrModule('/scripts/bench/benchSuite.ts', [LOCAL_FIRESTORE_ALIAS],
+        entry => entry.runBenchSuite(opts));
+    process.exit(report.regressions === 0 && report.outputChanges === 0 ? 0 : 1);
+}
+
+main().catch(e => {
+    console.error(`[BENCH][FATAL] ${e?.stack || e}`);
+    process.exit(2);
+});
@@ -0,0 +1,92 @@
+import * as path from 'path';
+import { parseArgs, withSsrModule, LOCAL_FIRESTORE_ALIAS } from './headless/viteLoader.ts';
+import type { ViteAlias } from './headless/viteLoader.ts';
+import type { HeadlessOptions, HeadlessReport, HeadlessStage } from './headless/pipelineMain';
+
+/**
+ * Headless pipeline runner.
+ *
+ *   npm run pipeline:headless -- --categories 3 --stages corpus,demand,pipeline
+ *
+ * The services are browser modules (import.meta.env, bundler resolution), so
+ * they are loaded through Vite's SSR module loader rather than plain Node.
+ *
+ * Options:
+ *   --categories N|id,id     First N core categories, or explicit ids (default 2)
+ *   --month YYYY-MM          Defaults to the current month
+ *   --stages list            corpus,demand,pipeline (default: all three)
+ *   --mode DRY_RUN|FULL_RUN  Pipeline mode; DRY_RUN skips LLM stages (default DRY_RUN)
+ *   --tier LITE|FULL         Pipeline tier (default LITE)
+ *   --store local|emulator|live
+ *                            local: file-backed stand-in under the workspace (default)
+ *                            emulator: Firestore emulator at --emulator / FIRESTORE_EMULATOR_HOST
+ *                            live: the configured Firebase project; must be asked for explicitly
+ *   --emulator host:port     Emulator address for --store emulator
+ *   --workspace dir          Local store, localStorage and reports (default .headless)
+ *   --fixtures dir           DFS/LLM fixtures (default <workspace>/fixtures)
+ *   --fixtures-mode replay|record|live   (default replay)
+ *   --no-synth               Fail DFS replay misses instead of synthesising volumes
+ */
+
+declare const process: any;
+
+const STAGES: HeadlessStage[] = ['corpus', 'demand', 'pipeline'];
+
+function oneOf<T extends string>(name: string, value: string, allowed: readonly T[]): T {
+    if (!(allowed as readonly string[]).includes(value)) {
+        throw new Error(`--${name} must be one of ${allowed.join('|')} (got ${value})`);
+    }
+    return value as T;
+}
+
+function buildOptions(args: Record<string, string>): HeadlessOptions {
+    const workspace = path.resolve(args.workspace || '.headless');
+    const stages = (args.stages || STAGES.join(',')).split(',').map(s => oneOf('stages', s.trim(), STAGES));
+    return {
+        categories: args.categories || '2',
+        month: args.month,
+        stages,
+        mode: oneOf('mode', args.mode || 'DRY_RUN', ['DRY_RUN', 'FULL_RUN'] as const),
+        tier: oneOf('tier', args.tier || 'LITE', ['LITE', 'FULL'] as const),
+        store: oneOf('store', args.store || 'local', ['local', 'emulator', 'live'] as const),
+        workspace,
+        fixtures: {
+            dir: path.resolve(args.fixtures || path.join(workspace, 'fixtures')),
+            mode: oneOf('fixtures-mode', args['fixtures-mode'] || 'replay', ['replay', 'record', 'live'] as const),
+            synthesizeDfs: args['no-synth'] !== 'true'
+        }
+    };
+}
+
+/** Points the Firestore SDK at the chosen backend; never defaults to the shared project. */
+function configureStore(opts: HeadlessOptions, args: Record<string, string>): ViteAlias[] {
+    if (opts.store === 'local') {
+        process.env.MCI_LOCAL_FIRESTORE_FILE = path.join(opts.workspace, 'firestore.json');
+        return [LOCAL_FIRESTORE_ALIAS];
+    }
+    if (opts.store === 'emulator') {
+        const host = args.emulator || process.env.FIRESTORE_EMULATOR_HOST;
+        if (!host) throw new Error('--store emulator needs --emulator host:port or FIRESTORE_EMULATOR_HOST');
+        process.env.FIRESTORE_EMULATOR_HOST = host;
+        return [];
+    }
+    delete process.env.FIRESTORE_EMULATOR_HOST;
+    console.warn('[HEADLESS][STORE] store=live: reads and writes go to the configured Firebase project');
+    return [];
+}
+
+async function main() {
+    const args = parseArgs(process.argv.slice(2));
+    const opts = buildOptions(args);
+    const storeAlias = configureStore(opts, args);
+
+    const report: HeadlessReport = await withSsrModule('/scripts/headless/pipelineMain.ts', storeAlias,
+        entry => entry.runHeadless(opts));
+    // Heartbeats and schedulers keep timers alive; the run is over
+    process.exit(report.ok ? 0 : 1);
+}
+
+main().catch(e => {
+    console.error(`[HEADLESS][FATAL] ${e?.stack || e}`);
+    process.exit(2);
+});
@@ -0,0 +1,39 @@
+import * as path from 'path';
+import { parseArgs, withSsrModule, LOCAL_FIRESTORE_ALIAS, ROOT } from './headless/viteLoader.ts';
+import type { TestSuiteReport } from './headless/testMain';
+
+/**
+ * Unit test runner.
+ *
+ *   npm test
+ *   npm test -- --filter chunkCodec
+ *
+ * Runs every exported `run...Tests` function in the colocated `*.test.ts`
+ * files under src/ and backend-proxy/src/. Loaded through Vite's SSR module
+ * loader like scripts/runPipeline.ts, with `firebase/firestore` aliased to the
+ * in-memory local stand-in.
+ *
+ * Options:
+ *   --filter regex        Only test files whose path matches
+ */
+
+declare const process: any;
+
+async function main() {
+    const args = parseArgs(process.argv.slice(2));
+    // In-memory only: tests must never write anywhere real
+    delete process.env.MCI_LOCAL_FIRESTORE_FILE;
+    delete process.env.FIRESTORE_EMULATOR_HOST;
+
+    const report: TestSuiteReport = await withSsrModule('/scripts/headless/testMain.ts', [LOCAL_FIRESTORE_ALIAS],
+        entry => entry.runTestSuite(ROOT, {
+            roots: [path.join(ROOT, 'src'), path.join(ROOT, 'backend-proxy/src')],
+            filter: args.filter
+        }));
+    process.exit(report.files > 0 && report.failed.length === 0 ? 0 : 1);
+}
+
+main().catch(e => {
+    console.error(`[TEST][FATAL] ${e?.stack || e}`);
+    process.exit(2);
+});
@@ -1,8 +1,10 @@
 
-import React, { useMemo } from 'react';
+import React, { useEffect, useState } from 'react';
 /* Added AlertCircle to the import list from lucide-react */
 import { X, Play, Loader2, CheckCircle2, AlertTriangle, AlertCircle, Ban, Clock, ChevronRight, StopCircle } from 'lucide-react';
 import { JobState } from '../types';
+import { StorageAdapter } from '../services/storageAdapter';
+import type { StoredStateContainer } from '../persistenceService';
 
 interface TaskPanelProps {
     isOpen: boolean;
@@ -26,18 +28,19 @@ const getProgressPercent = (p: number | { processed: number; total: number }): n
 }
 
 export const TaskPanel: React.FC<TaskPanelProps> = ({ isOpen, onClose, jobs, onCancel, onFocus }) => {
-    const hasStorageRisk = useMemo(() => {
-        try {
-            // Check current hydration state from local storage
-            const raw = localStorage.getItem('mci_v1_state_v1');
-            if (!raw) return false;
-            const state = JSON.parse(raw);
-            const demandResults = state?.appState?.demandResults || {};
-            const categoriesWithResults = Object.keys(demandResults).length;
-            return categoriesWithResults > STORAGE_THRESHOLD;
-        } catch (e) {
-            return false;
-        }
+    const [hasStorageRisk, setHasStorageRisk] = useState(false);
+
+    useEffect(() => {
+        let cancelled = false;
+        // Check current hydration state in the persisted app state
+        StorageAdapter.get<StoredStateContainer>('state_v1')
+            .then(state => {
+                const demandResults = state?.appState?.demandResults || {};
+                const categoriesWithResults = Object.keys(demandResults).length;
+                if (!cancelled) setHasStorageRisk(categoriesWithResults > STORAGE_THRESHOLD);
+            })
+            .catch(() => { if (!cancelled) setHasStorageRisk(false); });
+        return () => { cancelled = true; };
     }, [jobs, isOpen]); // Recalculate on job changes or panel open
 
     if (!isOpen) return null;
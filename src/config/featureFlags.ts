@@ -35,6 +35,26 @@ export const MCI_ENABLE_DEEPDIVE_CONTRACT = readBoolEnv('VITE_MCI_ENABLE_DEEPDIV
 export const MCI_ENABLE_DEEPDIVE_RUN_TRANSCRIPT = readBoolEnv('VITE_MCI_ENABLE_DEEPDIVE_RUN_TRANSCRIPT', true);
 export const MCI_ENABLE_DEMAND_ONLY_DEEPDIVE = readBoolEnv('VITE_MCI_ENABLE_DEMAND_ONLY_DEEPDIVE', false);
 export const MCI_DEEPDIVE_MODEL_TIMEOUT_MS = readNumEnv('VITE_MCI_DEEPDIVE_MODEL_TIMEOUT_MS', 120000);
+// Stream deep-dive generation and publish sections as they parse
+export const MCI_ENABLE_DEEPDIVE_STREAMING = readBoolEnv('VITE_MCI_ENABLE_DEEPDIVE_STREAMING', true);
 
 // --- INTEGRITY FLAGS ---
 export const MCI_ENABLE_INTEGRITY_CONTRACT_AUDIT = readBoolEnv('VITE_MCI_ENABLE_INTEGRITY_CONTRACT_AUDIT', true);
+
+// --- DFS BULK FLAGS ---
+// Route large validation passes through search_volume task_post/task_get instead of the live endpoint
+export const MCI_ENABLE_DFS_BULK_TASKS = readBoolEnv('VITE_MCI_ENABLE_DFS_BULK_TASKS', false);
+export const MCI_DFS_BULK_MIN_KEYWORDS = readNumEnv('VITE_MCI_DFS_BULK_MIN_KEYWORDS', 2100);
+
+// --- SNAPSHOT CHUNK FLAGS ---
+// Store snapshot chunks as deflated column arrays. Readers accept both formats, but
+// clients built before the format only see `rows`: enable once every client reads it.
+export const MCI_ENABLE_COMPACT_CHUNKS = readBoolEnv('VITE_MCI_ENABLE_COMPACT_CHUNKS', false);
+// Rows per chunk while compact chunks are on (plain-row chunks stay at 400)
+export const MCI_COMPACT_CHUNK_SIZE = readNumEnv('VITE_MCI_COMPACT_CHUNK_SIZE', 1500);
+
+// --- LLM SCHEDULER FLAGS ---
+// Concurrent Gemini calls per model (pro models get half); one slot is kept for interactive calls
+export const MCI_LLM_MODEL_CONCURRENCY = readNumEnv('VITE_MCI_LLM_MODEL_CONCURRENCY', 4);
+// Rolling tokens-per-minute budget per model (prompt estimate + output allowance)
+export const MCI_LLM_TPM_BUDGET = readNumEnv('VITE_MCI_LLM_TPM_BUDGET', 1000000);
@@ -310,13 +310,14 @@ const CorpusInspectorView: React.FC<Props> = ({ categoryId }) => {
                 setSnapshotId(res.snapshot.snapshot_id);
                 log(`[CORPUS_INSPECTOR][SNAP_OK] id=${res.snapshot.snapshot_id} lifecycle=${res.snapshot.lifecycle}`);
                 
-                const rowsRes = await CategorySnapshotStore.readAllKeywordRows(
+                // Display only: flyweight row views keep large corpora off the heap as objects
+                const rowsRes = await CategorySnapshotStore.readColumnarSnapshot(
                     { categoryId, countryCode: 'IN', languageCode: 'en' },
                     res.snapshot.snapshot_id
                 );
                 
                 if (rowsRes.ok) {
-                    setRows(rowsRes.data);
+                    setRows(rowsRes.data.rows());
                     setCurrentPage(1); // Reset pagination on new data
                     log(`[CORPUS_INSPECTOR] Loaded ${rowsRes.data.length} rows.`);
                 } else {
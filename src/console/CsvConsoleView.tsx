@@ -59,10 +59,9 @@ export const CsvConsoleView: React.FC<CsvConsoleViewProps> = ({ onProceed }) =>
         setProgress({ stage: 'IDLE', percent: 0, message: 'Starting...' });
 
         try {
-            const text = await file.text();
-            
+            // Pass the File itself so it is streamed rather than read into one string
             const res = await CsvIngestionService.ingest(
-                text, 
+                file, 
                 activeCatId, 
                 monthId, 
                 file.name,
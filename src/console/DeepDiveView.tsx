@@ -94,6 +94,67 @@ const TelemetryPanel = ({ runKey }: { runKey: string }) => {
     );
 };
 
+// Sections published by DeepDiveStreaming while the model is still writing
+const StreamingPreview = ({ runKey }: { runKey: string }) => {
+    const [sections, setSections] = useState<{ section: string; value: any; ok: boolean }[]>([]);
+
+    useEffect(() => {
+        const fromEvents = (events: DeepDiveTelemetryEvent[]) => {
+            const out: { section: string; value: any; ok: boolean }[] = [];
+            // History is newest first; stop at the start of the current run
+            for (const e of events) {
+                if (e.phase === 'QUEUED') break;
+                if (e.phase === 'MODEL_STREAMING' && e.meta?.section) {
+                    out.unshift({ section: String(e.meta.section), value: e.meta.value, ok: !!(e.meta.validation as any)?.ok });
+                }
+            }
+            return out;
+        };
+        setSections(fromEvents(DeepDiveTelemetryBus.getSnapshot(runKey).logs));
+
+        return DeepDiveTelemetryBus.subscribe(runKey, (evt) => {
+            if (evt.phase === 'QUEUED') setSections([]);
+            else if (evt.phase === 'MODEL_STREAMING' && evt.meta?.section) {
+                setSections(prev => [...prev, { section: String(evt.meta!.section), value: evt.meta!.value, ok: !!(evt.meta!.validation as any)?.ok }]);
+            }
+        });
+    }, [runKey]);
+
+    if (sections.length === 0) {
+        return (
+            <div className="p-12 text-center text-slate-400">
+                <Loader2 className="w-8 h-8 animate-spin mx-auto mb-2"/>
+                Waiting for the first section...
+            </div>
+        );
+    }
+
+    return (
+        <div className="space-y-4 animate-in fade-in">
+            {sections.map(({ section, value, ok }) => {
+                const bullets: any[] = Array.isArray(value) ? value : (value?.bullets || Object.values(value || {}).find(Array.isArray) || []);
+                return (
+                    <div key={section} className="bg-white rounded-xl border border-slate-200 p-5 shadow-sm">
+                        <div className="flex items-center justify-between mb-3">
+                            <h4 className="text-xs font-black text-slate-700 uppercase tracking-widest">{section.replace(/([A-Z])/g, ' $1')}</h4>
+                            {!ok && <span className="text-[10px] px-2 py-0.5 rounded bg-amber-100 text-amber-700 font-bold">Needs repair</span>}
+                        </div>
+                        <ul className="space-y-1 text-sm text-slate-600 list-disc pl-5">
+                            {bullets.slice(0, 4).map((b, i) => (
+                                <li key={i}>{typeof b === 'string' ? formatRichText(b) : toReactText(Object.values(b || {})[0])}</li>
+                            ))}
+                        </ul>
+                        {bullets.length > 4 && <p className="mt-2 text-[10px] text-slate-400 font-mono">+{bullets.length - 4} more</p>}
+                    </div>
+                );
+            })}
+            <div className="flex items-center gap-2 text-xs text-slate-400 justify-center py-4">
+                <Loader2 className="w-4 h-4 animate-spin"/> Generating remaining sections...
+            </div>
+        </div>
+    );
+};
+
 const ReportSection = ({ title, children, icon: Icon, color, className = "" }: any) => (
     <div className={`bg-white rounded-2xl border border-slate-200 p-6 md:p-8 shadow-sm mb-8 border-l-[6px] border-l-${color}-500 ${className}`}>
         <div className="flex items-center gap-3 mb-6 border-b border-slate-100 pb-4">
@@ -373,9 +434,10 @@ export const DeepDiveView: React.FC<DeepDiveViewProps> = ({ initialContext }) =>
         check();
     }, [selectedCat, monthKey]);
 
-    const handleRun = async () => {
+    // Retrying after a failed run skips the LLM response cache so the model is asked again
+    const handleRun = async (bypassCache = false) => {
         try {
-            await DeepDiveRunner.runDeepDive(selectedCat, monthKey, (msg) => { });
+            await DeepDiveRunner.runDeepDive(selectedCat, monthKey, (msg) => { }, { runId: runKey, bypassCache });
         } catch (e: any) {
             // Error already emitted
         }
@@ -487,7 +549,7 @@ export const DeepDiveView: React.FC<DeepDiveViewProps> = ({ initialContext }) =>
                     />
                     <div className="flex flex-col items-center">
                         <button 
-                            onClick={handleRun}
+                            onClick={() => handleRun()}
                             disabled={!canRun}
                             className={`bg-indigo-600 text-white px-6 py-2 rounded-xl text-xs font-black uppercase tracking-widest hover:bg-indigo-700 transition-all flex items-center gap-2 shadow-lg disabled:opacity-50 disabled:cursor-not-allowed`}
                             title={!canRun ? `Blocked: Missing Inputs` : ""}
@@ -533,7 +595,7 @@ export const DeepDiveView: React.FC<DeepDiveViewProps> = ({ initialContext }) =>
                            </p>
                            <p className="text-slate-500 text-xs">The model rejected the inputs due to insufficient data quality or missing required signals.</p>
                        </div>
-                       <button onClick={handleRun} disabled={!canRun} className="px-6 py-3 bg-red-600 text-white rounded-xl font-bold text-sm shadow-lg flex items-center gap-2 mx-auto disabled:opacity-50">
+                       <button onClick={() => handleRun(true)} disabled={!canRun} className="px-6 py-3 bg-red-600 text-white rounded-xl font-bold text-sm shadow-lg flex items-center gap-2 mx-auto disabled:opacity-50">
                            <RotateCcw className="w-4 h-4"/> Retry Analysis
                        </button>
                    </div>
@@ -752,10 +814,12 @@ export const DeepDiveView: React.FC<DeepDiveViewProps> = ({ initialContext }) =>
                     </div>
                 </div>
             )) : (
-                !isRunning && (
+                isRunning ? (
+                    <StreamingPreview runKey={runKey} />
+                ) : (
                     <div className="py-24 text-center border-2 border-dashed border-slate-200 rounded-[2rem] bg-slate-50/50">
                         <p className="text-slate-400 font-bold text-sm">No analysis found for {selectedCat} / {monthKey}.</p>
-                        <button onClick={handleRun} disabled={!canRun} className="mt-4 px-6 py-2 bg-white border border-slate-200 rounded-lg text-indigo-600 font-bold text-xs hover:border-indigo-200 shadow-sm transition-all disabled:opacity-50">
+                        <button onClick={() => handleRun()} disabled={!canRun} className="mt-4 px-6 py-2 bg-white border border-slate-200 rounded-lg text-indigo-600 font-bold text-xs hover:border-indigo-200 shadow-sm transition-all disabled:opacity-50">
                             Start Analysis
                         </button>
                     </div>
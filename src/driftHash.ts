@@ -1,5 +1,6 @@
 import { CORE_CATEGORIES } from './constants';
 import { LockedKeyword } from './types';
+import { createStringMemo, isAscii } from './utils/stringIntern';
 
 // --- Shared Normalization Logic ---
 
@@ -12,17 +13,31 @@ import { LockedKeyword } from './types';
  * 4. Remove all non-alphanumeric chars (except space)
  * 5. Collapse multiple spaces to single space
  */
-export function normalizeKeywordString(raw: string): string {
-    if (!raw) return "";
-    return raw
-        .toLowerCase()
-        .trim()
-        .normalize("NFKD")
-        .replace(/[\u0300-\u036f]/g, "") // Remove diacritics
+function normalizeKeywordStringUncached(raw: string): string {
+    const lowered = raw.toLowerCase().trim();
+    // ASCII fast path: NFKD and diacritic stripping cannot change 7-bit input
+    const folded = isAscii(lowered)
+        ? lowered
+        : lowered
+            .normalize("NFKD")
+            .replace(/[\u0300-\u036f]/g, ""); // Remove diacritics
+    return folded
         .replace(/[^a-z0-9\s]/g, "") // Remove punctuation/symbols
         .replace(/\s+/g, " "); // Collapse spaces
 }
 
+// Shared process-wide intern table: each distinct keyword is normalized once.
+const normalizeMemo = createStringMemo(normalizeKeywordStringUncached, 200000);
+
+export function normalizeKeywordString(raw: string): string {
+    if (!raw) return "";
+    return normalizeMemo(raw);
+}
+
+export function getKeywordNormalizationStats() {
+    return normalizeMemo.stats();
+}
+
 // --- v1 Registry Hash (Simple) ---
 
 function simpleHashString(str: string): string {
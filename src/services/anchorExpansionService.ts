@@ -1,5 +1,4 @@
 
-import { GoogleGenAI } from "@google/genai";
 import { CategorySnapshotStore } from './categorySnapshotStore';
 import { BootstrapService } from './bootstrapService';
 import { DataForSeoClient } from './demand_vNext/dataforseoClient';
@@ -9,6 +8,8 @@ import { SnapshotKeywordRow } from '../types';
 import { normalizeKeywordString } from '../driftHash';
 import { CategoryKeywordGuard } from './categoryKeywordGuard';
 import { CORE_CATEGORIES } from '../constants';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler } from './llmScheduler';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -31,7 +32,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 // Deterministic Fallback for Rebuild Mode
@@ -131,11 +132,11 @@ You are running Anchor Expansion V2.1 for ${categoryName}.
 Output 12 high-density anchors that can support >30 keywords each.
 Output JSON: { "anchors": [{ "anchorName": "...", "intentType": "...", "seedKeywords": ["...min 15"] }] }`;
 
-                const resp = await ai.models.generateContent({
+                const resp = await LlmCallLayer.generate(ai, {
                     model: 'gemini-3-pro-preview',
                     contents: prompt,
                     config: { responseMimeType: 'application/json', thinkingConfig: { thinkingBudget: 1024 } }
-                });
+                }, { label: 'ANCHOR_EXPANSION' });
                 
                 const data = JSON.parse(resp.text || "{}");
                 if (data.anchors && Array.isArray(data.anchors)) {
@@ -0,0 +1,81 @@
+
+import assert from 'assert';
+import { AsyncPool, PoolTask } from './asyncPool';
+
+/**
+ * UNIT TEST: AsyncPool.stream
+ * Completion-order results with source indices, failure isolation, lazy
+ * pulling under backpressure, dynamic concurrency and abort.
+ */
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+export async function runAsyncPoolTests() {
+    console.group("Testing AsyncPool.stream");
+
+    // 1. Yields as tasks settle; a failing task is reported and the rest keep going
+    const delays = [30, 5, 15];
+    const tasks: PoolTask<number>[] = delays.map((ms, i) => async () => {
+        await sleep(ms);
+        if (i === 2) throw new Error('boom');
+        return ms;
+    });
+    const seen: Array<[number, boolean]> = [];
+    for await (const r of AsyncPool.stream(tasks, { concurrency: 3 })) seen.push([r.index, r.ok]);
+    assert.deepStrictEqual(seen, [[1, true], [2, false], [0, true]], "Results should arrive in completion order with source indices");
+
+    // 2. Backpressure: a generator is only pulled while slots and buffer space are free
+    let pulled = 0;
+    let consumed = 0;
+    let maxAhead = 0;
+    function* lazy(): Generator<PoolTask<number>> {
+        for (let i = 0; i < 20; i++) {
+            pulled++;
+            maxAhead = Math.max(maxAhead, pulled - consumed);
+            yield async () => i;
+        }
+    }
+    for await (const _ of AsyncPool.stream(lazy(), { concurrency: 2, maxBuffered: 2 })) {
+        consumed++;
+        await sleep(1);
+    }
+    assert.strictEqual(consumed, 20);
+    assert.ok(maxAhead <= 5, `Source should not run ahead of the consumer (ran ${maxAhead} ahead)`);
+
+    // 3. setConcurrency raises the number of tasks in flight
+    let peak = 0;
+    let running = 0;
+    const slow: PoolTask<void>[] = Array.from({ length: 8 }, () => async () => {
+        running++;
+        peak = Math.max(peak, running);
+        await sleep(10);
+        running--;
+    });
+    const widened = AsyncPool.stream(slow, { concurrency: 1, maxBuffered: 8 });
+    let first = true;
+    for await (const _ of widened) {
+        if (first) { widened.setConcurrency(4); first = false; }
+    }
+    assert.strictEqual(peak, 4, "Concurrency change should apply as slots free up");
+
+    // 4. Abort ends iteration with ABORTED and releases the source
+    const controller = new AbortController();
+    let released = false;
+    function* endless(): Generator<PoolTask<number>> {
+        try {
+            for (let i = 0; ; i++) yield async () => { await sleep(2); return i; };
+        } finally {
+            released = true;
+        }
+    }
+    let count = 0;
+    await assert.rejects(async () => {
+        for await (const _ of AsyncPool.stream(endless(), { concurrency: 2, signal: controller.signal })) {
+            if (++count === 3) controller.abort();
+        }
+    }, /ABORTED/);
+    assert.strictEqual(released, true, "Aborting should return the source iterator");
+
+    console.log("All AsyncPool Tests Passed.");
+    console.groupEnd();
+}
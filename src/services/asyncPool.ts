@@ -3,6 +3,138 @@
  * Lightweight Async Pool for managing concurrency.
  * strictly restricted to service layer usage.
  */
+
+/** A task may take the pool's abort signal to cancel its own work. */
+export type PoolTask<T> = (signal?: AbortSignal) => Promise<T>;
+
+/** One settled task from `AsyncPool.stream`; `index` is its position in the source. */
+export type PoolStreamResult<T> =
+    | { index: number; ok: true; result: T }
+    | { index: number; ok: false; error: any };
+
+export interface PoolStreamOptions {
+    concurrency?: number;
+    /** Settled results held for a slow consumer before pulling stops (default: concurrency). */
+    maxBuffered?: number;
+    signal?: AbortSignal;
+}
+
+export interface PoolStream<T> extends AsyncIterable<PoolStreamResult<T>> {
+    /** Takes effect as slots free up; in-flight tasks are never interrupted. */
+    setConcurrency(limit: number): void;
+    readonly active: number;
+}
+
+function createPoolStream<T>(
+    source: AsyncIterable<PoolTask<T>> | Iterable<PoolTask<T>>,
+    opts: PoolStreamOptions
+): PoolStream<T> {
+    let concurrency = Math.max(1, opts.concurrency ?? 3);
+    const fixedBuffer = opts.maxBuffered;
+    const signal = opts.signal;
+
+    const iterator: AsyncIterator<PoolTask<T>> | Iterator<PoolTask<T>> =
+        Symbol.asyncIterator in source
+            ? (source as AsyncIterable<PoolTask<T>>)[Symbol.asyncIterator]()
+            : (source as Iterable<PoolTask<T>>)[Symbol.iterator]();
+
+    const buffer: PoolStreamResult<T>[] = [];
+    let active = 0;
+    let nextIndex = 0;
+    let pulling = false;
+    let exhausted = false;
+    let closed = false;
+    let sourceError: any = null;
+    let wake: (() => void) | null = null;
+
+    const notify = () => {
+        const w = wake;
+        wake = null;
+        if (w) w();
+    };
+
+    const canPull = () =>
+        !exhausted && !closed && !signal?.aborted &&
+        active < concurrency &&
+        buffer.length < (fixedBuffer ?? concurrency);
+
+    const launch = (task: PoolTask<T>, index: number) => {
+        active++;
+        Promise.resolve()
+            .then(() => task(signal))
+            .then(
+                result => { buffer.push({ index, ok: true, result }); },
+                error => { buffer.push({ index, ok: false, error }); }
+            )
+            .finally(() => {
+                active--;
+                notify();
+                fill();
+            });
+    };
+
+    // Only one pull runs at a time, so indices follow source order
+    const fill = async () => {
+        if (pulling) return;
+        pulling = true;
+        try {
+            while (canPull()) {
+                const step = await iterator.next();
+                if (step.done) {
+                    exhausted = true;
+                    break;
+                }
+                if (closed || signal?.aborted) break;
+                launch(step.value, nextIndex++);
+            }
+        } catch (e) {
+            sourceError = e;
+            exhausted = true;
+        } finally {
+            pulling = false;
+            notify();
+        }
+    };
+
+    async function* results(): AsyncGenerator<PoolStreamResult<T>> {
+        const onAbort = () => notify();
+        signal?.addEventListener('abort', onAbort);
+        try {
+            fill();
+            while (true) {
+                if (signal?.aborted) throw new Error("ABORTED");
+                if (buffer.length > 0) {
+                    const item = buffer.shift()!;
+                    fill();
+                    yield item;
+                    continue;
+                }
+                if (exhausted && active === 0 && !pulling) {
+                    if (sourceError) throw sourceError;
+                    return;
+                }
+                await new Promise<void>(resolve => { wake = resolve; });
+            }
+        } finally {
+            // Consumer stopped early, aborted or drained: release the source
+            closed = true;
+            signal?.removeEventListener('abort', onAbort);
+            if (!exhausted) await iterator.return?.();
+        }
+    }
+
+    return {
+        [Symbol.asyncIterator]: results,
+        setConcurrency(limit: number) {
+            concurrency = Math.max(1, limit);
+            fill();
+        },
+        get active() {
+            return active;
+        }
+    };
+}
+
 export const AsyncPool = {
     async run<T>(
         tasks: (() => Promise<T>)[],
@@ -43,5 +175,19 @@ export const AsyncPool = {
         }
 
         return results;
+    },
+
+    /**
+     * Runs tasks pulled lazily from `source` and yields each one as it settles,
+     * in completion order. A failing task is reported, not thrown, so the rest
+     * keep going. Tasks are only pulled while a slot and buffer space are free,
+     * which lets a generator produce work as fast as it is consumed.
+     * Iterating throws "ABORTED" once `signal` fires.
+     */
+    stream<T>(
+        source: AsyncIterable<PoolTask<T>> | Iterable<PoolTask<T>>,
+        opts: PoolStreamOptions = {}
+    ): PoolStream<T> {
+        return createPoolStream(source, opts);
     }
 };
@@ -6,6 +6,7 @@ import { SnapshotResolver } from './snapshotResolver';
 import { CertificationReadinessService } from './certificationReadinessService';
 import { CategorySnapshotBuilder } from './categorySnapshotBuilder';
 import { CategoryKeywordGrowthService } from './categoryKeywordGrowthService';
+import { StageDagScheduler, StageDef } from './stageDagScheduler';
 
 export const BatchCertificationService = {
     
@@ -52,116 +53,143 @@ export const BatchCertificationService = {
         this.abortController = new AbortController();
         const signal = this.abortController.signal;
 
-        try {
-            for (let i = job.cursorIndex; i < CORE_CATEGORIES.length; i++) {
-                if (signal.aborted) {
-                    // Fixed: Using 'CANCELLED' as 'STOPPED' is not defined in the BatchCertificationJob status type.
-                    await BatchJobStore.updateJob(job.jobId, { status: 'CANCELLED' });
-                    return;
-                }
+        // Categories are pipelined: several resolve against Firestore while one
+        // certifies. Rows land in completion order, so resume skips by row
+        // rather than by cursor position.
+        const recorded = new Set(job.rows.map(r => r.categoryId));
+        const pending = CORE_CATEGORIES.filter(c => !recorded.has(c.id));
+        const names = new Map(CORE_CATEGORIES.map(c => [c.id, c.category]));
+
+        const newRow = (categoryId: string): BatchCertifyRow => ({
+            categoryId,
+            categoryName: names.get(categoryId) || categoryId,
+            tier: job.tier,
+            status: 'PENDING',
+            tookMs: 0,
+            timestamp: new Date().toISOString()
+        });
+
+        const stages: StageDef[] = [
+            {
+                name: 'resolve',
+                resource: 'firestore',
+                run: async ({ item, state }) => {
+                    const row: BatchCertifyRow = state.row = newRow(item);
+                    state.startedAt = Date.now();
 
-                const cat = CORE_CATEGORIES[i];
-                const startTime = Date.now();
-                
-                const row: BatchCertifyRow = {
-                    categoryId: cat.id,
-                    categoryName: cat.category,
-                    tier: job.tier,
-                    status: 'PENDING',
-                    tookMs: 0,
-                    timestamp: new Date().toISOString()
-                };
-
-                try {
                     // 1. Resolve Active Snapshot
-                    const resolution = await SnapshotResolver.resolveActiveSnapshot(cat.id, 'IN', 'en');
-                    
+                    const resolution = await SnapshotResolver.resolveActiveSnapshot(item, 'IN', 'en');
                     if (!resolution.ok || !resolution.snapshot) {
                         row.status = 'FAILED';
                         row.reasons = ["No active snapshot found (Run Hydrate/Validate)"];
-                        job.summary.failed++;
-                    } else {
-                        const snapshot = resolution.snapshot;
-                        row.snapshotId = snapshot.snapshot_id;
-                        row.lifecycle = snapshot.lifecycle;
-
-                        // 2a. Attempt Auto-Promotion to Lite
-                        // If HYDRATED and has enough data, this will bump it to VALIDATED_LITE
-                        if (snapshot.lifecycle === 'HYDRATED' && job.tier === 'LITE') {
-                            const promoted = await CategoryKeywordGrowthService.attemptLitePromotion(snapshot, cat.id, 'IN', 'en');
-                            if (promoted) {
-                                row.lifecycle = 'VALIDATED_LITE'; // Update local ref
-                                snapshot.lifecycle = 'VALIDATED_LITE';
-                            }
-                        }
+                        return 'halt';
+                    }
 
-                        // 2b. Lifecycle Check
-                        // Now VALIDATED_LITE is a valid starting point for Certification
-                        const validStates = ['VALIDATED', 'VALIDATED_LITE', 'CERTIFIED', 'CERTIFIED_LITE', 'CERTIFIED_FULL'];
-                        if (!validStates.includes(snapshot.lifecycle)) {
-                            row.status = 'SKIPPED';
-                            row.reasons = [`Lifecycle '${snapshot.lifecycle}' not ready for certification`];
-                            job.summary.skipped++;
-                        } 
-                        // Already Certified Check
-                        else if (job.tier === 'LITE' && (snapshot.lifecycle === 'CERTIFIED_LITE' || snapshot.lifecycle === 'CERTIFIED_FULL')) {
-                            row.status = 'SKIPPED';
-                            row.reasons = ["Already Certified (LITE or higher)"];
-                            job.summary.skipped++;
-                        }
-                        else if (job.tier === 'FULL' && snapshot.lifecycle === 'CERTIFIED_FULL') {
-                            row.status = 'SKIPPED';
-                            row.reasons = ["Already Certified FULL"];
-                            job.summary.skipped++;
-                        }
-                        else {
-                            // 3. Readiness Check
-                            const readiness = CertificationReadinessService.computeReadiness(snapshot);
-                            const tierResult = job.tier === 'LITE' ? readiness.lite : readiness.full;
-
-                            if (!tierResult.pass) {
-                                row.status = 'SKIPPED';
-                                row.reasons = tierResult.reasons;
-                                job.summary.skipped++;
-                            } else {
-                                // 4. Certify Execution
-                                const res = await CategorySnapshotBuilder.certify(snapshot.snapshot_id, cat.id, 'IN', 'en', job.tier);
-                                
-                                if (res.ok) {
-                                    row.status = 'CERTIFIED';
-                                    row.lifecycle = res.data.lifecycle; // Update to new status
-                                    job.summary.certified++;
-                                } else {
-                                    row.status = 'FAILED';
-                                    const err = (res as { ok: false; error: string }).error;
-                                    row.reasons = [err];
-                                    job.summary.failed++;
-                                }
-                            }
+                    const snapshot = resolution.snapshot;
+                    row.snapshotId = snapshot.snapshot_id;
+                    row.lifecycle = snapshot.lifecycle;
+
+                    // 2a. Attempt Auto-Promotion to Lite
+                    // If HYDRATED and has enough data, this will bump it to VALIDATED_LITE
+                    if (snapshot.lifecycle === 'HYDRATED' && job.tier === 'LITE') {
+                        const promoted = await CategoryKeywordGrowthService.attemptLitePromotion(snapshot, item, 'IN', 'en');
+                        if (promoted) {
+                            row.lifecycle = 'VALIDATED_LITE'; // Update local ref
+                            snapshot.lifecycle = 'VALIDATED_LITE';
                         }
                     }
 
-                } catch (e: any) {
-                    console.error(`Batch Cert Error on ${cat.id}`, e);
-                    row.status = 'FAILED';
-                    row.reasons = [e.message || "Unknown error"];
-                    job.summary.failed++;
+                    // 2b. Lifecycle Check
+                    // Now VALIDATED_LITE is a valid starting point for Certification
+                    const validStates = ['VALIDATED', 'VALIDATED_LITE', 'CERTIFIED', 'CERTIFIED_LITE', 'CERTIFIED_FULL'];
+                    if (!validStates.includes(snapshot.lifecycle)) {
+                        row.status = 'SKIPPED';
+                        row.reasons = [`Lifecycle '${snapshot.lifecycle}' not ready for certification`];
+                        return 'halt';
+                    }
+                    // Already Certified Check
+                    if (job.tier === 'LITE' && (snapshot.lifecycle === 'CERTIFIED_LITE' || snapshot.lifecycle === 'CERTIFIED_FULL')) {
+                        row.status = 'SKIPPED';
+                        row.reasons = ["Already Certified (LITE or higher)"];
+                        return 'halt';
+                    }
+                    if (job.tier === 'FULL' && snapshot.lifecycle === 'CERTIFIED_FULL') {
+                        row.status = 'SKIPPED';
+                        row.reasons = ["Already Certified FULL"];
+                        return 'halt';
+                    }
+
+                    // 3. Readiness Check
+                    const readiness = CertificationReadinessService.computeReadiness(snapshot);
+                    const tierResult = job.tier === 'LITE' ? readiness.lite : readiness.full;
+                    if (!tierResult.pass) {
+                        row.status = 'SKIPPED';
+                        row.reasons = tierResult.reasons;
+                        return 'halt';
+                    }
+                }
+            },
+            {
+                name: 'certify',
+                resource: 'cpu',
+                dependsOn: ['resolve'],
+                run: async ({ item, state }) => {
+                    // 4. Certify Execution
+                    const row: BatchCertifyRow = state.row;
+                    const res = await CategorySnapshotBuilder.certify(row.snapshotId!, item, 'IN', 'en', job.tier);
+
+                    if (res.ok) {
+                        row.status = 'CERTIFIED';
+                        row.lifecycle = res.data.lifecycle; // Update to new status
+                    } else {
+                        row.status = 'FAILED';
+                        const err = (res as { ok: false; error: string }).error;
+                        row.reasons = [err];
+                    }
                 }
+            }
+        ];
 
-                row.tookMs = Date.now() - startTime;
-                job.rows.push(row);
-                job.summary.attempted++;
-                job.cursorIndex = i + 1;
+        // Job writes are serialised so rows from parallel categories never race
+        let writeChain: Promise<void> = Promise.resolve();
 
-                // Persist every 1 items to keep UI snappy
-                await BatchJobStore.updateJob(job.jobId, {
-                    cursorIndex: job.cursorIndex,
-                    summary: job.summary,
-                    rows: job.rows
-                });
+        try {
+            await StageDagScheduler.run(pending.map(c => c.id), stages, {
+                jobId: job.jobId,
+                signal,
+                onItemDone: async (r) => {
+                    if (r.status === 'ABORTED') return;
+
+                    const row: BatchCertifyRow = r.state.row || newRow(r.item);
+                    if (r.status === 'FAILED') {
+                        console.error(`Batch Cert Error on ${r.item}`, r.failed?.reason);
+                        row.status = 'FAILED';
+                        row.reasons = [r.failed?.reason || "Unknown error"];
+                    }
+
+                    if (row.status === 'CERTIFIED') job.summary.certified++;
+                    else if (row.status === 'SKIPPED') job.summary.skipped++;
+                    else job.summary.failed++;
+
+                    row.tookMs = r.state.startedAt ? Date.now() - r.state.startedAt : 0;
+                    job.rows.push(row);
+                    job.summary.attempted++;
+                    job.cursorIndex = job.rows.length;
+
+                    // Persist every item to keep UI snappy
+                    writeChain = writeChain.then(() => BatchJobStore.updateJob(job.jobId, {
+                        cursorIndex: job.cursorIndex,
+                        summary: job.summary,
+                        rows: job.rows
+                    }));
+                    await writeChain;
+                }
+            });
 
-                // Throttle
-                await new Promise(r => setTimeout(r, 150));
+            if (signal.aborted) {
+                // Fixed: Using 'CANCELLED' as 'STOPPED' is not defined in the BatchCertificationJob status type.
+                await BatchJobStore.updateJob(job.jobId, { status: 'CANCELLED' });
+                return;
             }
 
             await BatchJobStore.updateJob(job.jobId, { status: 'COMPLETED' });
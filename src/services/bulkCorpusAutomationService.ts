@@ -4,7 +4,7 @@ import { CategorySnapshotStore } from './categorySnapshotStore';
 import { CategorySnapshotBuilder } from './categorySnapshotBuilder';
 import { CategoryKeywordGrowthService } from './categoryKeywordGrowthService';
 import { SnapshotResolver } from './snapshotResolver';
-import { AsyncPool } from './asyncPool';
+import { StageDagScheduler, StageDef } from './stageDagScheduler';
 import { JobControlService } from './jobControlService';
 import { SnapshotLifecycle } from '../types';
 import { WiringTrace } from './wiringTrace';
@@ -12,9 +12,29 @@ import { DataForSeoClient } from './demand_vNext/dataforseoClient';
 import { FORCE_CERTIFY_MODE, BUILD_STAMP } from '../constants/runtimeFlags';
 import { CorpusIndexStore } from './corpusIndexStore';
 import { CorpusHealthRunner } from './corpusHealthRunner';
+import { KeywordVolumePlanner } from './keywordVolumePlanner';
+import { CredsStore } from './demand_vNext/credsStore';
+import { JobCheckpointStore } from './jobCheckpointStore';
+import { DateUtils } from '../utils/dateUtils';
 
 const MIN_VALID_FOR_LITE = FORCE_CERTIFY_MODE ? 0 : 50;
-const CONCURRENCY = 2;
+
+/**
+ * Fetches the de-duplicated union of the categories' first growth-pass
+ * expansion batches once, so each category's first pass resolves shared
+ * brands/heads from memory.
+ * Best effort: growth falls back to per-category fetches on failure.
+ */
+async function prefetchSharedVolumes(categoryIds: string[], signal: AbortSignal) {
+    try {
+        const creds = await CredsStore.get();
+        if (!creds || !creds.login) return;
+        const plan = await KeywordVolumePlanner.planBulk(categoryIds, { creds, signal });
+        console.log(`[VOLUME_PLANNER][BULK] unique=${plan.unique} requested=${plan.requested} fetched=${plan.fetched}`);
+    } catch (e: any) {
+        console.warn(`[VOLUME_PLANNER][BULK] Prefetch skipped: ${e.message}`);
+    }
+}
 
 export interface BulkCertifySummary {
     startedAt: string;
@@ -32,6 +52,37 @@ export interface BulkCertifySummary {
     }>;
 }
 
+const BULK_LITE_JOB_PREFIX = 'BULK_LITE::';
+const BULK_CKPT_MAX_AGE_MS = 7 * 24 * 60 * 60 * 1000;
+
+/**
+ * Checkpoint id for a bulk certify run: the same category set in the same month
+ * maps to the same id, so a re-run after an interruption resumes where it stopped.
+ */
+function bulkLiteJobId(categoryIds: string[], month: string): string {
+    return `${BULK_LITE_JOB_PREFIX}${month}::${[...categoryIds].sort().join(',')}`;
+}
+
+/**
+ * Drops DAG checkpoints that can no longer be resumed: bulk runs from another
+ * month, bulk runs untouched for a week, and checkpoints keyed by the old
+ * per-run trace ids (AP-/HEADLESS-<timestamp>).
+ */
+async function clearStaleBulkCheckpoints(currentJobId: string, month: string) {
+    try {
+        const cleared = await JobCheckpointStore.clearStaleDagCheckpoints(ckpt => {
+            if (ckpt.jobId === currentJobId) return false;
+            if (/^(AP|HEADLESS)-\d+$/.test(ckpt.jobId)) return true;
+            if (!ckpt.jobId.startsWith(BULK_LITE_JOB_PREFIX)) return false;
+            const updated = new Date(ckpt.updatedAt || 0).getTime() || 0;
+            return !ckpt.jobId.startsWith(`${BULK_LITE_JOB_PREFIX}${month}::`) || Date.now() - updated > BULK_CKPT_MAX_AGE_MS;
+        });
+        if (cleared.length > 0) console.log(`[AUTOPILOT][CKPT_CLEANUP] cleared=${cleared.length}`);
+    } catch (e: any) {
+        console.warn(`[AUTOPILOT][CKPT_CLEANUP] skipped: ${e?.message || e}`);
+    }
+}
+
 export type BulkRunConfig = {
   onlyCategoryIds?: string[];
   chunkSize?: number;      // default 4
@@ -193,6 +244,10 @@ export const BulkCorpusAutomationService = {
         }
 
         console.log(`[AUTOPILOT][SCOPE] chunkSize=${chunkSize} chunkIndex=${chunkIndex} totalTarget=${targetCategories.length} ids=${targetCategories.map(c => c.id).join(',')}`);
+        // traceId is per invocation; checkpoints are keyed by what is being built
+        const month = DateUtils.getCurrentMonthKey();
+        const dagJobId = bulkLiteJobId(targetCategories.map(c => c.id), month);
+        await clearStaleBulkCheckpoints(dagJobId, month);
         WiringTrace.log(traceId, "ALL", "SERVICE_START", { totalCategories: targetCategories.length, config });
 
         const startedAt = new Date().toISOString();
@@ -208,58 +263,92 @@ export const BulkCorpusAutomationService = {
             metricsByCategory: {}
         };
 
-        const tasks = targetCategories.map(cat => async () => {
-            if (signal.aborted) return;
-            const catId = cat.id;
-            this.statusMessage = `Processing ${catId}...`;
-
-            let stopHeartbeat: (() => void) | null = null;
-
-            try {
-                // 1. Start Job & Heartbeat
-                const jobId = await JobControlService.startJob('BUILD_ALL', catId, {});
-                stopHeartbeat = JobControlService.startHeartbeat(jobId);
-
-                try {
-                    if (signal.aborted) throw new Error("ABORTED");
-
-                    // USE V3 PIPELINE
-                    await CategoryKeywordGrowthService.rebuildCategorySnapshotV3(
-                        catId,
-                        { targetValidPerAnchor: 40, tier: 'LITE' },
-                        jobId
-                    );
-
-                    summary.certifiedLite.push(catId);
-                    summary.metricsByCategory[catId] = {
+        await prefetchSharedVolumes(targetCategories.map(c => c.id), signal);
+
+        // Each stage runs in the pool of the resource it is bound by, so categories
+        // pipeline through draft -> hydrate -> grow -> certify instead of running
+        // whole rebuilds two at a time. Certify also upserts the corpus index.
+        const heartbeats = new Map<string, () => void>();
+        // A resumed item gets a fresh control job: the interrupted one may already be
+        // marked FAILED/STOPPED, which assertNotStopped would refuse to continue.
+        const ensureJob = async (catId: string, state: Record<string, any>): Promise<string> => {
+            if (!heartbeats.has(catId)) {
+                state.jobId = await JobControlService.startJob('BUILD_ALL', catId, {});
+                heartbeats.set(catId, JobControlService.startHeartbeat(state.jobId));
+            }
+            return state.jobId;
+        };
+        const stages: StageDef[] = [
+            {
+                name: 'draft',
+                resource: 'firestore',
+                run: async ({ item, state }) => {
+                    this.statusMessage = `Processing ${item}...`;
+                    await ensureJob(item, state);
+                    const draft = await CategorySnapshotBuilder.ensureDraft(item, 'IN', 'en');
+                    if (!draft.ok) throw new Error("Draft failed");
+                    state.snapshotId = draft.data.snapshot_id;
+                }
+            },
+            {
+                name: 'hydrate',
+                resource: 'firestore',
+                dependsOn: ['draft'],
+                run: async ({ item, state }) => {
+                    const jobId = await ensureJob(item, state);
+                    await CategorySnapshotBuilder.hydrate(state.snapshotId, item, 'IN', 'en', undefined, jobId);
+                }
+            },
+            {
+                name: 'grow',
+                resource: 'dfs',
+                dependsOn: ['hydrate'],
+                run: async ({ item, state }) => {
+                    const jobId = await ensureJob(item, state);
+                    const growRes = await CategoryKeywordGrowthService.ensureAnchorQuotaAndValidate(item, state.snapshotId, { tier: 'LITE' }, jobId);
+                    if (!growRes.ok) throw new Error(growRes.error);
+                }
+            },
+            {
+                name: 'certify',
+                resource: 'cpu',
+                dependsOn: ['grow'],
+                run: async ({ item, state }) => {
+                    const jobId = await ensureJob(item, state);
+                    const cert = await CategorySnapshotBuilder.certify(state.snapshotId, item, 'IN', 'en', 'LITE', jobId, { policy: 'CERT_V3_LEAN' });
+                    if (!cert.ok) throw new Error((cert as any).error || 'Certify failed');
+                }
+            }
+        ];
+
+        const results = await StageDagScheduler.run(targetCategories.map(c => c.id), stages, {
+            jobId: dagJobId,
+            signal,
+            onStage: (catId, stage, event, detail) => {
+                WiringTrace.log(traceId, catId, `STAGE_${stage.toUpperCase()}_${event}`, detail ? { reason: detail } : {});
+            },
+            onItemDone: async (r) => {
+                const stop = heartbeats.get(r.item);
+                if (stop) stop();
+                heartbeats.delete(r.item);
+
+                if (r.status === 'DONE') {
+                    summary.certifiedLite.push(r.item);
+                    summary.metricsByCategory[r.item] = {
                         total: 0, valid: 0, anchorsWithZero: 0, topAnchorByValid: 'N/A', status: 'CERTIFIED_LITE'
                     };
-
-                    // Fix: use 'COMPLETED'
-                    await JobControlService.finishJob(jobId, 'COMPLETED');
-
-                } catch (e: any) {
-                    const msg = e.message || 'Unknown Error';
-                    const status = msg === 'ABORTED' ? 'STOPPED' : 'FAILED';
-                    await JobControlService.finishJob(jobId, status, msg);
-                    throw e;
-                } finally {
-                    if (stopHeartbeat) stopHeartbeat();
+                } else if (r.status === 'FAILED') {
+                    summary.failed.push({ id: r.item, stage: r.failed?.stage.toUpperCase() || 'PIPELINE', reason: r.failed?.reason || 'Unknown Error' });
                 }
 
-            } catch (e: any) {
-                if (e.message !== 'ABORTED') {
-                    summary.failed.push({ id: catId, stage: 'PIPELINE', reason: e.message });
+                if (stop && r.state.jobId) {
+                    const jobStatus = r.status === 'DONE' ? 'COMPLETED' : r.status === 'ABORTED' ? 'STOPPED' : 'FAILED';
+                    await JobControlService.finishJob(r.state.jobId, jobStatus, r.failed?.reason).catch(() => {});
                 }
             }
         });
 
-        try {
-            await AsyncPool.run(tasks, CONCURRENCY, signal);
-        } catch (e: any) {
-            if (e.message === 'ABORTED') console.log("Bulk run aborted");
-            else throw e;
-        }
+        if (results.some(r => r.status === 'ABORTED')) console.log("Bulk run aborted");
 
         summary.finishedAt = new Date().toISOString();
         this.statusMessage = 'Batch Run Complete';
@@ -274,6 +363,8 @@ export const BulkCorpusAutomationService = {
         
         console.log(`[FLUSH_REBUILD_V3] Starting sequential rebuild for all categories...`);
         this.statusMessage = `Starting V3 Rebuild...`;
+
+        await prefetchSharedVolumes(CORE_CATEGORIES.map(c => c.id), signal);
         
         // Strict Sequential Execution (Concurrency 1) for stability
         for (const cat of CORE_CATEGORIES) {
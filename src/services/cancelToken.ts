@@ -1,11 +1,12 @@
-
 export class CancelToken {
     isCancelled = false;
     reason = '';
+    private controller: AbortController | null = null;
     
     cancel(reason: string = 'Cancelled') {
         this.isCancelled = true;
         this.reason = reason;
+        this.controller?.abort(new Error(`CANCELLED: ${reason}`));
     }
     
     throwIfCancelled() {
@@ -13,4 +14,13 @@ export class CancelToken {
             throw new Error(`CANCELLED: ${this.reason}`);
         }
     }
+
+    /** AbortSignal view of this token, for APIs that take a signal (fetch, LLM calls). */
+    get signal(): AbortSignal {
+        if (!this.controller) {
+            this.controller = new AbortController();
+            if (this.isCancelled) this.controller.abort(new Error(`CANCELLED: ${this.reason}`));
+        }
+        return this.controller.signal;
+    }
 }
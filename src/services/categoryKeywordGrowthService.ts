@@ -16,6 +16,8 @@ import { sleep } from '../utils/yield';
 import { CategoryKeywordGuard, HEAD_TERMS } from './categoryKeywordGuard';
 import { LiteVerificationRunner } from './liteVerificationRunner';
 import { BootstrapService } from './bootstrapService';
+import { MCI_ENABLE_DFS_BULK_TASKS, MCI_DFS_BULK_MIN_KEYWORDS } from '../config/featureFlags';
+import { KeywordVolumePlanner } from './keywordVolumePlanner';
 
 export const CategoryKeywordGrowthService = {
     
@@ -103,24 +105,25 @@ export const CategoryKeywordGrowthService = {
                 if (expansionBatch.length > 0) {
                     console.log(`[GROW_UNIVERSAL][EXPAND] Pass ${attempt}: batch ${batchIndex+1}/${totalBatches}, ${expansionBatch.length} keywords (${newExpanded.length} total new)`);
                     try {
-                        const volRes = await DataForSeoClient.fetchGoogleVolumes_DFS({
+                        // Planner dedupes across categories: keywords another category
+                        // already fetched this session are served without a DFS call
+                        const volRes = await KeywordVolumePlanner.resolve({
                             keywords: expansionBatch,
                             location: 2356,
                             language: 'en',
                             creds,
-                            useProxy: true,
                             jobId,
                             categoryId
                         });
                         
-                        if (volRes.ok && volRes.parsedRows) {
-                            for (const row of volRes.parsedRows) {
+                        if (volRes.ok) {
+                            for (const row of volRes.rows) {
                                 if ((row.search_volume || 0) > 0) {
                                     candidates.push(row.keyword);
                                     dfsDiscoveredRows.push(row);
                                 }
                             }
-                            console.log(`[GROW_UNIVERSAL][EXPAND] returned=${volRes.parsedRows.length} valid=${dfsDiscoveredRows.length}`);
+                            console.log(`[GROW_UNIVERSAL][EXPAND] returned=${volRes.rows.length} valid=${dfsDiscoveredRows.length} reused=${volRes.reused}`);
                         }
                     } catch (e: any) {
                         console.warn(`[GROW_UNIVERSAL][EXPAND] Volume check failed: ${e.message}`);
@@ -237,7 +240,30 @@ export const CategoryKeywordGrowthService = {
 
     // --- SUPPORT METHODS ---
 
+    applyVolumeRows(batch: SnapshotKeywordRow[], parsedRows: DataForSeoRow[]) {
+        const map = new Map(parsedRows.map((r: any) => [normalizeKeywordString(r.keyword), r]));
+
+        batch.forEach(r => {
+            const hit = map.get(normalizeKeywordString(r.keyword_text));
+            if (hit) {
+                r.volume = hit.search_volume || 0;
+                r.cpc = hit.cpc;
+                r.competition = hit.competition_index;
+                // Mark as VALID if volume > 0, ZERO otherwise
+                r.status = (r.volume && r.volume > 0) ? 'VALID' : 'ZERO';
+            } else {
+                // DFS returned no data for this keyword
+                r.status = 'ZERO';
+                r.volume = 0;
+            }
+        });
+    },
+
     async runValidationLoop(rows: SnapshotKeywordRow[], creds: any, jobId: string, categoryId: string) {
+        if (MCI_ENABLE_DFS_BULK_TASKS && rows.length >= MCI_DFS_BULK_MIN_KEYWORDS) {
+            return this.runBulkValidation(rows, creds, jobId, categoryId);
+        }
+
         const BATCH_SIZE = 500;
         let emptyBatchCount = 0;
 
@@ -260,22 +286,7 @@ export const CategoryKeywordGrowthService = {
 
                     if (emptyBatchCount >= 2) throw { code: "DFS_EMPTY_RESULT", message: "DFS returned empty results for 2 consecutive batches." };
 
-                    const map = new Map(res.parsedRows.map((r: any) => [normalizeKeywordString(r.keyword), r]));
-                    
-                    batch.forEach(r => {
-                        const hit = map.get(normalizeKeywordString(r.keyword_text));
-                        if (hit) {
-                            r.volume = hit.search_volume || 0;
-                            r.cpc = hit.cpc;
-                            r.competition = hit.competition_index;
-                            // Mark as VALID if volume > 0, ZERO otherwise
-                            r.status = (r.volume && r.volume > 0) ? 'VALID' : 'ZERO';
-                        } else {
-                            // DFS returned no data for this keyword
-                            r.status = 'ZERO';
-                            r.volume = 0;
-                        }
-                    });
+                    this.applyVolumeRows(batch, res.parsedRows);
                 }
             } catch (e) {
                 console.error("[GROW_UNIVERSAL] Validation batch failed", e);
@@ -287,6 +298,59 @@ export const CategoryKeywordGrowthService = {
         }
     },
 
+    /**
+     * Corpus-scale validation through the DFS task API. Rows are updated as each
+     * 700-keyword task completes; rows from failed/timed-out tasks stay UNVERIFIED
+     * and fall back to the live endpoint.
+     */
+    async runBulkValidation(rows: SnapshotKeywordRow[], creds: any, jobId: string, categoryId: string) {
+        const byKeyword = new Map<string, SnapshotKeywordRow[]>();
+        rows.forEach(r => {
+            const list = byKeyword.get(r.keyword_text);
+            if (list) list.push(r);
+            else byKeyword.set(r.keyword_text, [r]);
+        });
+
+        const fallback: SnapshotKeywordRow[] = [];
+        const stream = DataForSeoClient.fetchGoogleVolumesBulk_DFS({
+            keywords: Array.from(byKeyword.keys()),
+            location: 2356,
+            language: 'en',
+            creds, jobId, categoryId
+        });
+
+        for await (const task of stream) {
+            const batch = task.keywords.flatMap(k => byKeyword.get(k) || []);
+            if (task.ok) {
+                this.applyVolumeRows(batch, task.rows);
+            } else {
+                console.warn(`[GROW_UNIVERSAL][BULK] task chunk=${task.chunkIndex} failed: ${task.error}`);
+                fallback.push(...batch);
+            }
+        }
+
+        if (fallback.length > 0) {
+            // Live endpoint fallback for keywords the task API could not resolve
+            const BATCH_SIZE = 500;
+            for (let i = 0; i < fallback.length; i += BATCH_SIZE) {
+                const batch = fallback.slice(i, i + BATCH_SIZE);
+                try {
+                    const res = await DataForSeoClient.fetchGoogleVolumes_DFS({
+                        keywords: batch.map(r => r.keyword_text),
+                        location: 2356,
+                        language: 'en',
+                        creds,
+                        useProxy: true, jobId, categoryId
+                    });
+                    if (res.ok && res.parsedRows) this.applyVolumeRows(batch, res.parsedRows);
+                } catch (e: any) {
+                    // Rows stay UNVERIFIED; the rest of the fallback (and the grow) carries on
+                    console.warn(`[GROW_UNIVERSAL][BULK] fallback batch=${i / BATCH_SIZE} failed: ${e?.message || e}`);
+                }
+            }
+        }
+    },
+
     computeStats(rows: SnapshotKeywordRow[]) {
         let valid = 0, zero = 0, unverified = 0;
         rows.forEach(r => {
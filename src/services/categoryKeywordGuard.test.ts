@@ -0,0 +1,111 @@
+
+import assert from 'assert';
+import { CategoryKeywordGuard, HEAD_TERMS, BRAND_PACKS } from './categoryKeywordGuard';
+import { expandKeywords } from './keywordExpansionEngine';
+
+/**
+ * UNIT TEST: Category Keyword Guard
+ * Golden comparison of the precompiled matcher against the substring matcher
+ * it replaced, over every category's expansion corpus, plus the boundary,
+ * normalisation and inflection rules the trie relies on.
+ */
+
+// --- Legacy matcher (pre-trie isSpecific, verbatim apart from naming) ---
+
+const LEGACY_GENERIC = new Set([
+    "india", "online", "price", "review", "reviews", "offer", "offers", "benefit", "benefits",
+    "best", "top", "cheap", "buy", "sale", "near me", "shop", "store", "cost", "how to", "what is",
+    "2023", "2024", "2025", "2026", "2027", "vs", "compare", "list", "guide", "men", "for men", "shopping", "products"
+]);
+const LEGACY_FEMALE = new Set([
+    "women", "womens", "woman", "female", "ladies", "girl", "girls", "she", "her",
+    "bridal", "bride", "maternity", "pregnancy", "mom", "mother", "sister", "wife",
+    "saree", "kurta", "lehenga", "makeup", "lipstick", "mascara", "foundation", "eyeliner", "blush",
+    "bra", "panty", "lingerie", "sanitary", "period", "menstrual", "vagina", "vaginal"
+]);
+const LEGACY_COMMERCE = new Set(['price','cost','buy','online','review','reviews','offer','offers','sale','shop','store','best','top','products','range','combo','kit','new','latest','compare','vs','alternative', 'near me']);
+
+function legacyIsSpecific(keyword: string, categoryId: string): boolean {
+    if (!keyword) return false;
+    const norm = keyword.toLowerCase().trim();
+    const tokens = norm.split(/\s+/);
+    if (norm.length < 3) return false;
+    if (/\b(2023|2024|2025|2026|2027)\b/.test(norm)) return false;
+    if (tokens.some(t => LEGACY_FEMALE.has(t))) return false;
+
+    const heads = HEAD_TERMS[categoryId] || [];
+    const brands = BRAND_PACKS[categoryId] || [];
+    if (tokens.length === 1) return heads.some(h => norm === h) || brands.some(b => norm === b);
+    if (tokens.every(t => LEGACY_GENERIC.has(t) || ['in', 'for', 'the', 'and', 'to', 'with', 'of', 'on', 'at', 'by'].includes(t))) return false;
+    if (heads.some(h => norm.includes(h))) return true;
+    if (brands.some(b => norm.includes(b))) {
+        let remainder = norm;
+        brands.forEach(b => { if (remainder.includes(b)) remainder = remainder.replace(b, '').trim(); });
+        const remainderTokens = remainder.split(/\s+/).filter(t => t.length > 0);
+        if (remainderTokens.length === 0) return true;
+        if (remainderTokens.some(t => LEGACY_COMMERCE.has(t))) return true;
+        return !remainderTokens.every(t => LEGACY_GENERIC.has(t) || ['in', 'for', 'the', 'and', 'to', 'with', 'of', 'on'].includes(t));
+    }
+    return false;
+}
+
+// Deliberate differences: the legacy matcher hit these only through a
+// substring inside another word ("beard" in "beardo"), or let an apostrophe
+// hide a female token.
+const INTENDED_DIFFERENCES: Record<string, boolean> = {
+    'beard|beardo for men': false,     // Brand + generic; "beard" only matched inside "beardo"
+    'shaving|angel face': false,       // "gel" inside "angel"
+    "shaving|women's razor": false,    // "women's" -> "womens" is a female token
+    'hair-oil|hair-fall control oil': true  // Hyphen split: "hair fall" is a head
+};
+
+// Real keywords the trie missed before normalisation and verb forms
+const REAL_KEYWORDS: Array<[string, string]> = [
+    ['shaving', 'shaved head look'],
+    ['shaving', "men's shaving cream"],
+    ['shaving', 'shaver for men'],
+    ['shaving', 'razors for sensitive skin'],
+    ['shampoo', 'anti-dandruff shampoo men'],
+    ['hair-colour', "l'oreal men hair colour"],
+    ['face-care', 'men’s face wash'],
+    ['beard', 'beard trimming tips'],
+    ['oral-care', 'whitening toothpastes'],
+    ['deodorants', 'the best scent'],
+    ...Object.keys(INTENDED_DIFFERENCES).map(k => k.split('|') as [string, string])
+];
+
+export function runCategoryKeywordGuardTests() {
+    console.group("Testing CategoryKeywordGuard");
+
+    // 1. Golden: new matcher agrees with the legacy one on every expansion keyword
+    const mismatches: string[] = [];
+    let compared = 0;
+    const corpus: Array<[string, string]> = [...REAL_KEYWORDS];
+    Object.keys(HEAD_TERMS).forEach(categoryId => expandKeywords(categoryId).forEach(kw => corpus.push([categoryId, kw])));
+    for (const [categoryId, kw] of corpus) {
+        compared++;
+        const key = `${categoryId}|${kw}`;
+        const expected = key in INTENDED_DIFFERENCES ? INTENDED_DIFFERENCES[key] : legacyIsSpecific(kw, categoryId);
+        if (CategoryKeywordGuard.isSpecific(kw, categoryId).ok !== expected) mismatches.push(`${key} expected=${expected}`);
+    }
+    assert.deepStrictEqual(mismatches, [], `Guard diverges from legacy matcher on ${mismatches.length}/${compared} keywords`);
+
+    // 2. Token boundaries
+    assert.strictEqual(CategoryKeywordGuard.match('the best deo', 'deodorants').brands.includes('he'), false, "Brand 'he' must not match inside 'the'");
+    assert.deepStrictEqual(CategoryKeywordGuard.match('axe deo price', 'deodorants').brands, ['axe']);
+
+    // 3. Normalisation: apostrophes dropped, hyphens split
+    assert.strictEqual(CategoryKeywordGuard.match('anti-dandruff shampoo', 'shampoo').head, 'anti dandruff');
+    assert.deepStrictEqual(CategoryKeywordGuard.match("l'oreal men", 'hair-colour').brands, ['loreal']);
+
+    // 4. Inflections resolve to the head term
+    assert.strictEqual(CategoryKeywordGuard.isSpecific('shaved head', 'shaving').matchedTerm, 'shave');
+    assert.strictEqual(CategoryKeywordGuard.isSpecific('trimmers online', 'beard').matchedTerm, 'trimmer');
+    assert.strictEqual(CategoryKeywordGuard.isSpecific('best shaving foams', 'shaving').matchedTerm, 'shaving');
+
+    // 5. Longest head wins
+    assert.strictEqual(CategoryKeywordGuard.match('safety razor blades', 'shaving').head, 'safety razor');
+
+    console.log(`All CategoryKeywordGuard Tests Passed (${compared} keywords compared).`);
+    console.groupEnd();
+}
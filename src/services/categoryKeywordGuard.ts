@@ -55,6 +55,122 @@ const FEMALE_EXCLUSIONS = new Set([
     "bra", "panty", "lingerie", "sanitary", "period", "menstrual", "vagina", "vaginal"
 ]);
 
+const CONNECTORS = new Set(['in', 'for', 'the', 'and', 'to', 'with', 'of', 'on', 'at', 'by']);
+const REMAINDER_CONNECTORS = new Set(['in', 'for', 'the', 'and', 'to', 'with', 'of', 'on']);
+const COMMERCE = new Set(['price','cost','buy','online','review','reviews','offer','offers','sale','shop','store','best','top','products','range','combo','kit','new','latest','compare','vs','alternative', 'near me']);
+const YEAR_TOKEN = /\b(2023|2024|2025|2026|2027)\b/;
+
+// --- PRECOMPILED MATCHER ---
+// Token-level trie over each category's head terms and brands, built once at
+// module load. Matches start and end on token boundaries, so "he" no longer
+// hits "the" and "gel" no longer hits "angel". Keywords are normalised first
+// ("men's" -> "mens", "anti-dandruff" -> "anti dandruff"), and heads also
+// accept inflected tokens ("razors", "shaved", "trimming").
+
+interface MatchNode {
+    next: Map<string, MatchNode>;
+    head?: string;
+    brand?: string;
+}
+
+interface CategoryMatcher {
+    root: MatchNode;
+    heads: Set<string>;
+    brands: Set<string>;
+}
+
+export interface GuardMatch {
+    head?: string;
+    brands: string[];
+    brandTokenMask: boolean[];
+}
+
+function buildMatcher(heads: string[], brands: string[]): CategoryMatcher {
+    const root: MatchNode = { next: new Map() };
+    const insert = (phrase: string, kind: 'head' | 'brand') => {
+        let node = root;
+        for (const tok of phrase.split(/\s+/)) {
+            let child = node.next.get(tok);
+            if (!child) node.next.set(tok, child = { next: new Map() });
+            node = child;
+        }
+        node[kind] = phrase;
+    };
+    heads.forEach(h => insert(h, 'head'));
+    brands.forEach(b => insert(b, 'brand'));
+    return { root, heads: new Set(heads), brands: new Set(brands) };
+}
+
+/** Lowercase; apostrophes dropped, other punctuation (hyphens, commas, ...) split tokens. */
+function normalizeKeyword(keyword: string): string {
+    return keyword.toLowerCase()
+        .replace(/['\u2019`]/g, '')
+        .replace(/[^a-z0-9&\s]+/g, ' ')
+        .replace(/\s+/g, ' ')
+        .trim();
+}
+
+/**
+ * Candidate base forms of an inflected token: plurals ("razors", "brushes"),
+ * past/participle and agent forms ("shaved", "shaving", "trimmed", "shaver").
+ */
+function inflectionBases(tok: string): string[] {
+    if (tok.length < 4) return [];
+    const out: string[] = [];
+    const stem = (base: string) => {
+        if (base.length < 2) return;
+        out.push(base, base + 'e');
+        // Doubled final consonant: trimm(ed) -> trim
+        const n = base.length;
+        if (n >= 3 && base[n - 1] === base[n - 2] && !'aeiou'.includes(base[n - 1])) out.push(base.slice(0, -1));
+    };
+    if (tok.endsWith('ies')) out.push(tok.slice(0, -3) + 'y');
+    if (tok.endsWith('es')) out.push(tok.slice(0, -2));
+    if (tok.endsWith('s') && !tok.endsWith('ss')) out.push(tok.slice(0, -1));
+    if (tok.endsWith('ing')) stem(tok.slice(0, -3));
+    if (tok.endsWith('ed')) stem(tok.slice(0, -2));
+    if (tok.endsWith('ers')) stem(tok.slice(0, -3));
+    else if (tok.endsWith('er')) stem(tok.slice(0, -2));
+    return out;
+}
+
+const MATCHERS = new Map<string, CategoryMatcher>();
+Object.keys({ ...HEAD_TERMS, ...BRAND_PACKS }).forEach(categoryId => {
+    MATCHERS.set(categoryId, buildMatcher(HEAD_TERMS[categoryId] || [], BRAND_PACKS[categoryId] || []));
+});
+const EMPTY_MATCHER = buildMatcher([], []);
+
+/**
+ * Single pass over the tokens: returns the longest head term and every brand
+ * occurrence, with a mask of tokens covered by brands.
+ */
+function matchTokens(tokens: string[], matcher: CategoryMatcher): GuardMatch {
+    let head: string | undefined;
+    const brands: string[] = [];
+    const brandTokenMask = new Array<boolean>(tokens.length).fill(false);
+
+    for (let i = 0; i < tokens.length; i++) {
+        let node: MatchNode | undefined = matcher.root;
+        for (let j = i; j < tokens.length && node; j++) {
+            if (!head) {
+                for (const base of inflectionBases(tokens[j])) {
+                    const h = node.next.get(base)?.head;
+                    if (h) { head = h; break; }
+                }
+            }
+            node = node.next.get(tokens[j]);
+            if (!node) break;
+            if (node.head && (!head || head.length < node.head.length)) head = node.head;
+            if (node.brand) {
+                brands.push(node.brand);
+                for (let k = i; k <= j; k++) brandTokenMask[k] = true;
+            }
+        }
+    }
+
+    return { head, brands, brandTokenMask };
+}
+
 export const CategoryKeywordGuard = {
     /**
      * isSpecific (v3 Strict + Female Guard)
@@ -65,51 +181,53 @@ export const CategoryKeywordGuard = {
      * 4. No female-specific terms
      * 5. MUST contain a category HEAD_TERM or (BRAND + NON-GENERIC)
      */
-    isSpecific(keyword: string, categoryId: string): { ok: boolean; reason: string; matchedToken?: string } {
+    isSpecific(keyword: string, categoryId: string): { ok: boolean; reason: string; matchedToken?: string; matchedTerm?: string } {
         if (!keyword) return { ok: false, reason: "Empty" };
-        const norm = keyword.toLowerCase().trim();
-        const tokens = norm.split(/\s+/);
+        const norm = normalizeKeyword(keyword);
+        const tokens = norm.split(' ');
         
         if (norm.length < 3) return { ok: false, reason: "Too Short (Min 3 chars)" };
-        if (/\b(2023|2024|2025|2026|2027)\b/.test(norm)) return { ok: false, reason: "Contains Year Token" };
+        if (YEAR_TOKEN.test(norm)) return { ok: false, reason: "Contains Year Token" };
 
         const hasFemale = tokens.some(t => FEMALE_EXCLUSIONS.has(t));
         if (hasFemale) return { ok: false, reason: "Female-Specific Intent" };
 
-        const heads = HEAD_TERMS[categoryId] || [];
-        const brands = BRAND_PACKS[categoryId] || [];
+        const matcher = MATCHERS.get(categoryId) || EMPTY_MATCHER;
 
         // SINGLE-TOKEN: allow known head terms and brands
         if (tokens.length === 1) {
-            if (heads.some(h => norm === h)) return { ok: true, reason: "OK", matchedToken: "HEAD_SINGLE" };
-            if (brands.some(b => norm === b)) return { ok: true, reason: "OK", matchedToken: "BRAND_SINGLE" };
+            if (matcher.heads.has(norm)) return { ok: true, reason: "OK", matchedToken: "HEAD_SINGLE", matchedTerm: norm };
+            if (matcher.brands.has(norm)) return { ok: true, reason: "OK", matchedToken: "BRAND_SINGLE", matchedTerm: norm };
             return { ok: false, reason: "Single token, not a known head term or brand" };
         }
 
         // MULTI-TOKEN
-        const isAllGeneric = tokens.every(t => GENERIC_BLACKLIST.has(t) || ['in', 'for', 'the', 'and', 'to', 'with', 'of', 'on', 'at', 'by'].includes(t));
+        const isAllGeneric = tokens.every(t => GENERIC_BLACKLIST.has(t) || CONNECTORS.has(t));
         if (isAllGeneric) return { ok: false, reason: "Generic Composition" };
-        
-        const hasHead = heads.some(h => norm.includes(h));
-        if (hasHead) return { ok: true, reason: "OK", matchedToken: "HEAD" };
-
-        const hasBrand = brands.some(b => norm.includes(b));
-        if (hasBrand) {
-            let remainder = norm;
-            brands.forEach(b => { if (remainder.includes(b)) remainder = remainder.replace(b, '').trim(); });
-            const remainderTokens = remainder.split(/\s+/).filter(t => t.length > 0);
+
+        const match = matchTokens(tokens, matcher);
+        if (match.head) return { ok: true, reason: "OK", matchedToken: "HEAD", matchedTerm: match.head };
+
+        if (match.brands.length > 0) {
+            const brand = match.brands[0];
+            const remainderTokens = tokens.filter((_, i) => !match.brandTokenMask[i]);
             
-            if (remainderTokens.length === 0) return { ok: true, reason: "OK", matchedToken: "BRAND" };
+            if (remainderTokens.length === 0) return { ok: true, reason: "OK", matchedToken: "BRAND", matchedTerm: brand };
 
-            const COMMERCE = new Set(['price','cost','buy','online','review','reviews','offer','offers','sale','shop','store','best','top','products','range','combo','kit','new','latest','compare','vs','alternative', 'near me']);
-            if (remainderTokens.some(t => COMMERCE.has(t))) return { ok: true, reason: "OK", matchedToken: "BRAND_COMMERCE" };
+            if (remainderTokens.some(t => COMMERCE.has(t))) return { ok: true, reason: "OK", matchedToken: "BRAND_COMMERCE", matchedTerm: brand };
 
-            const isRemainderGeneric = remainderTokens.every(t => GENERIC_BLACKLIST.has(t) || ['in','for','the','and','to','with','of','on'].includes(t));
-            if (isRemainderGeneric) return { ok: false, reason: "Brand + Generic (Low Value)" };
+            const isRemainderGeneric = remainderTokens.every(t => GENERIC_BLACKLIST.has(t) || REMAINDER_CONNECTORS.has(t));
+            if (isRemainderGeneric) return { ok: false, reason: "Brand + Generic (Low Value)", matchedTerm: brand };
 
-            return { ok: true, reason: "OK", matchedToken: "BRAND" };
+            return { ok: true, reason: "OK", matchedToken: "BRAND", matchedTerm: brand };
         }
 
         return { ok: false, reason: "Not Category-Specific (Missing Head Term or Qualified Brand)" };
+    },
+
+    /** Exposes the precompiled matcher's raw result for diagnostics. */
+    match(keyword: string, categoryId: string): GuardMatch {
+        const tokens = normalizeKeyword(keyword).split(' ');
+        return matchTokens(tokens, MATCHERS.get(categoryId) || EMPTY_MATCHER);
     }
 };
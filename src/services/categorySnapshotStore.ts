@@ -4,8 +4,12 @@ import { FirestoreClient } from './firestoreClient';
 import { FirestoreChunkStore } from './firestoreChunkStore';
 import { CategorySnapshotDoc, SnapshotLifecycle, SnapshotKeywordRow, SnapshotAnchor } from '../types';
 import { sanitizeForFirestore } from '../utils/firestoreSanitize';
+import { ColumnarSnapshot } from './columnarSnapshot';
+import { MCI_ENABLE_COMPACT_CHUNKS, MCI_COMPACT_CHUNK_SIZE } from '../config/featureFlags';
 
 const ROOT_COL = 'mci_category_snapshots';
+// Compact chunks are ~20x smaller, so each document can hold more rows
+const DEFAULT_CHUNK_SIZE = MCI_ENABLE_COMPACT_CHUNKS ? MCI_COMPACT_CHUNK_SIZE : 400;
 
 export const CategorySnapshotStore = {
     
@@ -47,7 +51,7 @@ export const CategorySnapshotStore = {
                 integrity: {
                     sha256: '',
                     chunk_count: 0,
-                    chunk_size: 400
+                    chunk_size: DEFAULT_CHUNK_SIZE
                 }
             };
 
@@ -123,7 +127,7 @@ export const CategorySnapshotStore = {
         params: { categoryId: string, countryCode: string, languageCode: string },
         snapshotId: string,
         rows: SnapshotKeywordRow[],
-        chunkSize: number = 400
+        chunkSize: number = DEFAULT_CHUNK_SIZE
     ): Promise<{ ok: true; data: { chunkCount: number; chunkHashes: string[] } } | { ok: false; error: string }> {
         const db = FirestoreClient.getDbSafe();
         if (!db) return { ok: false, error: "FIREBASE_DB_UNAVAILABLE" };
@@ -156,6 +160,28 @@ export const CategorySnapshotStore = {
         });
     },
 
+    /**
+     * Same rows as readAllKeywordRows, held as typed-array columns and built
+     * from the chunks directly. Use `.rows()` for the zero-copy
+     * SnapshotKeywordRow[] adapter.
+     */
+    async readColumnarSnapshot(
+        params: { categoryId: string, countryCode: string, languageCode: string },
+        snapshotId: string
+    ): Promise<{ ok: true; data: ColumnarSnapshot } | { ok: false; error: string }> {
+        const db = FirestoreClient.getDbSafe();
+        if (!db) return { ok: false, error: "FIREBASE_DB_UNAVAILABLE" };
+
+        return FirestoreClient.safe(async () => {
+            const path = this.getDocPath(params.countryCode, params.languageCode, params.categoryId);
+            const snapRef = doc(db, path, snapshotId);
+
+            const res = await FirestoreChunkStore.readChunksColumnar(snapRef, params);
+            if (!res.ok) throw new Error("CHUNK_READ_FAILED");
+            return res.snapshot;
+        });
+    },
+
     // --- GRANULAR CHUNK API ---
 
     async getSnapshotChunkIds(
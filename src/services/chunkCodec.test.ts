@@ -0,0 +1,60 @@
+
+import assert from 'assert';
+import { ChunkCodec } from './chunkCodec';
+import { SnapshotKeywordRow } from '../types';
+
+/**
+ * UNIT TEST: Snapshot Chunk Codec
+ * Rows survive an encode/decode round trip unchanged: optional fields stay
+ * absent, nulls stay null, dictionary-coded and plain columns both restore.
+ */
+
+function makeRows(n: number): SnapshotKeywordRow[] {
+    return Array.from({ length: n }, (_, i) => {
+        const row: SnapshotKeywordRow = {
+            keyword_id: `kw_${i}`,
+            keyword_text: `razor keyword ${i}`,
+            volume: i % 5 === 0 ? null : i * 10,
+            anchor_id: `anchor_${i % 3}`,
+            intent_bucket: i % 2 ? 'Discovery' : 'Brand',
+            status: i % 5 === 0 ? 'UNVERIFIED' : 'VALID',
+            active: i % 7 !== 0,
+            language_code: 'en',
+            country_code: 'IN',
+            category_id: 'shaving',
+            created_at_iso: '2026-01-01T00:00:00.000Z'
+        };
+        if (i % 4 === 0) row.cpc = i / 10;
+        if (i % 6 === 0) row.pruned_reason = 'LOW_VOLUME';
+        return row;
+    });
+}
+
+export async function runChunkCodecTests() {
+    console.group("Testing ChunkCodec");
+
+    // 1. Round trip restores every row exactly, including absent optional fields
+    const rows = makeRows(400);
+    const payload = await ChunkCodec.encodeRows(rows);
+    const decoded = await ChunkCodec.decodeRows(payload);
+    assert.deepStrictEqual(decoded, rows);
+    assert.strictEqual('cpc' in decoded[1], false, "Absent fields should not come back as undefined/null keys");
+    assert.strictEqual(decoded[0].volume, null, "Null values should stay null");
+
+    // 2. Compact: well under the row-object JSON it replaces
+    const jsonBytes = new TextEncoder().encode(JSON.stringify(rows)).length;
+    assert.ok(payload.length * 4 < jsonBytes, `Payload ${payload.length}B should be far below ${jsonBytes}B of row JSON`);
+
+    // 3. Edge cases: empty chunk and a single row (no dictionary)
+    assert.deepStrictEqual(await ChunkCodec.decodeRows(await ChunkCodec.encodeRows([])), []);
+    const single = makeRows(1);
+    assert.deepStrictEqual(await ChunkCodec.decodeRows(await ChunkCodec.encodeRows(single)), single);
+
+    // 4. Unknown format versions are rejected, not misread
+    const foreign = new Blob([JSON.stringify({ f: 99, n: 0, c: [] })]).stream().pipeThrough(new CompressionStream('deflate'));
+    const foreignBytes = new Uint8Array(await new Response(foreign).arrayBuffer());
+    await assert.rejects(ChunkCodec.decodeRows(foreignBytes), /CHUNK_FORMAT_UNSUPPORTED:99/);
+
+    console.log("All ChunkCodec Tests Passed.");
+    console.groupEnd();
+}
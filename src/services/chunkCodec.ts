@@ -0,0 +1,123 @@
+import { SnapshotKeywordRow } from '../types';
+
+/**
+ * SNAPSHOT CHUNK CODEC (format 2)
+ * Rows are stored column by column instead of as 400 objects repeating the
+ * same field names. String columns with few distinct values (anchor, intent,
+ * status, locale, ...) are dictionary coded. The JSON is then deflated and
+ * kept in a single Bytes field.
+ *
+ * Format 1 is the legacy `rows: SnapshotKeywordRow[]` document field.
+ */
+
+export const CHUNK_FORMAT_COLUMNAR = 2;
+export const CHUNK_ENCODING_COLUMNAR = 'columnar-json+deflate';
+
+// Firestore rejects documents over 1 MiB; leave room for the other fields
+export const MAX_CHUNK_PAYLOAD_BYTES = 900 * 1024;
+
+interface EncodedColumn {
+    k: string;      // Field name
+    v: any[];       // Values, or dictionary codes when `d` is set
+    d?: any[];      // Dictionary
+    m?: number[];   // Row indices where the field is absent
+}
+
+interface EncodedChunk {
+    f: number;
+    n: number;
+    c: EncodedColumn[];
+}
+
+async function pipeBytes(bytes: Uint8Array, transform: CompressionStream | DecompressionStream): Promise<Uint8Array> {
+    const stream = new Blob([bytes as BlobPart]).stream().pipeThrough(transform);
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+function encodeColumn(rows: any[], key: string): EncodedColumn {
+    const values: any[] = new Array(rows.length);
+    const missing: number[] = [];
+    const isMissing = new Uint8Array(rows.length);
+    let allStrings = true;
+
+    for (let i = 0; i < rows.length; i++) {
+        const row = rows[i];
+        if (!(key in row) || row[key] === undefined) {
+            missing.push(i);
+            isMissing[i] = 1;
+            values[i] = null;
+            continue;
+        }
+        values[i] = row[key];
+        if (typeof values[i] !== 'string') allStrings = false;
+    }
+
+    const col: EncodedColumn = { k: key, v: values };
+    if (missing.length > 0) col.m = missing;
+
+    const present = rows.length - missing.length;
+    if (allStrings && present > 1) {
+        const codes = new Map<string, number>();
+        const dict: string[] = [];
+        const coded = values.map((v, i) => {
+            if (isMissing[i]) return 0;
+            let code = codes.get(v);
+            if (code === undefined) {
+                code = dict.length;
+                codes.set(v, code);
+                dict.push(v);
+            }
+            return code;
+        });
+        // Only worth it when values repeat
+        if (dict.length * 2 <= present) {
+            col.v = coded;
+            col.d = dict;
+        }
+    }
+
+    return col;
+}
+
+export const ChunkCodec = {
+
+    async encodeRows(rows: SnapshotKeywordRow[]): Promise<Uint8Array> {
+        const keySet = new Set<string>();
+        for (const row of rows) {
+            for (const key in row) {
+                if ((row as any)[key] !== undefined) keySet.add(key);
+            }
+        }
+
+        const encoded: EncodedChunk = {
+            f: CHUNK_FORMAT_COLUMNAR,
+            n: rows.length,
+            c: Array.from(keySet).sort().map(key => encodeColumn(rows, key))
+        };
+
+        const json = new TextEncoder().encode(JSON.stringify(encoded));
+        return pipeBytes(json, new CompressionStream('deflate'));
+    },
+
+    async decodeRows(payload: Uint8Array): Promise<SnapshotKeywordRow[]> {
+        const json = await pipeBytes(payload, new DecompressionStream('deflate'));
+        const encoded = JSON.parse(new TextDecoder().decode(json)) as EncodedChunk;
+        if (encoded.f !== CHUNK_FORMAT_COLUMNAR) {
+            throw new Error(`CHUNK_FORMAT_UNSUPPORTED:${encoded.f}`);
+        }
+
+        const rows: any[] = new Array(encoded.n);
+        for (let i = 0; i < encoded.n; i++) rows[i] = {};
+
+        for (const col of encoded.c) {
+            const missing = col.m ? new Set(col.m) : null;
+            const dict = col.d;
+            for (let i = 0; i < encoded.n; i++) {
+                if (missing?.has(i)) continue;
+                rows[i][col.k] = dict ? dict[col.v[i]] : col.v[i];
+            }
+        }
+
+        return rows as SnapshotKeywordRow[];
+    }
+};
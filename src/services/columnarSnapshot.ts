@@ -0,0 +1,301 @@
+import { SnapshotKeywordRow } from '../types';
+
+/**
+ * COLUMNAR SNAPSHOT VIEW
+ * Holds a snapshot corpus as typed-array columns instead of one object per
+ * keyword. Anchor, intent and status are dictionary coded; active/valid live in
+ * a flags byte. `rows()` exposes a zero-copy adapter (flyweight row views over
+ * the shared columns) so existing consumers that take SnapshotKeywordRow[] —
+ * metrics calculators, health service, chunk planner — work unchanged.
+ */
+
+export const ROW_FLAG_ACTIVE = 1;
+export const ROW_FLAG_GOOGLE_VALID = 2;
+export const ROW_FLAG_HAS_VOLUME = 4;
+export const ROW_FLAG_AMAZON_BOOSTED = 8;
+
+// Fields stored per row only when present (rare or free-form).
+type SparseFields = Pick<SnapshotKeywordRow, 'validated_at_iso' | 'pruned_reason' | 'demandScore' | 'validation_tier'>;
+
+class Dictionary {
+    readonly values: string[] = [];
+    private index = new Map<string, number>();
+
+    encode(value: string): number {
+        let code = this.index.get(value);
+        if (code === undefined) {
+            code = this.values.length;
+            if (code > 0xffff) throw new Error("COLUMNAR_DICT_OVERFLOW");
+            this.values.push(value);
+            this.index.set(value, code);
+        }
+        return code;
+    }
+}
+
+export class ColumnarSnapshot {
+    readonly length: number;
+    readonly categoryId: string;
+    readonly countryCode: string;
+    readonly languageCode: string;
+
+    readonly keywordIds: string[];
+    readonly keywords: string[];
+    readonly createdAt: string[];
+    // NaN encodes null/undefined
+    readonly volume: Float64Array;
+    readonly amazonVolume: Float64Array;
+    readonly cpc: Float64Array;
+    readonly competition: Float64Array;
+    readonly anchorCodes: Uint16Array;
+    readonly intentCodes: Uint16Array;
+    readonly statusCodes: Uint16Array;
+    readonly flags: Uint8Array;
+    readonly sparse: Map<number, SparseFields>;
+
+    readonly anchorDict: string[];
+    readonly intentDict: string[];
+    readonly statusDict: string[];
+
+    private anchorEncoder: Dictionary;
+    private intentEncoder: Dictionary;
+    private statusEncoder: Dictionary;
+    private views: SnapshotKeywordRow[] | null = null;
+
+    private constructor(n: number, meta: { categoryId: string; countryCode: string; languageCode: string }) {
+        this.length = n;
+        this.categoryId = meta.categoryId;
+        this.countryCode = meta.countryCode;
+        this.languageCode = meta.languageCode;
+        this.keywordIds = new Array(n);
+        this.keywords = new Array(n);
+        this.createdAt = new Array(n);
+        this.volume = new Float64Array(n);
+        this.amazonVolume = new Float64Array(n);
+        this.cpc = new Float64Array(n);
+        this.competition = new Float64Array(n);
+        this.anchorCodes = new Uint16Array(n);
+        this.intentCodes = new Uint16Array(n);
+        this.statusCodes = new Uint16Array(n);
+        this.flags = new Uint8Array(n);
+        this.sparse = new Map();
+        this.anchorEncoder = new Dictionary();
+        this.intentEncoder = new Dictionary();
+        this.statusEncoder = new Dictionary();
+        this.anchorDict = this.anchorEncoder.values;
+        this.intentDict = this.intentEncoder.values;
+        this.statusDict = this.statusEncoder.values;
+    }
+
+    static fromRows(rows: SnapshotKeywordRow[]): ColumnarSnapshot {
+        const first = rows[0];
+        const cs = new ColumnarSnapshot(rows.length, {
+            categoryId: first?.category_id || '',
+            countryCode: first?.country_code || 'IN',
+            languageCode: first?.language_code || 'en'
+        });
+        cs.writeRows(0, rows);
+        return cs;
+    }
+
+    /**
+     * Empty columns for `n` rows, filled chunk by chunk with writeRows() so a
+     * reader never has to hold the whole corpus as row objects.
+     */
+    static allocate(n: number, meta: { categoryId: string; countryCode: string; languageCode: string }): ColumnarSnapshot {
+        return new ColumnarSnapshot(n, meta);
+    }
+
+    /** Copies `rows` into slots [offset, offset + rows.length). */
+    writeRows(offset: number, rows: SnapshotKeywordRow[]) {
+        if (offset < 0 || offset + rows.length > this.length) throw new Error("COLUMNAR_ROW_OVERFLOW");
+        for (let i = 0; i < rows.length; i++) this.writeRow(offset + i, rows[i]);
+    }
+
+    private writeRow(i: number, r: SnapshotKeywordRow) {
+        this.keywordIds[i] = r.keyword_id;
+        this.keywords[i] = r.keyword_text;
+        this.createdAt[i] = r.created_at_iso;
+        this.volume[i] = r.volume ?? NaN;
+        this.amazonVolume[i] = r.amazonVolume ?? NaN;
+        this.cpc[i] = r.cpc ?? NaN;
+        this.competition[i] = r.competition ?? NaN;
+        this.anchorCodes[i] = this.anchorEncoder.encode(r.anchor_id);
+        this.intentCodes[i] = this.intentEncoder.encode(r.intent_bucket);
+        this.statusCodes[i] = this.statusEncoder.encode(r.status);
+        this.refreshFlags(i, r.active, !!r.amazonBoosted);
+
+        if (r.validated_at_iso !== undefined || r.pruned_reason !== undefined || r.demandScore !== undefined || r.validation_tier !== undefined) {
+            this.sparse.set(i, {
+                validated_at_iso: r.validated_at_iso,
+                pruned_reason: r.pruned_reason,
+                demandScore: r.demandScore,
+                validation_tier: r.validation_tier
+            });
+        }
+    }
+
+    refreshFlags(i: number, active: boolean, amazonBoosted: boolean) {
+        const vol = this.volume[i];
+        let f = 0;
+        if (active) f |= ROW_FLAG_ACTIVE;
+        if (!Number.isNaN(vol)) f |= ROW_FLAG_HAS_VOLUME;
+        if (amazonBoosted) f |= ROW_FLAG_AMAZON_BOOSTED;
+        // Mirrors CorpusValidity.isGoogleValidRow
+        if (active && vol > 0) f |= ROW_FLAG_GOOGLE_VALID;
+        this.flags[i] = f;
+    }
+
+    encodeAnchor(value: string) { return this.anchorEncoder.encode(value); }
+    encodeIntent(value: string) { return this.intentEncoder.encode(value); }
+    encodeStatus(value: string) { return this.statusEncoder.encode(value); }
+
+    /** Zero-copy row adapter; views are created once and reused. */
+    rows(): SnapshotKeywordRow[] {
+        if (!this.views) {
+            const views = new Array<SnapshotKeywordRow>(this.length);
+            for (let i = 0; i < this.length; i++) views[i] = new ColumnarRowView(this, i);
+            this.views = views;
+        }
+        return this.views;
+    }
+
+    /** Materializes plain objects (for persistence or code that spreads rows). */
+    toRows(): SnapshotKeywordRow[] {
+        const out = new Array<SnapshotKeywordRow>(this.length);
+        for (let i = 0; i < this.length; i++) out[i] = materialize(this, i);
+        return out;
+    }
+
+    /** Sum of Google volume over rows whose flags contain every bit in `mask`. */
+    sumVolume(mask: number = 0): number {
+        let sum = 0;
+        for (let i = 0; i < this.length; i++) {
+            if ((this.flags[i] & mask) !== mask) continue;
+            const v = this.volume[i];
+            if (v > 0) sum += v;
+        }
+        return sum;
+    }
+
+    /** Google volume per anchor over rows matching `mask`, keyed by anchor id. */
+    anchorVolumes(mask: number = 0): Record<string, number> {
+        const byCode = new Float64Array(this.anchorDict.length);
+        for (let i = 0; i < this.length; i++) {
+            if ((this.flags[i] & mask) !== mask) continue;
+            const v = this.volume[i];
+            if (v > 0) byCode[this.anchorCodes[i]] += v;
+        }
+        const out: Record<string, number> = {};
+        this.anchorDict.forEach((anchor, code) => { out[anchor] = byCode[code]; });
+        return out;
+    }
+
+    /** Approximate retained bytes of the numeric/code columns (excludes strings). */
+    columnBytes(): number {
+        return this.volume.byteLength + this.amazonVolume.byteLength + this.cpc.byteLength + this.competition.byteLength
+            + this.anchorCodes.byteLength + this.intentCodes.byteLength + this.statusCodes.byteLength + this.flags.byteLength;
+    }
+}
+
+const nanToNull = (v: number): number | null => (Number.isNaN(v) ? null : v);
+const nanToUndef = (v: number): number | undefined => (Number.isNaN(v) ? undefined : v);
+
+function materialize(cs: ColumnarSnapshot, i: number): SnapshotKeywordRow {
+    const row: SnapshotKeywordRow = {
+        keyword_id: cs.keywordIds[i],
+        keyword_text: cs.keywords[i],
+        volume: nanToNull(cs.volume[i]),
+        anchor_id: cs.anchorDict[cs.anchorCodes[i]],
+        intent_bucket: cs.intentDict[cs.intentCodes[i]],
+        status: cs.statusDict[cs.statusCodes[i]],
+        active: (cs.flags[i] & ROW_FLAG_ACTIVE) !== 0,
+        language_code: cs.languageCode,
+        country_code: cs.countryCode,
+        category_id: cs.categoryId,
+        created_at_iso: cs.createdAt[i]
+    };
+    const amz = nanToUndef(cs.amazonVolume[i]);
+    if (amz !== undefined) row.amazonVolume = amz;
+    if (cs.flags[i] & ROW_FLAG_AMAZON_BOOSTED) row.amazonBoosted = true;
+    const cpc = nanToUndef(cs.cpc[i]);
+    if (cpc !== undefined) row.cpc = cpc;
+    const comp = nanToUndef(cs.competition[i]);
+    if (comp !== undefined) row.competition = comp;
+    const extra = cs.sparse.get(i);
+    if (extra) {
+        (Object.keys(extra) as (keyof SparseFields)[]).forEach(k => {
+            if (extra[k] !== undefined) (row as any)[k] = extra[k];
+        });
+    }
+    return row;
+}
+
+/**
+ * Flyweight SnapshotKeywordRow backed by column slot `i`. Writes go straight to
+ * the columns. Note: object spread (`{ ...row }`) only copies own properties,
+ * so code that needs a detached copy should use ColumnarSnapshot.toRows().
+ */
+class ColumnarRowView implements SnapshotKeywordRow {
+    constructor(private cs: ColumnarSnapshot, private i: number) {}
+
+    get keyword_id() { return this.cs.keywordIds[this.i]; }
+    set keyword_id(v: string) { this.cs.keywordIds[this.i] = v; }
+    get keyword_text() { return this.cs.keywords[this.i]; }
+    set keyword_text(v: string) { this.cs.keywords[this.i] = v; }
+    get created_at_iso() { return this.cs.createdAt[this.i]; }
+    set created_at_iso(v: string) { this.cs.createdAt[this.i] = v; }
+
+    get volume() { return nanToNull(this.cs.volume[this.i]); }
+    set volume(v: number | null) {
+        this.cs.volume[this.i] = v ?? NaN;
+        this.cs.refreshFlags(this.i, this.active, !!this.amazonBoosted);
+    }
+    get amazonVolume() { return nanToUndef(this.cs.amazonVolume[this.i]); }
+    set amazonVolume(v: number | undefined) { this.cs.amazonVolume[this.i] = v ?? NaN; }
+    get cpc() { return nanToUndef(this.cs.cpc[this.i]); }
+    set cpc(v: number | undefined) { this.cs.cpc[this.i] = v ?? NaN; }
+    get competition() { return nanToUndef(this.cs.competition[this.i]); }
+    set competition(v: number | undefined) { this.cs.competition[this.i] = v ?? NaN; }
+
+    get anchor_id() { return this.cs.anchorDict[this.cs.anchorCodes[this.i]]; }
+    set anchor_id(v: string) { this.cs.anchorCodes[this.i] = this.cs.encodeAnchor(v); }
+    get intent_bucket() { return this.cs.intentDict[this.cs.intentCodes[this.i]]; }
+    set intent_bucket(v: string) { this.cs.intentCodes[this.i] = this.cs.encodeIntent(v); }
+    get status() { return this.cs.statusDict[this.cs.statusCodes[this.i]]; }
+    set status(v: string) { this.cs.statusCodes[this.i] = this.cs.encodeStatus(v); }
+
+    get active() { return (this.cs.flags[this.i] & ROW_FLAG_ACTIVE) !== 0; }
+    set active(v: boolean) { this.cs.refreshFlags(this.i, v, !!this.amazonBoosted); }
+    get amazonBoosted() { return (this.cs.flags[this.i] & ROW_FLAG_AMAZON_BOOSTED) !== 0 || undefined; }
+    set amazonBoosted(v: boolean | undefined) { this.cs.refreshFlags(this.i, this.active, !!v); }
+
+    get language_code() { return this.cs.languageCode; }
+    get country_code() { return this.cs.countryCode; }
+    get category_id() { return this.cs.categoryId; }
+
+    get validated_at_iso() { return this.cs.sparse.get(this.i)?.validated_at_iso; }
+    set validated_at_iso(v: string | undefined) { this.setSparse('validated_at_iso', v); }
+    get pruned_reason() { return this.cs.sparse.get(this.i)?.pruned_reason; }
+    set pruned_reason(v: string | undefined) { this.setSparse('pruned_reason', v); }
+    get demandScore() { return this.cs.sparse.get(this.i)?.demandScore; }
+    set demandScore(v: number | undefined) { this.setSparse('demandScore', v); }
+    get validation_tier() { return this.cs.sparse.get(this.i)?.validation_tier; }
+    set validation_tier(v: string | undefined) { this.setSparse('validation_tier', v); }
+
+    private setSparse<K extends keyof SparseFields>(key: K, value: SparseFields[K]) {
+        let extra = this.cs.sparse.get(this.i);
+        if (!extra) this.cs.sparse.set(this.i, extra = {});
+        extra[key] = value;
+    }
+
+    // Serialize as a plain row, not as the backing columns
+    toJSON(): SnapshotKeywordRow {
+        return materialize(this.cs, this.i);
+    }
+}
+
+/** Flag-based equivalent of CorpusValidity.isGoogleValidRow for slot `i`. */
+export function isGoogleValidAt(cs: ColumnarSnapshot, i: number): boolean {
+    return (cs.flags[i] & ROW_FLAG_GOOGLE_VALID) !== 0;
+}
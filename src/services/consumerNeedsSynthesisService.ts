@@ -1,7 +1,8 @@
-import { GoogleGenAI } from "@google/genai";
 import { SnapshotRowLite } from './snapshotChunkReader';
 import { safeText } from '../utils/safety';
 import { ConsumerStatement, AnalystPoint } from '../types';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler, LlmRunContext } from './llmScheduler';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -28,7 +29,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY in Vercel env vars.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 export type ConsumerNeedsInsight = {
@@ -66,7 +67,8 @@ export const ConsumerNeedsSynthesisService = {
   async synthesizeChunk(
     chunk: SnapshotRowLite[], 
     categoryId: string,
-    existing: ConsumerNeedsResult['sections']
+    existing: ConsumerNeedsResult['sections'],
+    llm?: LlmRunContext
   ): Promise<ConsumerNeedsResult['sections']> {
     const ai = getAI();
     
@@ -121,11 +123,11 @@ export const ConsumerNeedsSynthesisService = {
     `;
 
     try {
-      const resp = await ai.models.generateContent({
+      const resp = await LlmCallLayer.generate(ai, {
         model: 'gemini-3-flash-preview',
         contents: prompt,
         config: { responseMimeType: 'application/json' }
-      });
+      }, { label: 'CONSUMER_NEEDS', ...llm });
 
       const raw = JSON.parse(cleanJson(resp.text || "{}"));
       
@@ -191,7 +193,7 @@ export const ConsumerNeedsSynthesisService = {
     }
   },
 
-  async enrichAnchorIntelligence(anchors: any[], categoryName: string): Promise<any[]> {
+  async enrichAnchorIntelligence(anchors: any[], categoryName: string, llm?: LlmRunContext): Promise<any[]> {
     const ai = getAI();
     // Fallback for huge lists
     const processingAnchors = anchors.slice(0, 15);
@@ -227,11 +229,11 @@ export const ConsumerNeedsSynthesisService = {
     `;
     
     try {
-         const resp = await ai.models.generateContent({
+         const resp = await LlmCallLayer.generate(ai, {
             model: 'gemini-3-flash-preview',
             contents: prompt,
             config: { responseMimeType: 'application/json' }
-         });
+         }, { label: 'CONSUMER_NEEDS', ...llm });
          const raw = JSON.parse(cleanJson(resp.text || "{}"));
          const profiles = raw.profiles || [];
          const profileMap = new Map(profiles.map((p: any) => [p.id, p]));
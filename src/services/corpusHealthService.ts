@@ -152,9 +152,9 @@ export const CorpusHealthService = {
             return this.createEmptyReport(categoryId, "NO_SNAPSHOT");
         }
 
-        // 2. Load Rows
-        const rowsRes = await CategorySnapshotStore.readAllKeywordRows({ categoryId, countryCode: 'IN', languageCode: 'en' }, snap.snapshot_id);
-        const rows = rowsRes.ok ? rowsRes.data : [];
+        // 2. Load Rows (read-only, so flyweight views over the columns will do)
+        const colRes = await CategorySnapshotStore.readColumnarSnapshot({ categoryId, countryCode: 'IN', languageCode: 'en' }, snap.snapshot_id);
+        const rows = colRes.ok ? colRes.data.rows() : [];
 
         // 3. Compute (Reusable)
         const report = this.computeSnapshotHealth(snap, rows);
@@ -69,38 +69,34 @@ export const CorpusRebuildService = {
 
         log(`Starting Full Rebuild for ${CORE_CATEGORIES.length} categories...`);
 
+        // Results are consumed as each category settles, so progress and
+        // failures show up while the slower categories are still rebuilding
         const tasks = CORE_CATEGORIES.map(cat => async () => {
-            if (signal.aborted) return;
-            
             status.currentCategory = cat.category;
             status.stage = 'PROCESSING';
             log(`>>> Processing ${cat.category} (${cat.id})`);
 
-            try {
-                // 1. Start Job Tracking
-                const jobId = await JobControlService.startJob('BUILD_ALL', cat.id, { message: 'Rebuild: Fresh Start' });
-                
-                // 2. Execute V3 Pipeline
-                // Use the updated rebuildSingleCategoryV3 logic here if calling directly or reuse service logic
-                // Calling service method directly to ensure updated logic
-                const res = await this.rebuildSingleCategoryV3(cat.id, jobId);
+            // 1. Start Job Tracking
+            const jobId = await JobControlService.startJob('BUILD_ALL', cat.id, { message: 'Rebuild: Fresh Start' });
 
-                if ((res as any).ok) {
-                    log(`${cat.category}: SUCCESS - V3 Pipeline Complete.`);
-                } else {
-                    log(`${cat.category}: FAILED - ${(res as any).error}`);
-                    await JobControlService.finishJob(jobId, 'FAILED', (res as any).error);
-                }
-
-            } catch (e: any) {
-                log(`${cat.category}: FAILED - ${e.message}`);
-            } finally {
-                status.processed++;
-                onProgress({ ...status });
-            }
+            // 2. Execute V3 Pipeline
+            const res = await this.rebuildSingleCategoryV3(cat.id, jobId);
+            if (!(res as any).ok) await JobControlService.finishJob(jobId, 'FAILED', (res as any).error);
+            return res;
         });
 
-        await AsyncPool.run(tasks, concurrency, signal);
+        for await (const settled of AsyncPool.stream(tasks, { concurrency, signal })) {
+            const cat = CORE_CATEGORIES[settled.index];
+            if (!settled.ok) {
+                log(`${cat.category}: FAILED - ${settled.error?.message || settled.error}`);
+            } else if ((settled.result as any).ok) {
+                log(`${cat.category}: SUCCESS - V3 Pipeline Complete.`);
+            } else {
+                log(`${cat.category}: FAILED - ${(settled.result as any).error}`);
+            }
+            status.processed++;
+            onProgress({ ...status });
+        }
 
         status.stage = 'COMPLETE';
         status.currentCategory = 'ALL DONE';
@@ -0,0 +1,35 @@
+
+import type { SchemaPlan } from '../csvAiMapping';
+import { createCsvRowProcessor, streamCsvBlob } from './rowProcessor';
+
+/**
+ * Off-main-thread CSV parse + dedupe. Receives the File itself (structured
+ * clone shares the underlying blob), posts progress per byte chunk and the
+ * de-duplicated records once at the end.
+ */
+
+export interface CsvIngestWorkerRequest {
+    file: Blob;
+    schema: SchemaPlan;
+    categoryId: string;
+    targetMonthWindowId: string;
+}
+
+// DOM lib types `self` as Window; only postMessage/onmessage are used here
+const ctx = self as unknown as {
+    postMessage(message: any): void;
+    onmessage: ((e: MessageEvent<CsvIngestWorkerRequest>) => void) | null;
+};
+
+ctx.onmessage = async (e) => {
+    const { file, schema, categoryId, targetMonthWindowId } = e.data;
+    try {
+        const processor = createCsvRowProcessor({ schema, categoryId, targetMonthWindowId });
+        const result = await streamCsvBlob(file, processor, (bytesRead) => {
+            ctx.postMessage({ type: 'progress', bytesRead, linesRead: processor.linesRead });
+        });
+        ctx.postMessage({ type: 'done', result });
+    } catch (err: any) {
+        ctx.postMessage({ type: 'error', message: String(err?.message || err) });
+    }
+};
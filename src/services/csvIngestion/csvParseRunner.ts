@@ -0,0 +1,62 @@
+
+import type { SchemaPlan } from '../csvAiMapping';
+import { createCsvRowProcessor, streamCsvBlob, RowProcessorResult } from './rowProcessor';
+import { yieldToUI } from '../../utils/yield';
+
+export interface CsvParseProgress {
+    bytesRead: number;
+    totalBytes: number;
+    linesRead: number;
+}
+
+async function parseOnMainThread(
+    file: Blob,
+    params: { schema: SchemaPlan; categoryId: string; targetMonthWindowId: string },
+    onProgress?: (p: CsvParseProgress) => void
+): Promise<RowProcessorResult> {
+    const processor = createCsvRowProcessor(params);
+    return streamCsvBlob(file, processor, async (bytesRead) => {
+        onProgress?.({ bytesRead, totalBytes: file.size, linesRead: processor.linesRead });
+        // Yield control to UI thread after each chunk
+        await yieldToUI();
+    });
+}
+
+/**
+ * Streams `file` through the row processor in a Web Worker. Falls back to
+ * chunked processing on the main thread where workers are unavailable.
+ */
+export async function parseCsvFile(
+    file: Blob,
+    params: { schema: SchemaPlan; categoryId: string; targetMonthWindowId: string },
+    onProgress?: (p: CsvParseProgress) => void
+): Promise<RowProcessorResult> {
+    let worker: Worker;
+    try {
+        if (typeof Worker === 'undefined') throw new Error('WORKER_UNAVAILABLE');
+        worker = new Worker(new URL('./csvIngest.worker.ts', import.meta.url), { type: 'module' });
+    } catch (e: any) {
+        console.warn(`[Ingestion] Worker unavailable (${e?.message || e}); parsing on main thread`);
+        return parseOnMainThread(file, params, onProgress);
+    }
+
+    return new Promise<RowProcessorResult>((resolve, reject) => {
+        worker.onmessage = (e: MessageEvent) => {
+            const msg = e.data;
+            if (msg.type === 'progress') {
+                onProgress?.({ bytesRead: msg.bytesRead, totalBytes: file.size, linesRead: msg.linesRead });
+            } else if (msg.type === 'done') {
+                worker.terminate();
+                resolve(msg.result);
+            } else if (msg.type === 'error') {
+                worker.terminate();
+                reject(new Error(msg.message));
+            }
+        };
+        worker.onerror = (e: ErrorEvent) => {
+            worker.terminate();
+            reject(new Error(e.message || 'CSV_WORKER_FAILED'));
+        };
+        worker.postMessage({ file, ...params });
+    });
+}
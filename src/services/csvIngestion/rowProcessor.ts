@@ -0,0 +1,207 @@
+
+import type { SchemaPlan } from '../csvAiMapping';
+import type { MasterCsvRecord } from '../masterCsvStore';
+import { Derivations } from './derivations';
+import { KeywordValidator } from './keywordValidator';
+import { Normalization } from '../normalization';
+import { IngestionDiagnostics } from './types';
+
+/**
+ * Incremental CSV row processing for Master CSV ingestion.
+ * Bytes go in as text chunks; only the de-duplicated records (one per
+ * normalized keyword) are retained, so memory tracks unique keywords rather
+ * than file size. Pure: runs the same on the main thread or in a worker.
+ */
+
+export interface RowProcessorResult {
+    records: MasterCsvRecord[];
+    totalRowsRead: number;
+    duplicatesRemoved: number;
+    diagnostics: IngestionDiagnostics;
+}
+
+// Helper to parse CSV row
+export const parseCsvRow = (rowStr: string, delimiter: string): string[] => {
+    const result: string[] = [];
+    let current = '';
+    let inQuotes = false;
+    for (let i = 0; i < rowStr.length; i++) {
+        const char = rowStr[i];
+        if (char === '"') { inQuotes = !inQuotes; }
+        else if (char === delimiter && !inQuotes) { result.push(current.trim().replace(/^"|"$/g, '')); current = ''; }
+        else { current += char; }
+    }
+    result.push(current.trim().replace(/^"|"$/g, ''));
+    return result;
+};
+
+export function createEmptyDiagnostics(): IngestionDiagnostics {
+    return {
+        volumeParseSuccessCount: 0,
+        volumeParseFailCount: 0,
+        volumeRawSample: [],
+        volumeParsedSample: [],
+        keywordBlankRejectedCount: 0,
+        volumeBlankRejectedCount: 0,
+        volumeNullRejectedCount: 0,
+        volumeZeroRejectedCount: 0,
+        volumeNaNRejectedCount: 0,
+        acceptedCount: 0,
+        acceptedSamples: [],
+        rejectedSamples: []
+    };
+}
+
+export function createCsvRowProcessor(params: {
+    schema: SchemaPlan;
+    categoryId: string;
+    targetMonthWindowId: string;
+}) {
+    const { schema, categoryId, targetMonthWindowId } = params;
+    const validator = KeywordValidator.createValidator(categoryId);
+    const diagnostics = createEmptyDiagnostics();
+
+    // Dedup Map to handle raw-file duplicates immediately
+    const dedupMap = new Map<string, MasterCsvRecord>();
+    let duplicatesRemoved = 0;
+
+    // Non-blank line counter; line 0 is the header
+    let lineIndex = 0;
+    // Partial line carried between chunks
+    let carry = '';
+
+    const processLine = (line: string) => {
+        if (line.trim().length === 0) return;
+        const i = lineIndex++;
+        if (i === 0) return;
+
+        const cols = parseCsvRow(line, schema.delimiter);
+        if (cols.length < 2) return;
+
+        // 1. Keyword Check
+        const rawKw = cols[schema.keyword.index] || '';
+        const validation = validator(rawKw);
+
+        if (!validation.isValid) {
+            diagnostics.keywordBlankRejectedCount++;
+            if (diagnostics.rejectedSamples.length < 5) diagnostics.rejectedSamples.push({ k: rawKw, v: 'N/A', reason: `Invalid Keyword: ${validation.rejectionReason}` });
+            return;
+        }
+
+        // 2. Volume Parse (STRICT)
+        const rawVolStr = cols[schema.volume.index];
+        const vol = Derivations.parseVolume(rawVolStr);
+
+        if (i <= 11) {
+            diagnostics.volumeRawSample.push(rawVolStr || '(empty)');
+            diagnostics.volumeParsedSample.push(vol);
+        }
+
+        // 3. STRICT Rejection Rules (Must match Definition of Done: "Reject 0/null/blank/NaN")
+        if (rawVolStr === undefined || rawVolStr === null || String(rawVolStr).trim() === '') {
+            diagnostics.volumeBlankRejectedCount++;
+            return;
+        }
+
+        if (vol === null) {
+            // Derivations.parseVolume returns null for NaN or <= 0
+            // Check raw to distinguish NaN from 0 for cleaner reporting
+            const numVal = Number(String(rawVolStr).replace(/[^0-9.]/g,''));
+            if (Number.isFinite(numVal) && numVal <= 0) {
+                 diagnostics.volumeZeroRejectedCount++;
+                 if (diagnostics.rejectedSamples.length < 5) diagnostics.rejectedSamples.push({ k: rawKw, v: rawVolStr, reason: 'Volume Zero' });
+            } else {
+                 diagnostics.volumeNaNRejectedCount++;
+                 if (diagnostics.rejectedSamples.length < 5) diagnostics.rejectedSamples.push({ k: rawKw, v: rawVolStr, reason: 'Volume Invalid (NaN)' });
+            }
+            return;
+        }
+
+        // Vol is guaranteed > 0 by Derivations.parseVolume logic
+        diagnostics.acceptedCount++;
+        if (diagnostics.acceptedSamples.length < 5) {
+            diagnostics.acceptedSamples.push({ k: validation.normalizedText, v: vol });
+        }
+
+        const normKey = Normalization.normalize(validation.normalizedText);
+
+        // Dedupe Logic: Keep Highest Volume. Losing rows never build a record.
+        const existing = dedupMap.get(normKey);
+        if (existing) {
+            duplicatesRemoved++;
+            if (vol <= existing.volume) return;
+        }
+
+        // Series (Optional, stored if present)
+        const series: { date: string, volume: number }[] = [];
+        if (schema.monthlySeries.present) {
+            schema.monthlySeries.monthColumns.forEach(mc => {
+                const rawM = cols[mc.index];
+                // Loose parse for series history, fallback to 0 is okay for history but NOT for base volume
+                const val = Derivations.parseVolumeStrict(rawM);
+                if (val !== null) series.push({ date: mc.month, volume: val });
+            });
+        }
+
+        dedupMap.set(normKey, {
+            operatingMonth: targetMonthWindowId,
+            categoryId,
+            keywordNormalized: normKey,
+            rawKeyword: rawKw,
+            volume: vol,
+            timeSeries: series,
+            ingestedAt: new Date().toISOString()
+        });
+    };
+
+    return {
+        /** Feeds decoded text; complete lines are processed, the tail is carried over. */
+        push(text: string) {
+            const parts = (carry + text).split(/\r?\n/);
+            carry = parts.pop() || '';
+            for (const line of parts) processLine(line);
+        },
+
+        finish(): RowProcessorResult {
+            if (carry) processLine(carry);
+            carry = '';
+            return {
+                records: Array.from(dedupMap.values()),
+                totalRowsRead: Math.max(0, lineIndex - 1),
+                duplicatesRemoved,
+                diagnostics
+            };
+        },
+
+        get linesRead() {
+            return lineIndex;
+        }
+    };
+}
+
+export type CsvRowProcessor = ReturnType<typeof createCsvRowProcessor>;
+
+/**
+ * Reads a File/Blob in byte chunks and feeds the processor; the file is
+ * never held in memory as a whole string. `onChunk` runs after each chunk.
+ */
+export async function streamCsvBlob(
+    blob: Blob,
+    processor: CsvRowProcessor,
+    onChunk?: (bytesRead: number) => void | Promise<void>
+): Promise<RowProcessorResult> {
+    const reader = blob.stream().getReader();
+    const decoder = new TextDecoder();
+    let bytesRead = 0;
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        bytesRead += value.byteLength;
+        processor.push(decoder.decode(value, { stream: true }));
+        if (onChunk) await onChunk(bytesRead);
+    }
+    processor.push(decoder.decode());
+
+    return processor.finish();
+}
@@ -1,23 +1,28 @@
 
 import { SeedStore } from './seedStore';
 import { Derivations } from './csvIngestion/derivations';
-import { KeywordValidator } from './csvIngestion/keywordValidator';
 import { SeedMeta, IngestionReport, IngestionProgress, IngestionDiagnostics } from './csvIngestion/types';
 import { CsvAiMapping } from './csvAiMapping';
 // Fixed: src/services/csvIngestionService.ts should import from ../../types (root) not ../types
 import { StrategyArtifact } from '../../types';
 import { StorageAdapter } from './storageAdapter';
-import { Normalization } from './normalization';
 import { MasterCsvStore, MasterCsvRecord } from './masterCsvStore';
 import { StrategyPackService } from './strategyPack';
 import { computeSHA256 } from './volumeTruthStore';
+import { parseCsvFile } from './csvIngestion/csvParseRunner';
 
 const MIN_ACCEPTED_COUNT = 50; 
+const SCHEMA_SAMPLE_BYTES = 64 * 1024; // Header + first rows for schema inference
+const WRITE_BATCH = 2000;
 
 export const CsvIngestionService = {
 
+    /**
+     * Accepts the File itself (preferred: streamed in byte chunks, parsed in a
+     * worker) or, for existing callers, the file text.
+     */
     async ingest(
-        fileContent: string, 
+        fileContent: string | Blob, 
         categoryId: string, 
         targetMonthWindowId: string, 
         fileName: string,
@@ -63,26 +68,14 @@ export const CsvIngestionService = {
             }
         };
 
-        const diagnostics: IngestionDiagnostics = {
-            volumeParseSuccessCount: 0,
-            volumeParseFailCount: 0,
-            volumeRawSample: [],
-            volumeParsedSample: [],
-            keywordBlankRejectedCount: 0,
-            volumeBlankRejectedCount: 0,
-            volumeNullRejectedCount: 0,
-            volumeZeroRejectedCount: 0,
-            volumeNaNRejectedCount: 0,
-            acceptedCount: 0,
-            acceptedSamples: [],
-            rejectedSamples: []
-        };
-
         try {
             reportProgress('FILE_READ', 5, 'Mapping structure...');
 
-            // 1. SCHEMA INFERENCE
-            const schema = await CsvAiMapping.inferSchema(fileName, fileContent);
+            const file = typeof fileContent === 'string' ? new Blob([fileContent]) : fileContent;
+
+            // 1. SCHEMA INFERENCE (only needs the header and a few rows)
+            const sample = (await file.slice(0, SCHEMA_SAMPLE_BYTES).text()).replace(/^\uFEFF/, '');
+            const schema = await CsvAiMapping.inferSchema(fileName, sample);
             if (schema.keyword.index === -1) throw new Error("MISSING_REQUIRED_COLUMN:Keyword.");
             if (schema.volume.index === -1) throw new Error("CRITICAL: Missing required volume column.");
 
@@ -91,122 +84,25 @@ export const CsvIngestionService = {
                 `Keyword: Column ${schema.keyword.index}`,
                 `Volume: Column ${schema.volume.index} (${schema.volume.source})`
             ];
-            
-            diagnostics.volumeColumnIndex = schema.volume.index;
-            diagnostics.volumeColumnHeader = schema.volume.source;
-
-            const cleanContent = fileContent.replace(/^\uFEFF/, '');
-            const lines = cleanContent.split(/\r?\n/).filter(l => l.trim().length > 0);
-            
-            // Helper to parse CSV row
-            const parseRow = (rowStr: string, delimiter: string): string[] => {
-                const result: string[] = [];
-                let current = '';
-                let inQuotes = false;
-                for (let i = 0; i < rowStr.length; i++) {
-                    const char = rowStr[i];
-                    if (char === '"') { inQuotes = !inQuotes; }
-                    else if (char === delimiter && !inQuotes) { result.push(current.trim().replace(/^"|"$/g, '')); current = ''; }
-                    else { current += char; }
-                }
-                result.push(current.trim().replace(/^"|"$/g, ''));
-                return result;
-            };
-
-            reportProgress('PARSE_ROWS', 15, `Processing ${lines.length} rows...`);
-            const records: MasterCsvRecord[] = [];
-            const validator = KeywordValidator.createValidator(categoryId);
-            
-            // Dedup Map to handle raw-file duplicates immediately
-            const dedupMap = new Map<string, MasterCsvRecord>();
-
-            for (let i = 1; i < lines.length; i++) {
-                const cols = parseRow(lines[i], schema.delimiter);
-                if (cols.length < 2) continue;
-
-                // 1. Keyword Check
-                const rawKw = cols[schema.keyword.index] || '';
-                const validation = validator(rawKw);
-                
-                if (!validation.isValid) {
-                    diagnostics.keywordBlankRejectedCount++;
-                    if (diagnostics.rejectedSamples.length < 5) diagnostics.rejectedSamples.push({ k: rawKw, v: 'N/A', reason: `Invalid Keyword: ${validation.rejectionReason}` });
-                    continue; 
-                }
-
-                // 2. Volume Parse (STRICT)
-                const rawVolStr = cols[schema.volume.index];
-                const vol = Derivations.parseVolume(rawVolStr);
 
-                if (i <= 11) {
-                    diagnostics.volumeRawSample.push(rawVolStr || '(empty)');
-                    diagnostics.volumeParsedSample.push(vol);
+            // 2. STREAMING PARSE + DEDUPE (worker)
+            reportProgress('PARSE_ROWS', 15, `Processing ${fileName}...`);
+            const parsed = await parseCsvFile(
+                file,
+                { schema, categoryId, targetMonthWindowId },
+                (p) => {
+                    const pct = p.totalBytes > 0 ? p.bytesRead / p.totalBytes : 1;
+                    reportProgress('PARSE_ROWS', 15 + Math.round(30 * pct), `Processed ${p.linesRead} rows...`, p);
                 }
+            );
 
-                // 3. STRICT Rejection Rules (Must match Definition of Done: "Reject 0/null/blank/NaN")
-                if (rawVolStr === undefined || rawVolStr === null || String(rawVolStr).trim() === '') {
-                    diagnostics.volumeBlankRejectedCount++;
-                    continue;
-                }
-
-                if (vol === null) {
-                    // Derivations.parseVolume returns null for NaN or <= 0
-                    // Check raw to distinguish NaN from 0 for cleaner reporting
-                    const numVal = Number(String(rawVolStr).replace(/[^0-9.]/g,''));
-                    if (Number.isFinite(numVal) && numVal <= 0) {
-                         diagnostics.volumeZeroRejectedCount++;
-                         if (diagnostics.rejectedSamples.length < 5) diagnostics.rejectedSamples.push({ k: rawKw, v: rawVolStr, reason: 'Volume Zero' });
-                    } else {
-                         diagnostics.volumeNaNRejectedCount++;
-                         if (diagnostics.rejectedSamples.length < 5) diagnostics.rejectedSamples.push({ k: rawKw, v: rawVolStr, reason: 'Volume Invalid (NaN)' });
-                    }
-                    continue;
-                }
-
-                // Vol is guaranteed > 0 by Derivations.parseVolume logic
-                diagnostics.acceptedCount++;
-                if (diagnostics.acceptedSamples.length < 5) {
-                    diagnostics.acceptedSamples.push({ k: validation.normalizedText, v: vol });
-                }
-
-                // Series (Optional, stored if present)
-                const series: { date: string, volume: number }[] = [];
-                if (schema.monthlySeries.present) {
-                    schema.monthlySeries.monthColumns.forEach(mc => {
-                        const rawM = cols[mc.index];
-                        // Loose parse for series history, fallback to 0 is okay for history but NOT for base volume
-                        const val = Derivations.parseVolumeStrict(rawM);
-                        if (val !== null) series.push({ date: mc.month, volume: val });
-                    });
-                }
-
-                const normKey = Normalization.normalize(validation.normalizedText);
-                
-                const record: MasterCsvRecord = {
-                    operatingMonth: targetMonthWindowId,
-                    categoryId,
-                    keywordNormalized: normKey,
-                    rawKeyword: rawKw,
-                    volume: vol,
-                    timeSeries: series,
-                    ingestedAt: new Date().toISOString()
-                };
-
-                // Dedupe Logic: Keep Highest Volume
-                if (dedupMap.has(normKey)) {
-                    const existing = dedupMap.get(normKey)!;
-                    if (vol > existing.volume) {
-                        dedupMap.set(normKey, record);
-                    }
-                    report.stats.duplicatesRemoved++;
-                } else {
-                    dedupMap.set(normKey, record);
-                }
-            }
-            
-            records.push(...dedupMap.values());
+            const records: MasterCsvRecord[] = parsed.records;
+            const diagnostics: IngestionDiagnostics = parsed.diagnostics;
+            diagnostics.volumeColumnIndex = schema.volume.index;
+            diagnostics.volumeColumnHeader = schema.volume.source;
 
-            report.stats.totalRowsRead = lines.length - 1;
+            report.stats.duplicatesRemoved = parsed.duplicatesRemoved;
+            report.stats.totalRowsRead = parsed.totalRowsRead;
             report.stats.rowsAccepted = records.length;
             report.diagnostics = diagnostics;
             
@@ -240,10 +136,13 @@ export const CsvIngestionService = {
             // 4. WRITE TO MASTER CSV STORE
             reportProgress('WRITE_MASTER', 50, `Saving ${records.length} records to Master Store...`);
             await MasterCsvStore.clearCategory(categoryId, targetMonthWindowId); // Clean slate for this month
-            await MasterCsvStore.saveRecords(records);
+            for (let i = 0; i < records.length; i += WRITE_BATCH) {
+                await MasterCsvStore.saveRecords(records.slice(i, i + WRITE_BATCH));
+                reportProgress('WRITE_MASTER', 50 + Math.round(25 * Math.min(1, (i + WRITE_BATCH) / records.length)), `Saved ${Math.min(i + WRITE_BATCH, records.length)}/${records.length} records...`);
+            }
 
             // 5. BUILD STRATEGY PACK (Refinement Layer)
-            reportProgress('DERIVE_TRENDS', 75, 'Building Strategy Pack...');
+            reportProgress('DERIVE_TRENDS', 76, 'Building Strategy Pack...');
             
             const seedRows = records.map(r => ({
                 categoryId: r.categoryId,
@@ -1,5 +1,7 @@
 import { GoogleGenAI } from "@google/genai";
 import { DeepDiveV1, DeepDiveSectionsV1, DeepDiveSignalsV1, PersonaV1, DeepDiveResult } from '../types';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmRunContext } from './llmScheduler';
 
 function safeParseJSON(input: string): any {
     if (!input) return {};
@@ -67,18 +69,18 @@ const SECTION_PROMPTS = {
 };
 
 export const DeepDiveAssembler = {
-    async generateAllSections(ai: GoogleGenAI, category: string, signals: DeepDiveSignalsV1, demandCtx: string): Promise<DeepDiveSectionsV1> {
+    async generateAllSections(ai: GoogleGenAI, category: string, signals: DeepDiveSignalsV1, demandCtx: string, llm?: LlmRunContext): Promise<DeepDiveSectionsV1> {
         const fullCtx = `${demandCtx}. Category: ${category}`;
         const [p1, p2, p3, p4, p5, p6, p7, p8, p9] = await Promise.all([
-            this.callAI(ai, SECTION_PROMPTS.primaryTension(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.drivingDemand(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.marketShape(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.momentum(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.brandImplications(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.opportunityMap(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.segmentationAndContent(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.regionalIntelligence(category, fullCtx)),
-            this.callAI(ai, SECTION_PROMPTS.summaries(category, signals))
+            this.callAI(ai, SECTION_PROMPTS.primaryTension(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.drivingDemand(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.marketShape(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.momentum(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.brandImplications(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.opportunityMap(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.segmentationAndContent(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.regionalIntelligence(category, fullCtx), llm),
+            this.callAI(ai, SECTION_PROMPTS.summaries(category, signals), llm)
         ]);
 
         return {
@@ -95,9 +97,9 @@ export const DeepDiveAssembler = {
         };
     },
 
-    async callAI(ai: GoogleGenAI, prompt: string): Promise<any> {
+    async callAI(ai: GoogleGenAI, prompt: string, llm?: LlmRunContext): Promise<any> {
         try {
-            const resp = await ai.models.generateContent({ model: 'gemini-3-flash-preview', contents: prompt, config: { responseMimeType: 'application/json' } });
+            const resp = await LlmCallLayer.generate(ai, { model: 'gemini-3-flash-preview', contents: prompt, config: { responseMimeType: 'application/json' } }, { label: 'DD_ASSEMBLER', ...llm });
             return safeParseJSON(resp.text || "{}");
         } catch (e) { return {}; }
     },
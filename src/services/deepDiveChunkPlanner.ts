@@ -26,7 +26,22 @@ export const DeepDiveChunkPlanner = {
     plan(rows: SnapshotKeywordRow[], signals: SignalDTO[]): ChunkedInputs {
         
         // 1. Demand Planning
-        const anchors = Array.from(new Set(rows.map(r => r.anchor_id)));
+        // One pass: anchor order (first seen), anchor volumes and active rows per anchor.
+        // Rows are referenced, not copied, so columnar row views work here too.
+        const anchors: string[] = [];
+        const anchorVols: Record<string, number> = {};
+        const activeByAnchor = new Map<string, SnapshotKeywordRow[]>();
+        for (const r of rows) {
+            const a = r.anchor_id;
+            if (!activeByAnchor.has(a)) {
+                anchors.push(a);
+                anchorVols[a] = 0;
+                activeByAnchor.set(a, []);
+            }
+            anchorVols[a] += (r.volume || 0);
+            if (r.active) activeByAnchor.get(a)!.push(r);
+        }
+
         const demandChunks = [];
         let totalDemandKw = 0;
 
@@ -34,16 +49,12 @@ export const DeepDiveChunkPlanner = {
         const GLOBAL_KW_CAP = 900;
 
         // Sort anchors by total volume to prioritize impact
-        const anchorVols: Record<string, number> = {};
-        rows.forEach(r => {
-            anchorVols[r.anchor_id] = (anchorVols[r.anchor_id] || 0) + (r.volume || 0);
-        });
         anchors.sort((a,b) => anchorVols[b] - anchorVols[a]);
 
         for (const anchor of anchors) {
             if (totalDemandKw >= GLOBAL_KW_CAP) break;
 
-            const anchorRows = rows.filter(r => r.anchor_id === anchor && r.active);
+            const anchorRows = activeByAnchor.get(anchor)!;
             
             // Selection Strategy:
             // 1. Top Volume (Head)
@@ -54,18 +65,18 @@ export const DeepDiveChunkPlanner = {
                 let score = (r.volume || 0) * 0.5; // Base vol weight
                 if (r.amazonVolume) score += r.amazonVolume * 1.5; // Commerce boost
                 if (r.intent_bucket === 'Decision' || r.intent_bucket === 'Consideration') score *= 1.2;
-                return { ...r, _score: score };
+                return { r, _score: score };
             });
 
             // Sort desc
             scoredRows.sort((a,b) => b._score - a._score);
             
-            const selected = scoredRows.slice(0, MAX_KW_PER_ANCHOR).map(r => ({
+            const selected = scoredRows.slice(0, MAX_KW_PER_ANCHOR).map(({ r, _score }) => ({
                 term: safeText(r.keyword_text),
                 vol: r.volume || 0,
                 amazonVol: r.amazonVolume || 0,
                 intent: safeText(r.intent_bucket),
-                score: r._score
+                score: _score
             }));
 
             if (selected.length > 0) {
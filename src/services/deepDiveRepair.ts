@@ -1,5 +1,6 @@
-import { GoogleGenAI } from "@google/genai";
 import { DeepDiveV1, DeepDiveResult, PersonaV1 } from '../types';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler } from './llmScheduler';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -22,7 +23,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 function safeParseJSON(input: string): any {
@@ -31,6 +32,12 @@ function safeParseJSON(input: string): any {
   try { return JSON.parse(cleaned); } catch (e) { return {}; }
 }
 
+// Repairs are cached only when they return a field they were asked for
+const returnsAny = (...keys: string[]) => (text: string) => {
+    const parsed = safeParseJSON(text);
+    return keys.some(k => parsed[k] !== undefined && parsed[k] !== null);
+};
+
 const BACKFILL_TEMPLATES: Record<string, any> = {
     demandSpace: (i: number) => `Category Demand Space ${i+1}`,
     brand: (i: number) => ({ brand: `Leading Brand ${i+1}`, why: "High market visibility" }),
@@ -74,11 +81,11 @@ export const DeepDiveRepair = {
                 Output JSON: { "topDemandSpaces": ["string"...], "topIngredients": ["string"...], "brandsThatTickAllBoxes": [{"brand": "string", "why": "string"}...] }
             `;
             try {
-                const resp = await ai.models.generateContent({
+                const resp = await LlmCallLayer.generate(ai, {
                     model: 'gemini-3-flash-preview',
                     contents: prompt,
                     config: { responseMimeType: 'application/json' }
-                });
+                }, { label: 'DD_REPAIR', accept: returnsAny('topDemandSpaces', 'topIngredients', 'brandsThatTickAllBoxes') });
                 const fixed = safeParseJSON(resp.text || "{}");
                 if (fixed.topDemandSpaces) synthesis.opportunityMap.topDemandSpaces = fixed.topDemandSpaces;
                 if (fixed.topIngredients) synthesis.opportunityMap.topIngredients = fixed.topIngredients;
@@ -97,11 +104,11 @@ export const DeepDiveRepair = {
                 Output JSON: { "personas": [{ "name": "string", "ageGroup": "string", "region": "string", "language": "string", "whatTheyAreThinking": ["string"...], "needs": ["string"...], "aspirations": ["string"...], "doubts": ["string"...], "emotionalDrivers": ["string"...], "quotes": [{"quote": "string", "sourceType": "reddit"}] } ... ] }
             `;
             try {
-                const resp = await ai.models.generateContent({
+                const resp = await LlmCallLayer.generate(ai, {
                     model: 'gemini-3-flash-preview',
                     contents: prompt,
                     config: { responseMimeType: 'application/json' }
-                });
+                }, { label: 'DD_REPAIR', accept: returnsAny('personas') });
                 const fixed = safeParseJSON(resp.text || "{}");
                 if (fixed.personas && Array.isArray(fixed.personas)) synthesis.consumerSegmentation.personas = fixed.personas;
             } catch (e) { console.warn("Repair Personas failed", e); }
@@ -118,11 +125,11 @@ export const DeepDiveRepair = {
                 Output JSON: { "bullets": ["string"...], "deterministicDrivers": ["string"...] }
             `;
             try {
-                const resp = await ai.models.generateContent({
+                const resp = await LlmCallLayer.generate(ai, {
                     model: 'gemini-3-flash-preview',
                     contents: prompt,
                     config: { responseMimeType: 'application/json' }
-                });
+                }, { label: 'DD_REPAIR', accept: returnsAny('bullets', 'deterministicDrivers') });
                 const fixed = safeParseJSON(resp.text || "{}");
                 if (fixed.bullets) synthesis.whatsDrivingDemand.bullets = fixed.bullets;
                 if (fixed.deterministicDrivers) synthesis.whatsDrivingDemand.deterministicDrivers = fixed.deterministicDrivers;
@@ -140,11 +147,11 @@ export const DeepDiveRepair = {
                 Output JSON: { "bullets": ["string"...] }
             `;
             try {
-                const resp = await ai.models.generateContent({
+                const resp = await LlmCallLayer.generate(ai, {
                     model: 'gemini-3-flash-preview',
                     contents: prompt,
                     config: { responseMimeType: 'application/json' }
-                });
+                }, { label: 'DD_REPAIR', accept: returnsAny('bullets') });
                 const fixed = safeParseJSON(resp.text || "{}");
                 if (fixed.bullets) synthesis.brandImplications = { bullets: fixed.bullets };
             } catch (e) { console.warn("Repair Brand Implications failed", e); }
@@ -161,11 +168,11 @@ export const DeepDiveRepair = {
                 Output JSON: { "themes": [{ "theme": "string", "needs": ["string"], "aspirations": ["string"] }...] }
             `;
             try {
-                const resp = await ai.models.generateContent({
+                const resp = await LlmCallLayer.generate(ai, {
                     model: 'gemini-3-flash-preview',
                     contents: prompt,
                     config: { responseMimeType: 'application/json' }
-                });
+                }, { label: 'DD_REPAIR', accept: returnsAny('themes') });
                 const fixed = safeParseJSON(resp.text || "{}");
                 if (fixed.themes) synthesis.contentIntelligence.themes = fixed.themes;
             } catch (e) { console.warn("Repair Content Intelligence failed", e); }
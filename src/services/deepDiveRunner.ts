@@ -6,10 +6,14 @@ import { HeartbeatController } from './jobHeartbeat';
 import { JobControlService } from './jobControlService';
 import { DeepDiveTelemetryBus } from './deepDiveTelemetryBus';
 import { MCI_DEEPDIVE_MODEL_TIMEOUT_MS } from '../config/featureFlags';
+import { CancelToken } from './cancelToken';
+import { LlmLane, LlmRunContext } from './llmScheduler';
 
 export interface DeepDiveRunOptions {
     runId?: string;
     bypassCache?: boolean;
+    lane?: LlmLane;              // Default 'interactive'; batch callers pass 'pipeline'/'background'
+    cancelToken?: CancelToken;
 }
 
 export const DeepDiveRunner = {
@@ -37,6 +41,14 @@ export const DeepDiveRunner = {
         DeepDiveTelemetryBus.emit(runId, 'QUEUED', `Job started: ${jobId}`);
 
         let watchdog: any = null;
+        // Aborted on timeout so queued/in-flight model calls don't outlive the run
+        const modelAbort = new AbortController();
+        const llm: LlmRunContext = {
+            lane: options.lane || 'interactive',
+            signal: modelAbort.signal,
+            cancelToken: options.cancelToken,
+            ...(options.bypassCache ? { cache: false } : {})
+        };
 
         try {
             // 2. Resolve Inputs
@@ -68,12 +80,13 @@ export const DeepDiveRunner = {
             // EXECUTE WITH TIMEOUT
             const timeoutPromise = new Promise<never>((_, reject) => {
                 watchdog = setTimeout(() => {
+                    modelAbort.abort(new Error('CANCELLED: MODEL_TIMEOUT'));
                     reject(new Error(`MODEL_TIMEOUT: Exceeded ${MCI_DEEPDIVE_MODEL_TIMEOUT_MS}ms`));
                 }, MCI_DEEPDIVE_MODEL_TIMEOUT_MS);
             });
 
             // Execute the v2 service call
-            const resultPromise = DeepDiveServiceV2.run(categoryId, month, inputs);
+            const resultPromise = DeepDiveServiceV2.run(categoryId, month, inputs, llm, { runId, categoryId });
             
             const result = await Promise.race([resultPromise, timeoutPromise]);
             clearTimeout(watchdog);
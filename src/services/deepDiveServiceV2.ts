@@ -6,9 +6,12 @@ import { DeepDiveResultV2, DeepDiveInputBundleV2, DeepDiveV1, DeepDiveMetrics, D
 import { DeepDiveStore } from './deepDiveStore';
 import { DeepDiveAssembler } from './deepDiveAssembler';
 import { DEEP_DIVE_V2_CONTRACT_PROMPT, DeepDiveV2ContractOutput } from '../llm/prompts/deepDiveV2.contract';
-import { MCI_ENABLE_DEEPDIVE_CONTRACT, MCI_ENABLE_DEMAND_ONLY_DEEPDIVE } from '../config/featureFlags';
+import { MCI_ENABLE_DEEPDIVE_CONTRACT, MCI_ENABLE_DEMAND_ONLY_DEEPDIVE, MCI_ENABLE_DEEPDIVE_STREAMING } from '../config/featureFlags';
 import { DeepDiveRepair } from './deepDiveRepair';
 import { normalizeDeepDiveDTO } from '../utils/reactSafe';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler, LlmRunContext } from './llmScheduler';
+import { DeepDiveStreaming, DeepDiveStreamTarget } from './deepDiveStreaming';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -35,7 +38,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY in Vercel env vars.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 function cleanJson(text: string): string {
@@ -43,8 +46,27 @@ function cleanJson(text: string): string {
     return text.replace(/```json/gi, "").replace(/```/g, "").trim();
 }
 
+const CONTRACT_REQUIRED_SECTIONS = [
+    'marketStructure', 'consumerNeeds', 'behavioursRituals', 
+    'triggersBarriersInfluences', 'categoryEvolutionOpportunities', 
+    'brandPerceptionsLightTouch', 'influencerEcosystem', 'regionalNuances', 
+    'appendix', 'ingredientsAtPlay', 'packagingAndPricing'
+];
+
+// Cache only answers the contract path can use: parsed, not a FAIL verdict, all sections present
+function isUsableContractText(text: string): boolean {
+    const raw = JSON.parse(cleanJson(text));
+    return !!raw && raw.verdict !== 'FAIL' && CONTRACT_REQUIRED_SECTIONS.every(k => !!raw[k]);
+}
+
 export const DeepDiveServiceV2 = {
-    async run(categoryId: string, monthKey: string, inputs?: DeepDiveInputBundleV2): Promise<DeepDiveResultV2> {
+    async run(
+        categoryId: string,
+        monthKey: string,
+        inputs?: DeepDiveInputBundleV2,
+        llm?: LlmRunContext,
+        stream?: DeepDiveStreamTarget
+    ): Promise<DeepDiveResultV2> {
         // If inputs not provided, resolve them
         const bundle = inputs || await DeepDiveInputService.resolveAndBindInputs(categoryId, monthKey);
         
@@ -88,7 +110,7 @@ export const DeepDiveServiceV2 = {
         
         // --- V2 CONTRACT PATH ---
         if (MCI_ENABLE_DEEPDIVE_CONTRACT) {
-            return this.runContractPath(ai, categoryName, categoryId, monthKey, bundle, metrics);
+            return this.runContractPath(ai, categoryName, categoryId, monthKey, bundle, metrics, llm, stream);
         }
 
         // --- LEGACY PATH (Fallback) ---
@@ -108,7 +130,7 @@ export const DeepDiveServiceV2 = {
              contentCreators: signals.filter(s => s.platform === 'creators')
         };
 
-        const sections = await DeepDiveAssembler.generateAllSections(ai, categoryName, signalsMap, demandCtx);
+        const sections = await DeepDiveAssembler.generateAllSections(ai, categoryName, signalsMap, demandCtx, llm);
         
         const result: DeepDiveResultV2 = {
             categoryId,
@@ -177,7 +199,9 @@ export const DeepDiveServiceV2 = {
         categoryId: string, 
         monthKey: string, 
         bundle: DeepDiveInputBundleV2,
-        metrics: DeepDiveMetrics
+        metrics: DeepDiveMetrics,
+        llm?: LlmRunContext,
+        stream?: DeepDiveStreamTarget
     ): Promise<DeepDiveResultV2> {
         
         console.log(`[DEEPDIVE] Running V2.2 Contract Path for ${categoryName}`);
@@ -207,14 +231,19 @@ export const DeepDiveServiceV2 = {
 
         let raw: DeepDiveV2ContractOutput;
         try {
-            const resp = await ai.models.generateContent({
+            const request = {
                 model: 'gemini-3-pro-preview',
                 contents: fullPrompt,
                 config: { 
                     responseMimeType: 'application/json',
                     thinkingConfig: { thinkingBudget: 16000 } // Reduced to ensure output tokens don't starve
                 }
-            });
+            };
+            // Streaming publishes sections as they parse; the final checks below are unchanged
+            const callOpts = { label: 'DEEP_DIVE_V2', ...llm, accept: isUsableContractText };
+            const resp = (MCI_ENABLE_DEEPDIVE_STREAMING && stream)
+                ? await DeepDiveStreaming.generate(ai, request, stream, callOpts)
+                : await LlmCallLayer.generate(ai, request, callOpts);
             const text = resp.text || "{}";
             raw = JSON.parse(cleanJson(text));
         } catch (e: any) {
@@ -246,12 +275,7 @@ export const DeepDiveServiceV2 = {
 
         // Validate Shape (Strict Contract)
         const missingSections: string[] = [];
-        const required = [
-            'marketStructure', 'consumerNeeds', 'behavioursRituals', 
-            'triggersBarriersInfluences', 'categoryEvolutionOpportunities', 
-            'brandPerceptionsLightTouch', 'influencerEcosystem', 'regionalNuances', 
-            'appendix', 'ingredientsAtPlay', 'packagingAndPricing'
-        ];
+        const required = CONTRACT_REQUIRED_SECTIONS;
         
         required.forEach(k => {
             if (!(raw as any)[k]) missingSections.push(k);
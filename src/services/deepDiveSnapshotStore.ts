@@ -1,16 +1,27 @@
 
-import { doc, setDoc } from 'firebase/firestore';
+import { doc, setDoc, deleteDoc } from 'firebase/firestore';
 import { FirestoreClient } from './firestoreClient';
 import { DeepDiveSnapshotDoc } from '../types';
 import { sanitizeForFirestore } from '../utils/firestoreSanitize';
 
+// Drafts of runs that never reach a certified snapshot are dropped by a
+// Firestore TTL policy on `expires_at` (collection group `streaming`)
+const STREAMING_DRAFT_TTL_MS = 24 * 60 * 60 * 1000;
+
+const streamingPath = (country: string, lang: string, categoryId: string) => `mci_deepdive/${country}/${lang}/${categoryId}/streaming`;
+
 export const DeepDiveSnapshotStore = {
+    /**
+     * Writes the certified snapshot. `streamingRunId` names the run's streaming
+     * draft, which is deleted once the snapshot is stored.
+     */
     async createDeepDiveSnapshot(
         outputSnapshotId: string,
         categoryId: string,
         country: string,
         lang: string,
-        deepDiveData: any
+        deepDiveData: any,
+        streamingRunId?: string
     ): Promise<{ok:true; data:DeepDiveSnapshotDoc} | {ok:false; error:string}> {
         const db = FirestoreClient.getDbSafe();
         if (!db) return { ok: false, error: "FIREBASE_DB_UNAVAILABLE" };
@@ -34,7 +45,70 @@ export const DeepDiveSnapshotStore = {
             };
 
             await setDoc(docRef, sanitizeForFirestore(docData));
+            if (streamingRunId) {
+                await this.deleteStreamingRun(streamingRunId, categoryId, country, lang);
+            }
             return docData;
         });
+    },
+
+    /**
+     * Merges one streamed section into the run's draft doc
+     * (`.../{categoryId}/streaming/{runId}`) so readers see it before the
+     * certified snapshot exists.
+     */
+    async writeStreamingSection(
+        runId: string,
+        categoryId: string,
+        country: string,
+        lang: string,
+        section: string,
+        value: any,
+        validation: { ok: boolean; errors: string[] }
+    ): Promise<{ok:true; data:string} | {ok:false; error:string}> {
+        const db = FirestoreClient.getDbSafe();
+        if (!db) return { ok: false, error: "FIREBASE_DB_UNAVAILABLE" };
+
+        return FirestoreClient.safe(async () => {
+            const docRef = doc(db, streamingPath(country, lang, categoryId), runId);
+            await setDoc(docRef, sanitizeForFirestore({
+                run_id: runId,
+                category_id: categoryId,
+                lifecycle: 'STREAMING',
+                updated_at_iso: new Date().toISOString(),
+                expires_at: new Date(Date.now() + STREAMING_DRAFT_TTL_MS),
+                sections: { [section]: value },
+                validation: { [section]: validation }
+            }), { merge: true });
+            return section;
+        });
+    },
+
+    async finishStreamingRun(
+        runId: string,
+        categoryId: string,
+        country: string,
+        lang: string,
+        lifecycle: 'STREAMED' | 'INCOMPLETE'
+    ): Promise<{ok:true; data:string} | {ok:false; error:string}> {
+        const db = FirestoreClient.getDbSafe();
+        if (!db) return { ok: false, error: "FIREBASE_DB_UNAVAILABLE" };
+
+        return FirestoreClient.safe(async () => {
+            const docRef = doc(db, streamingPath(country, lang, categoryId), runId);
+            await setDoc(docRef, { lifecycle, updated_at_iso: new Date().toISOString() }, { merge: true });
+            return runId;
+        });
+    },
+
+    /** Best effort: a draft left behind still expires via its TTL. */
+    async deleteStreamingRun(runId: string, categoryId: string, country: string, lang: string): Promise<void> {
+        const db = FirestoreClient.getDbSafe();
+        if (!db) return;
+        try {
+            await deleteDoc(doc(db, streamingPath(country, lang, categoryId), runId));
+        } catch (e: any) {
+            console.warn(`[DEEPDIVE][STREAM] draft cleanup failed run=${runId} reason=${e?.message || e}`);
+        }
     }
 };
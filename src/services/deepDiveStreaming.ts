@@ -0,0 +1,70 @@
+import { GoogleGenAI } from "@google/genai";
+import { LlmCallLayer, LlmCallOptions, LlmRequest, LlmResponse } from './llmCallLayer';
+import { createJsonMemberStream } from '../utils/incrementalJson';
+import { validateDeepDiveSection } from './deepDiveValidator';
+import { DeepDiveTelemetryBus } from './deepDiveTelemetryBus';
+import { DeepDiveSnapshotStore } from './deepDiveSnapshotStore';
+
+/**
+ * Streams a deep-dive generation and publishes each top-level section of the
+ * JSON output as soon as it parses: validated, emitted on the telemetry bus
+ * as MODEL_STREAMING, and merged into the run's streaming draft in
+ * DeepDiveSnapshotStore. The full text is still returned, so callers keep
+ * their existing parse/contract checks on the final object.
+ */
+
+export interface DeepDiveStreamTarget {
+    runId: string;              // Telemetry run key and streaming draft id
+    categoryId: string;
+    country?: string;
+    lang?: string;
+}
+
+export const DeepDiveStreaming = {
+
+    async generate(
+        ai: GoogleGenAI,
+        req: LlmRequest,
+        target: DeepDiveStreamTarget,
+        opts: LlmCallOptions = {}
+    ): Promise<LlmResponse> {
+        const country = target.country || 'IN';
+        const lang = target.lang || 'en';
+        const start = Date.now();
+        const writes: Promise<unknown>[] = [];
+        let sections = 0;
+        let invalid = 0;
+
+        const parser = createJsonMemberStream((section, value) => {
+            // Scalars (verdict, failCode) are not report sections
+            if (value === null || typeof value !== 'object') return;
+
+            const validation = validateDeepDiveSection(section, value);
+            sections++;
+            if (!validation.ok) invalid++;
+
+            DeepDiveTelemetryBus.emit(target.runId, 'MODEL_STREAMING', `Section ready: ${section}${validation.ok ? '' : ' (needs repair)'}`, {
+                section,
+                value,
+                validation,
+                sectionsDone: sections,
+                firstSectionMs: sections === 1 ? Date.now() - start : undefined
+            });
+
+            writes.push(DeepDiveSnapshotStore.writeStreamingSection(
+                target.runId, target.categoryId, country, lang, section, value, validation
+            ));
+        });
+
+        const resp = await LlmCallLayer.generate(ai, req, { ...opts, onText: delta => parser.push(delta) });
+        const { complete, parseErrors } = parser.finish();
+
+        writes.push(DeepDiveSnapshotStore.finishStreamingRun(
+            target.runId, target.categoryId, country, lang, complete ? 'STREAMED' : 'INCOMPLETE'
+        ));
+        await Promise.all(writes);
+
+        console.log(`[DEEPDIVE][STREAM] run=${target.runId} sections=${sections} invalid=${invalid} complete=${complete} parse_errors=${parseErrors.length} cached=${resp.cached} ms=${Date.now() - start}`);
+        return resp;
+    }
+};
@@ -160,6 +160,35 @@ export async function validateDeepDiveV1(result: any): Promise<{ ok: boolean; er
     };
 }
 
+/**
+ * Shape check for one streamed deep-dive section, run as soon as it parses.
+ * Sections are objects of string-bullet arrays (bullets, hindiBelt, ...) or
+ * arrays of items; an empty or mistyped section is reported, not thrown.
+ */
+export function validateDeepDiveSection(key: string, value: unknown): { ok: boolean; errors: string[] } {
+    const errors: string[] = [];
+
+    if (Array.isArray(value)) {
+        if (value.length === 0) errors.push(`${key}: empty`);
+        value.forEach((item, i) => {
+            if (item === null || item === undefined || item === '') errors.push(`${key}[${i}]: empty item`);
+        });
+    } else if (value && typeof value === 'object') {
+        const lists = Object.entries(value as Record<string, unknown>).filter(([, v]) => Array.isArray(v)) as [string, unknown[]][];
+        if (Object.keys(value as object).length === 0) errors.push(`${key}: empty`);
+        lists.forEach(([field, list]) => {
+            if (list.length === 0) errors.push(`${key}.${field}: empty`);
+            else if (field === 'bullets' && list.some(b => typeof b !== 'string' || !b.trim())) {
+                errors.push(`${key}.bullets: non-string or blank bullet`);
+            }
+        });
+    } else {
+        errors.push(`${key}: expected object or array`);
+    }
+
+    return { ok: errors.length === 0, errors };
+}
+
 export function createFallbackDeepDive(category: string, message: string): DeepDiveResult {
     return {
         categoryId: category,
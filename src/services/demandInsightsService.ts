@@ -1,8 +1,9 @@
 
-import { GoogleGenAI } from "@google/genai";
 import { SweepResult, DemandInsight } from '../types';
 import { CORE_CATEGORIES } from '../constants';
 import { safeText } from '../utils/safety';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler } from './llmScheduler';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -29,7 +30,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Configure VITE_GOOGLE_API_KEY or process.env.API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 function cleanJson(text: string): string {
@@ -68,11 +69,11 @@ export const DemandInsightsService = {
                 }
             `;
 
-            const resp = await ai.models.generateContent({
+            const resp = await LlmCallLayer.generate(ai, {
                 model: 'gemini-flash-lite-latest', // Fast & Cheap
                 contents: prompt,
                 config: { responseMimeType: 'application/json' }
-            });
+            }, { label: 'DEMAND_INSIGHTS' });
 
             const raw = JSON.parse(cleanJson(resp.text || "{}"));
             
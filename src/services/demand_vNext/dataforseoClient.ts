@@ -1,11 +1,18 @@
 
 import { CredsStore } from './credsStore';
-import { DfsGlobalLimiter } from '../../utils/dfsRateLimiter';
+import { DfsGlobalLimiter, parseRetryAfterMs } from '../../utils/dfsRateLimiter';
+import { RateLimiter } from '../../utils/concurrency';
 
 const BASE_URL = 'https://api.dataforseo.com/v3';
 const PROXY_API_KEY = 'dev-key'; // Should match proxy config (if used)
 const TIMEOUT_PROXY_MS = 60000;
 
+// Async (task_post/task_get) mode limits
+const DFS_MAX_KEYWORDS_PER_TASK = 700;
+const DFS_MAX_TASKS_PER_POST = 100;
+const DFS_TASK_CREATED = 20100;
+const DFS_TASK_PENDING_CODES = [40601, 40602]; // Task Handed / Task In Queue
+
 export interface DataForSeoRow {
     keyword: string;
     search_volume?: number;
@@ -29,6 +36,17 @@ export interface DataForSeoTestResult {
     bodySnippet?: string;
     isCorsLikely?: boolean;
     hint?: string;
+    retryAfterMs?: number;
+}
+
+export interface DfsBulkTaskResult {
+    taskId: string;
+    chunkIndex: number;
+    keywords: string[];
+    ok: boolean;
+    rows: DataForSeoRow[];
+    error?: string;
+    elapsedMs: number;
 }
 
 function extractVolumeRows(data: any): { rows: DataForSeoRow[], meta: any } {
@@ -142,6 +160,126 @@ export const DataForSeoClient = {
         );
     },
 
+    /**
+     * Bulk validation via the async task API. Keywords are split into 700-keyword
+     * tasks, submitted up to 100 per task_post call, then polled with bounded
+     * concurrency. Each task's parsed rows are yielded as soon as it completes,
+     * so callers can persist progress while later tasks are still queued.
+     * Tasks still pending after maxWaitMs are yielded with ok=false.
+     */
+    async *fetchGoogleVolumesBulk_DFS(params: {
+        keywords: string[],
+        location: number,
+        language: string,
+        creds: { login: string; password: string },
+        signal?: AbortSignal;
+        categoryId?: string;
+        jobId?: string;
+        pollConcurrency?: number;
+        pollIntervalMs?: number;
+        maxWaitMs?: number;
+    }): AsyncGenerator<DfsBulkTaskResult> {
+        // Bulk runs carry creds on every call: a proxy guard failure must not degrade to direct calls
+        const proxyUrl = await this.resolveDfsProxyEndpoint();
+        const pollConcurrency = params.pollConcurrency ?? 6;
+        const pollIntervalMs = params.pollIntervalMs ?? 5000;
+        const maxWaitMs = params.maxWaitMs ?? 15 * 60 * 1000;
+        const start = Date.now();
+
+        const chunks: string[][] = [];
+        for (let i = 0; i < params.keywords.length; i += DFS_MAX_KEYWORDS_PER_TASK) {
+            chunks.push(params.keywords.slice(i, i + DFS_MAX_KEYWORDS_PER_TASK));
+        }
+
+        console.log(`[DFS_BULK][POST] category=${params.categoryId || 'unknown'} keywords=${params.keywords.length} tasks=${chunks.length} jobId=${params.jobId || 'N/A'}`);
+
+        // 1. Submit
+        const pending: Array<{ taskId: string; chunkIndex: number; error?: string }> = [];
+        for (let i = 0; i < chunks.length; i += DFS_MAX_TASKS_PER_POST) {
+            if (params.signal?.aborted) throw new Error("ABORTED");
+
+            const postData = chunks.slice(i, i + DFS_MAX_TASKS_PER_POST).map((kws, j) => ({
+                keywords: kws,
+                location_code: params.location,
+                language_code: params.language,
+                tag: String(i + j)
+            }));
+
+            const res = await this._execRaw('keywords_data/google_ads/search_volume/task_post', postData, params.creds, proxyUrl, 'POST');
+            const tasks: any[] = res.data?.tasks || [];
+
+            postData.forEach((task, j) => {
+                const chunkIndex = i + j;
+                const t = tasks.find(x => x?.data?.tag === task.tag) || tasks[j];
+                if (res.ok && t?.status_code === DFS_TASK_CREATED && t.id) {
+                    pending.push({ taskId: t.id, chunkIndex });
+                } else {
+                    // Task-level status first; a rejected post (auth, balance) only has the envelope's
+                    const code = t?.status_code ?? res.data?.status_code;
+                    const msg = t?.status_message || res.data?.status_message || res.error || 'no status';
+                    const error = `TASK_POST_FAILED: DFS ${code ?? 'n/a'} ${msg}`;
+                    console.warn(`[DFS_BULK][POST_FAIL] chunk=${chunkIndex} msg=${error}`);
+                    pending.push({ taskId: '', chunkIndex, error });
+                }
+            });
+        }
+
+        // Failed submissions are reported immediately
+        for (const p of pending.filter(p => !p.taskId)) {
+            yield { taskId: '', chunkIndex: p.chunkIndex, keywords: chunks[p.chunkIndex], ok: false, rows: [], error: p.error || 'TASK_POST_FAILED', elapsedMs: Date.now() - start };
+        }
+
+        // 2. Poll
+        let outstanding = pending.filter(p => p.taskId);
+        const limiter = new RateLimiter(pollConcurrency);
+
+        while (outstanding.length > 0) {
+            if (params.signal?.aborted) throw new Error("ABORTED");
+
+            if (Date.now() - start > maxWaitMs) {
+                for (const p of outstanding) {
+                    yield { taskId: p.taskId, chunkIndex: p.chunkIndex, keywords: chunks[p.chunkIndex], ok: false, rows: [], error: 'TASK_TIMEOUT', elapsedMs: Date.now() - start };
+                }
+                return;
+            }
+
+            await new Promise(r => setTimeout(r, pollIntervalMs));
+
+            type PollOutcome = { p: { taskId: string; chunkIndex: number }; result: { ok: boolean; rows: DataForSeoRow[]; error?: string } | null };
+            const settled = await Promise.all(outstanding.map(p => limiter.add(async (): Promise<PollOutcome> => {
+                const res = await this._execRaw(`keywords_data/google_ads/search_volume/task_get/${p.taskId}`, undefined, params.creds, proxyUrl, 'GET');
+                const task0 = res.data?.tasks?.[0];
+                const code = task0?.status_code;
+
+                if (res.ok && code === 20000) {
+                    return { p, result: { ok: true, rows: extractVolumeRows(res.data).rows } };
+                }
+                if (!res.ok || DFS_TASK_PENDING_CODES.includes(code)) {
+                    // Transport errors are retried on the next poll round
+                    return { p, result: null };
+                }
+                return { p, result: { ok: false, rows: [], error: `DFS Error: ${task0?.status_message || code}` } };
+            })));
+
+            outstanding = [];
+            for (const s of settled) {
+                if (!s.result) {
+                    outstanding.push(s.p);
+                    continue;
+                }
+                yield {
+                    taskId: s.p.taskId,
+                    chunkIndex: s.p.chunkIndex,
+                    keywords: chunks[s.p.chunkIndex],
+                    elapsedMs: Date.now() - start,
+                    ...s.result
+                };
+            }
+
+            console.log(`[DFS_BULK][POLL] category=${params.categoryId || 'unknown'} outstanding=${outstanding.length} elapsed_ms=${Date.now() - start}`);
+        }
+    },
+
     async fetchKeywordsForKeywords(params: {
         keywords: string[],
         location: number,
@@ -272,6 +410,48 @@ export const DataForSeoClient = {
         });
     },
 
+    /**
+     * Raw DFS call (proxy or direct) returning the unparsed response body.
+     * Used by the async task API, whose status codes differ from live endpoints.
+     */
+    async _execRaw(path: string, payload: any, creds: { login: string; password: string }, resolvedProxyUrl: string, method: 'GET' | 'POST'): Promise<{ ok: boolean; status: number; data?: any; error?: string }> {
+        const baseUrl = resolvedProxyUrl ? resolvedProxyUrl.replace(/\/$/, '') : '';
+        const controller = new AbortController();
+        const id = setTimeout(() => controller.abort(), TIMEOUT_PROXY_MS);
+
+        try {
+            let res: Response;
+            if (baseUrl) {
+                res = await fetch(`${baseUrl}/dfs/proxy`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'X-API-Key': PROXY_API_KEY },
+                    body: JSON.stringify({ path, payload, creds, method }),
+                    signal: controller.signal
+                });
+            } else {
+                res = await fetch(`${BASE_URL}/${path}`, {
+                    method,
+                    headers: {
+                        'Authorization': `Basic ${btoa(`${creds.login}:${creds.password}`)}`,
+                        'Content-Type': 'application/json'
+                    },
+                    body: method === 'POST' ? JSON.stringify(payload) : undefined,
+                    signal: controller.signal
+                });
+            }
+
+            if (!res.ok) {
+                return { ok: false, status: res.status, error: `HTTP ${res.status}: ${await res.text()}` };
+            }
+            const json = await res.json();
+            return { ok: true, status: res.status, data: baseUrl ? (json.data || json) : json };
+        } catch (e: any) {
+            return { ok: false, status: 0, error: `Client Exception: ${e.message}` };
+        } finally {
+            clearTimeout(id);
+        }
+    },
+
     async _execDirect(url: string, payload: any, creds: { login: string; password: string }): Promise<DataForSeoTestResult> {
         const start = Date.now();
         const auth = btoa(`${creds.login}:${creds.password}`);
@@ -298,7 +478,8 @@ export const DataForSeoClient = {
                 return { 
                     ok: false, status: res.status, latency, 
                     error: `HTTP ${res.status}: ${errorText}`, 
-                    urlUsed: url, viaProxy: false 
+                    urlUsed: url, viaProxy: false,
+                    retryAfterMs: parseRetryAfterMs(res.headers.get('retry-after'))
                 };
             }
 
@@ -363,7 +544,7 @@ export const DataForSeoClient = {
                 if (res.status === 504 || res.status === 408) {
                      return { ok: false, status: 408, latency, error: "DFS_PROXY_TIMEOUT", urlUsed: url, viaProxy: true };
                 }
-                return { ok: false, status: res.status, latency, error: `Proxy HTTP ${res.status}: ${txt}`, urlUsed: url, viaProxy: true };
+                return { ok: false, status: res.status, latency, error: `Proxy HTTP ${res.status}: ${txt}`, urlUsed: url, viaProxy: true, retryAfterMs: parseRetryAfterMs(res.headers.get('retry-after')) };
             }
 
             const wrapper = await res.json(); 
@@ -1,8 +1,15 @@
 
-import { doc, setDoc, getDocs, getDoc, collection, query, orderBy, writeBatch, WriteBatch } from 'firebase/firestore';
+import { doc, setDoc, getDocs, getDoc, collection, query, orderBy, writeBatch, WriteBatch, Bytes } from 'firebase/firestore';
 import { FirestoreClient } from './firestoreClient';
+import { AsyncPool } from './asyncPool';
+import { stableStringify } from './contract';
+import { ChunkCodec, CHUNK_FORMAT_COLUMNAR, CHUNK_ENCODING_COLUMNAR, MAX_CHUNK_PAYLOAD_BYTES } from './chunkCodec';
 import { SnapshotKeywordRow } from '../types';
+import { ColumnarSnapshot } from './columnarSnapshot';
 import { sanitizeForFirestore } from '../utils/firestoreSanitize';
+import { MCI_ENABLE_COMPACT_CHUNKS } from '../config/featureFlags';
+
+const BATCH_COMMIT_CONCURRENCY = 4;
 
 async function computeSHA256(text: string): Promise<string> {
     const encoder = new TextEncoder();
@@ -12,25 +19,77 @@ async function computeSHA256(text: string): Promise<string> {
     return hashArray.map(b => b.toString(16).padStart(2, '0')).join('');
 }
 
+/**
+ * Chunk document body. Compact chunks carry the rows as a deflated columnar
+ * payload (format 2); anything that would not fit falls back to plain rows.
+ */
+async function buildChunkDoc(index: number, sanitizedRows: SnapshotKeywordRow[], sha256: string): Promise<Record<string, any>> {
+    const base = {
+        index,
+        row_count: sanitizedRows.length,
+        sha256,
+        created_at_iso: FirestoreClient.nowIso()
+    };
+    if (MCI_ENABLE_COMPACT_CHUNKS) {
+        const payload = await ChunkCodec.encodeRows(sanitizedRows);
+        if (payload.byteLength <= MAX_CHUNK_PAYLOAD_BYTES) {
+            return {
+                ...base,
+                format: CHUNK_FORMAT_COLUMNAR,
+                encoding: CHUNK_ENCODING_COLUMNAR,
+                payload_bytes: payload.byteLength,
+                payload: Bytes.fromUint8Array(payload)
+            };
+        }
+        console.warn(`[CHUNK_STORE] index=${index} compact payload ${payload.byteLength}B over limit; writing plain rows`);
+    }
+    return { ...base, rows: sanitizedRows };
+}
+
+/** Rows from either chunk format. */
+async function decodeChunkRows(data: any): Promise<SnapshotKeywordRow[]> {
+    if (data.format === CHUNK_FORMAT_COLUMNAR && data.payload) {
+        return ChunkCodec.decodeRows((data.payload as Bytes).toUint8Array());
+    }
+    return Array.isArray(data.rows) ? data.rows : [];
+}
+
 export const FirestoreChunkStore = {
     async writeChunks(
         baseRef: any, // DocumentReference
         rows: SnapshotKeywordRow[],
-        chunkSize: number = 400
-    ): Promise<{ ok: true; chunkCount: number; chunkHashes: string[] } | { ok: false; error: string }> {
+        chunkSize: number = 400,
+        opts: { incremental?: boolean } = {}
+    ): Promise<{ ok: true; chunkCount: number; chunkHashes: string[]; writtenChunks: number; skippedChunks: number } | { ok: false; error: string }> {
+        const incremental = opts.incremental !== false;
+
         const result = await FirestoreClient.safe(async () => {
             const db = FirestoreClient.getDbSafe();
             if (!db) throw new Error("DB_INIT_FAIL");
 
             const chunkHashes: string[] = [];
             const chunkColl = collection(baseRef, 'chunks');
-            
+
+            // Stored hashes: only chunks whose content hash differs get rewritten
+            const existing = incremental ? await this.getStoredChunkHashes(baseRef) : new Map<string, string>();
+            const nextHashes = new Map<string, string>();
+
             const chunkCount = Math.ceil(rows.length / chunkSize);
             const batches: WriteBatch[] = [];
             let currentBatch = writeBatch(db);
             let opCount = 0;
+            let writtenChunks = 0;
+            let skippedChunks = 0;
             const BATCH_LIMIT = 450; // Safety buffer under 500
 
+            const flushIfFull = () => {
+                if (opCount >= BATCH_LIMIT) {
+                    batches.push(currentBatch);
+                    currentBatch = writeBatch(db);
+                    opCount = 0;
+                }
+            };
+
             for (let i = 0; i < rows.length; i += chunkSize) {
                 const chunkRows = rows.slice(i, i + chunkSize);
                 const chunkIndex = Math.floor(i / chunkSize);
@@ -38,40 +97,47 @@ export const FirestoreChunkStore = {
                 
                 const sanitizedRows = sanitizeForFirestore(chunkRows);
                 
-                const payloadStr = JSON.stringify(sanitizedRows);
+                // Key-order independent: rows read back from Firestore come with sorted keys
+                const payloadStr = stableStringify(sanitizedRows);
                 const sha256 = await computeSHA256(payloadStr);
                 
                 chunkHashes.push(sha256);
+                nextHashes.set(chunkId, sha256);
+
+                if (existing.get(chunkId) === sha256) {
+                    skippedChunks++;
+                    continue;
+                }
 
                 const docRef = doc(chunkColl, chunkId);
-                const data = {
-                    index: chunkIndex,
-                    row_count: chunkRows.length,
-                    rows: sanitizedRows,
-                    sha256: sha256,
-                    created_at_iso: FirestoreClient.nowIso()
-                };
+                const data = await buildChunkDoc(chunkIndex, sanitizedRows, sha256);
                 
                 currentBatch.set(docRef, data);
                 opCount++;
-
-                if (opCount >= BATCH_LIMIT) {
-                    batches.push(currentBatch);
-                    currentBatch = writeBatch(db);
-                    opCount = 0;
-                }
+                writtenChunks++;
+                flushIfFull();
             }
 
+            // A shrunk corpus leaves trailing chunks that readers would still pick up
+            existing.forEach((_, chunkId) => {
+                if (nextHashes.has(chunkId)) return;
+                currentBatch.delete(doc(chunkColl, chunkId));
+                opCount++;
+                flushIfFull();
+            });
+
             if (opCount > 0) {
                 batches.push(currentBatch);
             }
 
-            // Execute batches sequentially to avoid flooding the client
-            for (const batch of batches) {
-                await batch.commit();
+            // Batches touch disjoint chunk docs, so they can commit side by side
+            await AsyncPool.run(batches.map(batch => () => batch.commit()), BATCH_COMMIT_CONCURRENCY);
+
+            if (incremental) {
+                console.log(`[CHUNK_STORE][DELTA] path=${baseRef.path} chunks=${chunkCount} written=${writtenChunks} skipped=${skippedChunks} batches=${batches.length}`);
             }
 
-            return { chunkCount, chunkHashes };
+            return { chunkCount, chunkHashes, writtenChunks, skippedChunks };
         });
 
         if (result.ok && result.data) {
@@ -83,6 +149,22 @@ export const FirestoreChunkStore = {
         }
     },
 
+    /**
+     * chunkId -> sha256 for every chunk currently stored under `baseRef`.
+     * Always listed from Firestore: another tab, client or job may have
+     * rewritten chunks since this session last saw them, and skipping a
+     * write on a stale hash would silently drop rows.
+     */
+    async getStoredChunkHashes(baseRef: any): Promise<Map<string, string>> {
+        const hashes = new Map<string, string>();
+        const snap = await getDocs(collection(baseRef, 'chunks'));
+        snap.forEach(d => {
+            // Chunks without a hash are always rewritten
+            hashes.set(d.id, d.data().sha256 || '');
+        });
+        return hashes;
+    },
+
     // Legacy full read
     async readChunks(baseRef: any): Promise<{ ok: true; rows: SnapshotKeywordRow[]; chunkCount: number } | { ok: false; error: string }> {
         const result = await FirestoreClient.safe(async () => {
@@ -92,13 +174,8 @@ export const FirestoreChunkStore = {
             
             if (snap.empty) return { rows: [], chunkCount: 0 };
 
-            let allRows: SnapshotKeywordRow[] = [];
-            snap.forEach(d => {
-                const data = d.data();
-                if (data.rows && Array.isArray(data.rows)) {
-                    allRows = allRows.concat(data.rows);
-                }
-            });
+            const decoded = await Promise.all(snap.docs.map(d => decodeChunkRows(d.data())));
+            const allRows: SnapshotKeywordRow[] = ([] as SnapshotKeywordRow[]).concat(...decoded);
 
             return { rows: allRows, chunkCount: snap.size };
         });
@@ -111,6 +188,43 @@ export const FirestoreChunkStore = {
         }
     },
 
+    /**
+     * Full read straight into typed-array columns. Sized from each chunk's
+     * row_count, then filled one decoded chunk at a time, so the only row
+     * objects alive at once are those of the chunk being copied.
+     */
+    async readChunksColumnar(
+        baseRef: any,
+        meta: { categoryId: string; countryCode: string; languageCode: string }
+    ): Promise<{ ok: true; snapshot: ColumnarSnapshot; chunkCount: number } | { ok: false; error: string }> {
+        const result = await FirestoreClient.safe(async () => {
+            const snap = await getDocs(query(collection(baseRef, 'chunks'), orderBy('index')));
+
+            const total = snap.docs.reduce((n, d) => {
+                const data = d.data();
+                return n + (typeof data.row_count === 'number' ? data.row_count : Array.isArray(data.rows) ? data.rows.length : 0);
+            }, 0);
+            const cs = ColumnarSnapshot.allocate(total, meta);
+
+            let offset = 0;
+            for (const d of snap.docs) {
+                const rows = await decodeChunkRows(d.data());
+                cs.writeRows(offset, rows);
+                offset += rows.length;
+            }
+            if (offset !== total) throw new Error(`CHUNK_ROW_COUNT_MISMATCH: expected=${total} read=${offset}`);
+
+            return { snapshot: cs, chunkCount: snap.size };
+        });
+
+        if (result.ok && result.data) {
+            return { ok: true, ...result.data };
+        } else {
+            const error = !result.ok ? (result as any).error : "Unknown error";
+            return { ok: false, error };
+        }
+    },
+
     // New granular methods
     async getChunkIds(baseRef: any): Promise<string[]> {
         const chunkColl = collection(baseRef, 'chunks');
@@ -125,24 +239,18 @@ export const FirestoreChunkStore = {
         if (!snap.exists()) return null;
         const data = snap.data();
         return {
-            rows: data.rows || [],
+            rows: await decodeChunkRows(data),
             sha256: data.sha256
         };
     },
 
     async writeSingleChunk(baseRef: any, chunkId: string, rows: SnapshotKeywordRow[], index: number): Promise<void> {
         const sanitizedRows = sanitizeForFirestore(rows);
-        const payloadStr = JSON.stringify(sanitizedRows);
+        const payloadStr = stableStringify(sanitizedRows);
         const sha256 = await computeSHA256(payloadStr);
         
         const docRef = doc(baseRef, 'chunks', chunkId);
-        const data = {
-            index: index,
-            row_count: rows.length,
-            rows: sanitizedRows,
-            sha256: sha256,
-            created_at_iso: FirestoreClient.nowIso()
-        };
+        const data = await buildChunkDoc(index, sanitizedRows, sha256);
         await setDoc(docRef, data);
     }
 };
@@ -1,11 +1,50 @@
 
-import { doc, getDoc, writeBatch, setDoc } from 'firebase/firestore';
+import { doc, getDoc, getDocs, writeBatch, setDoc, collection, query, where, documentId } from 'firebase/firestore';
 import { FirestoreClient } from './firestoreClient';
+import { AsyncPool } from './asyncPool';
+import { RuntimeCache } from './runtimeCache';
+import { LruCache } from '../utils/lruCache';
 import { normalizeKeywordString } from '../driftHash';
 import { sanitizeForFirestore } from '../utils/firestoreSanitize';
 import { KeywordVolumeRecord } from '../types';
 
 const COLLECTION = 'keyword_volume_cache';
+const TTL_DAYS = 30;
+// Firestore caps `in` filters at 30 values per query.
+const IN_QUERY_LIMIT = 30;
+const READ_CONCURRENCY = 8;
+const MEMORY_MAX_ENTRIES = 50000;
+const TTL_MS = TTL_DAYS * 24 * 60 * 60 * 1000;
+
+// Session tier in front of Firestore, keyed by getKey(). Entries expire when
+// the backing record would cross the 30-day TTL.
+const memoryTier = new LruCache<KeywordVolumeRecord>(MEMORY_MAX_ENTRIES, TTL_MS);
+const recordExpiry = (rec: KeywordVolumeRecord) => {
+    const fetched = rec.fetched_at_iso ? new Date(rec.fetched_at_iso).getTime() : NaN;
+    return Number.isNaN(fetched) ? undefined : fetched + TTL_MS;
+};
+
+RuntimeCache.subscribe(() => {
+    memoryTier.clear();
+    console.log("[FirestoreVolumeCache] Memory tier cleared via RuntimeCache");
+});
+
+function toVolumeRecord(norm: string, data: any): KeywordVolumeRecord | null {
+    const updated = data.updatedAt ? new Date(data.updatedAt).getTime() : 0;
+    const ageDays = (Date.now() - updated) / (1000 * 60 * 60 * 24);
+
+    // 30 Day TTL
+    if (ageDays >= TTL_DAYS) return null;
+
+    return {
+        keyword_norm: norm,
+        volume: data.volume || 0,
+        cpc: data.cpc || 0,
+        competition: data.competition || 0,
+        fetched_at_iso: data.updatedAt,
+        source: 'CACHE'
+    };
+}
 
 export const FirestoreVolumeCache = {
     getKey(country: string, lang: string, location: number, keyword: string) {
@@ -53,49 +92,77 @@ export const FirestoreVolumeCache = {
         }
     },
 
+    /**
+     * Bulk cache lookup. Keys are served from the in-memory tier first; the
+     * rest are resolved with `documentId() in [...]` queries (30 ids each) run
+     * in parallel, so a whole category comes back in a handful of round trips
+     * instead of one getDoc per keyword. Concurrent callers asking for the same
+     * key share one read.
+     */
     async getMany(keywords: string[], country: string, lang: string, location: number = 2356): Promise<Map<string, KeywordVolumeRecord>> {
         const db = FirestoreClient.getDbSafe();
         if (!db) return new Map();
 
-        const resultMap = new Map<string, KeywordVolumeRecord>();
-        
-        // Parallel fetch limited concurrency
-        const chunkSize = 20;
-        for (let i = 0; i < keywords.length; i += chunkSize) {
-            const batch = keywords.slice(i, i + chunkSize);
-            const promises = batch.map(async (kw) => {
-                const norm = normalizeKeywordString(kw);
-                const key = this.getKey(country, lang, location, kw);
-                try {
-                    const snap = await getDoc(doc(db, COLLECTION, key));
-                    if (snap.exists()) {
-                        const data = snap.data();
-                        const updated = data.updatedAt ? new Date(data.updatedAt).getTime() : 0;
-                        const now = Date.now();
-                        const ageDays = (now - updated) / (1000 * 60 * 60 * 24);
-                        
-                        // 30 Day TTL
-                        if (ageDays < 30) {
-                            resultMap.set(norm, {
-                                keyword_norm: norm,
-                                volume: data.volume || 0,
-                                cpc: data.cpc || 0,
-                                competition: data.competition || 0,
-                                fetched_at_iso: data.updatedAt,
-                                source: 'CACHE'
+        // Dedupe by doc key; several raw keywords may normalize to the same entry.
+        const keyToNorm = new Map<string, string>();
+        for (const kw of keywords) {
+            const key = this.getKey(country, lang, location, kw);
+            if (!keyToNorm.has(key)) keyToNorm.set(key, normalizeKeywordString(kw));
+        }
+
+        const byKey = await memoryTier.loadMany(
+            Array.from(keyToNorm.keys()),
+            async (keys) => {
+                const loaded = new Map<string, KeywordVolumeRecord>();
+                const tasks: (() => Promise<void>)[] = [];
+                for (let i = 0; i < keys.length; i += IN_QUERY_LIMIT) {
+                    const batch = keys.slice(i, i + IN_QUERY_LIMIT);
+                    tasks.push(async () => {
+                        try {
+                            const snap = await getDocs(query(collection(db, COLLECTION), where(documentId(), 'in', batch)));
+                            snap.forEach(d => {
+                                const norm = keyToNorm.get(d.id);
+                                if (!norm) return;
+                                const rec = toVolumeRecord(norm, d.data());
+                                if (rec) loaded.set(d.id, rec);
                             });
+                        } catch (e) {
+                            // Query path unavailable (rules/index); fall back to point reads for this batch
+                            await Promise.all(batch.map(async (key) => {
+                                try {
+                                    const snap = await getDoc(doc(db, COLLECTION, key));
+                                    if (snap.exists()) {
+                                        const rec = toVolumeRecord(keyToNorm.get(key)!, snap.data());
+                                        if (rec) loaded.set(key, rec);
+                                    }
+                                } catch (e) {
+                                    // Ignore read errors
+                                }
+                            }));
                         }
-                    }
-                } catch (e) {
-                    // Ignore read errors
+                    });
                 }
-            });
-            await Promise.all(promises);
-        }
+                await AsyncPool.run(tasks, READ_CONCURRENCY);
+                return loaded;
+            },
+            recordExpiry
+        );
+
+        const resultMap = new Map<string, KeywordVolumeRecord>();
+        byKey.forEach(rec => resultMap.set(rec.keyword_norm, rec));
 
         return resultMap;
     },
 
+    /** Hit/miss/eviction counters for the in-memory tier. */
+    getMemoryStats() {
+        return memoryTier.getStats();
+    },
+
+    clearMemory() {
+        memoryTier.clear();
+    },
+
     async setMany(entries: Array<{keyword: string, volume: number, cpc: number, competition: number, country: string, lang: string, location: number}>): Promise<void> {
         const db = FirestoreClient.getDbSafe();
         if (!db) return;
@@ -125,6 +192,18 @@ export const FirestoreVolumeCache = {
             });
 
             await batch.commit();
+
+            // Write-through so later lookups in this session skip Firestore
+            chunk.forEach(e => {
+                memoryTier.set(this.getKey(e.country, e.lang, e.location, e.keyword), {
+                    keyword_norm: normalizeKeywordString(e.keyword),
+                    volume: e.volume || 0,
+                    cpc: e.cpc || 0,
+                    competition: e.competition || 0,
+                    fetched_at_iso: now,
+                    source: 'CACHE'
+                });
+            });
         }
     }
 };
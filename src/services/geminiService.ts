@@ -1,4 +1,3 @@
-import { GoogleGenAI } from "@google/genai";
 import { 
     CategoryBaseline, Country, AuditLogEntry, TaskStage, ApiResponse, PreSweepData, 
     SweepResult, RunContext, CategorySnapshotDoc, DeepDiveResult, PlaybookResult,
@@ -28,6 +27,11 @@ import { yieldToUI } from '../utils/yield';
 import { HeartbeatController } from './jobHeartbeat';
 import { DemandMetricsRunner } from './demandMetricsRunner';
 import { normalizePlaybookResult, normalizeDeepDiveDTO } from '../utils/reactSafe';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler, LlmRunContext } from './llmScheduler';
+import { DeepDiveStreaming } from './deepDiveStreaming';
+import { MCI_ENABLE_DEEPDIVE_STREAMING } from '../config/featureFlags';
+import { CORE_CATEGORIES } from '../constants';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -55,7 +59,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 function safeParseJSON(input: string): any {
@@ -119,7 +123,8 @@ export async function runPreSweepIntelligence(
   logFn: (log: AuditLogEntry) => void,
   abortSignal: AbortSignal,
   onUpdate?: (stage: TaskStage, progress: number, log?: string) => void,
-  explicitSnapshotId?: string
+  explicitSnapshotId?: string,
+  llm?: LlmRunContext
 ): Promise<{ ok: true; data: PreSweepData } | { ok: false; error: string }> {
     const runId = `STRAT_${Date.now()}`;
     const startTime = Date.now();
@@ -162,6 +167,7 @@ export async function runPreSweepIntelligence(
 
     // 4. Incremental Synthesis Loop
     const heartbeat = new HeartbeatController(runId); 
+    const llmCtx: LlmRunContext = { signal: abortSignal, ...llm };
     
     for (let i = 0; i < chunks.length; i++) {
         if (abortSignal.aborted) throw new Error("Cancelled by user");
@@ -169,7 +175,7 @@ export async function runPreSweepIntelligence(
         const chunk = chunks[i];
         logFn({ timestamp: new Date().toISOString(), stage: 'Strategy', category: category.category, step: 'SYNTH', attempt: 1, status: 'Running', durationMs: 0, message: `Synthesizing Chunk ${i+1}/${chunks.length}...` });
         
-        synthesisState = await ConsumerNeedsSynthesisService.synthesizeChunk(chunk, category.category, synthesisState);
+        synthesisState = await ConsumerNeedsSynthesisService.synthesizeChunk(chunk, category.category, synthesisState, llmCtx);
         
         if (onUpdate) onUpdate('Processing Output', Math.round(((i+1)/chunks.length)*100), `Synthesized chunk ${i+1}`);
         await yieldToUI();
@@ -196,7 +202,7 @@ export async function runPreSweepIntelligence(
 
     // NEW: Enrich Anchor Intelligence with Context (V2.3)
     logFn({ timestamp: new Date().toISOString(), stage: 'Strategy', category: category.category, step: 'ENRICH_ANCHORS', attempt: 1, status: 'Running', durationMs: 0, message: 'Enriching anchor context...' });
-    const enrichedAnchorIntel = await ConsumerNeedsSynthesisService.enrichAnchorIntelligence(anchorIntel, category.category);
+    const enrichedAnchorIntel = await ConsumerNeedsSynthesisService.enrichAnchorIntelligence(anchorIntel, category.category, llmCtx);
 
     // Map to PreSweepData
     const preSweep = mapIncrementalToPreSweep(
@@ -253,7 +259,7 @@ export async function runCategorySweep(
     return { ok: true, data: metrics.result };
 }
 
-export async function runSingleDeepDive(category: string, runId: string, context?: SweepResult, onUpdate?: any): Promise<{ ok: true; data: DeepDiveResult } | { ok: false; error: string }> {
+export async function runSingleDeepDive(category: string, runId: string, context?: SweepResult, onUpdate?: any, llm?: LlmRunContext): Promise<{ ok: true; data: DeepDiveResult } | { ok: false; error: string }> {
     if (!context) return { ok: false, error: 'No demand context' };
 
     // --- METRIC INHERITANCE GUARD ---
@@ -285,14 +291,21 @@ export async function runSingleDeepDive(category: string, runId: string, context
         Ensure "ingredientsAtPlay" and "packagingAndPricing" are top-level arrays in the JSON response or inside 'synthesis'. Preference: Top level.
         `;
 
-        const resp = await ai.models.generateContent({ 
+        const request = { 
             model: THINKING_MODEL, 
             contents: prompt, 
             config: { 
                 responseMimeType: 'application/json', 
                 thinkingConfig: { thinkingBudget: 32768 } 
             } 
-        });
+        };
+        // Legacy callers pass the display name; drafts are keyed by category id like snapshots
+        const categoryId = CORE_CATEGORIES.find(c => c.id === category || c.category === category)?.id || category;
+        // A truncated answer parses to {}; don't keep replaying it from cache
+        const callOpts = { label: 'DEEP_DIVE', ...llm, accept: (text: string) => !!safeParseJSON(text).synthesis };
+        const resp = MCI_ENABLE_DEEPDIVE_STREAMING
+            ? await DeepDiveStreaming.generate(ai, request, { runId, categoryId }, callOpts)
+            : await LlmCallLayer.generate(ai, request, callOpts);
         const raw = safeParseJSON(resp.text || "{}");
         
         // --- STRICT METRIC INHERITANCE ---
@@ -331,7 +344,7 @@ export async function runSingleDeepDive(category: string, runId: string, context
     }
 }
 
-export async function runSinglePlaybook(category: string, deepDive?: DeepDiveResult, onUpdate?: any): Promise<{ ok: true; data: PlaybookResult } | { ok: false; error: string }> {
+export async function runSinglePlaybook(category: string, deepDive?: DeepDiveResult, onUpdate?: any, llm?: LlmRunContext): Promise<{ ok: true; data: PlaybookResult } | { ok: false; error: string }> {
     if (!deepDive) return { ok: false, error: "Deep Dive missing." };
     const ai = getAI();
 
@@ -382,14 +395,14 @@ export async function runSinglePlaybook(category: string, deepDive?: DeepDiveRes
     `;
 
     try {
-        const resp = await ai.models.generateContent({ 
+        const resp = await LlmCallLayer.generate(ai, { 
             model: THINKING_MODEL, 
             contents: prompt, 
             config: { 
                 responseMimeType: 'application/json',
                 thinkingConfig: { thinkingBudget: 32768 }
             } 
-        });
+        }, { label: 'PLAYBOOK', ...llm });
         
         const raw = safeParseJSON(resp.text || "{}");
         
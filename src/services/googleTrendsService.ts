@@ -1,8 +1,9 @@
 
-import { GoogleGenAI } from "@google/genai";
 import { HEAD_TERMS, BRAND_PACKS } from './categoryKeywordGuard';
 import { FirestoreClient } from './firestoreClient';
 import { doc, getDoc, setDoc } from 'firebase/firestore';
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler } from './llmScheduler';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -25,7 +26,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 export interface TrendsResult {
@@ -176,14 +177,14 @@ export const GoogleTrendsService = {
         `;
 
         try {
-            const response = await ai.models.generateContent({
+            const response = await LlmCallLayer.generate(ai, {
                 model: 'gemini-3-flash-preview',
                 contents: prompt,
                 config: { 
                     responseMimeType: 'application/json',
                     tools: [{ googleSearch: {} }] 
                 }
-            });
+            }, { label: 'GOOGLE_TRENDS', ttlMs: 6 * 60 * 60 * 1000 });
 
             const data = JSON.parse(response.text || "{}");
             
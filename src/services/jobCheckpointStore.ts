@@ -10,7 +10,21 @@ export interface StepCheckpoint {
     updatedAt: string;
 }
 
+export interface DagItemCheckpoint {
+    done: string[];                    // Completed stage names
+    state: Record<string, any>;        // Values stages hand to later stages (snapshotId, jobId, ...)
+    halted?: boolean;                  // A stage ended the item early (nothing left to do)
+    failed?: { stage: string; reason: string };
+}
+
+export interface DagCheckpoint {
+    jobId: string;
+    items: Record<string, DagItemCheckpoint>;
+    updatedAt: string;
+}
+
 const CHECKPOINT_PREFIX = 'job_ckpt::';
+const DAG_STEP = '__dag';
 
 export const JobCheckpointStore = {
     getKey(jobId: string, stepName: string): string {
@@ -28,5 +42,31 @@ export const JobCheckpointStore = {
 
     async clearCheckpoint(jobId: string, stepName: string): Promise<void> {
         await StorageAdapter.remove(this.getKey(jobId, stepName));
+    },
+
+    async getDagCheckpoint(jobId: string): Promise<DagCheckpoint | null> {
+        return await StorageAdapter.get<DagCheckpoint>(this.getKey(jobId, DAG_STEP));
+    },
+
+    async saveDagCheckpoint(ckpt: DagCheckpoint): Promise<void> {
+        ckpt.updatedAt = new Date().toISOString();
+        await StorageAdapter.set(this.getKey(ckpt.jobId, DAG_STEP), ckpt);
+    },
+
+    async clearDagCheckpoint(jobId: string): Promise<void> {
+        await StorageAdapter.remove(this.getKey(jobId, DAG_STEP));
+    },
+
+    /** Every stored DAG checkpoint, for resume discovery and cleanup. */
+    async listDagCheckpoints(): Promise<DagCheckpoint[]> {
+        const entries = await StorageAdapter.getByPrefix<DagCheckpoint>(CHECKPOINT_PREFIX);
+        return entries.filter(e => e.key.endsWith(`::${DAG_STEP}`) && e.value?.jobId).map(e => e.value);
+    },
+
+    /** Removes DAG checkpoints the predicate marks stale; returns the cleared job ids. */
+    async clearStaleDagCheckpoints(isStale: (ckpt: DagCheckpoint) => boolean): Promise<string[]> {
+        const stale = (await this.listDagCheckpoints()).filter(isStale).map(c => c.jobId);
+        for (const jobId of stale) await this.clearDagCheckpoint(jobId);
+        return stale;
     }
 };
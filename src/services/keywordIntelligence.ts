@@ -1,7 +1,8 @@
 
-import { GoogleGenAI } from "@google/genai";
 import { AnchorIntelligence } from "../contracts/strategyContract";
 import { normalizeKeywordString } from "../../driftHash";
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler } from './llmScheduler';
 
 // Safe env access
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
@@ -25,7 +26,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 // Rule-based intent mapping
@@ -144,11 +145,11 @@ export const KeywordIntelligence = {
                 Do not invent facts. Use only the keyword evidence.
             `;
 
-            const resp = await ai.models.generateContent({
+            const resp = await LlmCallLayer.generate(ai, {
                 model: 'gemini-2.5-flash-lite',
                 contents: prompt,
                 config: { responseMimeType: 'application/json' }
-            });
+            }, { label: 'KEYWORD_INTEL' });
 
             const json = JSON.parse(resp.text || "{}");
             if (json.problemStatements && Array.isArray(json.problemStatements)) {
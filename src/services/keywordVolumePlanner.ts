@@ -0,0 +1,234 @@
+import { DataForSeoClient, DataForSeoRow } from './demand_vNext/dataforseoClient';
+import { expandKeywords } from './keywordExpansionEngine';
+import { RuntimeCache } from './runtimeCache';
+import { normalizeKeywordString } from '../driftHash';
+import { LruCache } from '../utils/lruCache';
+import { MCI_ENABLE_DFS_BULK_TASKS } from '../config/featureFlags';
+
+/**
+ * KEYWORD VOLUME PLANNER
+ * Session-wide de-duplication of DFS Google volume requests. Categories share
+ * many brands and heads ("nivea men", "perfume", ...); every unique normalized
+ * keyword is fetched once and the row is fanned back out to each requester.
+ * A `null` entry records that DFS was asked and returned no row.
+ */
+
+const DFS_BATCH = 700;
+const MAX_ENTRIES = 100000;
+const TTL_MS = 6 * 60 * 60 * 1000; // One working session
+
+const rowsTier = new LruCache<DataForSeoRow | null>(MAX_ENTRIES, TTL_MS);
+
+RuntimeCache.subscribe(() => {
+    rowsTier.clear();
+    console.log("[VOLUME_PLANNER] Cache cleared via RuntimeCache");
+});
+
+const stats = {
+    requested: 0,
+    fetched: 0,
+    reused: 0,
+};
+
+type Creds = { login: string; password: string };
+
+export interface VolumePlanResult {
+    ok: boolean;
+    rows: DataForSeoRow[];
+    fetched: number;
+    reused: number;
+    error?: string;
+}
+
+export interface BulkVolumePlanSummary {
+    categories: number;
+    requested: number;
+    unique: number;
+    fetched: number;
+    sharedKeywords: number;
+    requestersByCategory: Record<string, number>;
+}
+
+const planKey = (location: number, language: string, norm: string) => `${location}__${language}__${norm}`;
+
+export const KeywordVolumePlanner = {
+
+    /**
+     * Returns DFS rows for `keywords`, fetching only normalized keywords that no
+     * earlier (or concurrent) caller has already requested. Concurrent calls for
+     * overlapping keywords share one upstream request.
+     */
+    async resolve(params: {
+        keywords: string[];
+        creds: Creds;
+        location?: number;
+        language?: string;
+        jobId?: string;
+        categoryId?: string;
+    }): Promise<VolumePlanResult> {
+        const location = params.location ?? 2356;
+        const language = params.language ?? 'en';
+
+        const keyToKeyword = new Map<string, string>();
+        for (const kw of params.keywords) {
+            const key = planKey(location, language, normalizeKeywordString(kw));
+            if (!keyToKeyword.has(key)) keyToKeyword.set(key, kw);
+        }
+
+        let fetched = 0;
+        let error: string | undefined;
+        const loadedHere = new Set<string>();
+
+        const byKey = await rowsTier.loadMany(Array.from(keyToKeyword.keys()), async (missing) => {
+            missing.forEach(k => loadedHere.add(k));
+            const loaded = new Map<string, DataForSeoRow | null>();
+            for (let i = 0; i < missing.length; i += DFS_BATCH) {
+                const batchKeys = missing.slice(i, i + DFS_BATCH);
+                const res = await DataForSeoClient.fetchGoogleVolumes_DFS({
+                    keywords: batchKeys.map(k => keyToKeyword.get(k)!),
+                    location,
+                    language,
+                    creds: params.creds,
+                    useProxy: true,
+                    jobId: params.jobId,
+                    categoryId: params.categoryId
+                });
+                if (!res.ok || !res.parsedRows) {
+                    // Leave failed keys uncached so a later call retries them
+                    error = res.error || 'DFS_FETCH_FAILED';
+                    continue;
+                }
+                fetched += batchKeys.length;
+                this._storeRows(batchKeys, res.parsedRows, location, language, loaded);
+            }
+            return loaded;
+        });
+
+        // Cache hits and keys another caller had in flight; failed keys are neither
+        let reused = 0;
+        byKey.forEach((_, key) => { if (!loadedHere.has(key)) reused++; });
+        stats.requested += keyToKeyword.size;
+        stats.fetched += fetched;
+        stats.reused += reused;
+
+        const rows: DataForSeoRow[] = [];
+        byKey.forEach(row => { if (row) rows.push(row); });
+
+        console.log(`[VOLUME_PLANNER] category=${params.categoryId || 'unknown'} requested=${keyToKeyword.size} fetched=${fetched} reused=${reused}`);
+        return { ok: !error || rows.length > 0, rows, fetched, reused, error };
+    },
+
+    /**
+     * Pre-fetches the union of the categories' expansion candidates before a
+     * bulk run, so per-category growth passes resolve from memory. Only the
+     * first `perCategoryLimit` candidates per category are taken (default: the
+     * one 700-keyword batch a growth pass sends); later passes fetch on demand.
+     */
+    async planBulk(categoryIds: string[], params: {
+        creds: Creds;
+        location?: number;
+        language?: string;
+        jobId?: string;
+        signal?: AbortSignal;
+        perCategoryLimit?: number;
+    }): Promise<BulkVolumePlanSummary> {
+        const location = params.location ?? 2356;
+        const language = params.language ?? 'en';
+        const perCategoryLimit = params.perCategoryLimit ?? DFS_BATCH;
+
+        const requesters = new Map<string, Set<string>>();
+        const keywordByNorm = new Map<string, string>();
+        const requestersByCategory: Record<string, number> = {};
+        let requested = 0;
+
+        for (const categoryId of categoryIds) {
+            const candidates = expandKeywords(categoryId).slice(0, perCategoryLimit);
+            requestersByCategory[categoryId] = candidates.length;
+            requested += candidates.length;
+            for (const kw of candidates) {
+                const norm = normalizeKeywordString(kw);
+                if (!norm) continue;
+                if (!keywordByNorm.has(norm)) keywordByNorm.set(norm, kw);
+                let set = requesters.get(norm);
+                if (!set) requesters.set(norm, set = new Set());
+                set.add(categoryId);
+            }
+        }
+
+        let sharedKeywords = 0;
+        requesters.forEach(set => { if (set.size > 1) sharedKeywords++; });
+
+        console.log(`[VOLUME_PLANNER][BULK] categories=${categoryIds.length} requested=${requested} unique=${keywordByNorm.size} shared=${sharedKeywords}`);
+
+        const unique = Array.from(keywordByNorm.values());
+        let fetched = 0;
+
+        if (MCI_ENABLE_DFS_BULK_TASKS) {
+            const pending = unique.filter(kw => rowsTier.get(planKey(location, language, normalizeKeywordString(kw))) === undefined);
+            const stream = DataForSeoClient.fetchGoogleVolumesBulk_DFS({
+                keywords: pending,
+                location,
+                language,
+                creds: params.creds,
+                signal: params.signal,
+                jobId: params.jobId,
+                categoryId: 'BULK_PLAN'
+            });
+            for await (const task of stream) {
+                if (!task.ok) continue;
+                const keys = task.keywords.map(kw => planKey(location, language, normalizeKeywordString(kw)));
+                const loaded = new Map<string, DataForSeoRow | null>();
+                this._storeRows(keys, task.rows, location, language, loaded);
+                loaded.forEach((row, key) => rowsTier.set(key, row));
+                fetched += task.keywords.length;
+            }
+            stats.requested += unique.length;
+            stats.fetched += fetched;
+            stats.reused += unique.length - pending.length;
+        } else {
+            for (let i = 0; i < unique.length; i += DFS_BATCH) {
+                if (params.signal?.aborted) throw new Error("ABORTED");
+                const res = await this.resolve({
+                    keywords: unique.slice(i, i + DFS_BATCH),
+                    creds: params.creds,
+                    location,
+                    language,
+                    jobId: params.jobId,
+                    categoryId: 'BULK_PLAN'
+                });
+                fetched += res.fetched;
+            }
+        }
+
+        return {
+            categories: categoryIds.length,
+            requested,
+            unique: keywordByNorm.size,
+            fetched,
+            sharedKeywords,
+            requestersByCategory
+        };
+    },
+
+    _storeRows(keys: string[], parsedRows: DataForSeoRow[], location: number, language: string, out: Map<string, DataForSeoRow | null>) {
+        for (const row of parsedRows) {
+            const key = planKey(location, language, normalizeKeywordString(row.keyword));
+            out.set(key, row);
+        }
+        // Asked but absent from the response: remember so no category re-asks
+        for (const key of keys) {
+            if (!out.has(key)) out.set(key, null);
+        }
+    },
+
+    getStats() {
+        return { ...stats, cache: rowsTier.getStats() };
+    },
+
+    clear() {
+        rowsTier.clear();
+        stats.requested = 0;
+        stats.fetched = 0;
+        stats.reused = 0;
+    }
+};
@@ -0,0 +1,320 @@
+import { GoogleGenAI } from "@google/genai";
+import { StorageAdapter } from './storageAdapter';
+import { stableStringify } from './contract';
+import { LruCache } from '../utils/lruCache';
+import { LlmScheduler, LlmRunContext } from './llmScheduler';
+
+/**
+ * LLM CALL LAYER
+ * Shared entry point for text `generateContent` calls. Prompts built from
+ * snapshot data are deterministic, so responses are cached by
+ * sha256(model, contents, config): an in-memory LRU in front of a persistent
+ * (IndexedDB) tier with TTL and size-bounded eviction. Misses go upstream
+ * through LlmScheduler in the caller's lane. Callers that parse or validate
+ * the text pass `accept` so only usable responses are stored.
+ */
+
+export interface LlmRequest {
+    model: string;
+    contents: any;
+    config?: Record<string, any>;
+}
+
+export interface LlmResponse {
+    text: string;
+    cached: boolean;
+    latencyMs: number;
+}
+
+export interface LlmCallOptions extends LlmRunContext {
+    label?: string;      // Log tag of the calling service
+    ttlMs?: number;      // Default DEFAULT_TTL_MS
+    /**
+     * Only responses this returns true for are cached, e.g. the text parses and
+     * passes the caller's checks. A truncated or rejected answer is then
+     * regenerated on the next run instead of replayed for the whole TTL.
+     * Cached entries that fail it are dropped and count as misses.
+     */
+    accept?: (text: string) => boolean;
+    // Streams the response (generateContentStream); a cache hit arrives as one delta
+    onText?: (delta: string) => void;
+}
+
+interface CachedLlmEntry {
+    text: string;
+    model: string;
+    latencyMs: number;   // What the original call cost; counted as saved on each hit
+    createdAt: number;
+    expiresAt: number;
+}
+
+// [bytes, lastUsedAt, expiresAt]
+type IndexEntry = [number, number, number];
+
+const STORE = StorageAdapter.STORES.LLM_CACHE;
+const INDEX_KEY = '__index';
+const DEFAULT_TTL_MS = 7 * 24 * 60 * 60 * 1000;
+const MAX_PERSISTED_ENTRIES = 1500;
+const MAX_PERSISTED_BYTES = 25 * 1024 * 1024;
+const MEMORY_ENTRIES = 300;
+const INDEX_FLUSH_DELAY_MS = 2000;
+const STATS_LOG_INTERVAL_MS = 60 * 1000;
+
+// Fields that don't change the model output
+const NON_SEMANTIC_CONFIG_KEYS = new Set(['abortSignal', 'httpOptions']);
+
+const memoryTier = new LruCache<CachedLlmEntry>(MEMORY_ENTRIES, DEFAULT_TTL_MS);
+
+const stats = {
+    calls: 0,
+    hits: 0,
+    memoryHits: 0,
+    misses: 0,
+    stores: 0,
+    evictions: 0,
+    savedLatencyMs: 0,
+    upstreamLatencyMs: 0
+};
+
+let lastStatsLogAt = Date.now();
+let indexPromise: Promise<Map<string, IndexEntry>> | null = null;
+let indexFlushTimer: ReturnType<typeof setTimeout> | null = null;
+
+async function sha256Hex(text: string): Promise<string> {
+    const hashBuffer = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(hashBuffer)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function cacheKeyInput(req: LlmRequest): string {
+    const config: Record<string, any> = {};
+    Object.keys(req.config || {}).forEach(k => {
+        if (!NON_SEMANTIC_CONFIG_KEYS.has(k)) config[k] = req.config![k];
+    });
+    return stableStringify({ model: req.model, contents: req.contents, config });
+}
+
+function loadIndex(): Promise<Map<string, IndexEntry>> {
+    if (!indexPromise) {
+        indexPromise = StorageAdapter.get<Array<[string, IndexEntry]>>(INDEX_KEY, STORE)
+            .then(saved => new Map(saved || []))
+            .catch(() => new Map<string, IndexEntry>());
+    }
+    return indexPromise;
+}
+
+function scheduleIndexFlush(index: Map<string, IndexEntry>) {
+    if (indexFlushTimer) return;
+    indexFlushTimer = setTimeout(() => {
+        indexFlushTimer = null;
+        StorageAdapter.set(INDEX_KEY, Array.from(index.entries()), STORE).catch(() => {});
+    }, INDEX_FLUSH_DELAY_MS);
+}
+
+/** Drops expired entries, then least recently used ones until under both bounds. */
+async function enforceBounds(index: Map<string, IndexEntry>) {
+    const now = Date.now();
+    const doomed: string[] = [];
+    let bytes = 0;
+    index.forEach(([size, , expiresAt], key) => {
+        if (expiresAt <= now) doomed.push(key);
+        else bytes += size;
+    });
+    doomed.forEach(k => index.delete(k));
+
+    if (index.size > MAX_PERSISTED_ENTRIES || bytes > MAX_PERSISTED_BYTES) {
+        const byAge = Array.from(index.entries()).sort((a, b) => a[1][1] - b[1][1]);
+        for (const [key, [size]] of byAge) {
+            if (index.size <= MAX_PERSISTED_ENTRIES && bytes <= MAX_PERSISTED_BYTES) break;
+            index.delete(key);
+            bytes -= size;
+            doomed.push(key);
+            stats.evictions++;
+        }
+    }
+
+    await Promise.all(doomed.map(k => StorageAdapter.remove(k, STORE)));
+}
+
+async function readCache(key: string): Promise<CachedLlmEntry | null> {
+    const mem = memoryTier.get(key);
+    if (mem) {
+        stats.memoryHits++;
+        return mem;
+    }
+    const index = await loadIndex();
+    const meta = index.get(key);
+    if (!meta) return null;
+    if (meta[2] <= Date.now()) {
+        index.delete(key);
+        await StorageAdapter.remove(key, STORE);
+        scheduleIndexFlush(index);
+        return null;
+    }
+    const entry = await StorageAdapter.get<CachedLlmEntry>(key, STORE);
+    if (!entry) {
+        index.delete(key);
+        scheduleIndexFlush(index);
+        return null;
+    }
+    meta[1] = Date.now();
+    scheduleIndexFlush(index);
+    memoryTier.set(key, entry, entry.expiresAt);
+    return entry;
+}
+
+async function dropCache(key: string) {
+    memoryTier.delete(key);
+    const index = await loadIndex();
+    index.delete(key);
+    await StorageAdapter.remove(key, STORE);
+    scheduleIndexFlush(index);
+}
+
+function accepted(text: string, opts: LlmCallOptions): boolean {
+    if (!text) return false;
+    if (!opts.accept) return true;
+    try {
+        return opts.accept(text);
+    } catch {
+        return false;
+    }
+}
+
+async function writeCache(key: string, entry: CachedLlmEntry) {
+    memoryTier.set(key, entry, entry.expiresAt);
+    const index = await loadIndex();
+    await StorageAdapter.set(key, entry, STORE);
+    index.set(key, [entry.text.length * 2, Date.now(), entry.expiresAt]);
+    stats.stores++;
+    await enforceBounds(index);
+    scheduleIndexFlush(index);
+}
+
+// Aggregate telemetry alongside the scheduler's queue state, at most once per interval
+function maybeLogStats() {
+    if (Date.now() - lastStatsLogAt < STATS_LOG_INTERVAL_MS) return;
+    LlmCallLayer.logStats();
+}
+
+/**
+ * Collects a streamed response, forwarding each delta. Once text has been
+ * delivered a failure is not retried, since the consumer has already acted on it.
+ */
+async function streamText(ai: GoogleGenAI, req: LlmRequest, onText: (delta: string) => void) {
+    let text = '';
+    let usageMetadata: any;
+    try {
+        const stream = await ai.models.generateContentStream(req as any);
+        for await (const chunk of stream) {
+            const delta = chunk.text || '';
+            if (chunk.usageMetadata) usageMetadata = chunk.usageMetadata;
+            if (!delta) continue;
+            text += delta;
+            onText(delta);
+        }
+    } catch (e: any) {
+        if (text && e && typeof e === 'object') e.retryable = false;
+        throw e;
+    }
+    return { text, usageMetadata };
+}
+
+export const LlmCallLayer = {
+
+    /**
+     * `ai.models.generateContent` for text responses, served from cache when
+     * the same model/prompt/config was answered within the TTL. With
+     * `opts.onText` the call streams and text is delivered as it arrives.
+     */
+    async generate(ai: GoogleGenAI, req: LlmRequest, opts: LlmCallOptions = {}): Promise<LlmResponse> {
+        const label = opts.label || 'LLM';
+        const useCache = opts.cache !== false;
+        stats.calls++;
+
+        const key = useCache ? await sha256Hex(cacheKeyInput(req)) : '';
+
+        if (useCache) {
+            try {
+                const lookupStart = Date.now();
+                let hit = await readCache(key);
+                if (hit && !accepted(hit.text, opts)) {
+                    console.warn(`[LLM_CACHE][REJECT] label=${label} model=${req.model} key=${key.slice(0, 12)}`);
+                    await dropCache(key);
+                    hit = null;
+                }
+                if (hit) {
+                    const saved = Math.max(0, hit.latencyMs - (Date.now() - lookupStart));
+                    stats.hits++;
+                    stats.savedLatencyMs += saved;
+                    console.log(`[LLM_CACHE][HIT] label=${label} model=${req.model} key=${key.slice(0, 12)} saved_ms=${saved}`);
+                    opts.onText?.(hit.text);
+                    maybeLogStats();
+                    return { text: hit.text, cached: true, latencyMs: Date.now() - lookupStart };
+                }
+            } catch (e: any) {
+                // Cache trouble must never block the call
+                console.warn(`[LLM_CACHE][READ_FAIL] label=${label} reason=${String(e?.message || e)}`);
+            }
+            stats.misses++;
+        }
+
+        let latencyMs = 0;
+        const resp = await LlmScheduler.submit(async signal => {
+            const start = Date.now();
+            const config = signal ? { ...req.config, abortSignal: signal } : req.config;
+            const r = opts.onText
+                ? await streamText(ai, { ...req, config }, opts.onText)
+                : await ai.models.generateContent({ ...req, config } as any);
+            latencyMs = Date.now() - start;
+            return r;
+        }, {
+            model: req.model,
+            estimatedTokens: LlmScheduler.estimateTokens(req.contents, req.config),
+            label,
+            lane: opts.lane,
+            signal: opts.signal,
+            cancelToken: opts.cancelToken
+        });
+        const text = resp.text || '';
+        stats.upstreamLatencyMs += latencyMs;
+
+        if (useCache && accepted(text, opts)) {
+            const now = Date.now();
+            writeCache(key, {
+                text,
+                model: req.model,
+                latencyMs,
+                createdAt: now,
+                expiresAt: now + (opts.ttlMs ?? DEFAULT_TTL_MS)
+            }).catch((e: any) => console.warn(`[LLM_CACHE][WRITE_FAIL] label=${label} reason=${String(e?.message || e)}`));
+        }
+
+        console.log(`[LLM_CACHE][MISS] label=${label} model=${req.model} latency_ms=${latencyMs}`);
+        maybeLogStats();
+        return { text, cached: false, latencyMs };
+    },
+
+    getStats() {
+        const lookups = stats.hits + stats.misses;
+        return {
+            ...stats,
+            hitRate: lookups > 0 ? Number((stats.hits / lookups).toFixed(3)) : 0,
+            memory: memoryTier.getStats()
+        };
+    },
+
+    logStats() {
+        lastStatsLogAt = Date.now();
+        const s = LlmCallLayer.getStats();
+        const sched = LlmScheduler.getStats();
+        console.log(`[LLM_CACHE][STATS] calls=${s.calls} hits=${s.hits} memory_hits=${s.memoryHits} misses=${s.misses} hit_rate=${s.hitRate} saved_ms=${s.savedLatencyMs} upstream_ms=${s.upstreamLatencyMs} stores=${s.stores} evictions=${s.evictions} memory_size=${s.memory.size} queued=${sched.queued}`);
+    },
+
+    async clear() {
+        if (indexFlushTimer) clearTimeout(indexFlushTimer);
+        indexFlushTimer = null;
+        memoryTier.clear();
+        indexPromise = Promise.resolve(new Map());
+        await StorageAdapter.clear(STORE);
+    }
+};
@@ -0,0 +1,334 @@
+import { GoogleGenAI } from "@google/genai";
+import { CancelToken } from './cancelToken';
+import { MCI_LLM_MODEL_CONCURRENCY, MCI_LLM_TPM_BUDGET } from '../config/featureFlags';
+
+/**
+ * LLM SCHEDULER
+ * Every upstream Gemini call is queued here. Jobs are dispatched by lane
+ * priority (interactive > pipeline > background, FIFO within a lane) subject
+ * to per-model concurrency and a rolling tokens-per-minute budget. 429/503
+ * responses are retried with jittered backoff and pause the model for
+ * everyone, as DfsGlobalLimiter does for DataForSEO lanes.
+ */
+
+export type LlmLane = 'interactive' | 'pipeline' | 'background';
+
+/** How a caller's LLM work should be scheduled; threaded down from runners. */
+export interface LlmRunContext {
+    lane?: LlmLane;
+    signal?: AbortSignal;
+    cancelToken?: CancelToken;
+    cache?: boolean;     // LlmCallLayer response cache (default true); false forces a fresh generation
+}
+
+export interface LlmSubmitOptions extends LlmRunContext {
+    model: string;
+    estimatedTokens: number;
+    label?: string;
+}
+
+interface ModelLimits {
+    maxConcurrent: number;
+    tokensPerMinute: number;
+}
+
+interface WindowEntry {
+    ts: number;
+    tokens: number;
+}
+
+interface ModelState {
+    limits: ModelLimits;
+    inFlight: number;
+    window: WindowEntry[];
+    cooldownUntil: number;
+}
+
+interface QueuedJob {
+    seq: number;
+    lane: LlmLane;
+    model: string;
+    label: string;
+    estimatedTokens: number;
+    attempt: number;
+    signal?: AbortSignal;
+    run: (usage: WindowEntry) => void;
+}
+
+const LANE_PRIORITY: Record<LlmLane, number> = { interactive: 0, pipeline: 1, background: 2 };
+const WINDOW_MS = 60000;
+const MAX_RETRIES = 4;
+const BASE_BACKOFF_MS = 1500;
+const MAX_BACKOFF_MS = 30000;
+
+const models = new Map<string, ModelState>();
+const queue: QueuedJob[] = [];
+let seqCounter = 0;
+let pumpTimer: ReturnType<typeof setTimeout> | null = null;
+
+const stats = {
+    submitted: 0,
+    completed: 0,
+    failed: 0,
+    retried: 0,
+    cancelled: 0,
+    queueWaitMs: 0
+};
+
+const sleep = (ms: number, signal?: AbortSignal) => new Promise<void>((resolve, reject) => {
+    if (signal?.aborted) return reject(cancelledError(signal));
+    const t = setTimeout(() => {
+        signal?.removeEventListener('abort', onAbort);
+        resolve();
+    }, ms);
+    const onAbort = () => {
+        clearTimeout(t);
+        reject(cancelledError(signal!));
+    };
+    signal?.addEventListener('abort', onAbort, { once: true });
+});
+
+function cancelledError(signal: AbortSignal): Error {
+    const reason = signal.reason;
+    if (reason instanceof Error && reason.message.startsWith('CANCELLED')) return reason;
+    return new Error(`CANCELLED: ${reason instanceof Error ? reason.message : String(reason ?? 'Aborted')}`);
+}
+
+function limitsFor(model: string): ModelLimits {
+    const base = Math.max(1, MCI_LLM_MODEL_CONCURRENCY);
+    return {
+        maxConcurrent: model.includes('-pro') ? Math.max(1, Math.ceil(base / 2)) : base,
+        tokensPerMinute: MCI_LLM_TPM_BUDGET
+    };
+}
+
+function stateFor(model: string): ModelState {
+    let s = models.get(model);
+    if (!s) {
+        s = { limits: limitsFor(model), inFlight: 0, window: [], cooldownUntil: 0 };
+        models.set(model, s);
+    }
+    return s;
+}
+
+function tokensInWindow(s: ModelState, now: number): number {
+    while (s.window.length > 0 && s.window[0].ts <= now - WINDOW_MS) s.window.shift();
+    return s.window.reduce((sum, e) => sum + e.tokens, 0);
+}
+
+/**
+ * Returns 0 when the job can start now, otherwise the ms until it might.
+ * Infinity means it waits for a slot to be released.
+ */
+function blockedFor(job: QueuedJob, s: ModelState, now: number): number {
+    if (now < s.cooldownUntil) return s.cooldownUntil - now;
+
+    // Keep one slot per model free for interactive calls
+    const cap = job.lane === 'interactive' || s.limits.maxConcurrent === 1
+        ? s.limits.maxConcurrent
+        : s.limits.maxConcurrent - 1;
+    if (s.inFlight >= cap) return Infinity;
+
+    const used = tokensInWindow(s, now);
+    // An oversized request still runs once the window is empty
+    if (used > 0 && used + job.estimatedTokens > s.limits.tokensPerMinute) {
+        return s.window[0].ts + WINDOW_MS - now;
+    }
+    return 0;
+}
+
+function pump() {
+    if (pumpTimer) {
+        clearTimeout(pumpTimer);
+        pumpTimer = null;
+    }
+    const now = Date.now();
+    let nextWake = Infinity;
+
+    queue.sort((a, b) => LANE_PRIORITY[a.lane] - LANE_PRIORITY[b.lane] || a.seq - b.seq);
+
+    // Once a job is held back, later jobs for the same model must not overtake it
+    const held = new Set<string>();
+    for (let i = 0; i < queue.length;) {
+        const job = queue[i];
+        const s = stateFor(job.model);
+        const wait = held.has(job.model) ? Infinity : blockedFor(job, s, now);
+        if (wait > 0) {
+            held.add(job.model);
+            nextWake = Math.min(nextWake, wait);
+            i++;
+            continue;
+        }
+        queue.splice(i, 1);
+        const usage = { ts: now, tokens: job.estimatedTokens };
+        s.inFlight++;
+        s.window.push(usage);
+        job.run(usage);
+    }
+
+    if (nextWake !== Infinity && queue.length > 0) {
+        pumpTimer = setTimeout(pump, Math.max(10, nextWake));
+    }
+}
+
+/** Pulls the real token count off a generateContent response when there is one. */
+function reportedTokens(result: any): number | undefined {
+    const n = result?.usageMetadata?.totalTokenCount;
+    return typeof n === 'number' && n > 0 ? n : undefined;
+}
+
+function isRetryable(e: any): boolean {
+    if (e?.retryable === false) return false;
+    const status = Number(e?.status ?? e?.code);
+    if (status === 429 || status === 503) return true;
+    const msg = String(e?.message || '');
+    return /\b(429|503)\b|RESOURCE_EXHAUSTED|UNAVAILABLE|overloaded/i.test(msg);
+}
+
+function backoffMs(attempt: number): number {
+    const exp = Math.min(MAX_BACKOFF_MS, BASE_BACKOFF_MS * Math.pow(2, attempt - 1));
+    // Jitter spreads out the retries from a burst of 429s
+    return Math.round(exp / 2 + Math.random() * exp / 2);
+}
+
+function combineSignals(ctx: LlmRunContext): AbortSignal | undefined {
+    const signals = [ctx.signal, ctx.cancelToken?.signal].filter((s): s is AbortSignal => !!s);
+    if (signals.length <= 1) return signals[0];
+    const controller = new AbortController();
+    for (const s of signals) {
+        if (s.aborted) {
+            controller.abort(s.reason);
+            break;
+        }
+        s.addEventListener('abort', () => controller.abort(s.reason), { once: true });
+    }
+    return controller.signal;
+}
+
+/** Queues the job; resolves with its token-window entry once it holds a slot. */
+function waitForSlot(job: Omit<QueuedJob, 'run'>): Promise<WindowEntry> {
+    return new Promise<WindowEntry>((resolve, reject) => {
+        const signal = job.signal;
+        if (signal?.aborted) return reject(cancelledError(signal));
+
+        const onAbort = () => {
+            const idx = queue.indexOf(queued);
+            if (idx >= 0) queue.splice(idx, 1);
+            reject(cancelledError(signal!));
+        };
+        const queued: QueuedJob = {
+            ...job,
+            run: usage => {
+                signal?.removeEventListener('abort', onAbort);
+                resolve(usage);
+            }
+        };
+        signal?.addEventListener('abort', onAbort, { once: true });
+        queue.push(queued);
+        pump();
+    });
+}
+
+let sharedClient: { apiKey: string; ai: GoogleGenAI } | null = null;
+
+export const LlmScheduler = {
+
+    /**
+     * Runs `fn` once the scheduler grants a slot for `model` in the caller's
+     * lane. `fn` receives the combined abort signal to hand to the SDK.
+     */
+    async submit<T>(fn: (signal?: AbortSignal) => Promise<T>, opts: LlmSubmitOptions): Promise<T> {
+        const lane = opts.lane || 'interactive';
+        const label = opts.label || 'LLM';
+        const signal = combineSignals(opts);
+        const seq = seqCounter++;
+        stats.submitted++;
+
+        let attempt = 1;
+        while (true) {
+            const enqueuedAt = Date.now();
+            let usage: WindowEntry;
+            try {
+                usage = await waitForSlot({ seq, lane, model: opts.model, label, estimatedTokens: opts.estimatedTokens, attempt, signal });
+            } catch (e) {
+                stats.cancelled++;
+                throw e;
+            }
+            const waited = Date.now() - enqueuedAt;
+            stats.queueWaitMs += waited;
+            if (waited > 1000) {
+                console.log(`[LLM_SCHED][WAIT] label=${label} lane=${lane} model=${opts.model} attempt=${attempt} wait_ms=${waited}`);
+            }
+
+            const s = stateFor(opts.model);
+            let retryDelay = 0;
+            try {
+                const result = await fn(signal);
+                const actual = reportedTokens(result);
+                if (actual !== undefined) usage.tokens = actual;
+                stats.completed++;
+                return result;
+            } catch (e: any) {
+                if (signal?.aborted) {
+                    stats.cancelled++;
+                    throw cancelledError(signal);
+                }
+                if (!isRetryable(e) || attempt >= MAX_RETRIES) {
+                    stats.failed++;
+                    throw e;
+                }
+                retryDelay = backoffMs(attempt);
+                s.cooldownUntil = Math.max(s.cooldownUntil, Date.now() + retryDelay);
+                stats.retried++;
+                console.warn(`[LLM_SCHED][BACKOFF] label=${label} lane=${lane} model=${opts.model} attempt=${attempt} sleep_ms=${retryDelay} reason=${String(e?.status ?? e?.message ?? e).slice(0, 80)}`);
+            } finally {
+                // Free the slot before sleeping so other lanes keep moving
+                s.inFlight--;
+                pump();
+            }
+
+            try {
+                await sleep(retryDelay, signal);
+            } catch (e) {
+                stats.cancelled++;
+                throw e;
+            }
+            attempt++;
+        }
+    },
+
+    /** Rough prompt size in tokens (~4 chars each) plus an allowance for output. */
+    estimateTokens(contents: any, config?: Record<string, any>): number {
+        const text = typeof contents === 'string' ? contents : JSON.stringify(contents ?? '');
+        const output = config?.maxOutputTokens ?? 4096;
+        const thinking = config?.thinkingConfig?.thinkingBudget ?? 0;
+        return Math.ceil(text.length / 4) + output + thinking;
+    },
+
+    /** Shared client so services stop constructing one per call. */
+    getClient(apiKey: string): GoogleGenAI {
+        if (!sharedClient || sharedClient.apiKey !== apiKey) {
+            sharedClient = { apiKey, ai: new GoogleGenAI({ apiKey }) };
+        }
+        return sharedClient.ai;
+    },
+
+    getStats() {
+        const now = Date.now();
+        const byLane: Record<LlmLane, number> = { interactive: 0, pipeline: 0, background: 0 };
+        queue.forEach(j => byLane[j.lane]++);
+        return {
+            ...stats,
+            queued: queue.length,
+            queuedByLane: byLane,
+            models: Array.from(models.entries()).map(([model, s]) => ({
+                model,
+                inFlight: s.inFlight,
+                maxConcurrent: s.limits.maxConcurrent,
+                tokensLastMinute: tokensInWindow(s, now),
+                tokensPerMinute: s.limits.tokensPerMinute,
+                cooldownMs: Math.max(0, s.cooldownUntil - now)
+            }))
+        };
+    }
+};
@@ -21,15 +21,14 @@ export const MasterCsvStore = {
     },
 
     async saveRecords(records: MasterCsvRecord[]): Promise<void> {
-        // In IDB adapter, we loop. In better implementation, transaction.
-        const promises = records.map(r => 
-            StorageAdapter.set(
-                this.getKey(r.categoryId, r.operatingMonth, r.keywordNormalized),
-                r,
-                STORE_NAME
-            )
+        // Single transaction for the whole batch
+        await StorageAdapter.setMany(
+            records.map(r => ({
+                key: this.getKey(r.categoryId, r.operatingMonth, r.keywordNormalized),
+                value: r
+            })),
+            STORE_NAME
         );
-        await Promise.all(promises);
     },
 
     async getRecord(categoryId: string, operatingMonth: string, keywordNormalized: string): Promise<MasterCsvRecord | null> {
@@ -41,28 +40,14 @@ export const MasterCsvStore = {
 
     /**
      * Efficiently retrieves all records for a category/month.
-     * Note: This assumes StorageAdapter.getAllKeys works for this store.
+     * Keys are `category::month::keyword`, so this is one key-range scan.
      */
     async getCategoryRecords(categoryId: string, operatingMonth: string): Promise<MasterCsvRecord[]> {
-        const allKeys = await StorageAdapter.getAllKeys(STORE_NAME);
-        const prefix = `${categoryId}::${operatingMonth}::`;
-        const matching = allKeys.filter(k => k.startsWith(prefix));
-        
-        const records: MasterCsvRecord[] = [];
-        // Batch fetch
-        const BATCH = 50;
-        for (let i = 0; i < matching.length; i += BATCH) {
-            const batchKeys = matching.slice(i, i + BATCH);
-            const batch = await Promise.all(batchKeys.map(k => StorageAdapter.get<MasterCsvRecord>(k, STORE_NAME)));
-            batch.forEach(r => { if(r) records.push(r); });
-        }
-        return records;
+        const entries = await StorageAdapter.getByPrefix<MasterCsvRecord>(`${categoryId}::${operatingMonth}::`, STORE_NAME);
+        return entries.map(e => e.value).filter(Boolean);
     },
 
     async clearCategory(categoryId: string, operatingMonth: string): Promise<void> {
-        const allKeys = await StorageAdapter.getAllKeys(STORE_NAME);
-        const prefix = `${categoryId}::${operatingMonth}::`;
-        const matching = allKeys.filter(k => k.startsWith(prefix));
-        await Promise.all(matching.map(k => StorageAdapter.remove(k, STORE_NAME)));
+        await StorageAdapter.removeByPrefix(`${categoryId}::${operatingMonth}::`, STORE_NAME);
     }
 };
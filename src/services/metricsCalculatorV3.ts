@@ -22,26 +22,31 @@ export const MetricsCalculatorV3 = {
     ): Partial<SweepResult> {
         console.log(`[DEMAND_V3][START] categoryId=${categoryId} snapshotId=${snapshotId}`);
 
-        // 1. DEDUPLICATION (Canonical Identity)
-        const groups = new Map<string, SnapshotKeywordRow[]>();
-        rows.forEach(r => {
+        // 1. DEDUPLICATION (Canonical Identity) + DEMAND SUM — single pass over rows.
+        // Winner per key is the first row with the highest volume (same as a stable
+        // sort DESC), kept in first-seen key order.
+        const winnerByKey = new Map<string, { row: SnapshotKeywordRow; eligible: boolean }>();
+        let totalValidatedVolume = 0;
+        let demandRowCount = 0;
+        for (let i = 0; i < rows.length; i++) {
+            const r = rows[i];
+            const eligible = isDemandEligible(r);
+            // Use ALL eligible rows (not just winners) for Total Demand Volume to match Standard Candle logic
+            if (eligible) {
+                totalValidatedVolume += (r.volume || 0);
+                demandRowCount++;
+            }
             const key = KeywordCanonicalizer.canonicalKey(r.keyword_text);
-            if (!groups.has(key)) groups.set(key, []);
-            groups.get(key)!.push(r);
-        });
-
-        const winners: SnapshotKeywordRow[] = [];
-        groups.forEach((group, key) => {
-            // Sort by Volume DESC to pick winner
-            const winner = group.sort((a, b) => (b.volume || 0) - (a.volume || 0))[0];
-            winners.push(winner);
-        });
+            const current = winnerByKey.get(key);
+            if (!current) {
+                winnerByKey.set(key, { row: r, eligible });
+            } else if ((r.volume || 0) > (current.row.volume || 0)) {
+                current.row = r;
+                current.eligible = eligible;
+            }
+        }
 
         // 2. DEMAND INDEX CALCULATION
-        // Use ALL eligible rows (not just winners) for Total Demand Volume to match Standard Candle logic
-        const rowsForDemand = rows.filter(isDemandEligible);
-        const totalValidatedVolume = rowsForDemand.reduce((sum, r) => sum + (r.volume || 0), 0);
-
         // RAW Demand (Option A Logic)
         const rawDemandMn = totalValidatedVolume / 1_000_000;
         let finalDemandMn = rawDemandMn;
@@ -58,19 +63,38 @@ export const MetricsCalculatorV3 = {
 
         // AUDIT LOGS (P0 Requirement)
         console.log(`[DEMAND_ALIGN_AUDIT][BENCH_SRC] file=metricsCalculatorV3.ts fn=calculate demandFormula=calibrated(raw/1M) units=Mn`);
-        console.log(`[DEMAND_ALIGN_AUDIT][ROWSET] categoryId=${categoryId} rowsLoaded=${rows.length} active=${rowsForDemand.length} volumeSum=${totalValidatedVolume}`);
+        console.log(`[DEMAND_ALIGN_AUDIT][ROWSET] categoryId=${categoryId} rowsLoaded=${rows.length} active=${demandRowCount} volumeSum=${totalValidatedVolume}`);
         console.log(`[DEMAND_ALIGN_AUDIT][UNIT_CHECK] categoryId=${categoryId} totalValidatedVolume=${totalValidatedVolume} demand_index_mn=${demandIndexMn}`);
 
         // 3. METRIC SCORES (Readiness & Spread)
-        // Use deduplicated winners for quality metrics to avoid skew
-        const winnersEligible = winners.filter(isDemandEligible);
-        const winnersVolume = winnersEligible.reduce((sum, w) => sum + (w.volume || 0), 0);
-        
-        // Spread (HHI)
+        // Use deduplicated winners for quality metrics to avoid skew.
+        // Single pass over winners (in key order, so float sums match a filter/reduce).
+        // Intent weights aligned with presentation (3-tier model)
+        const weights: Record<string, number> = {
+            'Decision': 1.00,
+            'Consideration': 0.70, 'Need': 0.70, 'Problem': 0.70,
+            'Habit': 0.40, 'Aspirational': 0.40, 'Discovery': 0.40
+        };
         const anchorVols: Record<string, number> = {};
-        winnersEligible.forEach(w => {
+        const anchorKeywordCounts: Record<string, number> = {};
+        const anchorResolvedCounts: Record<string, number> = {};
+        let winnersVolume = 0;
+        let weightedSum = 0;
+        let zeroVolumeCount = 0;
+        winnerByKey.forEach(({ row: w, eligible }) => {
+            anchorKeywordCounts[w.anchor_id] = (anchorKeywordCounts[w.anchor_id] || 0) + 1;
+            if ((w.volume || 0) === 0) zeroVolumeCount++;
+            if (!eligible) return;
+
+            winnersVolume += (w.volume || 0);
+            // Spread (HHI)
             anchorVols[w.anchor_id] = (anchorVols[w.anchor_id] || 0) + w.volume!;
+            anchorResolvedCounts[w.anchor_id] = (anchorResolvedCounts[w.anchor_id] || 0) + 1;
+            // Readiness (Intent Mix)
+            const weight = weights[w.intent_bucket || 'Discovery'] || 0.55;
+            weightedSum += (w.volume || 0) * weight;
         });
+        const winnerCount = winnerByKey.size;
 
         let spreadScore = 1;
 
@@ -84,19 +108,6 @@ export const MetricsCalculatorV3 = {
             spreadScore = Math.max(1, Math.min(10, spreadScore));
         }
 
-        // Readiness (Intent Mix)
-        // Intent weights aligned with presentation (3-tier model)
-        const weights: Record<string, number> = {
-            'Decision': 1.00,
-            'Consideration': 0.70, 'Need': 0.70, 'Problem': 0.70,
-            'Habit': 0.40, 'Aspirational': 0.40, 'Discovery': 0.40
-        };
-        let weightedSum = 0;
-        winnersEligible.forEach(w => {
-            const weight = weights[w.intent_bucket || 'Discovery'] || 0.55;
-            weightedSum += (w.volume || 0) * weight;
-        });
-        
         const avgIntent = winnersVolume === 0 ? 0 : weightedSum / winnersVolume;
         const normReadiness = Math.max(0, Math.min(1, (avgIntent - 0.5) / 0.5));
         const readinessScore = 1 + 9 * Math.sqrt(normReadiness);
@@ -143,8 +154,8 @@ export const MetricsCalculatorV3 = {
                 source: "Google Trends Grounding",
                 coverage: 1,
                 windowId: "now",
-                keywordCountTotal: winners.length,
-                keywordCountWithTrend: winners.length,
+                keywordCountTotal: winnerCount,
+                keywordCountWithTrend: winnerCount,
                 method: "MODEL_ESTIMATE",
                 period: "5y",
                 timestamp: new Date().toISOString()
@@ -159,16 +170,16 @@ export const MetricsCalculatorV3 = {
             metricsVersion: "ABS_V3",
             demandAudit: {
                 totalKeywordsInput: rows.length,
-                resolvedKeywordCount: winners.length,
-                zeroVolumeCount: winners.filter(w => (w.volume || 0) === 0).length,
+                resolvedKeywordCount: winnerCount,
+                zeroVolumeCount,
                 anchorVolumes: Object.entries(anchorVols).map(([name, vol]) => ({
                     anchorName: name,
                     totalVolume: vol,
-                    keywordCount: winners.filter(w => w.anchor_id === name).length,
-                    resolvedCount: winnersEligible.filter(w => w.anchor_id === name).length
+                    keywordCount: anchorKeywordCounts[name] || 0,
+                    resolvedCount: anchorResolvedCounts[name] || 0
                 })),
                 strategyHashUsed: "ABS_V3_DEDUP",
-                demandIndexRowsUsed: rowsForDemand.length
+                demandIndexRowsUsed: demandRowCount
             }
         };
     }
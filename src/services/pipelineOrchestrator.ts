@@ -12,6 +12,8 @@ import { JobControlService } from './jobControlService';
 import { DateUtils } from '../utils/dateUtils';
 import { CategorySnapshotStore } from './categorySnapshotStore';
 import { yieldToUI } from '../utils/yield';
+import { CancelToken } from './cancelToken';
+import { LlmRunContext } from './llmScheduler';
 
 export interface PipelineRunOptions {
     categoryId: string;
@@ -19,6 +21,7 @@ export interface PipelineRunOptions {
     tier: 'LITE' | 'FULL';
     jobId?: string;
     mode: 'DRY_RUN' | 'FULL_RUN';
+    cancelToken?: CancelToken;
 }
 
 export interface PipelineResult {
@@ -68,6 +71,10 @@ export const PipelineOrchestrator = {
         const db = FirestoreClient.getDbSafe();
         if (!db) throw new Error("DB_INIT_FAIL");
 
+        // LLM calls queue behind interactive console work
+        const llm: LlmRunContext = { lane: 'pipeline', cancelToken: opts.cancelToken };
+        const abortSignal = opts.cancelToken?.signal ?? new AbortController().signal;
+
         // --- HEARTBEAT & PERSISTENCE HELPERS ---
         const runDocRef = doc(db, 'pipeline_runs', runId);
         let heartbeatInterval: any = null;
@@ -173,9 +180,10 @@ export const PipelineOrchestrator = {
                 // Explicitly pass snapshot ID to ensure it reads the same one
                 const res = await runPreSweepIntelligence(categoryBase, 'India', 
                     (l) => console.log(`[GEMINI] ${l.message}`), 
-                    new AbortController().signal, 
+                    abortSignal, 
                     undefined, 
-                    corpusSnap.snapshot_id 
+                    corpusSnap.snapshot_id,
+                    llm
                 );
 
                 if (!res.ok) throw new Error((res as any).error);
@@ -223,7 +231,7 @@ export const PipelineOrchestrator = {
                     cnaData, // Pass strategy data to guide synthesis
                     'India', 
                     () => {}, 
-                    new AbortController().signal, 
+                    abortSignal, 
                     undefined, 
                     { jobId: runId, runId: `${runId}_1`, windowId: month, registryHash: '', keywordBaseHash: '', budget: {} },
                     undefined,
@@ -285,7 +293,7 @@ export const PipelineOrchestrator = {
                     return;
                 }
                 
-                const res = await runSingleDeepDive(opts.categoryId, runId, demandResult); 
+                const res = await runSingleDeepDive(opts.categoryId, runId, demandResult, undefined, llm);
                 
                 if (!res.ok) throw new Error((res as any).error);
                 ddResult = res.data;
@@ -304,7 +312,8 @@ export const PipelineOrchestrator = {
                     opts.categoryId,
                     'IN',
                     'en',
-                    ddResult
+                    ddResult,
+                    runId // Streaming draft of S9, superseded by this snapshot
                 );
                 if (!res.ok) throw new Error("Failed to save Deep Dive Snapshot");
                 result.artifacts.deepDiveSnapshotId = res.data.snapshot_id;
@@ -314,7 +323,7 @@ export const PipelineOrchestrator = {
             // S11: Playbook
             await measure('S11', async () => {
                 if (opts.mode === 'DRY_RUN') return;
-                const res = await runSinglePlaybook(opts.categoryId, ddResult);
+                const res = await runSinglePlaybook(opts.categoryId, ddResult, undefined, llm);
                 if (!res.ok) throw new Error((res as any).error);
                 
                 // Persist playbook run
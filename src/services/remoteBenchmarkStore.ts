@@ -1,6 +1,6 @@
 
 import { initializeApp, getApps, getApp } from 'firebase/app';
-import { getFirestore, doc, setDoc, getDoc, DocumentSnapshot, collection, query, orderBy, limit, getDocs, QuerySnapshot } from 'firebase/firestore';
+import { getFirestore, connectFirestoreEmulator, doc, setDoc, getDoc, DocumentSnapshot, collection, query, orderBy, limit, getDocs, QuerySnapshot } from 'firebase/firestore';
 import { CertifiedBenchmarkV3 } from '../types';
 import { RuntimeCache } from './runtimeCache';
 
@@ -17,6 +17,11 @@ const firebaseConfig = {
   appId: env.VITE_FIREBASE_APP_ID || "1:631746929602:web:de7098fb5ff02b2411ac5b",
 };
 
+// Headless runs (scripts/runPipeline.ts --store emulator) point the SDK at a local emulator
+const EMULATOR_HOST: string = env.VITE_FIRESTORE_EMULATOR_HOST ||
+  (typeof process !== 'undefined' ? process.env?.FIRESTORE_EMULATOR_HOST : '') || '';
+let _emulatorConnected = false;
+
 const COLLECTION_NAME = 'cbv3_snapshots';
 const TIMEOUT_MS = 15000;
 
@@ -73,7 +78,15 @@ export const RemoteBenchmarkStore = {
         
         try {
             const app = !getApps().length ? initializeApp(firebaseConfig) : getApp();
-            return getFirestore(app);
+            const db = getFirestore(app);
+            if (EMULATOR_HOST && !_emulatorConnected) {
+                // Must happen before the first read or write on this instance
+                const [host, port] = EMULATOR_HOST.split(':');
+                connectFirestoreEmulator(db, host, Number(port) || 8080);
+                _emulatorConnected = true;
+                console.log(`[CBV3][REMOTE] Using Firestore emulator host=${EMULATOR_HOST}`);
+            }
+            return db;
         } catch (e) {
             console.error("[CBV3][REMOTE] Firebase Init Error", e);
             return null;
@@ -1,5 +1,6 @@
 
 import { CategorySnapshotStore } from './categorySnapshotStore';
+import { SnapshotKeywordRow } from '../types';
 import { yieldToUI } from '../utils/yield';
 
 export type SnapshotRowLite = {
@@ -17,73 +18,160 @@ export type ChunkSpec = {
   chunkSize: number;
   maxChunks: number;
   seed: string; // Used for deterministic sort tie-breaking if needed (currently vol desc)
+  readAhead?: number; // Chunk reads kept in flight (default 4)
 };
 
+const DEFAULT_READ_AHEAD = 4;
+
+export type SnapshotChunkRead = {
+  index: number;
+  chunkId: string;
+  rows: SnapshotKeywordRow[];
+};
+
+/**
+ * Streams snapshot chunks in chunk order while keeping up to `readAhead`
+ * reads in flight. A new read is only issued when the consumer pulls the
+ * next chunk, so breaking out of the loop stops further reads.
+ */
+export async function* streamSnapshotChunks(
+  categoryId: string,
+  snapshotId: string,
+  readAhead: number = DEFAULT_READ_AHEAD
+): AsyncGenerator<SnapshotChunkRead> {
+  const params = { categoryId, countryCode: 'IN', languageCode: 'en' };
+  const chunkIds = await CategorySnapshotStore.getSnapshotChunkIds(params, snapshotId);
+
+  const depth = Math.max(1, readAhead);
+  const inflight: Promise<SnapshotKeywordRow[]>[] = [];
+  let next = 0;
+
+  const issue = () => {
+    const chunkId = chunkIds[next++];
+    const p = CategorySnapshotStore.readSnapshotChunk(params, snapshotId, chunkId);
+    // Reads abandoned by an early break must not surface as unhandled rejections
+    p.catch(() => {});
+    inflight.push(p);
+  };
+
+  while (next < chunkIds.length && inflight.length < depth) issue();
+
+  for (let index = 0; index < chunkIds.length; index++) {
+    const rows = await inflight.shift()!;
+    if (next < chunkIds.length) issue();
+    yield { index, chunkId: chunkIds[index], rows };
+  }
+}
+
+type Ranked = { row: SnapshotRowLite; seq: number };
+
+// Primary: Volume DESC, Secondary: Keyword ASC, then arrival order
+// (matches the stable sort this reader used before).
+const compareRanked = (a: Ranked, b: Ranked): number => {
+  if (b.row.volume !== a.row.volume) return b.row.volume - a.row.volume;
+  const byKeyword = a.row.keyword.localeCompare(b.row.keyword);
+  if (byKeyword !== 0) return byKeyword;
+  return a.seq - b.seq;
+};
+
+/**
+ * Bounded heap holding the best `k` rows. The root is the worst kept row,
+ * so each candidate costs one comparison unless it displaces the root.
+ */
+class TopKRows {
+  private heap: Ranked[] = [];
+  private seq = 0;
+
+  constructor(private k: number) {}
+
+  push(row: SnapshotRowLite) {
+    const item = { row, seq: this.seq++ };
+    const heap = this.heap;
+    if (heap.length < this.k) {
+      heap.push(item);
+      this.siftUp(heap.length - 1);
+    } else if (this.k > 0 && compareRanked(item, heap[0]) < 0) {
+      heap[0] = item;
+      this.siftDown(0);
+    }
+  }
+
+  toSortedRows(): SnapshotRowLite[] {
+    return this.heap.slice().sort(compareRanked).map(r => r.row);
+  }
+
+  // Heap order: parent ranks after (is worse than) its children
+  private siftUp(i: number) {
+    const heap = this.heap;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (compareRanked(heap[i], heap[parent]) <= 0) break;
+      [heap[i], heap[parent]] = [heap[parent], heap[i]];
+      i = parent;
+    }
+  }
+
+  private siftDown(i: number) {
+    const heap = this.heap;
+    const n = heap.length;
+    while (true) {
+      const l = 2 * i + 1;
+      const r = l + 1;
+      let worst = i;
+      if (l < n && compareRanked(heap[l], heap[worst]) > 0) worst = l;
+      if (r < n && compareRanked(heap[r], heap[worst]) > 0) worst = r;
+      if (worst === i) break;
+      [heap[i], heap[worst]] = [heap[worst], heap[i]];
+      i = worst;
+    }
+  }
+}
+
 export async function loadSnapshotRowsLiteChunked(
   categoryId: string,
   snapshotId: string,
   spec: ChunkSpec,
   opts?: { onlyActive?: boolean; onlyValid?: boolean }
 ): Promise<{ chunks: SnapshotRowLite[][]; totalRows: number }> {
-  // 1. Get Chunk IDs (Lightweight metadata fetch)
-  // Assuming IN/en as standard for this pipeline
-  const chunkIds = await CategorySnapshotStore.getSnapshotChunkIds(
-    { categoryId, countryCode: 'IN', languageCode: 'en' }, 
-    snapshotId
-  );
-
-  let accumulated: SnapshotRowLite[] = [];
   const limit = spec.chunkSize * spec.maxChunks;
+  const top = new TopKRows(limit);
+  let accepted = 0;
 
-  // 2. Iterate and Load Chunks
-  for (const chunkId of chunkIds) {
-    if (accumulated.length >= limit) break;
-
-    const rows = await CategorySnapshotStore.readSnapshotChunk(
-      { categoryId, countryCode: 'IN', languageCode: 'en' }, 
-      snapshotId, 
-      chunkId
-    );
-
-    // Filter & Map to Lite DTO
-    for (const r of rows) {
-      if (opts?.onlyActive && !r.active) continue;
-      if (opts?.onlyValid && (r.volume || 0) === 0) continue;
-
-      accumulated.push({
-        keyword_id: r.keyword_id,
-        keyword: r.keyword_text,
-        volume: r.volume || 0,
-        amazonVolume: r.amazonVolume,
-        anchor_id: r.anchor_id,
-        intent_bucket: r.intent_bucket,
-        status: r.status,
-        active: r.active
-      });
-    }
+  // 1. Pipelined chunk reads; stop pulling once the limit can be satisfied
+  if (limit > 0) {
+    for await (const { rows } of streamSnapshotChunks(categoryId, snapshotId, spec.readAhead)) {
+      // Filter & Map to Lite DTO
+      for (const r of rows) {
+        if (opts?.onlyActive && !r.active) continue;
+        if (opts?.onlyValid && (r.volume || 0) === 0) continue;
 
-    // Yield control to UI thread after each chunk read
-    await yieldToUI();
-  }
+        top.push({
+          keyword_id: r.keyword_id,
+          keyword: r.keyword_text,
+          volume: r.volume || 0,
+          amazonVolume: r.amazonVolume,
+          anchor_id: r.anchor_id,
+          intent_bucket: r.intent_bucket,
+          status: r.status,
+          active: r.active
+        });
+        accepted++;
+      }
 
-  // 3. Deterministic Sorting
-  // Primary: Volume DESC
-  // Secondary: Keyword ASC (Lexicographical)
-  accumulated.sort((a, b) => {
-    if (b.volume !== a.volume) return b.volume - a.volume;
-    return a.keyword.localeCompare(b.keyword);
-  });
-
-  // 4. Slice to hard limit
-  if (accumulated.length > limit) {
-    accumulated = accumulated.slice(0, limit);
+      // Yield control to UI thread after each chunk read
+      await yieldToUI();
+      if (accepted >= limit) break;
+    }
   }
 
-  // 5. Partition into Processing Chunks
+  // 2. Deterministic top-K (Volume DESC, Keyword ASC), already bounded to limit
+  const selected = top.toSortedRows();
+
+  // 3. Partition into Processing Chunks
   const chunks: SnapshotRowLite[][] = [];
-  for (let i = 0; i < accumulated.length; i += spec.chunkSize) {
-    chunks.push(accumulated.slice(i, i + spec.chunkSize));
+  for (let i = 0; i < selected.length; i += spec.chunkSize) {
+    chunks.push(selected.slice(i, i + spec.chunkSize));
   }
 
-  return { chunks, totalRows: accumulated.length };
+  return { chunks, totalRows: selected.length };
 }
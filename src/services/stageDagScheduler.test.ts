@@ -0,0 +1,85 @@
+
+import assert from 'assert';
+import { StageDagScheduler, StageDef } from './stageDagScheduler';
+import { JobCheckpointStore } from './jobCheckpointStore';
+
+/**
+ * UNIT TEST: Stage DAG Scheduler
+ * Dependencies and resource pools are respected, a re-run with the same jobId
+ * resumes at the failed stage with the checkpointed state, 'halt' skips later
+ * stages, and malformed DAGs are rejected up front.
+ */
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+export async function runStageDagSchedulerTests() {
+    console.group("Testing StageDagScheduler");
+
+    const signal = new AbortController().signal;
+    const jobId = `TEST_DAG::${Date.now()}`;
+    const calls: string[] = [];
+    let cpuActive = 0;
+    let cpuPeak = 0;
+    let failGrowFor: string | null = 'b';
+
+    const stages: StageDef[] = [
+        {
+            name: 'hydrate', resource: 'firestore',
+            run: async ({ item, state }) => {
+                calls.push(`hydrate:${item}`);
+                state.snapshotId = `snap_${item}`;
+            }
+        },
+        {
+            name: 'grow', resource: 'dfs', dependsOn: ['hydrate'],
+            run: async ({ item, state }) => {
+                calls.push(`grow:${item}`);
+                assert.strictEqual(state.snapshotId, `snap_${item}`, "State from earlier stages should be visible");
+                if (item === failGrowFor) throw new Error('DFS_DOWN');
+                if (item === 'c') return 'halt';
+            }
+        },
+        {
+            name: 'certify', resource: 'cpu', dependsOn: ['grow'],
+            run: async ({ item }) => {
+                calls.push(`certify:${item}`);
+                cpuPeak = Math.max(cpuPeak, ++cpuActive);
+                await sleep(5);
+                cpuActive--;
+            }
+        }
+    ];
+
+    // 1. First run: dependencies ordered, cpu pool of 1 serialises certify, b fails at grow, c halts
+    const first = await StageDagScheduler.run(['a', 'b', 'c', 'd'], stages, { jobId, signal });
+    assert.deepStrictEqual(first.map(r => r.status), ['DONE', 'FAILED', 'HALTED', 'DONE']);
+    assert.deepStrictEqual(first[1].failed, { stage: 'grow', reason: 'DFS_DOWN' });
+    assert.strictEqual(cpuPeak, 1, "cpu stages should never overlap with a pool of 1");
+    for (const item of ['a', 'd']) {
+        assert.ok(calls.indexOf(`hydrate:${item}`) < calls.indexOf(`grow:${item}`));
+        assert.ok(calls.indexOf(`grow:${item}`) < calls.indexOf(`certify:${item}`));
+    }
+    assert.strictEqual(calls.includes('certify:c'), false, "A halted item should skip later stages");
+    assert.ok(await JobCheckpointStore.getDagCheckpoint(jobId), "A failed run should keep its checkpoint");
+
+    // 2. Resume: only b's failed and remaining stages run, with its checkpointed state
+    calls.length = 0;
+    failGrowFor = null;
+    const second = await StageDagScheduler.run(['a', 'b', 'c', 'd'], stages, { jobId, signal });
+    assert.deepStrictEqual(second.map(r => r.status), ['DONE', 'DONE', 'HALTED', 'DONE']);
+    assert.deepStrictEqual(calls, ['grow:b', 'certify:b']);
+    assert.strictEqual(await JobCheckpointStore.getDagCheckpoint(jobId), null, "A clean run should clear its checkpoint");
+
+    // 3. Malformed DAGs are rejected before anything runs
+    const noop = async () => {};
+    await assert.rejects(StageDagScheduler.run(['a'], [
+        { name: 'x', resource: 'cpu', dependsOn: ['y'], run: noop },
+        { name: 'y', resource: 'cpu', dependsOn: ['x'], run: noop }
+    ], { jobId: `${jobId}::cycle`, signal }), /DAG_CYCLE/);
+    await assert.rejects(StageDagScheduler.run(['a'], [
+        { name: 'x', resource: 'cpu', dependsOn: ['missing'], run: noop }
+    ], { jobId: `${jobId}::unknown`, signal }), /DAG_UNKNOWN_DEPENDENCY/);
+
+    console.log("All StageDagScheduler Tests Passed.");
+    console.groupEnd();
+}
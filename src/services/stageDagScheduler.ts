@@ -0,0 +1,209 @@
+import { JobCheckpointStore } from './jobCheckpointStore';
+import type { DagCheckpoint, DagItemCheckpoint } from './jobCheckpointStore';
+
+/**
+ * STAGE DAG SCHEDULER
+ * Runs a set of items (categories) through a DAG of stages. Each stage names
+ * the resource it is bound by, and each resource has its own pool, so one
+ * category can be growing (DFS) while the next hydrates (Firestore) and a
+ * third certifies. Per-item progress is checkpointed to JobCheckpointStore
+ * after every stage; re-running with the same jobId skips finished stages and
+ * restarts an interrupted item at the stage it was in.
+ */
+
+export type StageResource = 'dfs' | 'firestore' | 'cpu';
+
+export const DEFAULT_STAGE_POOLS: Record<StageResource, number> = {
+    dfs: 2,         // DfsGlobalLimiter still enforces the API rate inside
+    firestore: 4,
+    cpu: 1          // Main thread; more only adds contention
+};
+
+export interface StageContext {
+    item: string;
+    state: Record<string, any>;     // Checkpointed; keep it JSON-serialisable
+    signal: AbortSignal;
+}
+
+/** Return 'halt' to finish the item early without running later stages. */
+export type StageOutcome = void | 'halt';
+
+export interface StageDef {
+    name: string;
+    resource: StageResource;
+    dependsOn?: string[];
+    run: (ctx: StageContext) => Promise<StageOutcome>;
+}
+
+export interface DagItemResult {
+    item: string;
+    status: 'DONE' | 'HALTED' | 'FAILED' | 'ABORTED';
+    state: Record<string, any>;
+    failed?: { stage: string; reason: string };
+}
+
+export interface DagRunOptions {
+    jobId: string;
+    signal: AbortSignal;
+    pools?: Partial<Record<StageResource, number>>;
+    onStage?: (item: string, stage: string, event: 'START' | 'DONE' | 'FAIL', detail?: string) => void;
+    onItemDone?: (result: DagItemResult) => void | Promise<void>;
+}
+
+/**
+ * Counting semaphore; waiters are served in item order so categories that
+ * entered the pipeline first leave it first.
+ */
+class ResourcePool {
+    private active = 0;
+    private waiters: Array<{ rank: number; resolve: () => void }> = [];
+
+    constructor(public readonly resource: StageResource, private size: number) {}
+
+    acquire(rank: number): Promise<void> {
+        if (this.active < this.size) {
+            this.active++;
+            return Promise.resolve();
+        }
+        return new Promise<void>(resolve => {
+            const i = this.waiters.findIndex(w => w.rank > rank);
+            const waiter = { rank, resolve };
+            if (i < 0) this.waiters.push(waiter);
+            else this.waiters.splice(i, 0, waiter);
+        });
+    }
+
+    release() {
+        const next = this.waiters.shift();
+        // Hand the slot straight over; `active` is unchanged
+        if (next) next.resolve();
+        else this.active--;
+    }
+}
+
+function validateStages(stages: StageDef[]) {
+    const names = new Set(stages.map(s => s.name));
+    for (const s of stages) {
+        for (const dep of s.dependsOn || []) {
+            if (!names.has(dep)) throw new Error(`DAG_UNKNOWN_DEPENDENCY: ${s.name} -> ${dep}`);
+        }
+    }
+    // Kahn's algorithm: every stage must become reachable
+    const remaining = new Map(stages.map(s => [s.name, new Set(s.dependsOn || [])]));
+    while (remaining.size > 0) {
+        const ready = Array.from(remaining.entries()).filter(([, deps]) => deps.size === 0).map(([n]) => n);
+        if (ready.length === 0) throw new Error(`DAG_CYCLE: ${Array.from(remaining.keys()).join(',')}`);
+        ready.forEach(n => {
+            remaining.delete(n);
+            remaining.forEach(deps => deps.delete(n));
+        });
+    }
+}
+
+export const StageDagScheduler = {
+
+    async run(items: string[], stages: StageDef[], opts: DagRunOptions): Promise<DagItemResult[]> {
+        validateStages(stages);
+
+        const poolSizes = { ...DEFAULT_STAGE_POOLS, ...opts.pools };
+        const pools: Record<StageResource, ResourcePool> = {
+            dfs: new ResourcePool('dfs', Math.max(1, poolSizes.dfs)),
+            firestore: new ResourcePool('firestore', Math.max(1, poolSizes.firestore)),
+            cpu: new ResourcePool('cpu', Math.max(1, poolSizes.cpu))
+        };
+
+        // Resume: earlier failures get another attempt, finished stages are kept
+        const saved = await JobCheckpointStore.getDagCheckpoint(opts.jobId).catch(() => null);
+        const ckpt: DagCheckpoint = saved || { jobId: opts.jobId, items: {}, updatedAt: '' };
+        items.forEach(item => {
+            const entry = ckpt.items[item];
+            if (!entry) ckpt.items[item] = { done: [], state: {} };
+            else delete entry.failed;
+        });
+        if (saved) {
+            const resumed = items.filter(i => ckpt.items[i].done.length > 0).length;
+            console.log(`[DAG][RESUME] jobId=${opts.jobId} items=${items.length} resumed=${resumed}`);
+        }
+
+        // Checkpoint writes are serialised so a slow write never lands after a newer one
+        let saveChain: Promise<void> = Promise.resolve();
+        const persist = () => {
+            saveChain = saveChain
+                .then(() => JobCheckpointStore.saveDagCheckpoint(ckpt))
+                .catch(e => console.warn(`[DAG][CKPT_FAIL] jobId=${opts.jobId} reason=${e?.message || e}`));
+            return saveChain;
+        };
+
+        const runItem = async (item: string, rank: number): Promise<DagItemResult> => {
+            const entry: DagItemCheckpoint = ckpt.items[item];
+            const finished = (status: DagItemResult['status']): DagItemResult =>
+                ({ item, status, state: entry.state, failed: entry.failed });
+
+            if (entry.halted) return finished('HALTED');
+
+            const done = new Set(entry.done);
+            const running = new Map<string, Promise<void>>();
+
+            while (true) {
+                if (opts.signal.aborted) {
+                    await Promise.allSettled(running.values());
+                    return finished('ABORTED');
+                }
+                if (entry.failed) {
+                    await Promise.allSettled(running.values());
+                    return finished('FAILED');
+                }
+                if (entry.halted) {
+                    await Promise.allSettled(running.values());
+                    return finished('HALTED');
+                }
+
+                const ready = stages.filter(s =>
+                    !done.has(s.name) && !running.has(s.name) &&
+                    (s.dependsOn || []).every(d => done.has(d))
+                );
+                if (ready.length === 0 && running.size === 0) return finished('DONE');
+
+                for (const stage of ready) {
+                    const p = (async () => {
+                        await pools[stage.resource].acquire(rank);
+                        try {
+                            if (opts.signal.aborted || entry.failed || entry.halted) return;
+                            opts.onStage?.(item, stage.name, 'START');
+                            const outcome = await stage.run({ item, state: entry.state, signal: opts.signal });
+                            done.add(stage.name);
+                            entry.done = Array.from(done);
+                            if (outcome === 'halt') entry.halted = true;
+                            opts.onStage?.(item, stage.name, 'DONE');
+                        } catch (e: any) {
+                            if (!opts.signal.aborted) {
+                                entry.failed = { stage: stage.name, reason: e?.message || String(e) };
+                                opts.onStage?.(item, stage.name, 'FAIL', entry.failed.reason);
+                            }
+                        } finally {
+                            pools[stage.resource].release();
+                            running.delete(stage.name);
+                        }
+                        await persist();
+                    })();
+                    running.set(stage.name, p);
+                }
+
+                // Wake when any stage of this item settles
+                await Promise.race(running.values());
+            }
+        };
+
+        const results = await Promise.all(items.map(async (item, rank) => {
+            const result = await runItem(item, rank);
+            if (opts.onItemDone) await opts.onItemDone(result);
+            return result;
+        }));
+
+        await saveChain;
+        if (!opts.signal.aborted && results.every(r => r.status === 'DONE' || r.status === 'HALTED')) {
+            await JobCheckpointStore.clearDagCheckpoint(opts.jobId).catch(() => {});
+        }
+        return results;
+    }
+};
@@ -1,123 +1,421 @@
-
 const PREFIX = 'mci_v1_';
 
 // In-memory fallback in case localStorage is blocked or full
 const memoryStore = new Map<string, string>();
 
+const STORES = {
+    DEFAULT: 'default',
+    VALIDITY: 'validity',
+    REPORT: 'report',
+    OVERRIDE: 'override',
+    MAPPING: 'mapping',
+    SEED_META: 'seed_meta',
+    SEED_KEYWORDS: 'seed_keywords',
+    CSV_LOG: 'csv_log',
+    STRATEGY_ARTIFACT: 'strategy_artifact',
+    DEMAND_ARTIFACT: 'demand_artifact',
+    JOB: 'job',
+    BACKTEST: 'backtest',
+    MASTER_CSV: 'master_csv',
+    VOLUME_CACHE: 'volume_cache', // Added
+    MASTER_CSV_STORE: 'master_csv_store', // MasterCsvStore
+    CBV3: 'cbv3_store', // CertificationStore
+    LLM_CACHE: 'llm_cache' // LlmCallLayer
+};
+
+/**
+ * Storage engines work on full keys (`mci_v1_<store>_<key>`), so every
+ * engine resolves a given StorageAdapter key to the same record.
+ */
+interface StorageEngine {
+    readonly name: string;
+    get(fullKeys: string[]): Promise<any[]>;
+    set(entries: Array<[string, any]>): Promise<void>;
+    remove(fullKeys: string[]): Promise<void>;
+    removePrefix(prefix: string): Promise<void>;
+    keys(prefix: string): Promise<string[]>;
+    entries(prefix: string): Promise<Array<[string, any]>>;
+}
+
+// --- localStorage engine (legacy; used when IndexedDB is unavailable) ---
+
+const localStorageEngine: StorageEngine = {
+    name: 'localStorage',
+
+    async get(fullKeys) {
+        return fullKeys.map(finalKey => {
+            try {
+                const val = localStorage.getItem(finalKey);
+                if (!val) return undefined;
+                return JSON.parse(val);
+            } catch (e: any) {
+                console.warn(`[STORAGE_ADAPTER][FALLBACK_MEMORY] op=get key=${finalKey} reason=${String(e?.message || e)}`);
+                try {
+                    const val = memoryStore.get(finalKey);
+                    if (!val) return undefined;
+                    return JSON.parse(val);
+                } catch (e2) { return undefined; }
+            }
+        });
+    },
+
+    async set(entries) {
+        for (const [finalKey, value] of entries) {
+            const strVal = JSON.stringify(value);
+            try {
+                localStorage.setItem(finalKey, strVal);
+            } catch (e: any) {
+                console.warn(`[STORAGE_ADAPTER][FALLBACK_MEMORY] op=set key=${finalKey} reason=${String(e?.message || e)}`);
+                memoryStore.set(finalKey, strVal);
+            }
+        }
+    },
+
+    async remove(fullKeys) {
+        for (const finalKey of fullKeys) {
+            try {
+                localStorage.removeItem(finalKey);
+            } catch (e: any) {
+                console.warn(`[STORAGE_ADAPTER][FALLBACK_MEMORY] op=remove key=${finalKey} reason=${String(e?.message || e)}`);
+            }
+            memoryStore.delete(finalKey);
+        }
+    },
+
+    async removePrefix(prefix) {
+        try {
+            Object.keys(localStorage).forEach(k => {
+                if (k.startsWith(prefix)) localStorage.removeItem(k);
+            });
+        } catch (e) {
+            console.warn("Storage clear failed", e);
+        }
+        for (const k of Array.from(memoryStore.keys())) {
+            if (k.startsWith(prefix)) memoryStore.delete(k);
+        }
+    },
+
+    async keys(prefix) {
+        const keys: string[] = [];
+        try {
+            for (let i = 0; i < localStorage.length; i++) {
+                const k = localStorage.key(i);
+                if (k && k.startsWith(prefix)) keys.push(k);
+            }
+        } catch (e) {}
+
+        // Merge memory keys
+        for (const k of memoryStore.keys()) {
+            if (k.startsWith(prefix) && !keys.includes(k)) keys.push(k);
+        }
+        return keys;
+    },
+
+    async entries(prefix) {
+        const keys = await this.keys(prefix);
+        const values = await this.get(keys);
+        const out: Array<[string, any]> = [];
+        keys.forEach((k, i) => { if (values[i] !== undefined) out.push([k, values[i]]); });
+        return out;
+    }
+};
+
+// --- IndexedDB engine ---
+
+const DB_NAME = 'mci_storage_v1';
+// Bump when adding a STORES entry so onupgradeneeded creates its object store
+const DB_VERSION = 2;
+const MISC_STORE = '_misc';  // Keys outside any STORES namespace, keyed by full key
+const META_STORE = '_meta';
+const MIGRATION_FLAG = 'migrated_from_local_storage';
+
+// Longest name first so `master_csv_store_x` routes to master_csv_store, not master_csv
+const STORE_NAMES = Array.from(new Set(Object.values(STORES))).sort((a, b) => b.length - a.length);
+
+const reqToPromise = <T>(req: IDBRequest<T>) => new Promise<T>((resolve, reject) => {
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => reject(req.error);
+});
+
+const txDone = (tx: IDBTransaction) => new Promise<void>((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error || new Error('IDB_TX_ABORTED'));
+});
+
+const upperBound = (prefix: string) => prefix + '\uffff';
+
+interface RoutedKey { store: string; key: string; }
+
+interface ScanPlan {
+    store: string;
+    range: IDBKeyRange | null; // null = whole store
+    toFull: (key: string) => string;
+}
+
+class IndexedDbEngine implements StorageEngine {
+    readonly name = 'indexedDB';
+
+    constructor(private db: IDBDatabase) {}
+
+    route(fullKey: string): RoutedKey {
+        if (fullKey.startsWith(PREFIX)) {
+            const rest = fullKey.slice(PREFIX.length);
+            for (const name of STORE_NAMES) {
+                if (rest.startsWith(name + '_')) return { store: name, key: rest.slice(name.length + 1) };
+            }
+        }
+        return { store: MISC_STORE, key: fullKey };
+    }
+
+    /** Object stores (and key ranges within them) that can hold keys starting with `prefix`. */
+    plan(prefix: string): ScanPlan[] {
+        const plans: ScanPlan[] = [];
+        for (const name of STORE_NAMES) {
+            const storePrefix = `${PREFIX}${name}_`;
+            const toFull = (key: string) => storePrefix + key;
+            if (storePrefix.startsWith(prefix)) {
+                plans.push({ store: name, range: null, toFull });
+            } else if (prefix.startsWith(storePrefix)) {
+                const local = prefix.slice(storePrefix.length);
+                plans.push({ store: name, range: IDBKeyRange.bound(local, upperBound(local)), toFull });
+            }
+        }
+        plans.push({
+            store: MISC_STORE,
+            range: prefix ? IDBKeyRange.bound(prefix, upperBound(prefix)) : null,
+            toFull: (key: string) => key
+        });
+        return plans;
+    }
+
+    async get(fullKeys: string[]) {
+        if (fullKeys.length === 0) return [];
+        const routes = fullKeys.map(k => this.route(k));
+        const tx = this.db.transaction(Array.from(new Set(routes.map(r => r.store))), 'readonly');
+        return Promise.all(routes.map(r => reqToPromise(tx.objectStore(r.store).get(r.key))));
+    }
+
+    async set(entries: Array<[string, any]>) {
+        if (entries.length === 0) return;
+        const routes = entries.map(([k]) => this.route(k));
+        const tx = this.db.transaction(Array.from(new Set(routes.map(r => r.store))), 'readwrite');
+        const done = txDone(tx);
+        entries.forEach(([, value], i) => {
+            const store = tx.objectStore(routes[i].store);
+            try {
+                store.put(value, routes[i].key);
+            } catch (e: any) {
+                if (e?.name !== 'DataCloneError') throw e;
+                // Functions/proxies can't be structured-cloned; keep the old JSON semantics
+                store.put(JSON.parse(JSON.stringify(value)), routes[i].key);
+            }
+        });
+        await done;
+    }
+
+    async remove(fullKeys: string[]) {
+        if (fullKeys.length === 0) return;
+        const routes = fullKeys.map(k => this.route(k));
+        const tx = this.db.transaction(Array.from(new Set(routes.map(r => r.store))), 'readwrite');
+        const done = txDone(tx);
+        routes.forEach(r => tx.objectStore(r.store).delete(r.key));
+        await done;
+    }
+
+    async removePrefix(prefix: string) {
+        const plans = this.plan(prefix);
+        const tx = this.db.transaction(plans.map(p => p.store), 'readwrite');
+        const done = txDone(tx);
+        for (const p of plans) {
+            const store = tx.objectStore(p.store);
+            if (p.range) store.delete(p.range);
+            else store.clear();
+        }
+        await done;
+    }
+
+    async keys(prefix: string) {
+        const plans = this.plan(prefix);
+        const tx = this.db.transaction(plans.map(p => p.store), 'readonly');
+        const perStore = await Promise.all(plans.map(p =>
+            reqToPromise(tx.objectStore(p.store).getAllKeys(p.range ?? undefined))
+                .then(keys => keys.map(k => p.toFull(String(k))))
+        ));
+        return ([] as string[]).concat(...perStore);
+    }
+
+    async entries(prefix: string) {
+        const plans = this.plan(prefix);
+        const tx = this.db.transaction(plans.map(p => p.store), 'readonly');
+        const perStore = await Promise.all(plans.map(async p => {
+            const store = tx.objectStore(p.store);
+            // Both requests walk the same range in key order, so they line up
+            const [keys, values] = await Promise.all([
+                reqToPromise(store.getAllKeys(p.range ?? undefined)),
+                reqToPromise(store.getAll(p.range ?? undefined))
+            ]);
+            return keys.map((k, i) => [p.toFull(String(k)), values[i]] as [string, any]);
+        }));
+        return ([] as Array<[string, any]>).concat(...perStore);
+    }
+
+    /**
+     * One-time copy of `mci_v1_` localStorage keys into IndexedDB. Runs in a
+     * single transaction; localStorage is only cleaned up after it commits.
+     */
+    async migrateFromLocalStorage() {
+        const tx = this.db.transaction(META_STORE, 'readonly');
+        const migrated = await reqToPromise(tx.objectStore(META_STORE).get(MIGRATION_FLAG));
+        if (migrated) return;
+
+        const keys = await localStorageEngine.keys(PREFIX);
+        const entries: Array<[string, any]> = [];
+        for (const k of keys) {
+            let raw: string | null | undefined;
+            try {
+                raw = localStorage.getItem(k);
+            } catch (e) {
+                raw = memoryStore.get(k);
+            }
+            if (raw === null || raw === undefined) continue;
+            // Values written outside StorageAdapter may not be JSON; keep them verbatim
+            let value: any = raw;
+            try { value = JSON.parse(raw); } catch (e) {}
+            entries.push([k, value]);
+        }
+
+        await this.set(entries);
+
+        const metaTx = this.db.transaction(META_STORE, 'readwrite');
+        const done = txDone(metaTx);
+        metaTx.objectStore(META_STORE).put({ at: new Date().toISOString(), count: entries.length }, MIGRATION_FLAG);
+        await done;
+
+        // Only keys that made it into IndexedDB; anything unread stays where it was
+        await localStorageEngine.remove(entries.map(([k]) => k));
+        console.log(`[STORAGE_ADAPTER][MIGRATE] moved=${entries.length} from=localStorage to=indexedDB`);
+    }
+}
+
+function openIndexedDb(): Promise<IDBDatabase> {
+    return new Promise((resolve, reject) => {
+        const req = indexedDB.open(DB_NAME, DB_VERSION);
+        req.onupgradeneeded = () => {
+            const db = req.result;
+            for (const name of [...STORE_NAMES, MISC_STORE, META_STORE]) {
+                if (!db.objectStoreNames.contains(name)) db.createObjectStore(name);
+            }
+        };
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+        req.onblocked = () => console.warn('[STORAGE_ADAPTER] IndexedDB upgrade blocked by another tab');
+    });
+}
+
+let enginePromise: Promise<StorageEngine> | null = null;
+
+function getEngine(): Promise<StorageEngine> {
+    if (!enginePromise) {
+        enginePromise = (async () => {
+            if (typeof indexedDB === 'undefined') return localStorageEngine;
+            try {
+                const engine = new IndexedDbEngine(await openIndexedDb());
+                try {
+                    await engine.migrateFromLocalStorage();
+                } catch (e: any) {
+                    // Flag stays unset, so the next session retries
+                    console.warn(`[STORAGE_ADAPTER][MIGRATE_FAIL] reason=${String(e?.message || e)}`);
+                }
+                return engine;
+            } catch (e: any) {
+                console.warn(`[STORAGE_ADAPTER][FALLBACK_LOCALSTORAGE] reason=${String(e?.message || e)}`);
+                return localStorageEngine;
+            }
+        })();
+    }
+    return enginePromise;
+}
+
+const fullKeyOf = (key: string, storeName?: string) => storeName ? `${PREFIX}${storeName}_${key}` : `${PREFIX}${key}`;
+
+const orNull = <T>(val: any): T | null => (val === undefined || val === null) ? null : val as T;
+
 export const StorageAdapter = {
   async get<T>(key: string, storeName?: string): Promise<T | null> {
-    const finalKey = storeName ? `${PREFIX}${storeName}_${key}` : `${PREFIX}${key}`;
-    try {
-      const val = localStorage.getItem(finalKey);
-      if (!val) return null;
-      return JSON.parse(val) as T;
-    } catch (e: any) {
-      console.warn(`[STORAGE_ADAPTER][FALLBACK_MEMORY] op=get key=${finalKey} reason=${String(e?.message || e)}`);
-      try {
-        const val = memoryStore.get(finalKey);
-        if (!val) return null;
-        return JSON.parse(val) as T;
-      } catch (e2) { return null; }
-    }
+    const engine = await getEngine();
+    const [val] = await engine.get([fullKeyOf(key, storeName)]);
+    return orNull<T>(val);
   },
 
   /**
-   * Retrieves item by full key (including prefix). 
+   * Retrieves item by full key (including prefix).
    * Essential for iterating keys returned by getAllKeys().
    */
   async getRaw<T>(fullKey: string): Promise<T | null> {
-    try {
-      const val = localStorage.getItem(fullKey);
-      if (!val) return null;
-      return JSON.parse(val) as T;
-    } catch (e) {
-       // Try memory
-       const val = memoryStore.get(fullKey);
-       if (!val) return null;
-       try { return JSON.parse(val) as T; } catch { return null; }
-    }
+    const engine = await getEngine();
+    const [val] = await engine.get([fullKey]);
+    return orNull<T>(val);
+  },
+
+  /** Reads many keys of one store in a single transaction. Missing keys come back as null. */
+  async getMany<T>(keys: string[], storeName?: string): Promise<(T | null)[]> {
+    const engine = await getEngine();
+    const vals = await engine.get(keys.map(k => fullKeyOf(k, storeName)));
+    return vals.map(v => orNull<T>(v));
   },
 
   async set(key: string, value: any, storeName?: string): Promise<void> {
-    const finalKey = storeName ? `${PREFIX}${storeName}_${key}` : `${PREFIX}${key}`;
-    const strVal = JSON.stringify(value);
-    try {
-      localStorage.setItem(finalKey, strVal);
-    } catch (e: any) {
-      console.warn(`[STORAGE_ADAPTER][FALLBACK_MEMORY] op=set key=${finalKey} reason=${String(e?.message || e)}`);
-      memoryStore.set(finalKey, strVal);
-    }
+    const engine = await getEngine();
+    await engine.set([[fullKeyOf(key, storeName), value]]);
+  },
+
+  /** Writes many entries of one store in a single transaction. */
+  async setMany(entries: Array<{ key: string; value: any }>, storeName?: string): Promise<void> {
+    const engine = await getEngine();
+    await engine.set(entries.map(e => [fullKeyOf(e.key, storeName), e.value] as [string, any]));
   },
 
   async remove(key: string, storeName?: string): Promise<void> {
-    const finalKey = storeName ? `${PREFIX}${storeName}_${key}` : `${PREFIX}${key}`;
-    try {
-      localStorage.removeItem(finalKey);
-    } catch (e: any) {
-       console.warn(`[STORAGE_ADAPTER][FALLBACK_MEMORY] op=remove key=${finalKey} reason=${String(e?.message || e)}`);
-    }
-    memoryStore.delete(finalKey);
+    const engine = await getEngine();
+    await engine.remove([fullKeyOf(key, storeName)]);
   },
 
   async clear(storeName?: string): Promise<void> {
-    try {
-        if (!storeName) {
-            // Clear all MCI keys
-            Object.keys(localStorage).forEach(k => {
-                if (k.startsWith(PREFIX)) localStorage.removeItem(k);
-            });
-            memoryStore.clear();
-            return;
-        }
-        const prefix = `${PREFIX}${storeName}_`;
-        Object.keys(localStorage).forEach(k => {
-            if (k.startsWith(prefix)) localStorage.removeItem(k);
-        });
-        
-        // Clear memory keys for store
-        for (const k of memoryStore.keys()) {
-            if (k.startsWith(prefix)) memoryStore.delete(k);
-        }
-    } catch (e) {
-        console.warn("Storage clear failed", e);
-    }
+    const engine = await getEngine();
+    // Clear all MCI keys, or just one store's
+    await engine.removePrefix(storeName ? `${PREFIX}${storeName}_` : PREFIX);
+    if (!storeName) memoryStore.clear();
   },
 
   async getAllKeys(storeName?: string): Promise<string[]> {
-    const keys: string[] = [];
-    const prefix = storeName ? `${PREFIX}${storeName}_` : PREFIX;
-    try {
-        for (let i = 0; i < localStorage.length; i++) {
-            const k = localStorage.key(i);
-            if (k && k.startsWith(prefix)) keys.push(k);
-        }
-    } catch (e) {}
+    const engine = await getEngine();
+    return engine.keys(storeName ? `${PREFIX}${storeName}_` : PREFIX);
+  },
 
-    // Merge memory keys
-    for (const k of memoryStore.keys()) {
-        if (k.startsWith(prefix) && !keys.includes(k)) keys.push(k);
-    }
-    return keys;
+  /**
+   * Key-range scan: entries of `storeName` whose key starts with `prefix`.
+   * Returned keys are store-relative (as passed to set()).
+   */
+  async getByPrefix<T>(prefix: string, storeName?: string): Promise<Array<{ key: string; value: T }>> {
+    const engine = await getEngine();
+    const base = fullKeyOf('', storeName);
+    const entries = await engine.entries(base + prefix);
+    return entries.map(([k, v]) => ({ key: k.slice(base.length), value: v as T }));
   },
-  
-  // Stubs for compatibility if needed
-  STORES: {
-      DEFAULT: 'default',
-      VALIDITY: 'validity',
-      REPORT: 'report',
-      OVERRIDE: 'override',
-      MAPPING: 'mapping',
-      SEED_META: 'seed_meta',
-      SEED_KEYWORDS: 'seed_keywords',
-      CSV_LOG: 'csv_log',
-      STRATEGY_ARTIFACT: 'strategy_artifact',
-      DEMAND_ARTIFACT: 'demand_artifact',
-      JOB: 'job',
-      BACKTEST: 'backtest',
-      MASTER_CSV: 'master_csv',
-      VOLUME_CACHE: 'volume_cache' // Added
+
+  async removeByPrefix(prefix: string, storeName?: string): Promise<void> {
+    const engine = await getEngine();
+    await engine.removePrefix(fullKeyOf(prefix, storeName));
+  },
+
+  /** Active backend: 'indexedDB' or 'localStorage' (memory fallback inside). */
+  async getEngineName(): Promise<string> {
+    return (await getEngine()).name;
   },
-  
+
+  STORES,
+
   // Stub unused methods
   async dumpAll(): Promise<Record<string, any>> { return {}; },
   async importJson(data: any): Promise<void> { }
@@ -3,6 +3,7 @@
 import { CategoryBaseline, AuditLogEntry, PreSweepData } from '../../types';
 import { GoogleGenAI } from "@google/genai";
 import { computeKeywordBaseHash } from '../driftHash';
+import { LlmCallLayer } from './llmCallLayer';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -99,11 +100,12 @@ export const StrategyRunner = {
                 attempt: 1, status: 'Running', durationMs: Date.now() - startTime, message: 'Generating Intent Map & Keyword Corpus...'
             });
 
-            const response = await ai.models.generateContent({
+            // Backtests run this per category; queue with the other pipeline LLM work
+            const response = await LlmCallLayer.generate(ai, {
                 model: 'gemini-3-flash-preview',
                 contents: prompt,
                 config: { responseMimeType: 'application/json' }
-            });
+            }, { label: 'STRATEGY_RUNNER', lane: 'pipeline', signal: abortSignal });
 
             const rawData = cleanAndParseJSON(response.text || "{}");
 
@@ -5,7 +5,8 @@ import { SeedKeywordRow } from './csvIngestion/types';
 import { StrategyPack, StrategyPackItem } from '../../types';
 import { StrategyContract, IntentNode, AnchorNarrative } from '../contracts/strategyContract';
 import { normalizeKeywordString } from '../../driftHash';
-import { GoogleGenAI } from "@google/genai";
+import { LlmCallLayer } from './llmCallLayer';
+import { LlmScheduler, LlmRunContext } from './llmScheduler';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -28,7 +29,7 @@ function getApiKey(): string | undefined {
 function getAI() {
   const apiKey = getApiKey();
   if (!apiKey) throw new Error("API Key missing. Set VITE_GOOGLE_API_KEY.");
-  return new GoogleGenAI({ apiKey });
+  return LlmScheduler.getClient(apiKey);
 }
 
 interface RefinementOutput {
@@ -56,13 +57,14 @@ export const StrategySeedCluster = {
     async cluster(
         category: CategoryBaseline,
         strategyPack: StrategyPack,
-        windowId: string
+        windowId: string,
+        llm: LlmRunContext = { lane: 'pipeline' }
     ): Promise<StrategyContract> {
         
         console.log(`[RefinementEngine] Using StrategyPack with ${strategyPack.keywords.length} representative keywords.`);
 
         // 1. AI Execution (Gemini 3 Pro + Thinking) using Pack
-        const refinedData = await this.runRefinementLoop(category.category, strategyPack);
+        const refinedData = await this.runRefinementLoop(category.category, strategyPack, llm);
 
         // 2. Map Pack Keywords to Anchors
         // We only map the Pack keywords here for the Contract's explicit list.
@@ -73,7 +75,7 @@ export const StrategySeedCluster = {
         return this.buildContract(category, windowId, refinedData, anchorMap, strategyPack, zeroVolStats);
     },
 
-    async runRefinementLoop(categoryName: string, pack: StrategyPack): Promise<RefinementOutput> {
+    async runRefinementLoop(categoryName: string, pack: StrategyPack, llm: LlmRunContext = { lane: 'pipeline' }): Promise<RefinementOutput> {
         const ai = getAI();
         
         // Prepare context from Pack
@@ -134,14 +136,14 @@ export const StrategySeedCluster = {
         `;
 
         try {
-            const response = await ai.models.generateContent({
+            const response = await LlmCallLayer.generate(ai, {
                 model: 'gemini-3-pro-preview',
                 contents: prompt,
                 config: { 
                     responseMimeType: 'application/json',
                     thinkingConfig: { thinkingBudget: 32768 }
                 }
-            });
+            }, { label: 'STRATEGY_SEED', ...llm });
 
             return JSON.parse(response.text || "{}");
         } catch (e) {
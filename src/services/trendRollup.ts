@@ -15,18 +15,12 @@ export const TrendRollupService = {
         let countWithTrend = 0;
         
         // 1. Fetch Truth for all keywords to access trend metrics
-        // We do this individually to ensure we are getting the exact record for the window.
-        
-        const trendData = await Promise.all(keywordKeys.map(async (key) => {
-            const truth = await VolumeTruthStore.getTruthVolume(key, windowId);
-            return {
-                key,
-                truth
-            };
-        }));
+        // One bulk read against the window's index.
+        const truthByKey = await VolumeTruthStore.getTruthVolumes(keywordKeys, windowId);
 
         // 2. Aggregate
-        for (const { key, truth } of trendData) {
+        for (const key of keywordKeys) {
+            const truth = truthByKey.get(key);
             // Check if trend5y exists in derived metrics
             const trendVal = truth?.derivedMetrics?.trend5y;
             
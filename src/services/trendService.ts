@@ -3,6 +3,7 @@ import { GoogleGenAI } from "@google/genai";
 import { FirestoreClient } from './firestoreClient';
 import { doc, getDoc, setDoc } from 'firebase/firestore';
 import { Trend5yOutput, TrendLabel, TrendSource } from '../types';
+import { LlmCallLayer } from './llmCallLayer';
 
 const safeProcess = (typeof process !== 'undefined' && process && process.env) 
     ? process 
@@ -103,14 +104,15 @@ export const TrendService = {
         `;
 
         try {
-            const response = await ai.models.generateContent({
+            // Grounded answers drift over time, and category_trend_store already caches for 30 days
+            const response = await LlmCallLayer.generate(ai, {
                 model: 'gemini-3-flash-preview',
                 contents: prompt,
                 config: { 
                     responseMimeType: 'application/json',
                     tools: [{ googleSearch: {} }] 
                 }
-            });
+            }, { label: 'TREND', lane: 'background', cache: false });
 
             const text = response.text || "{}";
             const data = JSON.parse(text);
@@ -32,13 +32,8 @@ export const VolumeResolution = {
     async planMissing(keywords: string[], windowId: string, categoryId?: string): Promise<string[]> {
         const effectiveWindow = categoryId ? await this.resolveEffectiveWindow(categoryId, windowId) : windowId;
         
-        const missing: string[] = [];
-        for (const kw of keywords) {
-            const truth = await VolumeTruthStore.getTruthVolume(kw, effectiveWindow);
-            if (truth) continue; 
-            missing.push(kw);
-        }
-        return missing;
+        const truthByKey = await VolumeTruthStore.getTruthVolumes(keywords, effectiveWindow);
+        return keywords.filter(kw => !truthByKey.has(kw));
     },
 
     /**
@@ -81,9 +76,11 @@ export const VolumeResolution = {
             auditMap.set(normalizeKeywordString(item.k), item.v);
         });
 
+        const truthByKey = await VolumeTruthStore.getTruthVolumes(keywords, effectiveWindow);
+
         for (const kw of keywords) {
             const normKw = normalizeKeywordString(kw);
-            const truth = await VolumeTruthStore.getTruthVolume(kw, effectiveWindow);
+            const truth = truthByKey.get(kw);
             
             if (truth) {
                 let source: ResolvedVolume['source'] = 'TRUTH_HIGH';
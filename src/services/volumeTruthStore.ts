@@ -41,6 +41,15 @@ export interface TruthVolume {
 const OBS_PREFIX = 'obs::';
 const TRUTH_PREFIX = 'truth::';
 
+/** normalized keyword -> truth record for one window, via one key-range scan over `truth::{windowId}::`. */
+async function scanWindow(windowId: string): Promise<Map<string, TruthVolume>> {
+    const prefix = `${TRUTH_PREFIX}${windowId}::`;
+    const entries = await StorageAdapter.getByPrefix<TruthVolume>(prefix);
+    const index = new Map<string, TruthVolume>();
+    entries.forEach(e => { if (e.value) index.set(e.key.slice(prefix.length), e.value); });
+    return index;
+}
+
 // --- Helpers ---
 
 export async function computeSHA256(str: string): Promise<string> {
@@ -69,6 +78,25 @@ export const VolumeTruthStore = {
         return await StorageAdapter.get<TruthVolume>(key);
     },
 
+    /**
+     * Bulk lookup for one window. Returns a map keyed by the keywords as
+     * passed in; keywords without a truth record are absent. Each call scans
+     * the window afresh, so it never serves a record older than the store.
+     */
+    async getTruthVolumes(keywords: string[], windowId: string): Promise<Map<string, TruthVolume>> {
+        const out = new Map<string, TruthVolume>();
+        if (TRUTH_STORE_DEPRECATED) {
+            if (keywords.length > 0) console.warn(`Legacy Truth Store bulk access attempted (${keywords.length} keywords).`);
+            return out;
+        }
+        const index = await scanWindow(windowId);
+        for (const kw of keywords) {
+            const truth = index.get(Normalization.normalize(kw));
+            if (truth) out.set(kw, truth);
+        }
+        return out;
+    },
+
     async calculateTruthFromValues(keyword: string, windowId: string, values: number[]): Promise<TruthVolume> {
         if (TRUTH_STORE_DEPRECATED) throw new Error("TRUTH_STORE_DEPRECATED_ACCESS");
         return {} as any;
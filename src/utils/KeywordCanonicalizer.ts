@@ -1,5 +1,17 @@
 
 import { normalizeKeywordString } from '../driftHash';
+import { createStringMemo } from './stringIntern';
+
+function canonicalKeyUncached(text: string): string {
+    return text
+        .toLowerCase()
+        .trim()
+        .replace(/[^\w\s-]/g, '') // Strip punctuation except word chars (includes _), spaces, and hyphens
+        .replace(/\s+/g, ' ')     // Collapse whitespace
+        .trim();
+}
+
+const canonicalKeyMemo = createStringMemo(canonicalKeyUncached, 200000);
 
 /**
  * KeywordCanonicalizer implements the identity rules for ABS_V3 metrics.
@@ -10,14 +22,14 @@ export const KeywordCanonicalizer = {
      * Rules:
      * 1. Lowercase, trim, collapse whitespace.
      * 2. Strip punctuation except spaces and hyphens.
+     * Memoized and interned; repeated calls for the same text are a map lookup.
      */
     canonicalKey(text: string): string {
         if (!text) return "";
-        return text
-            .toLowerCase()
-            .trim()
-            .replace(/[^\w\s-]/g, '') // Strip punctuation except word chars (includes _), spaces, and hyphens
-            .replace(/\s+/g, ' ')     // Collapse whitespace
-            .trim();
+        return canonicalKeyMemo(text);
+    },
+
+    getStats() {
+        return canonicalKeyMemo.stats();
     }
 };
@@ -1,7 +1,8 @@
-
 /**
  * DFS Rate Limiter Utility
- * Enforces strict RPM limits and handles exponential backoff for 429s.
+ * Enforces per-lane RPM limits (token bucket) with bounded concurrency and
+ * adaptive backoff for 429s. Each DfsKind gets its own lane so an Amazon
+ * backoff never stalls Google calls (and vice versa).
  */
 
 export type DfsKind = 'google' | 'amazon';
@@ -22,23 +23,170 @@ export class DfsUnavailableError extends Error {
 
 interface LimiterConfig {
     maxRpm: number;
+    burst: number;          // Token bucket capacity
+    maxConcurrent: number;  // In-flight calls per lane
     maxRetries: number;
     baseDelayMs: number;
+    maxDelayMs: number;
 }
 
-const DEFAULT_CONFIG: LimiterConfig = {
-    maxRpm: 10, // Safe buffer below 12/min
-    maxRetries: 5,
-    baseDelayMs: 2000,
+const LANE_CONFIG: Record<DfsKind, LimiterConfig> = {
+    google: {
+        maxRpm: 10, // Safe buffer below 12/min
+        burst: 2,
+        maxConcurrent: 3,
+        maxRetries: 5,
+        baseDelayMs: 2000,
+        maxDelayMs: 60000,
+    },
+    amazon: {
+        maxRpm: 30, // Labs endpoints allow far more; stay conservative
+        burst: 4,
+        maxConcurrent: 4,
+        maxRetries: 5,
+        baseDelayMs: 2000,
+        maxDelayMs: 60000,
+    },
 };
 
+// Adaptive rate scaling (AIMD): halve on 429, recover slowly on success.
+const MIN_RATE_SCALE = 0.25;
+const RATE_RECOVERY_STEP = 0.05;
+// EWMA weight for the observed rate-limit ratio.
+const ERROR_EWMA_ALPHA = 0.2;
+
+export interface DfsLaneStats {
+    kind: DfsKind;
+    inFlight: number;
+    queued: number;
+    tokens: number;
+    rateScale: number;
+    effectiveRpm: number;
+    errorRate: number;
+    cooldownMs: number;
+    calls: number;
+    rateLimited: number;
+}
+
+const sleep = (ms: number) => new Promise(r => setTimeout(r, ms));
+
+class DfsLane {
+    private tokens: number;
+    private lastRefillTs = Date.now();
+    private inFlight = 0;
+    private waiters: Array<() => void> = [];
+    private cooldownUntil = 0;
+    private rateScale = 1;
+    private errorRate = 0;
+    private calls = 0;
+    private rateLimited = 0;
+
+    constructor(public readonly kind: DfsKind, public readonly config: LimiterConfig) {
+        this.tokens = config.burst;
+    }
+
+    private refill() {
+        const now = Date.now();
+        const perMs = (this.config.maxRpm * this.rateScale) / 60000;
+        this.tokens = Math.min(this.config.burst, this.tokens + (now - this.lastRefillTs) * perMs);
+        this.lastRefillTs = now;
+    }
+
+    /**
+     * Waits for a concurrency slot, any lane-wide cooldown and a bucket token.
+     * Returns the total time spent waiting.
+     */
+    async acquire(): Promise<number> {
+        const start = Date.now();
+
+        if (this.inFlight >= this.config.maxConcurrent) {
+            // release() hands its slot straight to us, so inFlight is unchanged.
+            await new Promise<void>(r => this.waiters.push(r));
+        } else {
+            this.inFlight++;
+        }
+
+        while (true) {
+            const now = Date.now();
+            if (now < this.cooldownUntil) {
+                await sleep(this.cooldownUntil - now);
+                continue;
+            }
+            this.refill();
+            if (this.tokens >= 1) {
+                this.tokens -= 1;
+                return Date.now() - start;
+            }
+            const perMs = (this.config.maxRpm * this.rateScale) / 60000;
+            await sleep(Math.ceil((1 - this.tokens) / perMs));
+        }
+    }
+
+    release() {
+        const next = this.waiters.shift();
+        if (next) next();
+        else this.inFlight--;
+    }
+
+    recordSuccess() {
+        this.calls++;
+        this.errorRate = (1 - ERROR_EWMA_ALPHA) * this.errorRate;
+        this.rateScale = Math.min(1, this.rateScale + RATE_RECOVERY_STEP);
+    }
+
+    recordRateLimit() {
+        this.calls++;
+        this.rateLimited++;
+        this.errorRate = (1 - ERROR_EWMA_ALPHA) * this.errorRate + ERROR_EWMA_ALPHA;
+        this.rateScale = Math.max(MIN_RATE_SCALE, this.rateScale / 2);
+        // Drain the bucket so queued calls in this lane don't pile onto the limit.
+        this.tokens = 0;
+    }
+
+    /**
+     * Backoff honours Retry-After when the server sent one. Otherwise it grows
+     * exponentially with the attempt number, scaled by the lane's recent
+     * rate-limit ratio, and is capped at maxDelayMs.
+     */
+    computeBackoff(attempt: number, retryAfterMs?: number): number {
+        const jitter = Math.random() * 1000;
+        if (retryAfterMs !== undefined && retryAfterMs >= 0) {
+            return Math.min(this.config.maxDelayMs, retryAfterMs) + jitter;
+        }
+        const exp = this.config.baseDelayMs * Math.pow(2, attempt - 1);
+        return Math.min(this.config.maxDelayMs, exp * (1 + 2 * this.errorRate)) + jitter;
+    }
+
+    /** Pauses every caller in this lane (only this lane) until the window clears. */
+    coolDown(ms: number) {
+        this.cooldownUntil = Math.max(this.cooldownUntil, Date.now() + ms);
+    }
+
+    getStats(): DfsLaneStats {
+        this.refill();
+        return {
+            kind: this.kind,
+            inFlight: this.inFlight,
+            queued: this.waiters.length,
+            tokens: Number(this.tokens.toFixed(2)),
+            rateScale: this.rateScale,
+            effectiveRpm: Number((this.config.maxRpm * this.rateScale).toFixed(2)),
+            errorRate: Number(this.errorRate.toFixed(3)),
+            cooldownMs: Math.max(0, this.cooldownUntil - Date.now()),
+            calls: this.calls,
+            rateLimited: this.rateLimited,
+        };
+    }
+}
+
 class RateLimiter {
-    private queue: Promise<any> = Promise.resolve();
-    private lastCallTs = 0;
-    private minIntervalMs: number;
+    private lanes: Record<DfsKind, DfsLane>;
 
-    constructor(private config: LimiterConfig) {
-        this.minIntervalMs = (60 / config.maxRpm) * 1000;
+    constructor(config: Record<DfsKind, LimiterConfig>) {
+        this.lanes = {
+            google: new DfsLane('google', config.google),
+            amazon: new DfsLane('amazon', config.amazon),
+        };
     }
 
     async execute<T>(
@@ -49,90 +197,89 @@ class RateLimiter {
         path: string,
         fn: () => Promise<T>
     ): Promise<T> {
-        return new Promise((resolve, reject) => {
-            this.queue = this.queue.then(async () => {
-                let attempt = 1;
-                while (attempt <= this.config.maxRetries) {
-                    const now = Date.now();
-                    const timeSinceLast = now - this.lastCallTs;
-                    const waitMs = Math.max(0, this.minIntervalMs - timeSinceLast);
-                    
-                    if (waitMs > 0) {
-                        await new Promise(r => setTimeout(r, waitMs));
-                    }
-
-                    // Log Attempt: [DFS_CALL][RL]
-                    console.log(`[DFS_CALL][RL] kind=${kind} category=${categoryId} snapshot=${snapshotId} keywords=${keywordCount} attempt=${attempt} wait_ms=${waitMs} endpoint=https://api.dataforseo.com/v3 path=${path}`);
-
-                    try {
-                        const start = Date.now();
-                        const result = await fn() as any;
-                        const latency = Date.now() - start;
-                        this.lastCallTs = Date.now();
-
-                        // Check for rate limit indicators in response body or status
-                        // DataForSEO sometimes returns 200 OK but with a task error
-                        const isRateLimited = 
-                            result.status === 429 || 
-                            (result.error && typeof result.error === 'string' && (
-                                result.error.toLowerCase().includes('rates limit') ||
-                                result.error.toLowerCase().includes('limit per minute')
-                            ));
-
-                        if (isRateLimited) {
-                            const backoffMs = this.calculateBackoff(attempt);
-                            console.warn(`[DFS_BACKOFF][RL] kind=${kind} attempt=${attempt} reason=429_RATE sleep_ms=${backoffMs}`);
-                            await new Promise(r => setTimeout(r, backoffMs));
-                            attempt++;
-                            continue;
-                        }
-
-                        // Check for 5xx server errors
-                        if (!result.ok && result.status >= 500) {
-                            const backoffMs = this.calculateBackoff(attempt);
-                            console.warn(`[DFS_BACKOFF][RL] kind=${kind} attempt=${attempt} reason=5XX sleep_ms=${backoffMs}`);
-                            await new Promise(r => setTimeout(r, backoffMs));
-                            attempt++;
-                            continue;
-                        }
-
-                        // Success or Final Logical Error
-                        const dfsCode = result.status === 200 ? (result.parsedRows ? 20000 : result.status) : result.status;
-                        console.log(`[DFS_RESP][RL] kind=${kind} http=${result.status} ok=${result.ok} dfs_status_code=${dfsCode} tasks=${result.parsedRows?.length || 0} latency_ms=${latency}`);
-                        
-                        resolve(result);
-                        return;
-
-                    } catch (e: any) {
-                        const isTimeout = e.message?.includes('TIMEOUT') || e.name === 'AbortError';
-                        const backoffMs = this.calculateBackoff(attempt);
-                        
-                        if (attempt < this.config.maxRetries) {
-                            console.warn(`[DFS_BACKOFF][RL] kind=${kind} attempt=${attempt} reason=${isTimeout ? 'timeout' : 'network'} sleep_ms=${backoffMs}`);
-                            await new Promise(r => setTimeout(r, backoffMs));
-                            attempt++;
-                            continue;
-                        }
-
-                        console.error(`[DFS_FAIL][RL] kind=${kind} category=${categoryId} code=${isTimeout ? 'DFS_UNAVAILABLE' : 'DFS_ERROR'} msg=${e.message}`);
-                        reject(e);
-                        return;
-                    }
+        const lane = this.lanes[kind];
+        const { maxRetries } = lane.config;
+
+        let attempt = 1;
+        while (attempt <= maxRetries) {
+            const waitMs = await lane.acquire();
+            let backoffMs = 0;
+
+            try {
+                // Log Attempt: [DFS_CALL][RL]
+                console.log(`[DFS_CALL][RL] kind=${kind} category=${categoryId} snapshot=${snapshotId} keywords=${keywordCount} attempt=${attempt} wait_ms=${waitMs} endpoint=https://api.dataforseo.com/v3 path=${path}`);
+
+                const start = Date.now();
+                const result = await fn() as any;
+                const latency = Date.now() - start;
+
+                // Check for rate limit indicators in response body or status
+                // DataForSEO sometimes returns 200 OK but with a task error
+                const isRateLimited =
+                    result.status === 429 ||
+                    (result.error && typeof result.error === 'string' && (
+                        result.error.toLowerCase().includes('rates limit') ||
+                        result.error.toLowerCase().includes('rate limit') ||
+                        result.error.toLowerCase().includes('limit per minute')
+                    ));
+
+                if (isRateLimited) {
+                    lane.recordRateLimit();
+                    backoffMs = lane.computeBackoff(attempt, result.retryAfterMs);
+                    lane.coolDown(backoffMs);
+                    console.warn(`[DFS_BACKOFF][RL] kind=${kind} attempt=${attempt} reason=429_RATE sleep_ms=${Math.round(backoffMs)} retry_after_ms=${result.retryAfterMs ?? 'N/A'} rate_scale=${lane.getStats().rateScale}`);
                 }
+                // Check for 5xx server errors
+                else if (!result.ok && result.status >= 500) {
+                    backoffMs = lane.computeBackoff(attempt, result.retryAfterMs);
+                    console.warn(`[DFS_BACKOFF][RL] kind=${kind} attempt=${attempt} reason=5XX sleep_ms=${Math.round(backoffMs)}`);
+                }
+                else {
+                    // Success or Final Logical Error
+                    lane.recordSuccess();
+                    const dfsCode = result.status === 200 ? (result.parsedRows ? 20000 : result.status) : result.status;
+                    console.log(`[DFS_RESP][RL] kind=${kind} http=${result.status} ok=${result.ok} dfs_status_code=${dfsCode} tasks=${result.parsedRows?.length || 0} latency_ms=${latency}`);
+                    return result;
+                }
+            } catch (e: any) {
+                const isTimeout = e.message?.includes('TIMEOUT') || e.name === 'AbortError';
+
+                if (attempt >= maxRetries) {
+                    console.error(`[DFS_FAIL][RL] kind=${kind} category=${categoryId} code=${isTimeout ? 'DFS_UNAVAILABLE' : 'DFS_ERROR'} msg=${e.message}`);
+                    throw e;
+                }
+
+                backoffMs = lane.computeBackoff(attempt);
+                console.warn(`[DFS_BACKOFF][RL] kind=${kind} attempt=${attempt} reason=${isTimeout ? 'timeout' : 'network'} sleep_ms=${Math.round(backoffMs)}`);
+            } finally {
+                // Free the slot before sleeping so other callers can use the lane.
+                lane.release();
+            }
 
-                const finalMsg = `Rates limit per minute exceeded after ${this.config.maxRetries} attempts`;
-                console.error(`[DFS_FAIL][RL] kind=${kind} category=${categoryId} code=DFS_RATE_LIMIT msg=${finalMsg}`);
-                reject(new DfsRateLimitError(kind, finalMsg));
-            });
-        });
+            await sleep(backoffMs);
+            attempt++;
+        }
+
+        const finalMsg = `Rates limit per minute exceeded after ${maxRetries} attempts`;
+        console.error(`[DFS_FAIL][RL] kind=${kind} category=${categoryId} code=DFS_RATE_LIMIT msg=${finalMsg}`);
+        throw new DfsRateLimitError(kind, finalMsg);
     }
 
-    private calculateBackoff(attempt: number): number {
-        // 60s base window + jitter to clear the minute limit
-        const base = 60000; 
-        const jitter = Math.random() * 5000;
-        return base + jitter;
+    getStats(): DfsLaneStats[] {
+        return [this.lanes.google.getStats(), this.lanes.amazon.getStats()];
     }
 }
 
-export const DfsGlobalLimiter = new RateLimiter(DEFAULT_CONFIG);
+/**
+ * Parses a Retry-After header (delta-seconds or HTTP-date) into milliseconds.
+ */
+export function parseRetryAfterMs(header: string | null | undefined): number | undefined {
+    if (!header) return undefined;
+    const secs = Number(header);
+    if (Number.isFinite(secs)) return Math.max(0, secs * 1000);
+    const ts = Date.parse(header);
+    if (!Number.isNaN(ts)) return Math.max(0, ts - Date.now());
+    return undefined;
+}
+
+export const DfsGlobalLimiter = new RateLimiter(LANE_CONFIG);
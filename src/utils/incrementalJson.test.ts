@@ -0,0 +1,61 @@
+
+import assert from 'assert';
+import { createJsonMemberStream } from './incrementalJson';
+
+/**
+ * UNIT TEST: createJsonMemberStream
+ * Members are emitted as soon as their value closes, however the text is
+ * split; nested braces and escaped quotes inside strings do not confuse the
+ * scanner, and a cut-short stream reports what it parsed.
+ */
+
+const DOC = '```json\n{"title": "Razor {\\"pro\\"} kit", "sections": [{"a": [1, 2]}, {"b": "}"}], "score": 4.5, "flag": true}\n```';
+
+function feed(chunkSize: number) {
+    const order: string[] = [];
+    const stream = createJsonMemberStream(key => order.push(key));
+    for (let i = 0; i < DOC.length; i += chunkSize) stream.push(DOC.slice(i, i + chunkSize));
+    return { order, result: stream.finish() };
+}
+
+export function runIncrementalJsonTests() {
+    console.group("Testing createJsonMemberStream");
+
+    const expected = JSON.parse(DOC.slice(DOC.indexOf('{'), DOC.lastIndexOf('}') + 1));
+
+    // 1. Any chunking yields the same members, in document order
+    for (const size of [1, 3, 7, DOC.length]) {
+        const { order, result } = feed(size);
+        assert.deepStrictEqual(order, ['title', 'sections', 'score', 'flag'], `Member order for chunk size ${size}`);
+        assert.deepStrictEqual(result.members, expected, `Members for chunk size ${size}`);
+        assert.strictEqual(result.complete, true);
+        assert.deepStrictEqual(result.parseErrors, []);
+    }
+
+    // 2. A member is emitted before the rest of the object arrives
+    const early: string[] = [];
+    const partial = createJsonMemberStream(key => early.push(key));
+    partial.push('{"summary": "ok", "details": {"nested": ');
+    assert.deepStrictEqual(early, ['summary'], "Closed member should be emitted immediately");
+
+    // 3. Cut short: parsed members are kept and the result is marked incomplete
+    const cut = partial.finish();
+    assert.strictEqual(cut.complete, false);
+    assert.deepStrictEqual(cut.members, { summary: 'ok' });
+
+    // 4. A malformed value is reported by key and does not stop later members
+    const bad = createJsonMemberStream(() => {});
+    bad.push('{"a": tru, "b": 2}');
+    const badResult = bad.finish();
+    assert.deepStrictEqual(badResult.parseErrors, ['a']);
+    assert.deepStrictEqual(badResult.members, { b: 2 });
+
+    // 5. Text after the root object closes is ignored
+    const trailing = createJsonMemberStream(() => {});
+    trailing.push('{"a": 1}');
+    trailing.push('{"b": 2}');
+    assert.deepStrictEqual(trailing.finish().members, { a: 1 });
+
+    console.log("All Incremental JSON Tests Passed.");
+    console.groupEnd();
+}
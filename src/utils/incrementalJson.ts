@@ -0,0 +1,111 @@
+/**
+ * Incremental parser for a streamed JSON object.
+ * Text is pushed as it arrives from the model; each top-level member is
+ * parsed and handed to `onMember` as soon as its value closes, without
+ * waiting for the rest of the object. Anything before the opening `{`
+ * (e.g. a ```json fence) is skipped.
+ */
+
+export interface JsonMemberStreamResult {
+    members: Record<string, unknown>;
+    complete: boolean;          // Root object closed
+    parseErrors: string[];      // Keys whose value did not parse
+}
+
+type Phase = 'key' | 'colon' | 'value';
+
+export function createJsonMemberStream(onMember: (key: string, value: unknown) => void) {
+    const members: Record<string, unknown> = {};
+    const parseErrors: string[] = [];
+
+    let buf = '';
+    let pos = 0;
+    let started = false;
+    let complete = false;
+    let depth = 0;
+    let inString = false;
+    let escaped = false;
+
+    let phase: Phase = 'key';
+    let keyStart = -1;
+    let key = '';
+    let valueStart = -1;
+
+    const emit = (end: number) => {
+        const raw = buf.slice(valueStart, end);
+        try {
+            const value = JSON.parse(raw);
+            members[key] = value;
+            onMember(key, value);
+        } catch (e) {
+            parseErrors.push(key);
+        }
+        phase = 'key';
+        valueStart = -1;
+    };
+
+    const scan = () => {
+        for (; pos < buf.length && !complete; pos++) {
+            const ch = buf[pos];
+
+            if (!started) {
+                if (ch === '{') {
+                    started = true;
+                    depth = 1;
+                }
+                continue;
+            }
+
+            if (inString) {
+                if (escaped) escaped = false;
+                else if (ch === '\\') escaped = true;
+                else if (ch === '"') {
+                    inString = false;
+                    if (depth === 1 && phase === 'key' && keyStart >= 0) {
+                        key = JSON.parse(buf.slice(keyStart, pos + 1));
+                        keyStart = -1;
+                        phase = 'colon';
+                    }
+                }
+                continue;
+            }
+
+            if (ch === '"') {
+                inString = true;
+                if (depth === 1 && phase === 'key') keyStart = pos;
+            } else if (ch === ':' && depth === 1 && phase === 'colon') {
+                phase = 'value';
+                valueStart = pos + 1;
+            } else if (ch === '{' || ch === '[') {
+                depth++;
+            } else if (ch === '}' || ch === ']') {
+                if (depth === 1) {
+                    if (phase === 'value') emit(pos);
+                    complete = true;
+                }
+                depth--;
+            } else if (ch === ',' && depth === 1 && phase === 'value') {
+                emit(pos);
+            }
+        }
+
+        // Drop text that no pending member can still refer to
+        if (phase === 'key' && keyStart < 0 && pos > 0) {
+            buf = buf.slice(pos);
+            pos = 0;
+        }
+    };
+
+    return {
+        push(text: string) {
+            if (complete || !text) return;
+            buf += text;
+            scan();
+        },
+
+        /** Members parsed so far; `complete` is false if the stream was cut short. */
+        finish(): JsonMemberStreamResult {
+            return { members, complete, parseErrors };
+        }
+    };
+}
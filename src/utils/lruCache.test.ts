@@ -0,0 +1,71 @@
+
+import assert from 'assert';
+import { LruCache } from './lruCache';
+
+/**
+ * UNIT TEST: LruCache.loadMany
+ * Cached keys skip the loader, concurrent loads of the same key share one
+ * read, loader misses and failures are not cached, and eviction is LRU.
+ */
+
+export async function runLruCacheTests() {
+    console.group("Testing LruCache.loadMany");
+
+    // 1. Only uncached keys reach the loader, in a single call, de-duplicated
+    const cache = new LruCache<number>(10, 60_000);
+    cache.set('a', 1);
+    const calls: string[][] = [];
+    const loader = async (missing: string[]) => {
+        calls.push(missing);
+        return new Map(missing.filter(k => k !== 'none').map(k => [k, k.length] as [string, number]));
+    };
+    const got = await cache.loadMany(['a', 'bb', 'bb', 'none'], loader);
+    assert.deepStrictEqual(calls, [['bb', 'none']]);
+    assert.deepStrictEqual([...got.entries()].sort(), [['a', 1], ['bb', 2]]);
+
+    // 2. Loader misses are not cached: asked again next time
+    await cache.loadMany(['none'], loader);
+    assert.deepStrictEqual(calls[1], ['none'], "A key the loader did not return should be retried");
+
+    // 3. Single flight: an overlapping load joins the pending read
+    let release: () => void = () => {};
+    const gate = new Promise<void>(resolve => { release = resolve; });
+    let slowCalls = 0;
+    const slowLoader = async (missing: string[]) => {
+        slowCalls++;
+        await gate;
+        return new Map(missing.map(k => [k, 7] as [string, number]));
+    };
+    const first = cache.loadMany(['x', 'y'], slowLoader);
+    const second = cache.loadMany(['y'], slowLoader);
+    release();
+    const [r1, r2] = await Promise.all([first, second]);
+    assert.strictEqual(slowCalls, 1, "Overlapping loads of the same key should share one read");
+    assert.strictEqual(r1.get('y'), 7);
+    assert.strictEqual(r2.get('y'), 7);
+    assert.strictEqual(cache.getStats().coalesced, 1);
+
+    // 4. A failed load rejects its caller, caches nothing and frees the key
+    const failing = new LruCache<number>(10, 60_000);
+    await assert.rejects(failing.loadMany(['k'], async () => { throw new Error('read failed'); }), /read failed/);
+    const retried = await failing.loadMany(['k'], async () => new Map([['k', 3]]));
+    assert.strictEqual(retried.get('k'), 3, "A failed key should load again on the next call");
+
+    // 5. expiryOf can only shorten the TTL; already expired values are not stored
+    const expiring = new LruCache<number>(10, 60_000);
+    await expiring.loadMany(['old'], async () => new Map([['old', 1]]), () => Date.now() - 1);
+    assert.strictEqual(expiring.get('old'), undefined);
+
+    // 6. Least recently used entry is evicted first
+    const small = new LruCache<number>(2, 60_000);
+    small.set('p', 1);
+    small.set('q', 2);
+    small.get('p');
+    small.set('r', 3);
+    assert.strictEqual(small.get('q'), undefined, "Least recently used key should be evicted");
+    assert.strictEqual(small.get('p'), 1);
+    assert.strictEqual(small.getStats().evictions, 1);
+
+    console.log("All LruCache Tests Passed.");
+    console.groupEnd();
+}
@@ -0,0 +1,131 @@
+/**
+ * Bounded in-memory LRU with per-entry TTL and single-flight loading.
+ * Concurrent lookups for a key that is already being loaded share the
+ * same pending read instead of issuing another one.
+ */
+
+export interface LruCacheStats {
+    size: number;
+    maxEntries: number;
+    hits: number;
+    misses: number;
+    coalesced: number;
+    evictions: number;
+    expirations: number;
+}
+
+interface LruEntry<V> {
+    value: V;
+    expiresAt: number;
+}
+
+export class LruCache<V> {
+    // Map iteration order is insertion order; re-inserting on read keeps the
+    // least recently used entry at the front.
+    private entries = new Map<string, LruEntry<V>>();
+    private inflight = new Map<string, Promise<V | undefined>>();
+    private stats = { hits: 0, misses: 0, coalesced: 0, evictions: 0, expirations: 0 };
+
+    constructor(private maxEntries: number, private ttlMs: number) {}
+
+    get(key: string): V | undefined {
+        const entry = this.entries.get(key);
+        if (!entry) {
+            this.stats.misses++;
+            return undefined;
+        }
+        if (entry.expiresAt <= Date.now()) {
+            this.entries.delete(key);
+            this.stats.expirations++;
+            this.stats.misses++;
+            return undefined;
+        }
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        this.stats.hits++;
+        return entry.value;
+    }
+
+    /**
+     * Stores a value. `expiresAt` may shorten (never extend) the default TTL,
+     * e.g. to align with the age of the backing record.
+     */
+    set(key: string, value: V, expiresAt?: number) {
+        const defaultExpiry = Date.now() + this.ttlMs;
+        const expiry = expiresAt !== undefined ? Math.min(expiresAt, defaultExpiry) : defaultExpiry;
+        if (expiry <= Date.now()) return;
+
+        this.entries.delete(key);
+        this.entries.set(key, { value, expiresAt: expiry });
+
+        while (this.entries.size > this.maxEntries) {
+            const oldest = this.entries.keys().next().value as string;
+            this.entries.delete(oldest);
+            this.stats.evictions++;
+        }
+    }
+
+    delete(key: string) {
+        this.entries.delete(key);
+    }
+
+    clear() {
+        this.entries.clear();
+        this.inflight.clear();
+    }
+
+    /**
+     * Resolves many keys at once. Cached keys are served from memory, keys
+     * already being loaded join the pending read, and only the remainder is
+     * handed to `loader` in a single call. Keys the loader does not return
+     * are treated as misses and are not cached.
+     */
+    async loadMany(
+        keys: string[],
+        loader: (missing: string[]) => Promise<Map<string, V>>,
+        expiryOf?: (value: V) => number | undefined
+    ): Promise<Map<string, V>> {
+        const out = new Map<string, V>();
+        const waits: Promise<void>[] = [];
+        const missing: string[] = [];
+
+        for (const key of new Set(keys)) {
+            const cached = this.get(key);
+            if (cached !== undefined) {
+                out.set(key, cached);
+                continue;
+            }
+            const pending = this.inflight.get(key);
+            if (pending) {
+                this.stats.coalesced++;
+                waits.push(pending.then(v => { if (v !== undefined) out.set(key, v); }));
+                continue;
+            }
+            missing.push(key);
+        }
+
+        if (missing.length > 0) {
+            const batch = loader(missing).then(loaded => {
+                loaded.forEach((value, key) => this.set(key, value, expiryOf?.(value)));
+                return loaded;
+            });
+            const safeBatch = batch.catch(() => new Map<string, V>());
+
+            for (const key of missing) {
+                const p = safeBatch.then(m => m.get(key));
+                this.inflight.set(key, p);
+                p.then(() => { if (this.inflight.get(key) === p) this.inflight.delete(key); });
+            }
+
+            const loaded = await batch;
+            loaded.forEach((value, key) => out.set(key, value));
+        }
+
+        await Promise.all(waits);
+        return out;
+    }
+
+    getStats(): LruCacheStats {
+        return { size: this.entries.size, maxEntries: this.maxEntries, ...this.stats };
+    }
+}
@@ -0,0 +1,69 @@
+/**
+ * Bounded memo + intern table for pure string -> string normalizers.
+ * Each distinct input is normalized once per process (until evicted), and
+ * equal outputs are returned as the same string instance so every service
+ * holding a canonical key shares one copy.
+ */
+
+export interface StringMemoStats {
+    size: number;
+    interned: number;
+    hits: number;
+    misses: number;
+    evictions: number;
+}
+
+export interface StringMemo {
+    (raw: string): string;
+    stats(): StringMemoStats;
+    clear(): void;
+}
+
+export function createStringMemo(fn: (raw: string) => string, maxEntries: number): StringMemo {
+    const cache = new Map<string, string>();
+    const interned = new Map<string, string>();
+    let hits = 0;
+    let misses = 0;
+    let evictions = 0;
+
+    const memo = ((raw: string): string => {
+        const cached = cache.get(raw);
+        if (cached !== undefined) {
+            hits++;
+            return cached;
+        }
+        misses++;
+
+        const out = fn(raw);
+        let canonical = interned.get(out);
+        if (canonical === undefined) {
+            if (interned.size >= maxEntries) interned.delete(interned.keys().next().value as string);
+            interned.set(out, out);
+            canonical = out;
+        }
+
+        // FIFO eviction keeps the hot path to a single Map lookup
+        if (cache.size >= maxEntries) {
+            cache.delete(cache.keys().next().value as string);
+            evictions++;
+        }
+        cache.set(raw, canonical);
+        return canonical;
+    }) as StringMemo;
+
+    memo.stats = () => ({ size: cache.size, interned: interned.size, hits, misses, evictions });
+    memo.clear = () => {
+        cache.clear();
+        interned.clear();
+    };
+
+    return memo;
+}
+
+/** True when every UTF-16 unit is 7-bit ASCII (NFKD is then a no-op). */
+export function isAscii(s: string): boolean {
+    for (let i = 0; i < s.length; i++) {
+        if (s.charCodeAt(i) > 0x7f) return false;
+    }
+    return true;
+}